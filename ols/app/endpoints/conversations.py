@@ -85,8 +85,12 @@ def get_conversation(
         conversation_id,
     )
     try:
-        chat_history = CacheEntry.cache_entries_to_history(
-            retrieve_previous_input(user_id, conversation_id, skip_user_id_check)
+        # every cache entry consists of two messages - query and response
+        limit = (history_length + 1) // 2 if history_length is not None else None
+        chat_history = CacheEntry.cache_entries_to_messages(
+            retrieve_previous_input(
+                user_id, conversation_id, skip_user_id_check, limit=limit
+            )
         )
         if len(chat_history) == 0:
             logger.info(
@@ -200,6 +204,9 @@ def list_conversations(
     history_length: Optional[int] = Query(
         None, description="Number of most recent conversations to return", gt=0
     ),
+    offset: int = Query(
+        0, description="Number of most recent conversations to skip", ge=0
+    ),
     auth: Any = Depends(auth_dependency),
 ) -> ListConversationsResponse:
     """List all conversations for a given user.
@@ -207,6 +214,7 @@ def list_conversations(
     Args:
         auth: The Authentication handler (FastAPI Depends) that will handle authentication Logic.
         history_length: (Optional)Number of most recent conversations to return.
+        offset: (Optional)Number of most recent conversations to skip.
         user_id: (Optional)The user ID to get all conversations for.
 
     """
@@ -216,9 +224,8 @@ def list_conversations(
 
     # Log incoming request (after redaction)
     logger.info("Listing all conversations for user: %s ", user_id)
-    conversations = config.conversation_cache.list(user_id, skip_user_id_check)
-
-    if history_length is not None:
-        conversations = conversations[:history_length]
+    conversations = config.conversation_cache.list(
+        user_id, skip_user_id_check, limit=history_length, offset=offset
+    )
 
     return ListConversationsResponse(conversations=conversations)
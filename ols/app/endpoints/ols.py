@@ -1,13 +1,16 @@
 """Handlers for all OLS-related REST API endpoints."""
 
+import asyncio
 import dataclasses
 import json
 import logging
 import os
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Generator, Optional, Union
+from typing import Any, AsyncGenerator, Generator, Optional, Union
 
 import pytz
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -33,13 +36,18 @@ from ols.customize import keywords, prompts
 from ols.src.auth.auth import get_auth_dependency
 from ols.src.llms.llm_loader import LLMConfigurationError, resolve_provider_config
 from ols.src.query_helpers.attachment_appender import append_attachments_to_query
-from ols.src.query_helpers.docs_summarizer import DocsSummarizer
+from ols.src.query_helpers.docs_summarizer import DocsSummarizer, PreparedPrompt
+from ols.src.query_helpers.history_summarizer import HistorySummarizer
 from ols.src.query_helpers.question_validator import QuestionValidator
 from ols.src.query_helpers.topic_summarizer import TopicSummarizer
 from ols.utils import errors_parsing, suid
-from ols.utils.token_handler import PromptTooLongError
+from ols.utils.keyword_matcher import KeywordMatcher
+from ols.utils.token_handler import PromptTooLongError, TokenHandler
 
-KEYWORDS = keywords.KEYWORDS
+# keywords are compiled once, the query (with attachments) can be long
+KEYWORD_MATCHERS = {
+    mode: KeywordMatcher(keywords.KEYWORDS, mode) for mode in constants.KeywordMatchMode
+}
 INVALID_QUERY_RESP = prompts.INVALID_QUERY_RESP
 
 logger = logging.getLogger(__name__)
@@ -47,6 +55,21 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["query"])
 auth_dependency = get_auth_dependency(config.ols_config, virtual_path="/ols-access")
 
+# threads used to run independent parts of query processing concurrently
+pipeline_executor = ThreadPoolExecutor(
+    max_workers=constants.QUERY_PIPELINE_MAX_WORKERS,
+    thread_name_prefix="query-pipeline",
+)
+
+# threads used to summarize long conversations off the request path
+compaction_executor = ThreadPoolExecutor(
+    max_workers=constants.HISTORY_COMPACTION_MAX_WORKERS,
+    thread_name_prefix="history-compaction",
+)
+# conversations being compacted by this replica
+_compacting: set[str] = set()
+_compacting_lock = threading.Lock()
+
 query_responses: dict[int | str, dict[str, Any]] = {
     200: {
         "description": "Query is valid and correct response from LLM is returned",
@@ -72,7 +95,7 @@ query_responses: dict[int | str, dict[str, Any]] = {
 
 
 @router.post("/query", responses=query_responses)
-def conversation_request(
+async def conversation_request(
     llm_request: LLMRequest,
     auth: Any = Depends(auth_dependency),
     user_id: Optional[str] = None,
@@ -87,7 +110,7 @@ def conversation_request(
     Returns:
         Response containing the processed information.
     """
-    processed_request = process_request(auth, llm_request)
+    processed_request = await aprocess_request(auth, llm_request)
 
     summarizer_response: SummarizerResponse | Generator
 
@@ -100,23 +123,35 @@ def conversation_request(
             None,
         )
     else:
-        summarizer_response = generate_response(
-            processed_request.conversation_id,
-            llm_request,
-            processed_request.previous_input,
-        )
+        try:
+            summarizer_response = await agenerate_response(
+                processed_request.conversation_id,
+                llm_request,
+                processed_request.previous_input,
+                prepared_response=processed_request.prepared_response,
+            )
+        except BaseException:
+            cancel_futures(processed_request.topic_summary)
+            raise
 
     processed_request.timestamps["generate response"] = time.time()
 
-    topic_summary = ""
-    # only generate topic summary for new conversations
-    if not processed_request.previous_input:
-        topic_summary = get_topic_summary(
-            processed_request.conversation_id, llm_request
+    if config.ols_config.redact_responses:
+        summarizer_response = dataclasses.replace(
+            summarizer_response,
+            response=redact_response(
+                processed_request.conversation_id, summarizer_response.response
+            ),
         )
+        processed_request.timestamps["redact response"] = time.time()
+
+    topic_summary = ""
+    # topic summary is generated (concurrently) for new conversations only
+    if processed_request.topic_summary is not None:
+        topic_summary = await asyncio.wrap_future(processed_request.topic_summary)
         processed_request.timestamps["generate topic summary"] = time.time()
 
-    store_conversation_history(
+    await astore_conversation_history(
         processed_request.user_id,
         processed_request.conversation_id,
         llm_request,
@@ -130,7 +165,7 @@ def conversation_request(
     if config.ols_config.user_data_collection.transcripts_disabled:
         logger.debug("transcripts collections is disabled in configuration")
     else:
-        store_transcript(
+        await astore_transcript(
             processed_request.user_id,
             processed_request.conversation_id,
             processed_request.valid,
@@ -169,20 +204,20 @@ def conversation_request(
     )
 
 
-def process_request(auth: Any, llm_request: LLMRequest) -> ProcessedRequest:
-    """Process incoming request.
+def retrieve_request_context(
+    auth: Any, llm_request: LLMRequest, timestamps: dict[str, float]
+) -> tuple[str, str, bool, str, LLMRequest]:
+    """Retrieve user and conversation of the request and redact its query.
 
     Args:
         auth: The Authentication handler (FastAPI Depends) that will handle authentication Logic.
         llm_request: The request containing a query, conversation ID, and optional attachments.
+        timestamps: Timestamps of the processing steps, updated in place.
 
     Returns:
-        Tuple containing the processed information.
-        User ID, conversation ID, query without attachments, previous input,
-        attachments, validation result, timestamps, skip_user_id_check and user token
+        User ID, conversation ID, skip_user_id_check, user token and the
+        request with redacted query.
     """
-    timestamps = {"start": time.time()}
-
     user_id = retrieve_user_id(auth)
     logger.info("Auth module: %s", config.ols_config.authentication_config.module)
     logger.info("User ID: %s", user_id)
@@ -207,11 +242,22 @@ def process_request(auth: Any, llm_request: LLMRequest) -> ProcessedRequest:
         "Conversation ID: %s Incoming request: %s", conversation_id, llm_request.query
     )
 
-    previous_input = retrieve_previous_input(
-        user_id, llm_request.conversation_id, skip_user_id_check
-    )
-    timestamps["retrieve previous input"] = time.time()
+    return user_id, conversation_id, skip_user_id_check, user_token, llm_request
+
+
+def attach_attachments(
+    conversation_id: str, llm_request: LLMRequest, timestamps: dict[str, float]
+) -> tuple[str, list[Attachment]]:
+    """Redact attachments of the request and append them to its query.
 
+    Args:
+        conversation_id: The unique identifier for the conversation.
+        llm_request: The request containing a query and optional attachments.
+        timestamps: Timestamps of the processing steps, updated in place.
+
+    Returns:
+        Query without attachments and the redacted attachments.
+    """
     # Retrieve attachments from the request
     attachments = retrieve_attachments(llm_request)
 
@@ -224,14 +270,162 @@ def process_request(auth: Any, llm_request: LLMRequest) -> ProcessedRequest:
     llm_request.query = append_attachments_to_query(llm_request.query, attachments)
     timestamps["append attachments"] = time.time()
 
+    return query_without_attachments, attachments
+
+
+def process_request(
+    auth: Any, llm_request: LLMRequest, streaming: bool = False
+) -> ProcessedRequest:
+    """Process incoming request, see `aprocess_request`.
+
+    Args:
+        auth: The Authentication handler (FastAPI Depends) that will handle authentication Logic.
+        llm_request: The request containing a query, conversation ID, and optional attachments.
+        streaming: The flag indicating if the response is going to be streamed.
+
+    Returns:
+        Tuple containing the processed information.
+        User ID, conversation ID, query without attachments, previous input,
+        attachments, validation result, timestamps, skip_user_id_check, user token
+        and futures with prepared response and topic summary
+    """
+    timestamps = {"start": time.time()}
+    user_id, conversation_id, skip_user_id_check, user_token, llm_request = (
+        retrieve_request_context(auth, llm_request, timestamps)
+    )
+
+    previous_input = retrieve_previous_input(
+        user_id, llm_request.conversation_id, skip_user_id_check, history_limit()
+    )
+    schedule_history_compaction(
+        user_id, conversation_id, previous_input, llm_request, skip_user_id_check
+    )
+    timestamps["retrieve previous input"] = time.time()
+
+    query_without_attachments, attachments = attach_attachments(
+        conversation_id, llm_request, timestamps
+    )
+
     validate_requested_provider_model(llm_request)
 
+    # Start the work that does not depend on validation result speculatively
+    prepared_response: Optional[Future] = pipeline_executor.submit(
+        prepare_response, conversation_id, llm_request, previous_input, streaming
+    )
+    topic_summary: Optional[Future] = None
+    # only generate topic summary for new conversations
+    if not previous_input:
+        topic_summary = pipeline_executor.submit(
+            get_topic_summary, conversation_id, llm_request
+        )
+
     # Validate the query
+    try:
+        if not previous_input:
+            valid = validate_question(conversation_id, llm_request)
+        else:
+            logger.debug("follow-up conversation - skipping question validation")
+            valid = True
+    except BaseException:
+        cancel_futures(prepared_response, topic_summary)
+        raise
+
+    if not valid:
+        logger.debug("%s question rejected, dropping prepared prompt", conversation_id)
+        cancel_futures(prepared_response)
+        prepared_response = None
+
+    timestamps["validate question"] = time.time()
+
+    return ProcessedRequest(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        query_without_attachments=query_without_attachments,
+        previous_input=previous_input,
+        attachments=attachments,
+        valid=valid,
+        timestamps=timestamps,
+        skip_user_id_check=skip_user_id_check,
+        user_token=user_token,
+        prepared_response=prepared_response,
+        topic_summary=topic_summary,
+    )
+
+
+async def aprocess_request(
+    auth: Any, llm_request: LLMRequest, streaming: bool = False
+) -> ProcessedRequest:
+    """Process incoming request.
+
+    The question validation runs concurrently with the work that does not
+    depend on its result - RAG retrieval with prompt preparation and topic
+    summarization of new conversations. Prepared prompt is thrown away when
+    the question is rejected, so the response is never generated for it.
+
+    Args:
+        auth: The Authentication handler (FastAPI Depends) that will handle authentication Logic.
+        llm_request: The request containing a query, conversation ID, and optional attachments.
+        streaming: The flag indicating if the response is going to be streamed.
+
+    Returns:
+        Tuple containing the processed information.
+        User ID, conversation ID, query without attachments, previous input,
+        attachments, validation result, timestamps, skip_user_id_check, user token
+        and futures with prepared response and topic summary
+    """
+    timestamps = {"start": time.time()}
+    user_id, conversation_id, skip_user_id_check, user_token, llm_request = (
+        retrieve_request_context(auth, llm_request, timestamps)
+    )
+
+    previous_input = await aretrieve_previous_input(
+        user_id, llm_request.conversation_id, skip_user_id_check, history_limit()
+    )
+    schedule_history_compaction(
+        user_id, conversation_id, previous_input, llm_request, skip_user_id_check
+    )
+    timestamps["retrieve previous input"] = time.time()
+
+    query_without_attachments, attachments = attach_attachments(
+        conversation_id, llm_request, timestamps
+    )
+
+    validate_requested_provider_model(llm_request)
+
+    # Start the work that does not depend on validation result speculatively,
+    # RAG retrieval is blocking so it is run in the pipeline thread pool
+    prepared_response: Optional[
+        asyncio.Future
+    ] = asyncio.get_running_loop().run_in_executor(
+        pipeline_executor,
+        prepare_response,
+        conversation_id,
+        llm_request,
+        previous_input,
+        streaming,
+    )
+    topic_summary: Optional[asyncio.Future] = None
+    # only generate topic summary for new conversations
     if not previous_input:
-        valid = validate_question(conversation_id, llm_request)
-    else:
-        logger.debug("follow-up conversation - skipping question validation")
-        valid = True
+        topic_summary = asyncio.create_task(
+            aget_topic_summary(conversation_id, llm_request)
+        )
+
+    # Validate the query
+    try:
+        if not previous_input:
+            valid = await avalidate_question(conversation_id, llm_request)
+        else:
+            logger.debug("follow-up conversation - skipping question validation")
+            valid = True
+    except BaseException:
+        cancel_futures(prepared_response, topic_summary)
+        raise
+
+    if not valid:
+        logger.debug("%s question rejected, dropping prepared prompt", conversation_id)
+        cancel_futures(prepared_response)
+        prepared_response = None
 
     timestamps["validate question"] = time.time()
 
@@ -245,9 +439,28 @@ def process_request(auth: Any, llm_request: LLMRequest) -> ProcessedRequest:
         timestamps=timestamps,
         skip_user_id_check=skip_user_id_check,
         user_token=user_token,
+        prepared_response=prepared_response,
+        topic_summary=topic_summary,
     )
 
 
+def cancel_futures(*futures: Optional[Union[Future, asyncio.Future]]) -> None:
+    """Cancel speculatively started work that is not needed anymore.
+
+    Work that is already running in a thread can not be interrupted, its
+    result is just never retrieved. Errors of already finished work are
+    consumed, so they are not reported as never retrieved.
+    """
+    for future in futures:
+        if future is None:
+            continue
+        if future.done():
+            if not future.cancelled():
+                future.exception()
+        else:
+            future.cancel()
+
+
 def log_processing_durations(timestamps: dict[str, float]) -> None:
     """Log processing durations."""
 
@@ -311,14 +524,20 @@ def retrieve_conversation_id(llm_request: LLMRequest) -> str:
 
 
 def retrieve_previous_input(
-    user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    user_id: str,
+    conversation_id: str,
+    skip_user_id_check: bool = False,
+    limit: Optional[int] = None,
 ) -> list[CacheEntry]:
-    """Retrieve previous user input, if exists."""
+    """Retrieve previous user input, if exists.
+
+    Only `limit` most recent cache entries are retrieved when the limit is set.
+    """
     try:
         previous_input = []
         if conversation_id:
             cache_content = config.conversation_cache.get(
-                user_id, conversation_id, skip_user_id_check
+                user_id, conversation_id, skip_user_id_check, limit=limit
             )
             if cache_content is not None:
                 previous_input = cache_content
@@ -339,6 +558,184 @@ def retrieve_previous_input(
         )
 
 
+async def aretrieve_previous_input(
+    user_id: str,
+    conversation_id: str,
+    skip_user_id_check: bool = False,
+    limit: Optional[int] = None,
+) -> list[CacheEntry]:
+    """Retrieve previous user input asynchronously, see `retrieve_previous_input`."""
+    try:
+        previous_input = []
+        if conversation_id:
+            cache_content = await config.conversation_cache.aget(
+                user_id, conversation_id, skip_user_id_check, limit=limit
+            )
+            if cache_content is not None:
+                previous_input = cache_content
+            logger.info(
+                "Conversation ID: %s Previous conversation input: %s",
+                conversation_id,
+                previous_input,
+            )
+        return previous_input
+    except Exception as e:
+        logger.error("Error retrieving previous user input for user %s", user_id)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "response": "Error retrieving conversation history",
+                "cause": str(e),
+            },
+        )
+
+
+def history_limit() -> Optional[int]:
+    """Return number of the most recent cache entries used as conversation history.
+
+    Conversations are kept short by history compaction, so the limit only
+    bounds the read when the compaction falls behind.
+    """
+    cache_config = config.ols_config.conversation_cache
+    if cache_config is None or cache_config.history_compaction is None:
+        return None
+    # the oldest entry of compacted conversation is the summary
+    return cache_config.history_compaction.max_turns + 1
+
+
+def count_history_tokens(previous_input: list[CacheEntry]) -> int:
+    """Count tokens of conversation history messages.
+
+    Token counts stored in the cache entries are used when available.
+    """
+    token_handler = TokenHandler()
+    total = 0
+    for entry in previous_input:
+        # counts for any model family are precise enough for the threshold
+        counts = next(iter(entry.token_counts.values()), None)
+        if counts is not None:
+            total += sum(counts)
+            continue
+        total += sum(
+            token_handler.message_to_token_count(message)
+            for message in (entry.query, entry.response)
+        )
+    return total
+
+
+def schedule_history_compaction(
+    user_id: str,
+    conversation_id: str,
+    previous_input: list[CacheEntry],
+    llm_request: LLMRequest,
+    skip_user_id_check: bool = False,
+) -> None:
+    """Start folding older turns of long conversation into summary in background.
+
+    Only the number of turns is checked on the request path, tokens of the
+    conversation are counted in background.
+    """
+    cache_config = config.ols_config.conversation_cache
+    if cache_config is None or cache_config.history_compaction is None:
+        return
+    compaction = cache_config.history_compaction
+    if len(previous_input) <= compaction.keep_turns or (
+        len(previous_input) < compaction.max_turns and compaction.max_tokens is None
+    ):
+        return
+
+    key = f"{user_id}:{conversation_id}"
+    with _compacting_lock:
+        if key in _compacting:
+            return
+        _compacting.add(key)
+    compaction_executor.submit(
+        compact_history,
+        user_id,
+        conversation_id,
+        previous_input,
+        llm_request.provider,
+        llm_request.model,
+        skip_user_id_check,
+    )
+
+
+def compact_history(
+    user_id: str,
+    conversation_id: str,
+    previous_input: list[CacheEntry],
+    provider: Optional[str],
+    model: Optional[str],
+    skip_user_id_check: bool = False,
+) -> None:
+    """Fold older turns of the conversation into summary stored in the cache.
+
+    Args:
+        user_id: User identification.
+        conversation_id: Conversation ID unique for given user.
+        previous_input: The history of the conversation used by the request.
+        provider: The provider of the LLM used to summarize the history.
+        model: The LLM used to summarize the history.
+        skip_user_id_check: Skip user_id suid check.
+    """
+    compaction = config.ols_config.conversation_cache.history_compaction
+    try:
+        if len(previous_input) < compaction.max_turns and (
+            count_history_tokens(previous_input) <= compaction.max_tokens
+        ):
+            return
+
+        # the history used by the request might be limited
+        history = config.conversation_cache.get(
+            user_id, conversation_id, skip_user_id_check
+        )
+        if not history or len(history) <= compaction.keep_turns:
+            return
+        folded = history[: -compaction.keep_turns]
+
+        summarizer = HistorySummarizer(provider=provider, model=model)
+        summary = summarizer.summarize_history(
+            conversation_id,
+            # messages are modified by the conversion, entries are compared later
+            CacheEntry.cache_entries_to_history(
+                [entry.model_copy(deep=True) for entry in folded]
+            ),
+            CacheEntry.cache_entries_to_token_counts(folded),
+        )
+        if not summary:
+            return
+
+        query_message = HumanMessage(
+            content=constants.HISTORY_SUMMARY_QUERY,
+            additional_kwargs={constants.HISTORY_SUMMARY_FLAG: True},
+        )
+        response_message = AIMessage(
+            content=summary,
+            additional_kwargs={constants.HISTORY_SUMMARY_FLAG: True},
+        )
+        summary_entry = CacheEntry(
+            query=query_message,
+            response=response_message,
+            token_counts=TokenHandler().history_token_counts(
+                [query_message, response_message], summarizer.model
+            ),
+        )
+        if config.conversation_cache.compact(
+            user_id, conversation_id, folded, summary_entry, skip_user_id_check
+        ):
+            metrics.history_compactions_total.inc()
+            logger.info(
+                "%s %d conversation turns folded into summary",
+                conversation_id,
+                len(folded),
+            )
+    except Exception as e:
+        logger.error("%s history compaction failed: %s", conversation_id, e)
+    finally:
+        with _compacting_lock:
+            _compacting.discard(f"{user_id}:{conversation_id}")
+
+
 def retrieve_attachments(llm_request: LLMRequest) -> list[Attachment]:
     """Retrieve attachments from the request."""
     attachments = llm_request.attachments
@@ -369,62 +766,373 @@ def retrieve_attachments(llm_request: LLMRequest) -> list[Attachment]:
     return attachments
 
 
+def prepare_response(
+    conversation_id: str,
+    llm_request: LLMRequest,
+    previous_input: list[CacheEntry],
+    streaming: bool = False,
+) -> tuple[DocsSummarizer, Union[PreparedPrompt, SummarizerResponse]]:
+    """Construct docs summarizer and prepare its prompt, including RAG retrieval.
+
+    Prompt is not prepared when the answer of similar question is found in
+    semantic cache, the cached response is returned instead.
+
+    Args:
+        conversation_id: The unique identifier for the conversation.
+        llm_request: The request containing a query.
+        previous_input: The history of the conversation (if available).
+        streaming: The flag indicating if the response should be streamed.
+
+    Returns:
+        Tuple containing docs summarizer and prepared prompt or cached response.
+    """
+    logger.debug("%s Preparing prompt", conversation_id)
+    docs_summarizer = DocsSummarizer(
+        provider=llm_request.provider,
+        model=llm_request.model,
+        system_prompt=llm_request.system_prompt,
+        streaming=streaming,
+    )
+    cached_response = lookup_cached_response(
+        conversation_id, docs_summarizer, llm_request, previous_input
+    )
+    if cached_response is not None:
+        return docs_summarizer, cached_response
+    history = CacheEntry.cache_entries_to_history(previous_input)
+    prepared_prompt = docs_summarizer.prepare_prompt(
+        llm_request.query,
+        config.rag_index,
+        history,
+        CacheEntry.cache_entries_to_token_counts(previous_input),
+    )
+    return docs_summarizer, prepared_prompt
+
+
+def stream_or_cached_response(
+    conversation_id: str,
+    llm_request: LLMRequest,
+    previous_input: list[CacheEntry],
+    streaming: bool,
+    docs_summarizer: DocsSummarizer,
+    prepared_prompt: Union[PreparedPrompt, SummarizerResponse],
+) -> Union[SummarizerResponse, AsyncGenerator]:
+    """Return the cached response or the stream of the generated one.
+
+    Args:
+        conversation_id: The unique identifier for the conversation.
+        llm_request: The request containing a query.
+        previous_input: The history of the conversation (if available).
+        streaming: The flag indicating if the response should be streamed.
+        docs_summarizer: Docs summarizer the prompt was prepared by.
+        prepared_prompt: Prepared prompt or cached response.
+
+    Returns:
+        SummarizerResponse or AsyncGenerator, depending on the streaming flag.
+    """
+    if isinstance(prepared_prompt, SummarizerResponse):
+        if streaming:
+            return cached_response_generator(prepared_prompt)
+        return prepared_prompt
+    return cache_streamed_response(
+        docs_summarizer.generate_response(
+            llm_request.query,
+            config.rag_index,
+            CacheEntry.cache_entries_to_history(previous_input),
+            prepared_prompt,
+            history_token_counts=CacheEntry.cache_entries_to_token_counts(
+                previous_input
+            ),
+        ),
+        conversation_id,
+        docs_summarizer,
+        llm_request,
+        previous_input,
+    )
+
+
 def generate_response(
     conversation_id: str,
     llm_request: LLMRequest,
     previous_input: list[CacheEntry],
     streaming: bool = False,
-) -> Union[SummarizerResponse, Generator]:
-    """Generate response based on validation result, previous input, and model output.
+    prepared_response: Optional[Future] = None,
+) -> Union[SummarizerResponse, AsyncGenerator]:
+    """Generate response, see `agenerate_response`.
 
     Args:
         conversation_id: The unique identifier for the conversation.
         llm_request: The request containing a query.
         previous_input: The history of the conversation (if available).
         streaming: The flag indicating if the response should be streamed.
+        prepared_response: Future with result of `prepare_response` (if started).
 
     Returns:
-        SummarizerResponse or Generator, depending on the streaming flag.
+        SummarizerResponse or AsyncGenerator, depending on the streaming flag.
     """
     try:
-        docs_summarizer = DocsSummarizer(
-            provider=llm_request.provider,
-            model=llm_request.model,
-            system_prompt=llm_request.system_prompt,
-            streaming=streaming,
-        )
-        history = CacheEntry.cache_entries_to_history(previous_input)
-        if streaming:
-            return docs_summarizer.generate_response(
-                llm_request.query, config.rag_index, history
+        if prepared_response is not None:
+            docs_summarizer, prepared_prompt = prepared_response.result()
+        else:
+            docs_summarizer, prepared_prompt = prepare_response(
+                conversation_id, llm_request, previous_input, streaming
+            )
+        if isinstance(prepared_prompt, SummarizerResponse) or streaming:
+            return stream_or_cached_response(
+                conversation_id,
+                llm_request,
+                previous_input,
+                streaming,
+                docs_summarizer,
+                prepared_prompt,
             )
         response = docs_summarizer.create_response(
-            llm_request.query, config.rag_index, history
+            llm_request.query,
+            config.rag_index,
+            CacheEntry.cache_entries_to_history(previous_input),
+            prepared_prompt,
+            history_token_counts=CacheEntry.cache_entries_to_token_counts(
+                previous_input
+            ),
         )
         logger.debug("%s Generated response: %s", conversation_id, response)
+        cache_response(
+            conversation_id,
+            docs_summarizer,
+            llm_request,
+            previous_input,
+            response.response,
+            response.rag_chunks,
+        )
         return response
-    except PromptTooLongError as summarizer_error:
-        logger.error("Prompt is too long: %s", summarizer_error)
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail={
-                "response": "Prompt is too long",
-                "cause": str(summarizer_error),
-            },
+    except Exception as summarizer_error:
+        raise llm_error_to_http_exception(
+            summarizer_error, "Error while obtaining answer for user question"
+        )
+
+
+async def agenerate_response(
+    conversation_id: str,
+    llm_request: LLMRequest,
+    previous_input: list[CacheEntry],
+    streaming: bool = False,
+    prepared_response: Optional[Union[Future, asyncio.Future]] = None,
+) -> Union[SummarizerResponse, AsyncGenerator]:
+    """Generate response based on validation result, previous input, and model output.
+
+    Args:
+        conversation_id: The unique identifier for the conversation.
+        llm_request: The request containing a query.
+        previous_input: The history of the conversation (if available).
+        streaming: The flag indicating if the response should be streamed.
+        prepared_response: Future with result of `prepare_response` (if started).
+
+    Returns:
+        SummarizerResponse or AsyncGenerator, depending on the streaming flag.
+    """
+    try:
+        if prepared_response is None:
+            prepared_response = asyncio.get_running_loop().run_in_executor(
+                pipeline_executor,
+                prepare_response,
+                conversation_id,
+                llm_request,
+                previous_input,
+                streaming,
+            )
+        docs_summarizer, prepared_prompt = await asyncio.wrap_future(prepared_response)
+        if isinstance(prepared_prompt, SummarizerResponse) or streaming:
+            return stream_or_cached_response(
+                conversation_id,
+                llm_request,
+                previous_input,
+                streaming,
+                docs_summarizer,
+                prepared_prompt,
+            )
+        response = await docs_summarizer.acreate_response(
+            llm_request.query,
+            config.rag_index,
+            CacheEntry.cache_entries_to_history(previous_input),
+            prepared_prompt,
+            history_token_counts=CacheEntry.cache_entries_to_token_counts(
+                previous_input
+            ),
+        )
+        logger.debug("%s Generated response: %s", conversation_id, response)
+        # the question is embedded on CPU, it would block the event loop
+        await asyncio.to_thread(
+            cache_response,
+            conversation_id,
+            docs_summarizer,
+            llm_request,
+            previous_input,
+            response.response,
+            response.rag_chunks,
         )
+        return response
     except Exception as summarizer_error:
-        logger.error("Error while obtaining answer for user question")
-        logger.exception(summarizer_error)
-        status_code, response_text, cause = errors_parsing.parse_generic_llm_error(
-            summarizer_error
+        raise llm_error_to_http_exception(
+            summarizer_error, "Error while obtaining answer for user question"
         )
-        raise HTTPException(
-            status_code=status_code,
+
+
+def semantic_cache_partition(docs_summarizer: DocsSummarizer) -> tuple[str, str, str]:
+    """Return provider, model and system prompt the answers are cached for."""
+    return (
+        docs_summarizer.provider,
+        docs_summarizer.model,
+        docs_summarizer.system_prompt,
+    )
+
+
+def is_semantic_cacheable(
+    llm_request: LLMRequest, previous_input: list[CacheEntry]
+) -> bool:
+    """Check if the answer can be looked up in (and stored into) semantic cache.
+
+    Only the first questions of conversations are cached, answers of follow-up
+    questions depend on the history and answers of questions with attachments
+    depend on the attachments.
+    """
+    return (
+        config.ols_config.semantic_cache is not None
+        and not previous_input
+        and not llm_request.attachments
+    )
+
+
+def lookup_cached_response(
+    conversation_id: str,
+    docs_summarizer: DocsSummarizer,
+    llm_request: LLMRequest,
+    previous_input: list[CacheEntry],
+) -> Optional[SummarizerResponse]:
+    """Look up answer of similar question in semantic cache.
+
+    Args:
+        conversation_id: The unique identifier for the conversation.
+        docs_summarizer: Docs summarizer that would generate the answer.
+        llm_request: The request containing a (redacted) query.
+        previous_input: The history of the conversation (if available).
+
+    Returns:
+        The cached response, None if it is not found.
+    """
+    if not is_semantic_cacheable(llm_request, previous_input):
+        return None
+    semantic_cache = config.semantic_cache
+    if semantic_cache is None:
+        return None
+    try:
+        answer = semantic_cache.get(
+            llm_request.query, semantic_cache_partition(docs_summarizer)
+        )
+    except Exception as e:
+        logger.error("%s semantic cache lookup failed: %s", conversation_id, e)
+        return None
+    if answer is None:
+        return None
+    logger.info("%s answer of similar question found in cache", conversation_id)
+    return SummarizerResponse(answer.response, answer.rag_chunks, False, None)
+
+
+def cache_response(
+    conversation_id: str,
+    docs_summarizer: DocsSummarizer,
+    llm_request: LLMRequest,
+    previous_input: list[CacheEntry],
+    response: str,
+    rag_chunks: list[RagChunk],
+) -> None:
+    """Store the generated answer into semantic cache (if it is enabled).
+
+    Args:
+        conversation_id: The unique identifier for the conversation.
+        docs_summarizer: Docs summarizer that generated the answer.
+        llm_request: The request containing a (redacted) query.
+        previous_input: The history of the conversation (if available).
+        response: The generated response.
+        rag_chunks: RAG chunks referenced by the response.
+    """
+    if not response or not is_semantic_cacheable(llm_request, previous_input):
+        return
+    semantic_cache = config.semantic_cache
+    if semantic_cache is None:
+        return
+    try:
+        semantic_cache.put(
+            llm_request.query,
+            semantic_cache_partition(docs_summarizer),
+            response,
+            rag_chunks,
+        )
+    except Exception as e:
+        logger.error("%s unable to store answer into cache: %s", conversation_id, e)
+
+
+async def cached_response_generator(
+    response: SummarizerResponse,
+) -> AsyncGenerator[Union[str, SummarizerResponse], None]:
+    """Yield the cached response the same way as the streamed one is yielded."""
+    yield response.response
+    yield response
+
+
+async def cache_streamed_response(
+    generator: AsyncGenerator[Union[str, SummarizerResponse], None],
+    conversation_id: str,
+    docs_summarizer: DocsSummarizer,
+    llm_request: LLMRequest,
+    previous_input: list[CacheEntry],
+) -> AsyncGenerator[Union[str, SummarizerResponse], None]:
+    """Pass the streamed response through, store it into cache when it is complete."""
+    response = ""
+    async for item in generator:
+        if isinstance(item, SummarizerResponse):
+            # the answer is stored outside the event loop, see agenerate_response
+            await asyncio.to_thread(
+                cache_response,
+                conversation_id,
+                docs_summarizer,
+                llm_request,
+                previous_input,
+                response,
+                item.rag_chunks,
+            )
+        else:
+            response += item
+        yield item
+
+
+def llm_error_to_http_exception(error: Exception, message: str) -> HTTPException:
+    """Construct HTTP exception for an error raised while calling LLM.
+
+    Args:
+        error: The exception raised during LLM call (or during preparation of it).
+        message: The message to be logged for errors other than too long prompt.
+
+    Returns:
+        HTTPException with status code and detail based on the error.
+    """
+    if isinstance(error, PromptTooLongError):
+        logger.error("Prompt is too long: %s", error)
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail={
-                "response": response_text,
-                "cause": cause,
+                "response": "Prompt is too long",
+                "cause": str(error),
             },
         )
+    logger.error(message)
+    logger.exception(error)
+    status_code, response_text, cause = errors_parsing.parse_generic_llm_error(error)
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "response": response_text,
+            "cause": cause,
+        },
+    )
 
 
 def validate_requested_provider_model(llm_request: LLMRequest) -> None:
@@ -455,6 +1163,34 @@ def store_conversation_history(
     timestamps: dict[str, float],
     topic_summary: str,
     skip_user_id_check: bool = False,
+) -> None:
+    """Store conversation history into selected cache, see `astore_conversation_history`."""
+    try:
+        if config.conversation_cache is not None:
+            logger.info("%s Storing conversation history", conversation_id)
+            cache_entry = construct_cache_entry(
+                llm_request, response, attachments, timestamps
+            )
+            config.conversation_cache.insert_or_append(
+                user_id,
+                conversation_id,
+                cache_entry,
+                topic_summary,
+                skip_user_id_check,
+            )
+    except Exception as e:
+        raise store_conversation_error(user_id, conversation_id, e)
+
+
+async def astore_conversation_history(
+    user_id: str,
+    conversation_id: str,
+    llm_request: LLMRequest,
+    response: Optional[str],
+    attachments: list[Attachment],
+    timestamps: dict[str, float],
+    topic_summary: str,
+    skip_user_id_check: bool = False,
 ) -> None:
     """Store conversation history into selected cache.
 
@@ -464,28 +1200,12 @@ def store_conversation_history(
     ```
     """
     try:
-        if response is None:
-            response = ""
         if config.conversation_cache is not None:
             logger.info("%s Storing conversation history", conversation_id)
-            query_message = HumanMessage(content=llm_request.query)
-            response_message = AIMessage(content=response)
-            if timestamps:
-                query_message.response_metadata = {"created_at": timestamps["start"]}
-                response_message.response_metadata["created_at"] = timestamps[
-                    "generate response"
-                ]
-            if llm_request.provider:
-                response_message.response_metadata["provider"] = llm_request.provider
-            if llm_request.model:
-                response_message.response_metadata["model"] = llm_request.model
-
-            cache_entry = CacheEntry(
-                query=query_message,
-                response=response_message,
-                attachments=attachments,
+            cache_entry = construct_cache_entry(
+                llm_request, response, attachments, timestamps
             )
-            config.conversation_cache.insert_or_append(
+            await config.conversation_cache.ainsert_or_append(
                 user_id,
                 conversation_id,
                 cache_entry,
@@ -493,20 +1213,66 @@ def store_conversation_history(
                 skip_user_id_check,
             )
     except Exception as e:
-        logger.error(
-            "Error storing conversation history for user %s and conversation %s",
-            user_id,
-            conversation_id,
-        )
-        logger.exception(e)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={
-                "response": "Error storing conversation",
-                "cause": str(e),
-            },
+        raise store_conversation_error(user_id, conversation_id, e)
+
+
+def construct_cache_entry(
+    llm_request: LLMRequest,
+    response: Optional[str],
+    attachments: list[Attachment],
+    timestamps: dict[str, float],
+) -> CacheEntry:
+    """Construct conversation history cache entry for query and its response."""
+    if response is None:
+        response = ""
+    query_message = HumanMessage(content=llm_request.query)
+    response_message = AIMessage(content=response)
+    if timestamps:
+        query_message.response_metadata = {"created_at": timestamps["start"]}
+        response_message.response_metadata["created_at"] = timestamps[
+            "generate response"
+        ]
+    if llm_request.provider:
+        response_message.response_metadata["provider"] = llm_request.provider
+    if llm_request.model:
+        response_message.response_metadata["model"] = llm_request.model
+
+    # tokens are counted once, history is not tokenized again by next questions
+    model = llm_request.model or config.ols_config.default_model
+    token_counts = {}
+    if model:
+        token_counts = TokenHandler().history_token_counts(
+            # history messages are stripped, see `cache_entries_to_history`
+            [HumanMessage(llm_request.query.strip()), AIMessage(response.strip())],
+            model,
         )
 
+    return CacheEntry(
+        query=query_message,
+        response=response_message,
+        attachments=attachments,
+        token_counts=token_counts,
+    )
+
+
+def store_conversation_error(
+    user_id: str, conversation_id: str, error: Exception
+) -> HTTPException:
+    """Log error raised while storing conversation and construct HTTP exception."""
+    logger.error(
+        "Error storing conversation history for user %s and conversation %s",
+        user_id,
+        conversation_id,
+    )
+    logger.exception(error)
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail={
+            "response": "Error storing conversation",
+            "cause": str(error),
+        },
+    )
+
 
 def redact_query(conversation_id: str, llm_request: LLMRequest) -> LLMRequest:
     """Redact query using query_redactor, raise HTTPException in case of any problem."""
@@ -531,6 +1297,26 @@ def redact_query(conversation_id: str, llm_request: LLMRequest) -> LLMRequest:
         )
 
 
+def redact_response(conversation_id: str, response: str) -> str:
+    """Redact LLM response using query_redactor, raise HTTPException in case of any problem."""
+    try:
+        logger.debug("Redacting response for conversation %s", conversation_id)
+        return config.query_redactor.redact(conversation_id, response)
+    except Exception as redactor_error:
+        logger.error(
+            "Error while redacting response %s for conversation %s",
+            redactor_error,
+            conversation_id,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "response": "Error while redacting response",
+                "cause": str(redactor_error),
+            },
+        )
+
+
 def redact_attachments(
     conversation_id: str, attachments: list[Attachment]
 ) -> list[Attachment]:
@@ -568,80 +1354,158 @@ def redact_attachments(
         )
 
 
+def question_validator(llm_request: LLMRequest) -> QuestionValidator:
+    """Construct LLM based question validator for the request."""
+    return QuestionValidator(
+        provider=llm_request.provider,
+        model=llm_request.model,
+        system_prompt=llm_request.system_prompt,
+    )
+
+
 def _validate_question_llm(conversation_id: str, llm_request: LLMRequest) -> bool:
     """Validate user question using llm, raise HTTPException in case of any problem."""
-    # Validate the query
     try:
-        question_validator = QuestionValidator(
-            provider=llm_request.provider,
-            model=llm_request.model,
-            system_prompt=llm_request.system_prompt,
+        return question_validator(llm_request).validate_question(
+            conversation_id, llm_request.query
         )
-        return question_validator.validate_question(conversation_id, llm_request.query)
-    except LLMConfigurationError as e:
+    except Exception as validation_error:
+        raise validation_error_to_http_exception(validation_error)
+
+
+async def _avalidate_question_llm(
+    conversation_id: str, llm_request: LLMRequest
+) -> bool:
+    """Validate user question using llm, see `_validate_question_llm`."""
+    try:
+        return await question_validator(llm_request).avalidate_question(
+            conversation_id, llm_request.query
+        )
+    except Exception as validation_error:
+        raise validation_error_to_http_exception(validation_error)
+
+
+def validation_error_to_http_exception(error: Exception) -> HTTPException:
+    """Construct HTTP exception for an error raised while validating question."""
+    if isinstance(error, LLMConfigurationError):
         metrics.llm_calls_validation_errors_total.inc()
-        logger.error(e)
-        raise HTTPException(
+        logger.error(error)
+        return HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail={"response": "Unable to process this request", "cause": str(e)},
+            detail={"response": "Unable to process this request", "cause": str(error)},
         )
-    except PromptTooLongError as e:
-        logger.error("Prompt is too long: %s", e)
-        raise HTTPException(
+    if isinstance(error, PromptTooLongError):
+        logger.error("Prompt is too long: %s", error)
+        return HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail={
                 "response": "Prompt is too long",
-                "cause": str(e),
-            },
-        )
-    except Exception as validation_error:
-        metrics.llm_calls_failures_total.inc()
-        logger.error("Error while validating question")
-        logger.exception(validation_error)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={
-                "response": "Error while validating question",
-                "cause": str(validation_error),
+                "cause": str(error),
             },
         )
+    metrics.llm_calls_failures_total.inc()
+    logger.error("Error while validating question")
+    logger.exception(error)
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail={
+            "response": "Error while validating question",
+            "cause": str(error),
+        },
+    )
 
 
 def _validate_question_keyword(query: str) -> bool:
     """Validate user question using keyword."""
-    # Current implementation is without any tokenizer method, lemmatization/n-grams.
     # Add valid keywords to keywords.py file.
-    query_temp = query.lower()
-    for kw in KEYWORDS:
-        if kw in query_temp:
-            return True
-    # query_temp = {q_word.lower().strip(".?,") for q_word in query.split()}
-    # common_words = config.keywords.intersection(query_temp)
-    # if len(common_words) > 0:
-    #     return constants.SUBJECT_ALLOWED
+    matcher = KEYWORD_MATCHERS[config.ols_config.keyword_validation.match_mode]
+    keyword = matcher.search(query)
+    if keyword is None:
+        logger.debug("No matching keyword found for query: %s", query)
+        return False
+    logger.debug("Keyword %s found in query", keyword)
+    return True
 
-    logger.debug("No matching keyword found for query: %s", query)
-    return False
+
+def _validate_question_embedding(query: str) -> Optional[bool]:
+    """Validate user question using embeddings, None if LLM is to validate it.
+
+    Questions are validated by LLM (when the fallback is enabled) or by
+    keywords when there is no RAG index whose embedding model could be used.
+    """
+    validator = config.embedding_question_validator
+    if validator is None:
+        logger.warning("RAG index is not loaded, question can not be embedded")
+        if config.ols_config.embedding_validation.llm_fallback:
+            return None
+        return _validate_question_keyword(query)
+    try:
+        return validator.validate_question(query)
+    except Exception as validation_error:
+        raise validation_error_to_http_exception(validation_error)
 
 
 def validate_question(conversation_id: str, llm_request: LLMRequest) -> bool:
-    """Validate user question."""
+    """Validate user question, see `avalidate_question`."""
     match config.ols_config.query_validation_method:
         case constants.QueryValidationMethod.LLM:
             logger.debug("LLM based query validation.")
             return _validate_question_llm(conversation_id, llm_request)
 
-        case constants.QueryValidationMethod.KEYWORD:
-            logger.debug("Keyword based query validation.")
-            return _validate_question_keyword(llm_request.query)
+        case constants.QueryValidationMethod.EMBEDDING:
+            logger.debug("Embedding based query validation.")
+            valid = _validate_question_embedding(llm_request.query)
+            if valid is None:
+                logger.debug(
+                    "%s ambiguous question, validating by LLM", conversation_id
+                )
+                return _validate_question_llm(conversation_id, llm_request)
+            return valid
 
         case _:
-            # Query validation disabled by default
-            logger.debug(
-                "%s Question validation is disabled. Treating question as valid.",
-                conversation_id,
+            # other validation methods do not perform any I/O
+            return _validate_question_locally(conversation_id, llm_request)
+
+
+def _validate_question_locally(conversation_id: str, llm_request: LLMRequest) -> bool:
+    """Validate user question by keywords (if enabled), without any I/O."""
+    if (
+        config.ols_config.query_validation_method
+        == constants.QueryValidationMethod.KEYWORD
+    ):
+        logger.debug("Keyword based query validation.")
+        return _validate_question_keyword(llm_request.query)
+    # Query validation disabled by default
+    logger.debug(
+        "%s Question validation is disabled. Treating question as valid.",
+        conversation_id,
+    )
+    return True
+
+
+async def avalidate_question(conversation_id: str, llm_request: LLMRequest) -> bool:
+    """Validate user question."""
+    match config.ols_config.query_validation_method:
+        case constants.QueryValidationMethod.LLM:
+            logger.debug("LLM based query validation.")
+            return await _avalidate_question_llm(conversation_id, llm_request)
+
+        case constants.QueryValidationMethod.EMBEDDING:
+            logger.debug("Embedding based query validation.")
+            # embedding model runs on CPU, so it would block the event loop
+            valid = await asyncio.to_thread(
+                _validate_question_embedding, llm_request.query
             )
-            return True
+            if valid is None:
+                logger.debug(
+                    "%s ambiguous question, validating by LLM", conversation_id
+                )
+                return await _avalidate_question_llm(conversation_id, llm_request)
+            return valid
+
+        case _:
+            # other validation methods do not perform any I/O
+            return _validate_question_locally(conversation_id, llm_request)
 
 
 def construct_transcripts_path(user_id: str, conversation_id: str) -> Path:
@@ -711,34 +1575,66 @@ def store_transcript(
     logger.debug("transcript stored in '%s'", transcript_file_path)
 
 
+async def astore_transcript(
+    user_id: str,
+    conversation_id: str,
+    query_is_valid: bool,
+    redacted_query: str,
+    llm_request: LLMRequest,
+    response: str,
+    rag_chunks: list[RagChunk],
+    truncated: bool,
+    attachments: list[Attachment],
+) -> None:
+    """Store transcript in the local filesystem asynchronously.
+
+    File I/O is blocking, so `store_transcript` is run in worker thread.
+    See `store_transcript` for description of arguments.
+    """
+    await asyncio.to_thread(
+        store_transcript,
+        user_id,
+        conversation_id,
+        query_is_valid,
+        redacted_query,
+        llm_request,
+        response,
+        rag_chunks,
+        truncated,
+        attachments,
+    )
+
+
+def topic_summarizer(llm_request: LLMRequest) -> TopicSummarizer:
+    """Construct topic summarizer for the request."""
+    return TopicSummarizer(
+        provider=llm_request.provider,
+        model=llm_request.model,
+        system_prompt=llm_request.system_prompt,
+    )
+
+
 def get_topic_summary(conversation_id: str, llm_request: LLMRequest) -> str:
     """Summarize user question using llm, returns a topic."""
     try:
-        topic_summarizer = TopicSummarizer(
-            provider=llm_request.provider,
-            model=llm_request.model,
-            system_prompt=llm_request.system_prompt,
-        )
-        return topic_summarizer.summarize_topic(conversation_id, llm_request.query)
-    except PromptTooLongError as topic_summarizer_error:
-        logger.error("Prompt is too long: %s", topic_summarizer_error)
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail={
-                "response": "Prompt is too long",
-                "cause": str(topic_summarizer_error),
-            },
+        return topic_summarizer(llm_request).summarize_topic(
+            conversation_id, llm_request.query
         )
     except Exception as topic_summarizer_error:
-        logger.error("Error while obtaining a topic summary for user question")
-        logger.exception(topic_summarizer_error)
-        status_code, response_text, cause = errors_parsing.parse_generic_llm_error(
-            topic_summarizer_error
+        raise llm_error_to_http_exception(
+            topic_summarizer_error,
+            "Error while obtaining a topic summary for user question",
         )
-        raise HTTPException(
-            status_code=status_code,
-            detail={
-                "response": response_text,
-                "cause": cause,
-            },
+
+
+async def aget_topic_summary(conversation_id: str, llm_request: LLMRequest) -> str:
+    """Summarize user question using llm, see `get_topic_summary`."""
+    try:
+        return await topic_summarizer(llm_request).asummarize_topic(
+            conversation_id, llm_request.query
+        )
+    except Exception as topic_summarizer_error:
+        raise llm_error_to_http_exception(
+            topic_summarizer_error,
+            "Error while obtaining a topic summary for user question",
         )
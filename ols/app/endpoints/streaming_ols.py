@@ -4,20 +4,25 @@ This module defines the endpoint and supporting functions for handling
 streaming queries.
 """
 
+import asyncio
 import json
 import logging
 import time
-from typing import Any, AsyncGenerator, Optional
+from concurrent.futures import Future
+from typing import Any, AsyncGenerator, Optional, Union
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 
 from ols import config, constants
+from ols.app import metrics
 from ols.app.endpoints.ols import (
-    generate_response,
-    get_topic_summary,
+    agenerate_response,
+    aprocess_request,
+    astore_conversation_history,
+    astore_transcript,
+    cancel_futures,
     log_processing_durations,
-    process_request,
     store_conversation_history,
     store_transcript,
 )
@@ -72,7 +77,7 @@ query_responses: dict[int | str, dict[str, Any]] = {
 
 
 @router.post("/streaming_query", responses=query_responses)
-def conversation_request(
+async def conversation_request(
     llm_request: LLMRequest,
     auth: Any = Depends(auth_dependency),
     user_id: Optional[str] = None,
@@ -87,27 +92,33 @@ def conversation_request(
     Returns:
         StreamingResponse: The streaming response generated for the query.
     """
-    processed_request = process_request(auth, llm_request)
+    processed_request = await aprocess_request(auth, llm_request, streaming=True)
 
-    summarizer_response = (
-        invalid_response_generator()
-        if not processed_request.valid
-        else generate_response(
-            processed_request.conversation_id,
-            llm_request,
-            processed_request.previous_input,
-            streaming=True,
+    try:
+        summarizer_response = (
+            invalid_response_generator()
+            if not processed_request.valid
+            else await agenerate_response(
+                processed_request.conversation_id,
+                llm_request,
+                processed_request.previous_input,
+                streaming=True,
+                prepared_response=processed_request.prepared_response,
+            )
         )
-    )
-
-    topic_summary = ""
-    # only generate topic summary for new conversations
-    if not processed_request.previous_input:
-        topic_summary = get_topic_summary(
-            processed_request.conversation_id, llm_request
+    except BaseException:
+        cancel_futures(processed_request.topic_summary)
+        raise
+
+    # many providers emit tiny tokens, they are sent in larger frames
+    coalescing = config.ols_config.stream_coalescing
+    if coalescing is not None:
+        summarizer_response = coalesce_tokens(
+            summarizer_response, coalescing.max_bytes, coalescing.max_delay
         )
-        processed_request.timestamps["generate topic summary"] = time.time()
 
+    # topic summary (if any) is still being generated, it is retrieved after
+    # the response is streamed so it does not delay the first token
     return StreamingResponse(
         response_processing_wrapper(
             summarizer_response,
@@ -119,7 +130,7 @@ def conversation_request(
             processed_request.query_without_attachments,
             llm_request.media_type,
             processed_request.timestamps,
-            topic_summary,
+            processed_request.topic_summary,
             processed_request.skip_user_id_check,
         ),
         media_type=llm_request.media_type,
@@ -253,6 +264,109 @@ def generic_llm_error(error: Exception, media_type: str) -> str:
     )
 
 
+class TokenCoalescer:
+    """Join tokens into chunks of given size or age.
+
+    The first token is not joined with others, so it is sent right away. The
+    following ones are joined until the chunk has at least `max_bytes` bytes
+    (UTF-8 encoded) or `max_delay` seconds passed since its first token
+    arrived, whichever comes first.
+    """
+
+    def __init__(self, max_bytes: int, max_delay: float) -> None:
+        """Initialize the coalescer, one per streamed response."""
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self._tokens: list[str] = []
+        self._size = 0
+        self._deadline = 0.0
+        self._first = True
+
+    def timeout(self) -> Optional[float]:
+        """Return time (in seconds) left to the chunk, None if it is empty."""
+        if not self._tokens:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def add(self, item: Any) -> list[Any]:
+        """Add item to the chunk, return items to be sent.
+
+        Args:
+            item: The token, other items (summarizer response) end the chunk.
+
+        Returns:
+            Chunks and other items to be sent, in order.
+        """
+        if not isinstance(item, str):
+            return [*self.flush(), item]
+        if self._first:
+            self._first = False
+            return [item]
+        if not self._tokens:
+            self._deadline = time.monotonic() + self.max_delay
+        self._tokens.append(item)
+        self._size += len(item.encode("utf-8"))
+        return self.flush() if self._size >= self.max_bytes else []
+
+    def flush(self) -> list[str]:
+        """Return the chunk (if any) and start a new one."""
+        if not self._tokens:
+            return []
+        chunk = "".join(self._tokens)
+        self._tokens.clear()
+        self._size = 0
+        return [chunk]
+
+
+async def coalesce_tokens(
+    generator: AsyncGenerator[Any, None], max_bytes: int, max_delay: float
+) -> AsyncGenerator[Any, None]:
+    """Join tokens from the generator into larger chunks, see `TokenCoalescer`.
+
+    The chunk is sent when it is old enough even if no other token arrives;
+    the generator is awaited meanwhile.
+
+    Args:
+        generator: The async generator providing summarizer responses.
+        max_bytes: Size of the chunk that is sent.
+        max_delay: Maximum time (in seconds) a token waits in the chunk.
+
+    Yields:
+        Chunks of tokens and other items from the generator.
+    """
+    coalescer = TokenCoalescer(max_bytes, max_delay)
+    next_item: Optional[asyncio.Future] = None
+    try:
+        while True:
+            if next_item is None:
+                next_item = asyncio.ensure_future(anext(generator))
+            done, _ = await asyncio.wait({next_item}, timeout=coalescer.timeout())
+            if not done:
+                for chunk in coalescer.flush():
+                    yield chunk
+                continue
+
+            item_future, next_item = next_item, None
+            try:
+                item = item_future.result()
+            except Exception as e:
+                # tokens received before the end (or error) are sent first
+                for chunk in coalescer.flush():
+                    yield chunk
+                if isinstance(e, StopAsyncIteration):
+                    return
+                raise
+            for item_or_chunk in coalescer.add(item):
+                yield item_or_chunk
+    finally:
+        if next_item is not None:
+            next_item.cancel()
+            # the generator can not be closed while the item is awaited
+            await asyncio.wait({next_item})
+        # the stream was closed early, LLM call is not needed anymore
+        await generator.aclose()
+
+
 def build_yield_item(item: str, idx: int, media_type: str) -> str:
     """Build an item to yield based on media type.
 
@@ -274,6 +388,31 @@ def build_yield_item(item: str, idx: int, media_type: str) -> str:
     )
 
 
+async def retrieve_topic_summary(
+    conversation_id: str, topic_summary: Optional[Union[Future, asyncio.Future]]
+) -> str:
+    """Wait for the topic summary generated concurrently with the response.
+
+    Args:
+        conversation_id: The conversation ID (UUID).
+        topic_summary: Future with topic summary, None for follow-up conversations.
+
+    Returns:
+        str: The topic summary or empty string when it is not available.
+    """
+    if topic_summary is None:
+        return ""
+    try:
+        return await asyncio.wrap_future(topic_summary)
+    except HTTPException as e:
+        # the response has been streamed already, so the error can not be
+        # reported to the client - the conversation is stored without topic
+        logger.error(
+            "%s Unable to retrieve topic summary: %s", conversation_id, e.detail
+        )
+        return ""
+
+
 def store_data(
     user_id: str,
     conversation_id: str,
@@ -287,6 +426,47 @@ def store_data(
     timestamps: dict[str, float],
     topic_summary: str,
     skip_user_id_check: bool,
+) -> None:
+    """Store conversation history and transcript if enabled, see `astore_data`."""
+    store_conversation_history(
+        user_id,
+        conversation_id,
+        llm_request,
+        response,
+        attachments,
+        timestamps,
+        topic_summary,
+        skip_user_id_check,
+    )
+
+    if not config.ols_config.user_data_collection.transcripts_disabled:
+        store_transcript(
+            user_id,
+            conversation_id,
+            valid,
+            query_without_attachments,
+            llm_request,
+            response,
+            rag_chunks,
+            history_truncated,
+            attachments,
+        )
+    timestamps["store transcripts"] = time.time()
+
+
+async def astore_data(
+    user_id: str,
+    conversation_id: str,
+    llm_request: LLMRequest,
+    response: str,
+    attachments: list[Attachment],
+    valid: bool,
+    query_without_attachments: str,
+    rag_chunks: list[RagChunk],
+    history_truncated: bool,
+    timestamps: dict[str, float],
+    topic_summary: str,
+    skip_user_id_check: bool,
 ) -> None:
     """Store conversation history and transcript if enabled.
 
@@ -304,7 +484,7 @@ def store_data(
         topic_summary: Summary of the conversation's initial topic.
         skip_user_id_check: Skip user_id usid check.
     """
-    store_conversation_history(
+    await astore_conversation_history(
         user_id,
         conversation_id,
         llm_request,
@@ -316,7 +496,7 @@ def store_data(
     )
 
     if not config.ols_config.user_data_collection.transcripts_disabled:
-        store_transcript(
+        await astore_transcript(
             user_id,
             conversation_id,
             valid,
@@ -340,7 +520,7 @@ async def response_processing_wrapper(
     query_without_attachments: str,
     media_type: str,
     timestamps: dict[str, float],
-    topic_summary: str,
+    topic_summary: Optional[Union[Future, asyncio.Future]],
     skip_user_id_check: bool,
 ) -> AsyncGenerator[str, None]:
     """Process the response from the generator and handle metadata and errors.
@@ -355,7 +535,7 @@ async def response_processing_wrapper(
         query_without_attachments: Query content excluding attachments.
         media_type: Media type of the response (e.g. text or JSON).
         timestamps: Dictionary tracking timestamps for various stages.
-        topic_summary: Summary of the conversation's initial topic.
+        topic_summary: Future with summary of the conversation's initial topic.
         skip_user_id_check: Skip user_id usid check.
 
     Yields:
@@ -369,6 +549,11 @@ async def response_processing_wrapper(
     history_truncated = False
     idx = 0
     token_counter: Optional[TokenCounter] = None
+    # the end of the response that can be a part of redacted text is held
+    # back until the next token arrives
+    redactor = (
+        config.query_redactor.stream() if config.ols_config.redact_responses else None
+    )
 
     try:
         async for item in generator:
@@ -378,20 +563,37 @@ async def response_processing_wrapper(
                 token_counter = item.token_counter
                 break
 
-            response += item
-            yield build_yield_item(item, idx, media_type)
+            token = item
+            if redactor is not None:
+                token = redactor.redact(item)
+                if not token:
+                    continue
+            response += token
+            yield build_yield_item(token, idx, media_type)
+            idx += 1
+
+        if redactor is not None and (token := redactor.flush()):
+            response += token
+            yield build_yield_item(token, idx, media_type)
             idx += 1
     except PromptTooLongError as summarizer_error:
+        cancel_futures(topic_summary)
         yield prompt_too_long_error(summarizer_error, media_type)
         return  # stop execution after error
 
     except Exception as summarizer_error:
+        cancel_futures(topic_summary)
         yield generic_llm_error(summarizer_error, media_type)
         return  # stop execution after error
 
     timestamps["generate response"] = time.time()
+    metrics.streaming_response_frames.observe(idx)
 
-    store_data(
+    summary = await retrieve_topic_summary(conversation_id, topic_summary)
+    if topic_summary is not None:
+        timestamps["generate topic summary"] = time.time()
+
+    await astore_data(
         user_id,
         conversation_id,
         llm_request,
@@ -402,7 +604,7 @@ async def response_processing_wrapper(
         rag_chunks,
         history_truncated,
         timestamps,
-        topic_summary,
+        summary,
         skip_user_id_check,
     )
 
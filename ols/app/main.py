@@ -1,6 +1,7 @@
 """Entry point to FastAPI-based web service."""
 
 import logging
+import threading
 from collections.abc import AsyncGenerator, Awaitable, Callable
 
 from fastapi import FastAPI, Request, Response
@@ -9,6 +10,7 @@ from starlette.responses import StreamingResponse
 
 from ols import config, constants, version
 from ols.app import metrics, routers
+from ols.src.llms.http_clients import http_clients_pool
 
 app = FastAPI(
     title="Swagger Road-core service - OpenAPI",
@@ -44,6 +46,12 @@ else:
 # even for first scraping
 metrics.setup_model_metrics(config)
 
+# open connections to LLM providers (if enabled in configuration) in the
+# background, so the first query does not need to wait for TCP and TLS handshakes
+threading.Thread(
+    target=http_clients_pool.prewarm, args=(config.llm_config,), daemon=True
+).start()
+
 
 @app.middleware("")
 async def rest_api_counter(
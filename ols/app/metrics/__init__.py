@@ -1,28 +1,66 @@
 """Metrics and metric collectors."""
 
 from .metrics import (
+    auth_cache_hits_total,
+    auth_cache_misses_total,
+    embedding_validation_total,
+    history_compactions_total,
+    in_memory_cache_entries,
+    in_memory_cache_evicted_total,
+    in_memory_cache_size_bytes,
+    k8s_auth_call_duration_seconds,
+    k8s_auth_call_failures_total,
+    llm_call_cache_requests_total,
     llm_calls_failures_total,
     llm_calls_total,
     llm_calls_validation_errors_total,
     llm_token_received_total,
     llm_token_sent_total,
+    near_cache_requests_total,
+    postgres_cache_evicted_total,
+    postgres_cache_eviction_duration_seconds,
+    postgres_pool_timeouts_total,
+    postgres_pool_wait_duration_seconds,
     provider_model_configuration,
+    redaction_duration_seconds,
+    redaction_matches_total,
     response_duration_seconds,
     rest_api_calls_total,
+    semantic_cache_requests_total,
     setup_model_metrics,
+    streaming_response_frames,
 )
 from .token_counter import GenericTokenCounter, TokenMetricUpdater
 
 __all__ = [
     "GenericTokenCounter",
     "TokenMetricUpdater",
+    "auth_cache_hits_total",
+    "auth_cache_misses_total",
+    "embedding_validation_total",
+    "history_compactions_total",
+    "in_memory_cache_entries",
+    "in_memory_cache_evicted_total",
+    "in_memory_cache_size_bytes",
+    "k8s_auth_call_duration_seconds",
+    "k8s_auth_call_failures_total",
+    "llm_call_cache_requests_total",
     "llm_calls_failures_total",
     "llm_calls_total",
     "llm_calls_validation_errors_total",
     "llm_token_received_total",
     "llm_token_sent_total",
+    "near_cache_requests_total",
+    "postgres_cache_evicted_total",
+    "postgres_cache_eviction_duration_seconds",
+    "postgres_pool_timeouts_total",
+    "postgres_pool_wait_duration_seconds",
     "provider_model_configuration",
+    "redaction_duration_seconds",
+    "redaction_matches_total",
     "response_duration_seconds",
     "rest_api_calls_total",
+    "semantic_cache_requests_total",
     "setup_model_metrics",
+    "streaming_response_frames",
 ]
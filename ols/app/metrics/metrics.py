@@ -47,6 +47,94 @@ llm_token_received_total = Counter(
     "ols_llm_token_received_total", "LLM tokens received", ["provider", "model"]
 )
 
+k8s_auth_call_duration_seconds = Histogram(
+    "ols_k8s_auth_call_duration_seconds",
+    "Durations of Kubernetes API calls made during authentication",
+    ["review"],
+)
+k8s_auth_call_failures_total = Counter(
+    "ols_k8s_auth_call_failures_total",
+    "Failed Kubernetes API calls made during authentication",
+    ["review", "reason"],
+)
+
+auth_cache_hits_total = Counter(
+    "ols_auth_cache_hits_total", "Authentication decisions served from cache"
+)
+auth_cache_misses_total = Counter(
+    "ols_auth_cache_misses_total", "Authentication decisions not found in cache"
+)
+
+postgres_pool_wait_duration_seconds = Histogram(
+    "ols_postgres_pool_wait_duration_seconds",
+    "Time spent waiting for connection from Postgres connection pool",
+)
+postgres_pool_timeouts_total = Counter(
+    "ols_postgres_pool_timeouts_total",
+    "Number of times no connection from Postgres connection pool was available",
+)
+in_memory_cache_entries = Gauge(
+    "ols_in_memory_cache_entries",
+    "Number of conversations stored in in-memory cache",
+)
+in_memory_cache_size_bytes = Gauge(
+    "ols_in_memory_cache_size_bytes",
+    "Approximate size of conversations stored in in-memory cache",
+)
+in_memory_cache_evicted_total = Counter(
+    "ols_in_memory_cache_evicted_total",
+    "Number of conversations evicted from in-memory cache",
+    ["reason"],
+)
+history_compactions_total = Counter(
+    "ols_history_compactions_total",
+    "Number of conversations whose older turns were folded into summary",
+)
+near_cache_requests_total = Counter(
+    "ols_near_cache_requests_total",
+    "Number of conversation history reads served (hit) or not (miss) by near cache",
+    ["result"],
+)
+semantic_cache_requests_total = Counter(
+    "ols_semantic_cache_requests_total",
+    "Number of first questions answered (hit) or not (miss) by semantic cache",
+    ["result"],
+)
+embedding_validation_total = Counter(
+    "ols_embedding_validation_total",
+    "Number of questions validated by embeddings as allowed, rejected or ambiguous",
+    ["result"],
+)
+llm_call_cache_requests_total = Counter(
+    "ols_llm_call_cache_requests_total",
+    "Number of LLM calls of query helpers served (hit) or not (miss) by LLM call cache",
+    ["helper", "result"],
+)
+redaction_duration_seconds = Histogram(
+    "ols_redaction_duration_seconds",
+    "Durations of redaction passes by filter, passes of merged filters are labelled merged",
+    ["filter"],
+)
+redaction_matches_total = Counter(
+    "ols_redaction_matches_total",
+    "Number of text fragments replaced by redaction filters",
+    ["filter"],
+)
+streaming_response_frames = Histogram(
+    "ols_streaming_response_frames",
+    "Number of frames with tokens sent per streamed response",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+)
+postgres_cache_evicted_total = Counter(
+    "ols_postgres_cache_evicted_total",
+    "Number of conversations evicted from Postgres cache",
+    ["reason"],
+)
+postgres_cache_eviction_duration_seconds = Histogram(
+    "ols_postgres_cache_eviction_duration_seconds",
+    "Duration of Postgres cache eviction sweeps",
+)
+
 # metric that indicates what provider + model customers are using so we can
 # understand what is popular/important
 provider_model_configuration = Gauge(
@@ -10,6 +10,9 @@ from pydantic import (
     BaseModel,
     DirectoryPath,
     FilePath,
+    NonNegativeFloat,
+    NonNegativeInt,
+    PositiveFloat,
     PositiveInt,
     field_validator,
     model_validator,
@@ -129,6 +132,12 @@ class AuthenticationConfig(BaseModel):
     skip_tls_verification: bool = False
     k8s_cluster_api: Optional[AnyHttpUrl] = None
     k8s_ca_cert_path: Optional[FilePath] = None
+    k8s_request_timeout: PositiveFloat = constants.K8S_AUTH_REQUEST_TIMEOUT
+    k8s_auth_cache_ttl: NonNegativeFloat = constants.K8S_AUTH_CACHE_TTL
+    k8s_auth_cache_negative_ttl: NonNegativeFloat = (
+        constants.K8S_AUTH_CACHE_NEGATIVE_TTL
+    )
+    k8s_auth_cache_max_entries: PositiveInt = constants.K8S_AUTH_CACHE_MAX_ENTRIES
 
     def validate_yaml(self) -> None:
         """Validate YAML containing authentication configuration section."""
@@ -245,6 +254,18 @@ class FakeConfig(ProviderSpecificConfig, extra="forbid"):
     sleep: Optional[float]
 
 
+class ConnectionPoolConfig(BaseModel):
+    """HTTP connection pool configuration used to communicate with provider."""
+
+    max_connections: PositiveInt = constants.LLM_HTTP_MAX_CONNECTIONS
+    max_keepalive_connections: PositiveInt = (
+        constants.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS
+    )
+    keepalive_expiry: NonNegativeFloat = constants.LLM_HTTP_KEEPALIVE_EXPIRY
+    http2: bool = False
+    prewarm: bool = False
+
+
 class ProviderConfig(BaseModel):
     """LLM provider configuration."""
 
@@ -265,6 +286,7 @@ class ProviderConfig(BaseModel):
     fake_provider_config: Optional[FakeConfig] = None
     certificates_store: Optional[str] = None
     tls_security_profile: Optional[TLSSecurityProfile] = None
+    connection_pool: ConnectionPoolConfig = ConnectionPoolConfig()
 
     def __init__(
         self,
@@ -315,6 +337,7 @@ class ProviderConfig(BaseModel):
         self.tls_security_profile = TLSSecurityProfile(
             data.get("tlsSecurityProfile", None)
         )
+        self.connection_pool = ConnectionPoolConfig(**data.get("connection_pool", {}))
 
     def set_provider_type(self, data: dict) -> None:
         """Set the provider type."""
@@ -463,6 +486,7 @@ class ProviderConfig(BaseModel):
                 and self.watsonx_config == other.watsonx_config
                 and self.bam_config == other.bam_config
                 and self.tls_security_profile == other.tls_security_profile
+                and self.connection_pool == other.connection_pool
             )
         return False
 
@@ -569,6 +593,16 @@ class PostgresConfig(BaseModel):
     gss_encmode: str = constants.POSTGRES_CACHE_GSSENCMODE
     ca_cert_path: Optional[FilePath] = None
     max_entries: PositiveInt = constants.POSTGRES_CACHE_MAX_ENTRIES
+    pool_min_size: NonNegativeInt = constants.POSTGRES_CACHE_POOL_MIN_SIZE
+    pool_max_size: PositiveInt = constants.POSTGRES_CACHE_POOL_MAX_SIZE
+    pool_timeout: PositiveFloat = constants.POSTGRES_CACHE_POOL_TIMEOUT
+    pool_health_check_interval: NonNegativeFloat = (
+        constants.POSTGRES_CACHE_POOL_HEALTH_CHECK_INTERVAL
+    )
+    eviction_interval: PositiveFloat = constants.POSTGRES_CACHE_EVICTION_INTERVAL
+    eviction_batch_size: PositiveInt = constants.POSTGRES_CACHE_EVICTION_BATCH_SIZE
+    # conversations not updated for longer time (in seconds) are evicted
+    retention_period: Optional[PositiveFloat] = None
 
     def __init__(self, **data: Any) -> None:
         """Initialize configuration."""
@@ -583,6 +617,10 @@ class PostgresConfig(BaseModel):
         """Validate Postgres cache config."""
         if not 0 < self.port < 65536:
             raise ValueError("The port needs to be between 0 and 65536")
+        if self.pool_min_size > self.pool_max_size:
+            raise ValueError(
+                "The minimal pool size needs to be less or equal to the maximal one"
+            )
         return self
 
 
@@ -670,6 +708,8 @@ class InMemoryCacheConfig(BaseModel):
     """In-memory cache configuration."""
 
     max_entries: Optional[int] = None
+    max_bytes: Optional[int] = None
+    shards: int = constants.IN_MEMORY_CACHE_SHARDS
 
     def __init__(self, data: Optional[dict] = None) -> None:
         """Initialize configuration and perform basic validation."""
@@ -689,10 +729,36 @@ class InMemoryCacheConfig(BaseModel):
                 " max_entries needs to be a non-negative integer"
             ) from e
 
+        try:
+            max_bytes = data.get("max_bytes")
+            if max_bytes is not None:
+                self.max_bytes = int(max_bytes)
+                if self.max_bytes <= 0:
+                    raise ValueError
+        except ValueError as e:
+            raise checks.InvalidConfigurationError(
+                "invalid max_bytes for memory conversation cache,"
+                " max_bytes needs to be a positive integer"
+            ) from e
+
+        try:
+            self.shards = int(data.get("shards", constants.IN_MEMORY_CACHE_SHARDS))
+            if self.shards <= 0:
+                raise ValueError
+        except ValueError as e:
+            raise checks.InvalidConfigurationError(
+                "invalid shards for memory conversation cache,"
+                " shards needs to be a positive integer"
+            ) from e
+
     def __eq__(self, other: object) -> bool:
         """Compare two objects for equality."""
         if isinstance(other, InMemoryCacheConfig):
-            return self.max_entries == other.max_entries
+            return (
+                self.max_entries == other.max_entries
+                and self.max_bytes == other.max_bytes
+                and self.shards == other.shards
+            )
         return False
 
     def validate_yaml(self) -> None:
@@ -746,6 +812,79 @@ class QueryFilter(BaseModel):
             raise checks.InvalidConfigurationError("replace_with is missing")
 
 
+class NearCacheConfig(BaseModel):
+    """Configuration of in-process cache in front of the conversation cache."""
+
+    max_entries: PositiveInt = constants.NEAR_CACHE_MAX_ENTRIES
+    ttl: PositiveFloat = constants.NEAR_CACHE_TTL
+    # notify other replicas about changed conversations
+    invalidation: bool = True
+
+
+class SemanticCacheConfig(BaseModel):
+    """Configuration of cache of answers to first questions of conversations."""
+
+    max_entries: PositiveInt = constants.SEMANTIC_CACHE_MAX_ENTRIES
+    ttl: PositiveFloat = constants.SEMANTIC_CACHE_TTL
+    similarity_threshold: PositiveFloat = constants.SEMANTIC_CACHE_SIMILARITY_THRESHOLD
+
+    @model_validator(mode="after")
+    def validate_yaml(self) -> Self:
+        """Validate semantic cache config."""
+        if self.similarity_threshold > 1.0:
+            raise ValueError("Similarity threshold needs to be at most 1.0")
+        return self
+
+
+class StreamCoalescingConfig(BaseModel):
+    """Configuration of joining streamed tokens into larger frames."""
+
+    max_bytes: PositiveInt = constants.STREAM_COALESCING_MAX_BYTES
+    max_delay: PositiveFloat = constants.STREAM_COALESCING_MAX_DELAY
+
+
+class KeywordValidationConfig(BaseModel):
+    """Configuration of question validation by keywords."""
+
+    match_mode: constants.KeywordMatchMode = constants.KeywordMatchMode.SUBSTRING
+
+
+class EmbeddingValidationConfig(BaseModel):
+    """Configuration of question validation by embeddings."""
+
+    # score is the similarity to on-topic content minus the one to off-topic
+    # examples, so it is in range [-2, 2]
+    threshold: float = constants.EMBEDDING_VALIDATION_THRESHOLD
+    margin: NonNegativeFloat = constants.EMBEDDING_VALIDATION_MARGIN
+    # questions scored within the margin around threshold are validated by LLM
+    llm_fallback: bool = False
+
+    @model_validator(mode="after")
+    def validate_yaml(self) -> Self:
+        """Validate embedding validation config."""
+        if not -2.0 <= self.threshold <= 2.0:
+            raise ValueError("Threshold needs to be in range from -2.0 to 2.0")
+        return self
+
+
+class HistoryCompactionConfig(BaseModel):
+    """Configuration of folding older conversation turns into summary."""
+
+    max_turns: PositiveInt = constants.HISTORY_COMPACTION_MAX_TURNS
+    keep_turns: PositiveInt = constants.HISTORY_COMPACTION_KEEP_TURNS
+    # conversations with more tokens are compacted even with fewer turns
+    max_tokens: Optional[PositiveInt] = None
+
+    @model_validator(mode="after")
+    def validate_yaml(self) -> Self:
+        """Validate history compaction config."""
+        if self.keep_turns >= self.max_turns:
+            raise ValueError(
+                "The number of kept turns needs to be lower than the maximal one"
+            )
+        return self
+
+
 class ConversationCacheConfig(BaseModel):
     """Conversation cache configuration."""
 
@@ -753,6 +892,10 @@ class ConversationCacheConfig(BaseModel):
     redis: Optional[RedisConfig] = None
     memory: Optional[InMemoryCacheConfig] = None
     postgres: Optional[PostgresConfig] = None
+    codec: str = constants.CACHE_CODEC_MSGPACK
+    compression_threshold: Optional[int] = constants.CACHE_CODEC_COMPRESSION_THRESHOLD
+    near_cache: Optional[NearCacheConfig] = None
+    history_compaction: Optional[HistoryCompactionConfig] = None
 
     def __init__(self, data: Optional[dict] = None) -> None:
         """Initialize configuration and perform basic validation."""
@@ -760,6 +903,12 @@ class ConversationCacheConfig(BaseModel):
         if data is None:
             return
         self.type = data.get("type", None)
+        self._init_codec(data)
+        self._init_near_cache(data)
+        if data.get("history_compaction") is not None:
+            self.history_compaction = HistoryCompactionConfig(
+                **data["history_compaction"]
+            )
         if self.type is not None:
             match self.type:
                 case constants.CACHE_TYPE_REDIS:
@@ -792,6 +941,43 @@ class ConversationCacheConfig(BaseModel):
                         f"unknown conversation cache type: {self.type}"
                     )
 
+    def _init_near_cache(self, data: dict) -> None:
+        """Initialize configuration of in-process cache in front of the cache."""
+        if data.get("near_cache") is None:
+            return
+        if self.type == constants.CACHE_TYPE_MEMORY:
+            raise checks.InvalidConfigurationError(
+                "near cache can not be used with memory conversation cache"
+            )
+        self.near_cache = NearCacheConfig(**data["near_cache"])
+
+    def _init_codec(self, data: dict) -> None:
+        """Initialize configuration of codec used to serialize cache entries."""
+        self.codec = data.get("codec", constants.CACHE_CODEC_MSGPACK)
+        if self.codec not in (
+            constants.CACHE_CODEC_JSON,
+            constants.CACHE_CODEC_MSGPACK,
+        ):
+            raise checks.InvalidConfigurationError(
+                f"unknown conversation cache codec: {self.codec}"
+            )
+        try:
+            threshold = data.get(
+                "compression_threshold", constants.CACHE_CODEC_COMPRESSION_THRESHOLD
+            )
+            # compression is disabled when the threshold is not set
+            self.compression_threshold = None if threshold is None else int(threshold)
+            if (
+                self.compression_threshold is not None
+                and self.compression_threshold < 0
+            ):
+                raise ValueError
+        except ValueError as e:
+            raise checks.InvalidConfigurationError(
+                "invalid compression_threshold for conversation cache,"
+                " compression_threshold needs to be a non-negative integer"
+            ) from e
+
     def __eq__(self, other: object) -> bool:
         """Compare two objects for equality."""
         if isinstance(other, ConversationCacheConfig):
@@ -800,6 +986,10 @@ class ConversationCacheConfig(BaseModel):
                 and self.redis == other.redis
                 and self.memory == other.memory
                 and self.postgres == other.postgres
+                and self.codec == other.codec
+                and self.compression_threshold == other.compression_threshold
+                and self.near_cache == other.near_cache
+                and self.history_compaction == other.history_compaction
             )
         return False
 
@@ -821,6 +1011,105 @@ class ConversationCacheConfig(BaseModel):
                 )
 
 
+class LLMCallMemoryCacheConfig(BaseModel):
+    """Configuration of LLM call cache kept in process memory."""
+
+    max_entries: PositiveInt = constants.LLM_CALL_CACHE_MAX_ENTRIES
+
+
+class SQLiteCacheConfig(BaseModel):
+    """Configuration of LLM call cache stored in SQLite database."""
+
+    db_path: str
+
+
+class LLMCallCacheConfig(BaseModel):
+    """Configuration of cache of LLM calls made by query helpers."""
+
+    type: Optional[str] = None
+    ttl: PositiveFloat = constants.LLM_CALL_CACHE_TTL
+    helpers: list[str] = list(constants.LLM_CALL_CACHE_DEFAULT_HELPERS)
+    memory: Optional[LLMCallMemoryCacheConfig] = None
+    redis: Optional[RedisConfig] = None
+    sqlite: Optional[SQLiteCacheConfig] = None
+
+    def __init__(self, data: Optional[dict] = None) -> None:
+        """Initialize configuration and perform basic validation."""
+        super().__init__()
+        if data is None:
+            return
+        self.type = data.get("type", None)
+        self._init_ttl(data)
+        self._init_helpers(data)
+        match self.type:
+            case constants.CACHE_TYPE_MEMORY:
+                self.memory = LLMCallMemoryCacheConfig(
+                    **(data.get(constants.CACHE_TYPE_MEMORY) or {})
+                )
+            case constants.CACHE_TYPE_REDIS:
+                if constants.CACHE_TYPE_REDIS not in data:
+                    raise checks.InvalidConfigurationError(
+                        "redis LLM call cache type is specified,"
+                        " but redis configuration is missing"
+                    )
+                self.redis = RedisConfig(data.get(constants.CACHE_TYPE_REDIS))
+            case constants.CACHE_TYPE_SQLITE:
+                if constants.CACHE_TYPE_SQLITE not in data:
+                    raise checks.InvalidConfigurationError(
+                        "sqlite LLM call cache type is specified,"
+                        " but sqlite configuration is missing"
+                    )
+                self.sqlite = SQLiteCacheConfig(**data[constants.CACHE_TYPE_SQLITE])
+            case None:
+                raise checks.InvalidConfigurationError("missing LLM call cache type")
+            case _:
+                raise checks.InvalidConfigurationError(
+                    f"unknown LLM call cache type: {self.type}"
+                )
+
+    def _init_ttl(self, data: dict) -> None:
+        """Initialize time the responses are kept in the cache."""
+        if data.get("ttl") is None:
+            return
+        try:
+            self.ttl = float(data["ttl"])
+            if self.ttl <= 0:
+                raise ValueError
+        except ValueError as e:
+            raise checks.InvalidConfigurationError(
+                "invalid ttl for LLM call cache, ttl needs to be a positive number"
+            ) from e
+
+    def _init_helpers(self, data: dict) -> None:
+        """Initialize query helpers whose LLM calls are cached."""
+        if data.get("helpers") is None:
+            return
+        unknown = set(data["helpers"]) - constants.LLM_CALL_CACHE_HELPERS
+        if unknown:
+            raise checks.InvalidConfigurationError(
+                f"unknown query helpers in LLM call cache: {sorted(unknown)}"
+            )
+        self.helpers = list(data["helpers"])
+
+    def __eq__(self, other: object) -> bool:
+        """Compare two objects for equality."""
+        if isinstance(other, LLMCallCacheConfig):
+            return (
+                self.type == other.type
+                and self.ttl == other.ttl
+                and self.helpers == other.helpers
+                and self.memory == other.memory
+                and self.redis == other.redis
+                and self.sqlite == other.sqlite
+            )
+        return False
+
+    def validate_yaml(self) -> None:
+        """Validate LLM call cache config."""
+        if self.redis is not None:
+            self.redis.validate_yaml()
+
+
 class LoggingConfig(BaseModel):
     """Logging configuration."""
 
@@ -1028,7 +1317,13 @@ class OLSConfig(BaseModel):
     certificate_directory: Optional[str] = None
 
     enable_event_stream_format: bool = False
+    redact_responses: bool = False
+    stream_coalescing: Optional[StreamCoalescingConfig] = None
     quota_limiter: Optional[QuotaLimiterConfig] = None
+    semantic_cache: Optional[SemanticCacheConfig] = None
+    llm_call_cache: Optional[LLMCallCacheConfig] = None
+    embedding_validation: EmbeddingValidationConfig = EmbeddingValidationConfig()
+    keyword_validation: KeywordValidationConfig = KeywordValidationConfig()
 
     def __init__(
         self, data: Optional[dict] = None, ignore_missing_certs: bool = False
@@ -1081,7 +1376,20 @@ class OLSConfig(BaseModel):
             data.get("tlsSecurityProfile", None)
         )
         self.enable_event_stream_format = data.get("enable_event_stream_format", False)
+        self.redact_responses = data.get("redact_responses", False)
+        if data.get("stream_coalescing") is not None:
+            self.stream_coalescing = StreamCoalescingConfig(**data["stream_coalescing"])
         self.quota_limiter = QuotaLimiterConfig(data.get("quota_limiter", None))
+        if data.get("semantic_cache") is not None:
+            self.semantic_cache = SemanticCacheConfig(**data["semantic_cache"])
+        if data.get("llm_call_cache") is not None:
+            self.llm_call_cache = LLMCallCacheConfig(data["llm_call_cache"])
+        self.embedding_validation = EmbeddingValidationConfig(
+            **data.get("embedding_validation", {})
+        )
+        self.keyword_validation = KeywordValidationConfig(
+            **data.get("keyword_validation", {})
+        )
 
     def __eq__(self, other: object) -> bool:
         """Compare two objects for equality."""
@@ -1104,7 +1412,13 @@ class OLSConfig(BaseModel):
                 and self.expire_llm_is_ready_persistent_state
                 == other.expire_llm_is_ready_persistent_state
                 and self.enable_event_stream_format == other.enable_event_stream_format
+                and self.redact_responses == other.redact_responses
+                and self.stream_coalescing == other.stream_coalescing
                 and self.quota_limiter == other.quota_limiter
+                and self.semantic_cache == other.semantic_cache
+                and self.llm_call_cache == other.llm_call_cache
+                and self.embedding_validation == other.embedding_validation
+                and self.keyword_validation == other.keyword_validation
             )
         return False
 
@@ -1123,6 +1437,8 @@ class OLSConfig(BaseModel):
             self.tls_security_profile.validate_yaml()
         if self.authentication_config is not None:
             self.authentication_config.validate_yaml()
+        if self.llm_call_cache is not None:
+            self.llm_call_cache.validate_yaml()
 
         valid_query_validation_methods = list(constants.QueryValidationMethod)
         if self.query_validation_method not in valid_query_validation_methods:
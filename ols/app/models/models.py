@@ -1,7 +1,9 @@
 """Data models representing payloads for REST API calls."""
 
+import asyncio
 import json
 from collections import OrderedDict
+from concurrent.futures import Future
 from typing import Any, Optional, Self, Union
 
 from langchain.llms.base import LLM
@@ -9,7 +11,7 @@ from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from pydantic import BaseModel, field_validator, model_validator
 from pydantic.dataclasses import dataclass
 
-from ols.constants import MEDIA_TYPE_JSON, MEDIA_TYPE_TEXT
+from ols.constants import HISTORY_SUMMARY_FLAG, MEDIA_TYPE_JSON, MEDIA_TYPE_TEXT
 from ols.customize import prompts
 from ols.utils import suid
 
@@ -669,11 +671,15 @@ class CacheEntry(BaseModel):
     Attributes:
         query: The query string.
         response: The response string.
+        attachments: Attachments sent together with the query.
+        token_counts: Token counts of the query and response messages keyed
+            by the tokenizer they were counted by (see `TokenHandler`).
     """
 
     query: HumanMessage
     response: Optional[AIMessage] = AIMessage("")
     attachments: list[Attachment] = []
+    token_counts: dict[str, list[int]] = {}
 
     @field_validator("response")
     @classmethod
@@ -685,11 +691,14 @@ class CacheEntry(BaseModel):
 
     def to_dict(self) -> dict:
         """Convert the cache entry to a dictionary."""
-        return {
+        data = {
             "human_query": self.query,
             "ai_response": self.response,
             "attachments": [attachment.model_dump() for attachment in self.attachments],
         }
+        if self.token_counts:
+            data["token_counts"] = self.token_counts
+        return data
 
     @classmethod
     def from_dict(cls, data: dict) -> Self:
@@ -700,6 +709,8 @@ class CacheEntry(BaseModel):
             attachments=[
                 Attachment(**attachment) for attachment in data["attachments"]
             ],
+            # entries stored before token counts were introduced do not have them
+            token_counts=data.get("token_counts", {}),
         )
 
     @staticmethod
@@ -717,6 +728,41 @@ class CacheEntry(BaseModel):
 
         return history
 
+    @staticmethod
+    def cache_entries_to_messages(
+        cache_entries: list["CacheEntry"],
+    ) -> list[BaseMessage]:
+        """Convert cache entries to messages of the conversation shown to the user.
+
+        Entry with summary of compacted turns is not a question asked by the
+        user, just its response (flagged as history summary) is returned.
+        """
+        history = CacheEntry.cache_entries_to_history(cache_entries)
+        messages: list[BaseMessage] = []
+        for query, response in zip(history[::2], history[1::2]):
+            if query.additional_kwargs.get(HISTORY_SUMMARY_FLAG):
+                # summaries stored before the response was flagged too
+                response.additional_kwargs[HISTORY_SUMMARY_FLAG] = True
+            else:
+                messages.append(query)
+            messages.append(response)
+        return messages
+
+    @staticmethod
+    def cache_entries_to_token_counts(
+        cache_entries: list["CacheEntry"],
+    ) -> list[dict[str, int]]:
+        """Return token counts of messages returned by `cache_entries_to_history`."""
+        token_counts: list[dict[str, int]] = []
+        for entry in cache_entries:
+            token_counts.append(
+                {key: counts[0] for key, counts in entry.token_counts.items()}
+            )
+            token_counts.append(
+                {key: counts[1] for key, counts in entry.token_counts.items()}
+            )
+        return token_counts
+
 
 class MessageEncoder(json.JSONEncoder):
     """Convert Message objects to serializable dictionaries."""
@@ -748,12 +794,15 @@ class MessageEncoder(json.JSONEncoder):
                 "additional_kwargs": o.additional_kwargs,
             }
         if isinstance(o, CacheEntry):
-            return {
+            entry = {
                 "__type__": "CacheEntry",
                 "query": self.default(o.query),  # Handle nested Message object
                 "response": self.default(o.response) if o.response else None,
                 "attachments": o.attachments,
             }
+            if o.token_counts:
+                entry["token_counts"] = o.token_counts
+            return entry
         return super().default(o)
 
 
@@ -795,6 +844,7 @@ class MessageDecoder(json.JSONDecoder):
                     self._decode_message(dct["response"]) if dct["response"] else None
                 ),
                 attachments=dct["attachments"],
+                token_counts=dct.get("token_counts", {}),
             )
         if "type" in dct:
             message: Union[HumanMessage, AIMessage]
@@ -823,8 +873,12 @@ class ProcessedRequest(BaseModel):
         timestamps: Timestamps for all operations.
         skip_user_id_check: Flag to skip user ID checking in handler.
         user_token: User token (if provided).
+        prepared_response: Speculatively prepared summarizer and prompt (if any).
+        topic_summary: Topic summary being generated for new conversation (if any).
     """
 
+    model_config = {"arbitrary_types_allowed": True}
+
     user_id: str
     conversation_id: str
     query_without_attachments: str
@@ -834,3 +888,5 @@ class ProcessedRequest(BaseModel):
     timestamps: dict[str, float]
     skip_user_id_check: bool
     user_token: str
+    prepared_response: Optional[Union[Future, asyncio.Future]] = None
+    topic_summary: Optional[Union[Future, asyncio.Future]] = None
@@ -11,13 +11,39 @@ class QueryValidationMethod(StrEnum):
 
     KEYWORD = "keyword"
     LLM = "llm"
+    EMBEDDING = "embedding"
     DISABLED = "disabled"
 
 
+# How keywords are matched by keyword based query validation
+class KeywordMatchMode(StrEnum):
+    """Possible options for keyword matching."""
+
+    SUBSTRING = "substring"
+    WORD = "word"
+
+
+# maximum number of characters of streamed response held back by each redaction
+# filter, its matches longer than that are redacted as soon as they are found
+RESPONSE_REDACTION_MAX_LOOKBACK = 256
+
+# tokens of streamed response are joined into one frame until it has at least
+# this number of bytes or the first of them waited for this number of seconds
+STREAM_COALESCING_MAX_BYTES = 256
+STREAM_COALESCING_MAX_DELAY = 0.03
+
+
 # Query validation responses
 SUBJECT_REJECTED = "REJECTED"
 SUBJECT_ALLOWED = "ALLOWED"
 
+# questions scored at least this by embedding based validation are allowed
+EMBEDDING_VALIDATION_THRESHOLD = 0.0
+# questions scored closer to the threshold are validated by LLM (when enabled)
+EMBEDDING_VALIDATION_MARGIN = 0.05
+# number of document embeddings read from the index at once to compute centroid
+EMBEDDING_VALIDATION_CENTROID_BATCH_SIZE = 10000
+
 
 # providers
 PROVIDER_BAM = "bam"
@@ -59,6 +85,25 @@ class GenericLLMParameters:
     TEMPERATURE = "temperature"
 
 
+# Maximum number of loaded LLM instances (provider/model/parameters combinations)
+# that are kept in process-wide pool to be reused by subsequent requests
+LLM_POOL_MAX_SIZE = 32
+
+# Maximum number of compiled prompt templates, system prompt is part of the key
+# and it can be set by the query request
+PROMPT_TEMPLATE_REGISTRY_SIZE = 128
+
+# Default limits for HTTP connection pools used to communicate with LLM providers
+LLM_HTTP_MAX_CONNECTIONS = 100
+LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+# in seconds
+LLM_HTTP_KEEPALIVE_EXPIRY = 60.0
+
+# Maximum number of threads used to run independent parts of query
+# processing (question validation, RAG retrieval, topic summary) concurrently
+QUERY_PIPELINE_MAX_WORKERS = 64
+
+
 # Token related constants
 
 # It is important to set correct context window, otherwise there will be potential
@@ -110,6 +155,51 @@ RAG_SIMILARITY_CUTOFF = 0.3
 # cache constants
 CACHE_TYPE_MEMORY = "memory"
 IN_MEMORY_CACHE_MAX_ENTRIES = 1000
+# maximum number of independently locked shards of in-memory cache
+IN_MEMORY_CACHE_SHARDS = 16
+# cache is split into more shards only when every shard holds at least this
+# number of conversations, so LRU order is still (almost) global
+IN_MEMORY_CACHE_MIN_ENTRIES_PER_SHARD = 1000
+# codecs used to serialize conversation history entries
+CACHE_CODEC_JSON = "json"
+CACHE_CODEC_MSGPACK = "msgpack"
+# entries bigger than this size (in bytes) are compressed by zstd
+CACHE_CODEC_COMPRESSION_THRESHOLD = 4096
+# recently active conversations kept in process memory in front of the cache
+NEAR_CACHE_MAX_ENTRIES = 1000
+# time (in seconds) a conversation is kept in near cache
+NEAR_CACHE_TTL = 300.0
+# channel used to notify other replicas about changed conversations
+CACHE_INVALIDATION_CHANNEL = "ols_conversation_cache_invalidation"
+# older turns of conversations longer than this are folded into summary
+HISTORY_COMPACTION_MAX_TURNS = 20
+# number of the most recent turns that are not folded into summary
+HISTORY_COMPACTION_KEEP_TURNS = 5
+# number of threads summarizing conversations in background
+HISTORY_COMPACTION_MAX_WORKERS = 2
+# query of the conversation entry with summary of the folded turns
+HISTORY_SUMMARY_QUERY = "Summarize our conversation so far."
+# flag in additional kwargs of messages of the entry with the summary
+HISTORY_SUMMARY_FLAG = "history_summary"
+
+# answers to first questions of conversations cached by query similarity
+SEMANTIC_CACHE_MAX_ENTRIES = 1000
+# time (in seconds) an answer is kept in semantic cache
+SEMANTIC_CACHE_TTL = 3600.0
+# minimal cosine similarity of the query and the cached one
+SEMANTIC_CACHE_SIMILARITY_THRESHOLD = 0.95
+# responses of LLM calls made by query helpers cached by exact prompt
+CACHE_TYPE_SQLITE = "sqlite"
+LLM_CALL_CACHE_MAX_ENTRIES = 10000
+# time (in seconds) a response is kept in LLM call cache
+LLM_CALL_CACHE_TTL = 3600.0
+# query helpers whose LLM calls can be cached
+LLM_CALL_CACHE_HELPERS = frozenset(
+    {"question_validator", "topic_summarizer", "history_summarizer", "docs_summarizer"}
+)
+# answers of docs summarizer depend on retrieved documents and are not cached
+# unless it is enabled explicitly
+LLM_CALL_CACHE_DEFAULT_HELPERS = ("question_validator", "topic_summarizer")
 CACHE_TYPE_REDIS = "redis"
 REDIS_CACHE_HOST = "lightspeed-redis-server.openshift-lightspeed.svc"
 REDIS_CACHE_PORT = 6379
@@ -125,6 +215,17 @@ POSTGRES_CACHE_PORT = 5432
 POSTGRES_CACHE_DBNAME = "cache"
 POSTGRES_CACHE_USER = "postgres"
 POSTGRES_CACHE_MAX_ENTRIES = 1000
+# number of connections opened in advance and the upper bound of connections
+POSTGRES_CACHE_POOL_MIN_SIZE = 1
+POSTGRES_CACHE_POOL_MAX_SIZE = 10
+# time (in seconds) to wait for free connection
+POSTGRES_CACHE_POOL_TIMEOUT = 30.0
+# connections idle for longer time (in seconds) are checked before use
+POSTGRES_CACHE_POOL_HEALTH_CHECK_INTERVAL = 30.0
+# time (in seconds) between two sweeps of the background eviction job
+POSTGRES_CACHE_EVICTION_INTERVAL = 60.0
+# maximum number of conversations deleted in one transaction
+POSTGRES_CACHE_EVICTION_BATCH_SIZE = 500
 
 # look at https://www.postgresql.org/docs/current/libpq-connect.html#LIBPQ-CONNECT-SSLMODE
 # for all possible options
@@ -151,6 +252,21 @@ HTTP_RESPONSE_HEADERS_TO_REDACT = frozenset(
 )
 
 
+# Maximum number of threads used to perform Kubernetes TokenReview and
+# SubjectAccessReview calls outside of the event loop
+K8S_AUTH_MAX_WORKERS = 16
+
+# Timeout (in seconds) for one call to Kubernetes API made during authentication
+K8S_AUTH_REQUEST_TIMEOUT = 10.0
+
+# Time (in seconds) for which successful and failed authentication decisions
+# are cached, zero disables the caching
+K8S_AUTH_CACHE_TTL = 30.0
+K8S_AUTH_CACHE_NEGATIVE_TTL = 5.0
+
+# Maximum number of cached authentication decisions
+K8S_AUTH_CACHE_MAX_ENTRIES = 1000
+
 # Tells if the code is running in a cluster or not. It depends on
 # specific envs that k8s/ocp sets to pod.
 RUNNING_IN_CLUSTER = (
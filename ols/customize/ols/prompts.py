@@ -66,6 +66,29 @@ Question:
 Response:
 """
 
+# labelled questions used by embedding based question validation, on-topic
+# questions are compared together with the content of the RAG index
+QUESTION_VALIDATOR_ALLOWED_EXAMPLES = (
+    "Can you help configure my cluster to automatically scale?",
+    "How do I deploy an application to OpenShift?",
+    "Why is my pod stuck in CrashLoopBackOff?",
+    "How do I expose a service with a route?",
+    "How can I upgrade my OpenShift cluster?",
+    "How do I create a persistent volume claim?",
+    "What is the difference between a deployment and a stateful set?",
+    "How do I give a user access to a project?",
+)
+QUESTION_VALIDATOR_REJECTED_EXAMPLES = (
+    "Why is the sky blue?",
+    "Write me a poem about the ocean.",
+    "What is the capital of France?",
+    "Who won the football world cup?",
+    "Give me a recipe for chocolate cake.",
+    "What is the weather like tomorrow?",
+    "Tell me a joke.",
+    "How do I lose weight fast?",
+)
+
 # {{query}} is escaped because it will be replaced as a parameter at time of use
 TOPIC_SUMMARY_PROMPT_TEMPLATE = """
 Instructions:
@@ -113,3 +136,23 @@ Input:
 {query}
 Output:
 """
+
+
+# {history} will be replaced as a parameter at time of use
+HISTORY_SUMMARY_PROMPT_TEMPLATE = """
+Instructions:
+- You are summarizing a conversation between a user and an assistant
+- The summary replaces the conversation in the assistant's memory
+
+The summary must:
+- Keep facts, names, commands, configuration and decisions the user may refer to later
+- Keep the user's goals and questions that are not resolved yet
+- Omit greetings and repeated information
+- Be written in third person
+- Have at most 300 words
+
+Conversation:
+{history}
+
+Summary:
+"""
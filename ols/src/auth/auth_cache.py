@@ -0,0 +1,76 @@
+"""Cache of authentication and authorization decisions."""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from ols import constants
+
+logger = logging.getLogger(__name__)
+
+
+class AuthDecisionCache:
+    """Bounded LRU cache of authentication decisions with per-entry TTL.
+
+    Console sessions send a lot of requests with the same bearer token, so
+    caching the decisions (both positive and negative ones) for a short time
+    removes most of the calls to the Kubernetes API server. Tokens are never
+    stored in the cache, only their SHA-256 digests are used in keys.
+    """
+
+    def __init__(self, max_entries: int = constants.K8S_AUTH_CACHE_MAX_ENTRIES) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of decisions kept in the cache.
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def construct_key(token: str, virtual_path: str) -> str:
+        """Construct cache key from token and path the access is checked for."""
+        digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        return f"{digest}:{virtual_path}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return cached decision or None if it is not cached or has expired."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, decision = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return decision
+
+    def set(self, key: str, decision: Any, ttl: float) -> None:
+        """Store the decision into the cache.
+
+        Args:
+            key: The cache key, see `construct_key`.
+            decision: The decision to be cached.
+            ttl: Time to live in seconds, zero means the decision is not cached.
+        """
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, decision)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all decisions from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return number of cached decisions."""
+        return len(self._entries)
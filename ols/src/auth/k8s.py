@@ -1,8 +1,13 @@
 """Manage authentication flow for FastAPI endpoints with K8S/OCP."""
 
+import asyncio
 import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Optional, Self
+from typing import Any, Optional, Self, TypeVar
 
 import kubernetes.client
 from fastapi import HTTPException, Request
@@ -13,10 +18,12 @@ from ols import config
 from ols.constants import (
     DEFAULT_USER_NAME,
     DEFAULT_USER_UID,
+    K8S_AUTH_MAX_WORKERS,
     NO_USER_TOKEN,
     RUNNING_IN_CLUSTER,
 )
 
+from .auth_cache import AuthDecisionCache
 from .auth_dependency_interface import AuthDependencyInterface
 
 logger = logging.getLogger(__name__)
@@ -24,6 +31,14 @@ logger = logging.getLogger(__name__)
 
 CLUSTER_ID_LOCAL = "local"
 
+T = TypeVar("T")
+
+# Kubernetes client is synchronous, so all calls to API server are performed
+# in dedicated threads to not block the event loop
+k8s_auth_executor = ThreadPoolExecutor(
+    max_workers=K8S_AUTH_MAX_WORKERS, thread_name_prefix="k8s-auth"
+)
+
 
 class ClusterIDUnavailableError(Exception):
     """Cluster ID is not available."""
@@ -180,11 +195,60 @@ class K8sClientSingleton:
         return cls._cluster_id
 
 
-def get_user_info(token: str) -> Optional[kubernetes.client.V1TokenReview]:
+async def run_k8s_call(review: str, func: Callable[..., T], *args: Any) -> T:
+    """Run blocking Kubernetes API call in executor and measure its duration.
+
+    Args:
+        review: Name of the performed review, used as metrics label.
+        func: The function performing the call.
+        args: Positional arguments passed to the function.
+
+    Returns:
+        The value returned by the function.
+
+    Raises:
+        HTTPException: If the call does not finish within configured timeout.
+    """
+    # metrics module constructs auth dependency when imported
+    from ols.app import metrics
+
+    timeout = config.ols_config.authentication_config.k8s_request_timeout
+    loop = asyncio.get_running_loop()
+    start = time.monotonic()
+    try:
+        # the whole call is bounded, including the time spent waiting
+        # for free worker in the executor
+        return await asyncio.wait_for(
+            loop.run_in_executor(k8s_auth_executor, partial(func, *args)),
+            timeout=timeout,
+        )
+    except TimeoutError as e:
+        metrics.k8s_auth_call_failures_total.labels(review, "timeout").inc()
+        logger.error("%s timed out after %s seconds", review, timeout)
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "response": "Service Unavailable: Kubernetes API timed out",
+                "cause": f"{review} did not finish in {timeout} seconds",
+            },
+        ) from e
+    except Exception:
+        metrics.k8s_auth_call_failures_total.labels(review, "error").inc()
+        raise
+    finally:
+        metrics.k8s_auth_call_duration_seconds.labels(review).observe(
+            time.monotonic() - start
+        )
+
+
+def get_user_info(
+    token: str, timeout: Optional[float] = None
+) -> Optional[kubernetes.client.V1TokenReview]:
     """Perform a Kubernetes TokenReview to validate a given token.
 
     Args:
         token: The bearer token to be validated.
+        timeout: Timeout (in seconds) for the call to Kubernetes API.
 
     Returns:
         The user information if the token is valid, None otherwise.
@@ -194,7 +258,7 @@ def get_user_info(token: str) -> Optional[kubernetes.client.V1TokenReview]:
         spec=kubernetes.client.V1TokenReviewSpec(token=token)
     )
     try:
-        response = auth_api.create_token_review(token_review)
+        response = auth_api.create_token_review(token_review, _request_timeout=timeout)
         if response.status.authenticated:
             return response.status
         return None
@@ -209,6 +273,37 @@ def get_user_info(token: str) -> Optional[kubernetes.client.V1TokenReview]:
         ) from e
 
 
+def is_access_allowed(
+    user: kubernetes.client.V1UserInfo,
+    virtual_path: str,
+    timeout: Optional[float] = None,
+) -> bool:
+    """Perform a Kubernetes SubjectAccessReview for given user and path.
+
+    Args:
+        user: The user information retrieved by TokenReview.
+        virtual_path: The non-resource path the access is checked for.
+        timeout: Timeout (in seconds) for the call to Kubernetes API.
+
+    Returns:
+        True if the user is allowed to access the path, False otherwise.
+    """
+    authorization_api = K8sClientSingleton.get_authz_api()
+    sar = kubernetes.client.V1SubjectAccessReview(
+        spec=kubernetes.client.V1SubjectAccessReviewSpec(
+            user=user.username,
+            groups=user.groups,
+            non_resource_attributes=kubernetes.client.V1NonResourceAttributes(
+                path=virtual_path, verb="get"
+            ),
+        )
+    )
+    response = authorization_api.create_subject_access_review(
+        sar, _request_timeout=timeout
+    )
+    return response.status.allowed
+
+
 def _extract_bearer_token(header: str) -> str:
     """Extract the bearer token from an HTTP authorization header.
 
@@ -233,12 +328,26 @@ class AuthDependency(AuthDependencyInterface):
     def __init__(self, virtual_path: str = "/ols-access") -> None:
         """Initialize the required allowed paths for authorization checks."""
         self.virtual_path = virtual_path
+        self.cache = AuthDecisionCache(
+            config.ols_config.authentication_config.k8s_auth_cache_max_entries
+        )
+
+    def _deny(self, cache_key: str, detail: str) -> HTTPException:
+        """Cache the negative decision and construct exception to be raised."""
+        self.cache.set(
+            cache_key,
+            detail,
+            config.ols_config.authentication_config.k8s_auth_cache_negative_ttl,
+        )
+        return HTTPException(status_code=403, detail=detail)
 
     async def __call__(self, request: Request) -> tuple[str, str, bool, str]:
         """Validate FastAPI Requests for authentication and authorization.
 
         Validates the bearer token from the request,
         performs access control checks using Kubernetes TokenReview and SubjectAccessReview.
+        Decisions are cached for a short time, keyed by hash of the token and
+        the virtual path.
 
         Args:
             request: The FastAPI request object.
@@ -274,32 +383,63 @@ class AuthDependency(AuthDependencyInterface):
                 status_code=401,
                 detail="Unauthorized: Bearer token not found or invalid",
             )
-        user_info = get_user_info(token)
+        # metrics module constructs auth dependency when imported
+        from ols.app import metrics
+
+        cache_key = AuthDecisionCache.construct_key(token, self.virtual_path)
+        decision = self.cache.get(cache_key)
+        if decision is None:
+            metrics.auth_cache_misses_total.inc()
+            user_uid, username = await self._review(token, cache_key)
+            return user_uid, username, False, token
+
+        metrics.auth_cache_hits_total.inc()
+        # negative decisions are stored as the reason for denial
+        if isinstance(decision, str):
+            raise HTTPException(status_code=403, detail=decision)
+        user_uid, username = decision
+        return user_uid, username, False, token
+
+    async def _review(self, token: str, cache_key: str) -> tuple[str, str]:
+        """Perform TokenReview and SubjectAccessReview and cache the decision.
+
+        Args:
+            token: The bearer token from the request.
+            cache_key: The key the decision is cached under.
+
+        Returns:
+            The user's UID and username.
+
+        Raises:
+            HTTPException: If the token is invalid or the user does not have access.
+        """
+        auth_config = config.ols_config.authentication_config
+        timeout = auth_config.k8s_request_timeout
+        user_info = await run_k8s_call("token_review", get_user_info, token, timeout)
         if user_info is None:
-            raise HTTPException(
-                status_code=403, detail="Forbidden: Invalid or expired token"
-            )
+            raise self._deny(cache_key, "Forbidden: Invalid or expired token")
         if user_info.user.username == "kube:admin":
-            user_info.user.uid = K8sClientSingleton.get_cluster_id()
-        authorization_api = K8sClientSingleton.get_authz_api()
-
-        sar = kubernetes.client.V1SubjectAccessReview(
-            spec=kubernetes.client.V1SubjectAccessReviewSpec(
-                user=user_info.user.username,
-                groups=user_info.user.groups,
-                non_resource_attributes=kubernetes.client.V1NonResourceAttributes(
-                    path=self.virtual_path, verb="get"
-                ),
+            user_info.user.uid = await run_k8s_call(
+                "cluster_id", K8sClientSingleton.get_cluster_id
             )
-        )
+
         try:
-            response = authorization_api.create_subject_access_review(sar)
-            if not response.status.allowed:
-                raise HTTPException(
-                    status_code=403, detail="Forbidden: User does not have access"
-                )
+            allowed = await run_k8s_call(
+                "subject_access_review",
+                is_access_allowed,
+                user_info.user,
+                self.virtual_path,
+                timeout,
+            )
         except ApiException as e:
             logger.error("API exception during SubjectAccessReview: %s", e)
             raise HTTPException(status_code=403, detail="Internal server error") from e
+        if not allowed:
+            raise self._deny(cache_key, "Forbidden: User does not have access")
 
-        return user_info.user.uid, user_info.user.username, False, token
+        self.cache.set(
+            cache_key,
+            (user_info.user.uid, user_info.user.username),
+            auth_config.k8s_auth_cache_ttl,
+        )
+        return user_info.user.uid, user_info.user.username
@@ -1,6 +1,9 @@
 """Abstract class that is parent for all cache implementations."""
 
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from typing import Optional
 
 from ols.app.models.models import CacheEntry
 from ols.utils.suid import check_suid
@@ -44,7 +47,11 @@ class Cache(ABC):
 
     @abstractmethod
     def get(
-        self, user_id: str, conversation_id: str, skip_user_id_check: bool
+        self,
+        user_id: str,
+        conversation_id: str,
+        skip_user_id_check: bool,
+        limit: Optional[int] = None,
     ) -> list[CacheEntry]:
         """Abstract method to retrieve a value from the cache.
 
@@ -52,6 +59,7 @@ class Cache(ABC):
             user_id: User identification.
             conversation_id: Conversation ID unique for given user.
             skip_user_id_check: Skip user_id suid check.
+            limit: Number of most recent entries to return, all if not set.
 
         Returns:
             The value (CacheEntry(s)) associated with the key, or None if not found.
@@ -76,6 +84,87 @@ class Cache(ABC):
             skip_user_id_check: Skip user_id suid check.
         """
 
+    @abstractmethod
+    def compact(
+        self,
+        user_id: str,
+        conversation_id: str,
+        folded: list[CacheEntry],
+        summary: CacheEntry,
+        skip_user_id_check: bool,
+    ) -> bool:
+        """Abstract method to replace the oldest entries by their summary.
+
+        Entries appended in the meantime are kept. Nothing is replaced when
+        the conversation does not start with the folded entries anymore, for
+        example when it has been compacted concurrently.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            folded: The oldest entries of the conversation being replaced.
+            summary: The entry with summary of the folded entries.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            bool: True if entries were replaced, False otherwise.
+        """
+
+    async def aget(
+        self,
+        user_id: str,
+        conversation_id: str,
+        skip_user_id_check: bool,
+        limit: Optional[int] = None,
+    ) -> list[CacheEntry]:
+        """Retrieve a value from the cache asynchronously.
+
+        Blocking `get` is run in worker thread by default, implementations
+        with native asynchronous clients can override this method.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+            limit: Number of most recent entries to return, all if not set.
+
+        Returns:
+            The value (CacheEntry(s)) associated with the key, or None if not found.
+        """
+        return await asyncio.to_thread(
+            self.get, user_id, conversation_id, skip_user_id_check, limit
+        )
+
+    async def ainsert_or_append(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        topic_summary: str,
+        skip_user_id_check: bool,
+    ) -> None:
+        """Store a value in the cache asynchronously.
+
+        Blocking `insert_or_append` is run in worker thread by default,
+        implementations with native asynchronous clients can override
+        this method.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            cache_entry: The value to store.
+            topic_summary: Summary of the conversation's initial topic.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        await asyncio.to_thread(
+            self.insert_or_append,
+            user_id,
+            conversation_id,
+            cache_entry,
+            topic_summary,
+            skip_user_id_check,
+        )
+
     @abstractmethod
     def delete(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool
@@ -92,13 +181,46 @@ class Cache(ABC):
         """
 
     @abstractmethod
-    def list(self, user_id: str, skip_user_id_check: bool) -> list[dict[str, str]]:
+    def list(
+        self,
+        user_id: str,
+        skip_user_id_check: bool,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> list[dict[str, str]]:
         """List all conversations for a given user_id.
 
         Args:
             user_id: User identification.
             skip_user_id_check: Skip user_id suid check.
+            limit: Maximum number of returned conversations, all if not set.
+            offset: Number of the most recent conversations to skip.
 
         Returns:
              A list of dictionaries containing conversation_id and topic_summary
         """
+
+    def publish_invalidation(self, message: str) -> None:
+        """Notify all replicas that a conversation has been changed.
+
+        Caches that are not shared between replicas do not publish anything.
+
+        Args:
+            message: The message delivered to subscribers.
+        """
+
+    def subscribe_invalidations(
+        self, callback: Callable[[Optional[str]], None]
+    ) -> bool:
+        """Call the callback with every invalidation published by any replica.
+
+        The callback is called with None when some invalidations might have
+        been lost, for example when connection to the storage was interrupted.
+
+        Args:
+            callback: Function called in background thread.
+
+        Returns:
+            bool: True if the cache supports invalidations, False otherwise.
+        """
+        return False
@@ -1,9 +1,21 @@
 """Cache factory class."""
 
 from ols import constants
-from ols.app.models.config import ConversationCacheConfig
+from ols.app.models.config import (
+    ConversationCacheConfig,
+    LLMCallCacheConfig,
+    LLMCallMemoryCacheConfig,
+)
 from ols.src.cache.cache import Cache
+from ols.src.cache.codec import get_codec
 from ols.src.cache.in_memory_cache import InMemoryCache
+from ols.src.cache.llm_call_cache import (
+    InMemoryLLMCallCache,
+    LLMCallCache,
+    RedisLLMCallCache,
+    SQLiteLLMCallCache,
+)
+from ols.src.cache.near_cache import NearCache
 from ols.src.cache.postgres_cache import PostgresCache
 from ols.src.cache.redis_cache import RedisCache
 
@@ -16,18 +28,48 @@ class CacheFactory:
         """Create an instance of Cache based on loaded configuration.
 
         Returns:
-            An instance of `Cache` (either `RedisCache` or `InMemoryCache`).
+            An instance of `Cache` (`RedisCache`, `PostgresCache` or
+            `InMemoryCache`), decorated by `NearCache` when it is configured.
         """
+        codec = get_codec(config.codec, config.compression_threshold)
+        cache: Cache
         match config.type:
             case constants.CACHE_TYPE_REDIS:
-                return RedisCache(config.redis)
+                cache = RedisCache(config.redis, codec)
             case constants.CACHE_TYPE_MEMORY:
-                return InMemoryCache(config.memory)
+                return InMemoryCache(config.memory, codec)
             case constants.CACHE_TYPE_POSTGRES:
-                return PostgresCache(config.postgres)
+                cache = PostgresCache(config.postgres, codec)
             case _:
                 raise ValueError(
                     f"Invalid cache type: {config.type}. "
                     f"Use '{constants.CACHE_TYPE_REDIS}', '{constants.CACHE_TYPE_POSTGRES}' or "
                     f"'{constants.CACHE_TYPE_MEMORY}' options."
                 )
+        if config.near_cache is not None:
+            return NearCache(cache, config.near_cache)
+        return cache
+
+    @staticmethod
+    def llm_call_cache(config: LLMCallCacheConfig) -> LLMCallCache:
+        """Create an instance of LLM call cache based on loaded configuration.
+
+        Returns:
+            An instance of `LLMCallCache` (`InMemoryLLMCallCache`,
+            `RedisLLMCallCache` or `SQLiteLLMCallCache`).
+        """
+        match config.type:
+            case constants.CACHE_TYPE_MEMORY:
+                return InMemoryLLMCallCache(
+                    config.memory or LLMCallMemoryCacheConfig(), config.ttl
+                )
+            case constants.CACHE_TYPE_REDIS:
+                return RedisLLMCallCache(config.redis, config.ttl)  # type: ignore [arg-type]
+            case constants.CACHE_TYPE_SQLITE:
+                return SQLiteLLMCallCache(config.sqlite, config.ttl)  # type: ignore [arg-type]
+            case _:
+                raise ValueError(
+                    f"Invalid LLM call cache type: {config.type}. "
+                    f"Use '{constants.CACHE_TYPE_MEMORY}', '{constants.CACHE_TYPE_REDIS}' or "
+                    f"'{constants.CACHE_TYPE_SQLITE}' options."
+                )
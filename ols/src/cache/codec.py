@@ -0,0 +1,198 @@
+"""Codecs used to serialize conversation history entries stored in caches."""
+
+import importlib.util
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Union
+
+import msgpack
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ols import constants
+from ols.app.models.models import (
+    Attachment,
+    CacheEntry,
+    MessageDecoder,
+    MessageEncoder,
+)
+
+logger = logging.getLogger(__name__)
+
+# the first byte of binary payloads, it is never used by msgpack nor it can
+# start a JSON document, so payloads in both formats can be distinguished
+BINARY_FORMAT_MARKER = 0xC1
+BINARY_FORMAT_VERSION = 1
+# flag set when the msgpack payload is compressed by zstd
+FLAG_ZSTD = 0x01
+HEADER_SIZE = 3
+
+
+def zstd_available() -> bool:
+    """Check if zstd compression can be used."""
+    # compression is optional and requires zstandard package
+    return importlib.util.find_spec("zstandard") is not None
+
+
+class EntryCodec(ABC):
+    """Serializes `CacheEntry` objects into bytes stored in caches."""
+
+    @abstractmethod
+    def encode(self, cache_entry: CacheEntry) -> bytes:
+        """Serialize the cache entry."""
+
+    @abstractmethod
+    def decode(self, data: bytes) -> CacheEntry:
+        """Deserialize the cache entry."""
+
+
+class JSONCodec(EntryCodec):
+    """Codec using JSON format, the one used before binary format was introduced."""
+
+    def encode(self, cache_entry: CacheEntry) -> bytes:
+        """Serialize the cache entry into JSON document."""
+        return json.dumps(cache_entry.to_dict(), cls=MessageEncoder).encode("utf-8")
+
+    def decode(self, data: bytes) -> CacheEntry:
+        """Deserialize the cache entry from JSON document."""
+        value = json.loads(data, cls=MessageDecoder)
+        if isinstance(value, CacheEntry):
+            return value
+        # entries stored by `CacheEntry.to_dict`
+        return CacheEntry.from_dict(value)
+
+
+class MsgpackCodec(EntryCodec):
+    """Codec using compact binary format based on msgpack.
+
+    Payload starts with three bytes header - format marker, format version
+    and flags. Entries are stored as arrays instead of maps and they are
+    decoded without pydantic validation, as they were validated when stored.
+    Payloads bigger than `compression_threshold` (typically entries with
+    large attachments) are compressed by zstd when it is available.
+    """
+
+    def __init__(
+        self,
+        compression_threshold: Optional[
+            int
+        ] = constants.CACHE_CODEC_COMPRESSION_THRESHOLD,
+    ) -> None:
+        """Initialize the codec.
+
+        Args:
+            compression_threshold: Minimal payload size (in bytes) to be
+                compressed, None disables the compression.
+        """
+        if compression_threshold is not None and not zstd_available():
+            logger.warning("compression requested, but zstandard is not installed")
+            compression_threshold = None
+        self.compression_threshold = compression_threshold
+
+    @staticmethod
+    def _pack_message(message: Union[HumanMessage, AIMessage]) -> list[Any]:
+        """Convert message into array."""
+        return [message.content, message.additional_kwargs, message.response_metadata]
+
+    def encode(self, cache_entry: CacheEntry) -> bytes:
+        """Serialize the cache entry into binary payload."""
+        payload = msgpack.packb(
+            [
+                self._pack_message(cache_entry.query),
+                (
+                    self._pack_message(cache_entry.response)
+                    if cache_entry.response is not None
+                    else None
+                ),
+                [
+                    [a.attachment_type, a.content_type, a.content]
+                    for a in cache_entry.attachments
+                ],
+                cache_entry.token_counts,
+            ]
+        )
+        flags = 0
+        if (
+            self.compression_threshold is not None
+            and len(payload) >= self.compression_threshold
+        ):
+            import zstandard  # pylint: disable=import-outside-toplevel
+
+            payload = zstandard.compress(payload)
+            flags |= FLAG_ZSTD
+        return bytes((BINARY_FORMAT_MARKER, BINARY_FORMAT_VERSION, flags)) + payload
+
+    def decode(self, data: bytes) -> CacheEntry:
+        """Deserialize the cache entry from binary payload."""
+        if data[0] != BINARY_FORMAT_MARKER:
+            raise ValueError("Payload is not in binary format")
+        if data[1] != BINARY_FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary format version {data[1]}")
+        payload = data[HEADER_SIZE:]
+        if data[2] & FLAG_ZSTD:
+            import zstandard  # pylint: disable=import-outside-toplevel
+
+            payload = zstandard.decompress(payload)
+
+        query, response, attachments, *rest = msgpack.unpackb(payload)
+        # entries stored before token counts were introduced do not have them
+        token_counts = rest[0] if rest else {}
+        return CacheEntry.model_construct(
+            query=HumanMessage.model_construct(
+                content=query[0],
+                additional_kwargs=query[1],
+                response_metadata=query[2],
+            ),
+            response=(
+                AIMessage.model_construct(
+                    content=response[0],
+                    additional_kwargs=response[1],
+                    response_metadata=response[2],
+                )
+                if response is not None
+                else AIMessage("")
+            ),
+            attachments=[
+                Attachment.model_construct(
+                    attachment_type=attachment_type,
+                    content_type=content_type,
+                    content=content,
+                )
+                for attachment_type, content_type, content in attachments
+            ],
+            token_counts=token_counts,
+        )
+
+
+CODECS: dict[str, type[EntryCodec]] = {
+    constants.CACHE_CODEC_JSON: JSONCodec,
+    constants.CACHE_CODEC_MSGPACK: MsgpackCodec,
+}
+
+_json_codec = JSONCodec()
+_msgpack_codec = MsgpackCodec(None)
+
+
+def get_codec(
+    name: str = constants.CACHE_CODEC_MSGPACK,
+    compression_threshold: Optional[int] = constants.CACHE_CODEC_COMPRESSION_THRESHOLD,
+) -> EntryCodec:
+    """Construct codec with given name."""
+    if name == constants.CACHE_CODEC_MSGPACK:
+        return MsgpackCodec(compression_threshold)
+    return CODECS[name]()
+
+
+def decode_entry(data: Union[bytes, bytearray, memoryview, str]) -> CacheEntry:
+    """Deserialize cache entry stored by any codec.
+
+    The format is detected from the payload, so entries stored before the
+    codec has been changed can still be read.
+    """
+    if isinstance(data, str):
+        return _json_codec.decode(data.encode("utf-8"))
+    if isinstance(data, (bytearray, memoryview)):
+        data = bytes(data)
+    if data[:1] == bytes((BINARY_FORMAT_MARKER,)):
+        return _msgpack_codec.decode(data)
+    return _json_codec.decode(data)
@@ -3,40 +3,110 @@
 from __future__ import annotations
 
 import threading
-from collections import deque
-from typing import TYPE_CHECKING, Any
+from collections import OrderedDict
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Optional
 
-from ols.app.models.models import CacheEntry
+from ols import constants
+from ols.src.cache.codec import EntryCodec, get_codec
 
 if TYPE_CHECKING:
     from ols.app.models.config import InMemoryCacheConfig
+    from ols.app.models.models import CacheEntry
 # pylint: disable-next=C0413
 from ols.src.cache.cache import Cache
 
 
+class CacheShard:
+    """Independently locked part of the in-memory cache.
+
+    Conversations are kept in ordered dictionary in LRU order (the least
+    recently used first), so both the lookup and the LRU bookkeeping are
+    O(1). Conversation IDs of every user are indexed, so listing does not
+    need to iterate over all stored conversations.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the shard."""
+        self.lock = threading.Lock()
+        self.conversations: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        # conversation IDs of every user, the most recently updated last
+        self.users: dict[str, OrderedDict[str, None]] = {}
+        self.size = 0
+
+    def remove(self, key: str) -> dict[str, Any]:
+        """Remove conversation from the shard, the lock needs to be held."""
+        conversation = self.conversations.pop(key)
+        self.size -= conversation["size"]
+        user_conversations = self.users[conversation["user_id"]]
+        del user_conversations[conversation["conversation_id"]]
+        if not user_conversations:
+            del self.users[conversation["user_id"]]
+        return conversation
+
+    def oldest(self) -> str:
+        """Return key of the least recently used conversation."""
+        return next(iter(self.conversations))
+
+
 class InMemoryCache(Cache):
-    """An in-memory LRU cache implementation in O(1) time."""
+    """An in-memory LRU cache implementation in O(1) time.
+
+    The cache is split into shards with their own locks, conversations of
+    one user are always stored in the same shard. Capacity (number of
+    conversations and optionally their size in bytes) is split evenly
+    between shards and the least recently used conversations of the shard
+    are evicted when it is exceeded. Entries are stored serialized by the
+    codec, so they can not be modified by callers.
+    """
 
     _instance = None
     _lock = threading.Lock()
 
-    def __new__(cls: type[InMemoryCache], config: InMemoryCacheConfig) -> InMemoryCache:
+    def __new__(
+        cls: type[InMemoryCache],
+        config: InMemoryCacheConfig,
+        codec: Optional[EntryCodec] = None,
+    ) -> InMemoryCache:
         """Implement Singleton pattern with thread safety."""
         with cls._lock:
             if not cls._instance:
                 cls._instance = super().__new__(cls)
-                cls._instance.initialize_cache(config)
+                cls._instance.initialize_cache(config, codec)
         return cls._instance
 
-    def initialize_cache(self, config: InMemoryCacheConfig) -> None:
+    def initialize_cache(
+        self, config: InMemoryCacheConfig, codec: Optional[EntryCodec] = None
+    ) -> None:
         """Initialize the InMemoryCache."""
+        # metrics module constructs auth dependency when imported
+        from ols.app import metrics
+
         # pylint: disable=W0201
+        self.codec = codec or get_codec()
         self.capacity = config.max_entries
-        self.deque: deque[str] = deque()
-        self.cache: dict[str, dict[str, Any]] = {}
+        self.max_bytes = config.max_bytes
+        shards = config.shards
+        if self.capacity is not None:
+            # small caches are not split, LRU order would be too coarse
+            shards = min(
+                shards,
+                self.capacity // constants.IN_MEMORY_CACHE_MIN_ENTRIES_PER_SHARD,
+            )
+        self.shards = [CacheShard() for _ in range(max(1, shards))]
+        metrics.in_memory_cache_entries.set(0)
+        metrics.in_memory_cache_size_bytes.set(0)
+
+    def _shard(self, user_id: str) -> CacheShard:
+        """Return shard where conversations of given user are stored."""
+        return self.shards[hash(user_id) % len(self.shards)]
 
     def get(
-        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+        self,
+        user_id: str,
+        conversation_id: str,
+        skip_user_id_check: bool = False,
+        limit: Optional[int] = None,
     ) -> list[CacheEntry]:
         """Get the value associated with the given key.
 
@@ -44,19 +114,22 @@ class InMemoryCache(Cache):
           user_id: User identification.
           conversation_id: Conversation ID unique for given user.
           skip_user_id_check: Skip user_id suid check.
+          limit: Number of most recent entries to return, all if not set.
 
         Returns:
           The value associated with the key, or `None` if the key is not present.
         """
         key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        shard = self._shard(user_id)
 
-        if key not in self.cache:
-            return None
-
-        self.deque.remove(key)
-        self.deque.appendleft(key)
-        value = self.cache[key]["history"].copy()
-        return [CacheEntry.from_dict(cache_entry) for cache_entry in value]
+        with shard.lock:
+            conversation = shard.conversations.get(key)
+            if conversation is None:
+                return None
+            shard.conversations.move_to_end(key)
+            value = conversation["history"]
+            value = value[-limit:] if limit is not None else value.copy()
+        return [self.codec.decode(cache_entry) for cache_entry in value]
 
     def insert_or_append(
         self,
@@ -75,21 +148,147 @@ class InMemoryCache(Cache):
             topic_summary: Summary of the conversation's initial topic.
             skip_user_id_check: Skip user_id suid check.
         """
+        # metrics module constructs auth dependency when imported
+        from ols.app import metrics
+
         key = super().construct_key(user_id, conversation_id, skip_user_id_check)
-        value = cache_entry.to_dict()
-
-        with self._lock:
-            if key not in self.cache:
-                if len(self.deque) == self.capacity:
-                    oldest = self.deque.pop()
-                    del self.cache[oldest]
-                self.cache[key] = {"topic_summary": topic_summary, "history": [value]}
+        value = self.codec.encode(cache_entry)
+        size = len(value)
+        shard = self._shard(user_id)
+
+        with shard.lock:
+            conversation = shard.conversations.get(key)
+            if conversation is None:
+                self._evict(shard, new_conversation=True)
+                shard.conversations[key] = {
+                    "user_id": user_id,
+                    "conversation_id": conversation_id,
+                    "topic_summary": topic_summary,
+                    "history": [value],
+                    "size": size,
+                }
+                metrics.in_memory_cache_entries.inc()
             else:
-                self.deque.remove(key)
-                old_value = self.cache[key]
-                old_value["history"].append(value)
-                self.cache[key] = old_value
-            self.deque.appendleft(key)
+                conversation["history"].append(value)
+                conversation["size"] += size
+                shard.conversations.move_to_end(key)
+            user_conversations = shard.users.setdefault(user_id, OrderedDict())
+            user_conversations[conversation_id] = None
+            user_conversations.move_to_end(conversation_id)
+            shard.size += size
+            metrics.in_memory_cache_size_bytes.inc(size)
+            self._evict(shard, new_conversation=False)
+
+    def compact(
+        self,
+        user_id: str,
+        conversation_id: str,
+        folded: list[CacheEntry],
+        summary: CacheEntry,
+        skip_user_id_check: bool = False,
+    ) -> bool:
+        """Replace the oldest entries of the conversation by their summary.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            folded: The oldest entries of the conversation being replaced.
+            summary: The entry with summary of the folded entries.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            bool: True if entries were replaced, False otherwise.
+        """
+        # metrics module constructs auth dependency when imported
+        from ols.app import metrics
+
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        value = self.codec.encode(summary)
+        shard = self._shard(user_id)
+
+        with shard.lock:
+            conversation = shard.conversations.get(key)
+            if conversation is None:
+                return False
+            history = conversation["history"]
+            if (
+                not folded
+                or len(history) < len(folded)
+                or self.codec.decode(history[0]) != folded[0]
+            ):
+                return False
+            removed = sum(len(entry) for entry in history[: len(folded)])
+            conversation["history"] = [value, *history[len(folded) :]]
+            size = len(value) - removed
+            conversation["size"] += size
+            shard.size += size
+            metrics.in_memory_cache_size_bytes.inc(size)
+        return True
+
+    def _evict(self, shard: CacheShard, new_conversation: bool) -> None:
+        """Evict the least recently used conversations until the shard fits.
+
+        Args:
+            shard: The shard to evict conversations from, its lock is held.
+            new_conversation: New conversation is going to be stored.
+        """
+        if new_conversation and self.capacity is not None:
+            limit = max(1, self.capacity // len(self.shards))
+            while len(shard.conversations) >= limit:
+                self._remove(shard, shard.oldest(), "entries")
+        if self.max_bytes is not None:
+            limit = self.max_bytes // len(self.shards)
+            # the most recently used conversation is never evicted
+            while shard.size > limit and len(shard.conversations) > 1:
+                self._remove(shard, shard.oldest(), "bytes")
+
+    @staticmethod
+    def _remove(shard: CacheShard, key: str, reason: Optional[str]) -> None:
+        """Remove conversation from the shard and update metrics.
+
+        Args:
+            shard: The shard the conversation is stored in, its lock is held.
+            key: The compound key of the conversation.
+            reason: Reason of eviction, None if the conversation is deleted.
+        """
+        # metrics module constructs auth dependency when imported
+        from ols.app import metrics
+
+        conversation = shard.remove(key)
+        metrics.in_memory_cache_entries.dec()
+        metrics.in_memory_cache_size_bytes.dec(conversation["size"])
+        if reason is not None:
+            metrics.in_memory_cache_evicted_total.labels(reason).inc()
+
+    async def aget(
+        self,
+        user_id: str,
+        conversation_id: str,
+        skip_user_id_check: bool = False,
+        limit: Optional[int] = None,
+    ) -> list[CacheEntry]:
+        """Get the value associated with the given key asynchronously.
+
+        In-memory cache does not perform any I/O, so `get` is called directly.
+        """
+        return self.get(user_id, conversation_id, skip_user_id_check, limit)
+
+    async def ainsert_or_append(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        topic_summary: str = "",
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Set or append the value asynchronously.
+
+        In-memory cache does not perform any I/O, so `insert_or_append` is
+        called directly.
+        """
+        self.insert_or_append(
+            user_id, conversation_id, cache_entry, topic_summary, skip_user_id_check
+        )
 
     def delete(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
@@ -105,24 +304,30 @@ class InMemoryCache(Cache):
             bool: True if entries were deleted, False if key wasn't found.
         """
         key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        shard = self._shard(user_id)
 
-        with self._lock:
-            if key not in self.cache:
+        with shard.lock:
+            if key not in shard.conversations:
                 return False
-
-            # Remove from both cache and deque
-            del self.cache[key]
-            self.deque.remove(key)
+            self._remove(shard, key, None)
             return True
 
     def list(
-        self, user_id: str, skip_user_id_check: bool = False
+        self,
+        user_id: str,
+        skip_user_id_check: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0,
     ) -> list[dict[str, str]]:
         """List all conversations for a given user_id.
 
+        Conversations are ordered from the most recently updated one.
+
         Args:
             user_id: User identification.
             skip_user_id_check: Skip user_id suid check.
+            limit: Maximum number of returned conversations, all if not set.
+            offset: Number of the most recent conversations to skip.
 
         Returns:
             A list of dictionaries containing conversation_id and topic_summary
@@ -130,18 +335,19 @@ class InMemoryCache(Cache):
         conversations = []
         super()._check_user_id(user_id, skip_user_id_check)
         prefix = f"{user_id}{Cache.COMPOUND_KEY_SEPARATOR}"
+        shard = self._shard(user_id)
 
-        with self._lock:
-            for key, value in self.cache.items():
-                if key.startswith(prefix):
-                    # Extract conversation_id from the key
-                    conversation_id = key[len(prefix) :]
-                    topic_summary = value.get("topic_summary", "")
-                    conversations.append(
-                        {
-                            "conversation_id": conversation_id,
-                            "topic_summary": topic_summary,
-                        }
-                    )
+        stop = None if limit is None else offset + limit
+        with shard.lock:
+            for conversation_id in islice(
+                reversed(shard.users.get(user_id, {})), offset, stop
+            ):
+                conversation = shard.conversations[f"{prefix}{conversation_id}"]
+                conversations.append(
+                    {
+                        "conversation_id": conversation_id,
+                        "topic_summary": conversation["topic_summary"],
+                    }
+                )
 
         return conversations
@@ -0,0 +1,203 @@
+"""Cache of responses of LLM calls made by query helpers."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+from ols.app.models.config import (
+    LLMCallMemoryCacheConfig,
+    RedisConfig,
+    SQLiteCacheConfig,
+)
+from ols.src.cache.redis_cache import create_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCallCache(ABC):
+    """Responses of LLM calls keyed by exact prompt and generation parameters.
+
+    Query helpers like question validator make the same LLM call for the
+    same (redacted) query over and over again; the response is looked up in
+    this cache before the LLM is called.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        """Initialize the cache.
+
+        Args:
+            ttl: Time (in seconds) a response is kept in the cache.
+        """
+        self.ttl = ttl
+
+    @staticmethod
+    def construct_key(
+        provider: str, model: str, prompt: str, params: dict[str, Any]
+    ) -> str:
+        """Construct cache key of the LLM call.
+
+        Args:
+            provider: Provider the LLM call is made to.
+            model: Model the LLM call is made to.
+            prompt: The rendered prompt.
+            params: Generation parameters of the LLM.
+
+        Returns:
+            Digest of the LLM call.
+        """
+        call = json.dumps(
+            [provider, model, prompt, {str(k): v for k, v in params.items()}],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(call.encode("utf-8")).hexdigest()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Get response of the LLM call, None if it is not cached."""
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        """Store response of the LLM call."""
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Get response of the LLM call asynchronously, see `get`."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: str) -> None:
+        """Store response of the LLM call asynchronously, see `set`."""
+        await asyncio.to_thread(self.set, key, value)
+
+
+class InMemoryLLMCallCache(LLMCallCache):
+    """LLM call cache kept in process memory, the least recently used are dropped."""
+
+    def __init__(self, config: LLMCallMemoryCacheConfig, ttl: float) -> None:
+        """Initialize the cache."""
+        super().__init__(ttl)
+        self.max_entries = config.max_entries
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return number of cached responses."""
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        """Get response of the LLM call, None if it is not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store response of the LLM call."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # no I/O is performed, so there is no need to offload to worker thread
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Get response of the LLM call asynchronously, see `get`."""
+        return self.get(key)
+
+    async def aset(self, key: str, value: str) -> None:
+        """Store response of the LLM call asynchronously, see `set`."""
+        self.set(key, value)
+
+
+class RedisLLMCallCache(LLMCallCache):
+    """LLM call cache stored in Redis, so it is shared by all replicas.
+
+    Responses are stored with expiration, the server (which is typically
+    shared with conversation cache) is not reconfigured.
+    """
+
+    KEY_PREFIX = "ols:llm-call:"
+
+    def __init__(self, config: RedisConfig, ttl: float) -> None:
+        """Initialize the cache."""
+        super().__init__(ttl)
+        self.redis_client = create_redis_client(config, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        """Get response of the LLM call, None if it is not cached."""
+        return self.redis_client.get(RedisLLMCallCache.KEY_PREFIX + key)
+
+    def set(self, key: str, value: str) -> None:
+        """Store response of the LLM call."""
+        self.redis_client.set(
+            RedisLLMCallCache.KEY_PREFIX + key, value, px=int(self.ttl * 1000)
+        )
+
+
+class SQLiteLLMCallCache(LLMCallCache):
+    """LLM call cache stored in SQLite database.
+
+    The database survives restarts and can be shared by workers running on
+    the same node. Expired responses are deleted periodically by writers.
+    """
+
+    # expired responses are deleted once per this number of writes
+    PURGE_INTERVAL = 100
+
+    def __init__(self, config: SQLiteCacheConfig, ttl: float) -> None:
+        """Initialize the cache."""
+        super().__init__(ttl)
+        directory = os.path.dirname(config.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._writes = 0
+        # autocommit mode, every statement is a transaction on its own
+        self.connection = sqlite3.connect(
+            config.db_path, check_same_thread=False, isolation_level=None
+        )
+        with self._lock:
+            # readers are not blocked by writers of other processes
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_call_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        """Get response of the LLM call, None if it is not cached."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT value FROM llm_call_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """Store response of the LLM call."""
+        now = time.time()
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO llm_call_cache (key, value, expires_at)"
+                " VALUES (?, ?, ?)",
+                (key, value, now + self.ttl),
+            )
+            self._writes += 1
+            if self._writes % SQLiteLLMCallCache.PURGE_INTERVAL == 0:
+                self.connection.execute(
+                    "DELETE FROM llm_call_cache WHERE expires_at <= ?", (now,)
+                )
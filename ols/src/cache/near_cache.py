@@ -0,0 +1,343 @@
+"""In-process cache of recently active conversations in front of shared cache."""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from ols.app.models.config import NearCacheConfig
+from ols.app.models.models import CacheEntry
+from ols.src.cache.cache import Cache
+
+logger = logging.getLogger(__name__)
+
+
+def copy_entries(entries: list[CacheEntry]) -> list[CacheEntry]:
+    """Copy cache entries, so callers can not modify the cached ones."""
+    return [
+        entry.model_copy(
+            update={
+                "query": entry.query.model_copy(),
+                "response": entry.response.model_copy(),
+            }
+        )
+        for entry in entries
+    ]
+
+
+class NearCache(Cache):
+    """Cache keeping recently active conversations in process memory.
+
+    The near cache decorates a cache shared by all replicas (Redis or
+    Postgres). Conversations read from the shared cache are kept in LRU
+    order for `ttl` seconds, new entries are written to the shared cache
+    first and then appended to the conversation kept in memory, so follow-up
+    questions do not read the history from the shared cache at all.
+
+    Every change is published to other replicas that drop their copy of the
+    conversation. Invalidations are delivered asynchronously, so a replica
+    can read a conversation changed by other replica a moment ago; the time
+    a conversation is kept in memory bounds the staleness when invalidations
+    are lost or disabled.
+    """
+
+    # separator between the replica ID and the key in invalidation messages
+    MESSAGE_SEPARATOR = " "
+
+    def __init__(self, cache: Cache, config: NearCacheConfig) -> None:
+        """Initialize the near cache.
+
+        Args:
+            cache: The shared cache that is decorated.
+            config: Configuration of the near cache.
+        """
+        self.cache = cache
+        self.max_entries = config.max_entries
+        self.ttl = config.ttl
+        # conversations that are not stored yet are kept as empty history
+        self._entries: OrderedDict[str, tuple[float, list[CacheEntry]]] = OrderedDict()
+        self._lock = threading.Lock()
+        # incremented by every invalidation, conversations read from the
+        # shared cache before the invalidation arrived are not kept
+        self._generation = 0
+        # invalidations published by this replica are ignored
+        self.instance_id = uuid.uuid4().hex
+        self.invalidation = False
+        if config.invalidation:
+            self.invalidation = cache.subscribe_invalidations(self._invalidated)
+            if not self.invalidation:
+                logger.warning(
+                    "%s does not support invalidations, near cache of other "
+                    "replicas is refreshed after %s seconds",
+                    type(cache).__name__,
+                    self.ttl,
+                )
+
+    def _invalidated(self, message: Optional[str]) -> None:
+        """Drop conversation changed by other replica, all if None is passed."""
+        with self._lock:
+            self._generation += 1
+            if message is None:
+                self._entries.clear()
+                return
+            instance_id, _, key = message.partition(NearCache.MESSAGE_SEPARATOR)
+            if instance_id != self.instance_id:
+                self._entries.pop(key, None)
+
+    def _publish(self, key: str) -> None:
+        """Notify other replicas that the conversation has been changed."""
+        if not self.invalidation:
+            return
+        try:
+            self.cache.publish_invalidation(
+                f"{self.instance_id}{NearCache.MESSAGE_SEPARATOR}{key}"
+            )
+        except Exception as e:
+            logger.error("unable to publish near cache invalidation: %s", e)
+
+    def _lookup(self, key: str, limit: Optional[int]) -> Optional[list[CacheEntry]]:
+        """Return copy of cached history or None if it is not cached."""
+        # metrics module constructs auth dependency when imported
+        from ols.app import metrics
+
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] <= time.monotonic():
+                del self._entries[key]
+                item = None
+            if item is None:
+                metrics.near_cache_requests_total.labels("miss").inc()
+                return None
+            self._entries.move_to_end(key)
+            history = item[1]
+            if limit is not None:
+                history = history[max(0, len(history) - limit) :]
+        metrics.near_cache_requests_total.labels("hit").inc()
+        return copy_entries(history)
+
+    @staticmethod
+    def _read_limit(limit: Optional[int]) -> Optional[int]:
+        """Return number of entries read from the shared cache on miss.
+
+        One more entry than requested is read, so complete history (which
+        is kept in memory) can be told apart from the truncated one.
+        """
+        return None if limit is None else limit + 1
+
+    def _store(
+        self,
+        key: str,
+        history: Optional[list[CacheEntry]],
+        limit: Optional[int],
+        generation: int,
+    ) -> Optional[list[CacheEntry]]:
+        """Keep history read from the shared cache if it is complete.
+
+        Args:
+            key: The compound key of the conversation.
+            history: History read from the shared cache with `_read_limit`.
+            limit: Number of most recent entries requested by the caller.
+            generation: Invalidation generation before the history was read.
+
+        Returns:
+            The history trimmed to the requested number of entries.
+        """
+        if history is not None and limit is not None and len(history) > limit:
+            # older entries were not read
+            return history[len(history) - limit :]
+        with self._lock:
+            if generation != self._generation:
+                return history
+            self._entries[key] = (
+                time.monotonic() + self.ttl,
+                copy_entries(history or []),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return history
+
+    def _append(self, key: str, cache_entry: CacheEntry) -> None:
+        """Append the entry stored in the shared cache to the cached history."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return
+            item[1].extend(copy_entries([cache_entry]))
+            self._entries[key] = (time.monotonic() + self.ttl, item[1])
+            self._entries.move_to_end(key)
+
+    def _discard(self, key: str) -> None:
+        """Drop the conversation from the near cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get(
+        self,
+        user_id: str,
+        conversation_id: str,
+        skip_user_id_check: bool = False,
+        limit: Optional[int] = None,
+    ) -> list[CacheEntry]:
+        """Get conversation history, read it from the shared cache on miss.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+            limit: Number of most recent entries to return, all if not set.
+
+        Returns:
+            The value associated with the key, or `None` if the key is not present.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        history = self._lookup(key, limit)
+        if history is not None:
+            return history or None
+
+        generation = self._generation
+        history = self.cache.get(
+            user_id, conversation_id, skip_user_id_check, self._read_limit(limit)
+        )
+        return self._store(key, history, limit, generation)
+
+    async def aget(
+        self,
+        user_id: str,
+        conversation_id: str,
+        skip_user_id_check: bool = False,
+        limit: Optional[int] = None,
+    ) -> list[CacheEntry]:
+        """Get conversation history asynchronously, see `get`."""
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        history = self._lookup(key, limit)
+        if history is not None:
+            return history or None
+
+        generation = self._generation
+        history = await self.cache.aget(
+            user_id, conversation_id, skip_user_id_check, self._read_limit(limit)
+        )
+        return self._store(key, history, limit, generation)
+
+    def insert_or_append(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        topic_summary: str = "",
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Store the entry into the shared cache and then into the near cache.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            cache_entry: The `CacheEntry` object to store.
+            topic_summary: Summary of the conversation's initial topic.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        try:
+            self.cache.insert_or_append(
+                user_id, conversation_id, cache_entry, topic_summary, skip_user_id_check
+            )
+        except Exception:
+            # the entry might have been stored anyway
+            self._discard(key)
+            raise
+        self._append(key, cache_entry)
+        self._publish(key)
+
+    async def ainsert_or_append(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        topic_summary: str = "",
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Store the entry asynchronously, see `insert_or_append`."""
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        try:
+            await self.cache.ainsert_or_append(
+                user_id, conversation_id, cache_entry, topic_summary, skip_user_id_check
+            )
+        except Exception:
+            # the entry might have been stored anyway
+            self._discard(key)
+            raise
+        self._append(key, cache_entry)
+        await asyncio.to_thread(self._publish, key)
+
+    def compact(
+        self,
+        user_id: str,
+        conversation_id: str,
+        folded: list[CacheEntry],
+        summary: CacheEntry,
+        skip_user_id_check: bool = False,
+    ) -> bool:
+        """Compact the conversation in the shared cache, drop it from memory.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            folded: The oldest entries of the conversation being replaced.
+            summary: The entry with summary of the folded entries.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            bool: True if entries were replaced, False otherwise.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        compacted = self.cache.compact(
+            user_id, conversation_id, folded, summary, skip_user_id_check
+        )
+        if compacted:
+            self._discard(key)
+            self._publish(key)
+        return compacted
+
+    def delete(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> bool:
+        """Delete the conversation from both the shared and near cache.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            bool: True if entries were deleted, False if key wasn't found.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        try:
+            return self.cache.delete(user_id, conversation_id, skip_user_id_check)
+        finally:
+            self._discard(key)
+            self._publish(key)
+
+    def list(
+        self,
+        user_id: str,
+        skip_user_id_check: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> list[dict[str, str]]:
+        """List conversations of given user, they are read from the shared cache.
+
+        Args:
+            user_id: User identification.
+            skip_user_id_check: Skip user_id suid check.
+            limit: Maximum number of returned conversations, all if not set.
+            offset: Number of the most recent conversations to skip.
+
+        Returns:
+            A list of dictionaries containing conversation_id and topic_summary
+        """
+        return self.cache.list(user_id, skip_user_id_check, limit, offset)
@@ -2,98 +2,255 @@
 
 import json
 import logging
-from typing import Any
+import select
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Optional, TypeVar
 
 import psycopg2
+from psycopg2 import errors
 
+from ols import constants
 from ols.app.models.config import PostgresConfig
-from ols.app.models.models import CacheEntry, MessageDecoder, MessageEncoder
+from ols.app.models.models import CacheEntry, MessageDecoder
 from ols.src.cache.cache import Cache
 from ols.src.cache.cache_error import CacheError
+from ols.src.cache.codec import EntryCodec, decode_entry, get_codec
+from ols.src.cache.postgres_pool import (
+    CONNECTION_ERRORS,
+    PoolTimeoutError,
+    PostgresConnectionPool,
+)
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class PostgresCache(Cache):
     """Cache that uses Postgres to store cached values.
 
-    The cache itself is stored in following table:
+    Conversations are stored in following table:
 
     ```
          Column      |            Type             | Nullable | Default | Storage  |
     -----------------+-----------------------------+----------+---------+----------+
      user_id         | text                        | not null |         | extended |
      conversation_id | text                        | not null |         | extended |
-     topic_summary   | text                        | not null |         | extended |
-     value           | bytea                       |          |         | extended |
+     topic_summary   | text                        |          |         | extended |
      updated_at      | timestamp without time zone |          |         | plain    |
     Indexes:
-        "cache_pkey" PRIMARY KEY, btree (user_id, conversation_id)
-        "cache_key_key" UNIQUE CONSTRAINT, btree (key)
-        "timestamps" btree (updated_at)
+        "conversations_pkey" PRIMARY KEY, btree (user_id, conversation_id)
+        "conversations_updated_at" btree (updated_at)
+        "conversations_user_updated_at" btree (user_id, updated_at)
+    Access method: heap
+    ```
+
+    Every conversation turn is stored in its own row in following table:
+
+    ```
+         Column      |            Type             | Nullable | Default | Storage  |
+    -----------------+-----------------------------+----------+---------+----------+
+     id              | bigint                      | not null | serial  | plain    |
+     user_id         | text                        | not null |         | extended |
+     conversation_id | text                        | not null |         | extended |
+     value           | bytea                       | not null |         | extended |
+     created_at      | timestamp without time zone |          | now     | plain    |
+    Indexes:
+        "conversation_entries_pkey" PRIMARY KEY, btree (id)
+        "conversation_entries_conversation" btree (user_id, conversation_id, id)
+    Foreign-key constraints:
+        (user_id, conversation_id) REFERENCES conversations ON DELETE CASCADE
     Access method: heap
     ```
+
+    Appending a turn is a single INSERT, so the history stored so far is
+    never read nor rewritten. Conversations stored in the legacy `cache`
+    table (one bytea blob per conversation) are migrated in batches by
+    background thread and, until the migration is finished, also on demand
+    when they are accessed.
+
+    Conversations over the capacity and (optionally) conversations not
+    updated for longer than the retention period are deleted by background
+    eviction job, so creating a conversation does not need to count all of
+    them.
+
+    Connections to the database are taken from bounded pool, so the cache
+    can be used from many threads at once. Operations that fail because the
+    connection has been lost are retried once with a new connection.
     """
 
-    CREATE_CACHE_TABLE = """
-        CREATE TABLE IF NOT EXISTS cache (
+    CREATE_CONVERSATIONS_TABLE = """
+        CREATE TABLE IF NOT EXISTS conversations (
             user_id         text NOT NULL,
             conversation_id text NOT NULL,
-            value           bytea,
             topic_summary   text,
             updated_at      timestamp,
             PRIMARY KEY(user_id, conversation_id)
         );
         """
 
-    CREATE_INDEX = """
-        CREATE INDEX IF NOT EXISTS timestamps
-            ON cache (updated_at)
+    CREATE_CONVERSATION_ENTRIES_TABLE = """
+        CREATE TABLE IF NOT EXISTS conversation_entries (
+            id              bigserial PRIMARY KEY,
+            user_id         text NOT NULL,
+            conversation_id text NOT NULL,
+            value           bytea NOT NULL,
+            created_at      timestamp DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id, conversation_id)
+                REFERENCES conversations(user_id, conversation_id)
+                ON DELETE CASCADE
+        );
+        """
+
+    CREATE_INDEXES = """
+        CREATE INDEX IF NOT EXISTS conversations_updated_at
+            ON conversations (updated_at);
+        CREATE INDEX IF NOT EXISTS conversations_user_updated_at
+            ON conversations (user_id, updated_at);
+        CREATE INDEX IF NOT EXISTS conversation_entries_conversation
+            ON conversation_entries (user_id, conversation_id, id);
         """
 
+    QUERY_LEGACY_TABLE_EXISTS = """
+        SELECT to_regclass('cache') IS NOT NULL
+        """
+
+    # last N entries are selected, but returned in chronological order
     SELECT_CONVERSATION_HISTORY_STATEMENT = """
         SELECT value
-          FROM cache
-         WHERE user_id=%s AND conversation_id=%s LIMIT 1
+          FROM (SELECT id, value
+                  FROM conversation_entries
+                 WHERE user_id=%s AND conversation_id=%s
+                 ORDER BY id DESC
+                 LIMIT %s) AS entries
+         ORDER BY id
         """
 
-    UPDATE_CONVERSATION_HISTORY_STATEMENT = """
-        UPDATE cache
-           SET value=%s, updated_at=CURRENT_TIMESTAMP
-         WHERE user_id=%s AND conversation_id=%s
+    # conversation is created or touched and new entry is appended in one
+    # statement
+    APPEND_CONVERSATION_ENTRY_STATEMENT = """
+        WITH conversation AS (
+            INSERT INTO conversations(user_id, conversation_id, topic_summary, updated_at)
+            VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (user_id, conversation_id)
+            DO UPDATE SET updated_at=EXCLUDED.updated_at
+            RETURNING user_id, conversation_id
+        )
+        INSERT INTO conversation_entries(user_id, conversation_id, value)
+        SELECT user_id, conversation_id, %s FROM conversation
         """
 
-    INSERT_CONVERSATION_HISTORY_STATEMENT = """
-        INSERT INTO cache(user_id, conversation_id, value, topic_summary, updated_at)
-        VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+    # only one replica performs eviction at a time
+    ACQUIRE_EVICTION_LOCK = """
+        SELECT pg_try_advisory_xact_lock(%s)
         """
 
-    DELETE_CONVERSATION_HISTORY_STATEMENT = """
-        DELETE FROM cache
+    # the newest conversations that fit into capacity are skipped using
+    # index on updated_at, so the whole table is never counted
+    EVICT_OVER_CAPACITY_STATEMENT = """
+        DELETE FROM conversations
          WHERE (user_id, conversation_id) in
-               (SELECT user_id, conversation_id FROM cache ORDER BY updated_at LIMIT
+               (SELECT user_id, conversation_id FROM conversations
+                 ORDER BY updated_at DESC
+                OFFSET %s LIMIT %s)
         """
 
-    QUERY_CACHE_SIZE = """
-        SELECT count(*) FROM cache;
+    EVICT_EXPIRED_STATEMENT = """
+        DELETE FROM conversations
+         WHERE (user_id, conversation_id) in
+               (SELECT user_id, conversation_id FROM conversations
+                 WHERE updated_at < CURRENT_TIMESTAMP - %s * INTERVAL '1 second'
+                 ORDER BY updated_at
+                 LIMIT %s)
         """
 
     DELETE_SINGLE_CONVERSATION_STATEMENT = """
-        DELETE FROM cache
+        DELETE FROM conversations
          WHERE user_id=%s AND conversation_id=%s
+        RETURNING conversation_id
         """
 
     LIST_CONVERSATIONS_STATEMENT = """
         SELECT conversation_id, topic_summary
-        FROM cache
+        FROM conversations
         WHERE user_id=%s
         ORDER BY updated_at DESC
+        LIMIT %s OFFSET %s
     """
 
-    def __init__(self, config: PostgresConfig) -> None:
+    MIGRATE_LEGACY_CONVERSATION_STATEMENT = """
+        DELETE FROM cache
+         WHERE user_id=%s AND conversation_id=%s
+        RETURNING user_id, conversation_id, value, topic_summary, updated_at
+        """
+
+    # rows being migrated by other replica are skipped
+    MIGRATE_LEGACY_BATCH_STATEMENT = """
+        DELETE FROM cache
+         WHERE (user_id, conversation_id) in
+               (SELECT user_id, conversation_id FROM cache
+                 LIMIT %s FOR UPDATE SKIP LOCKED)
+        RETURNING user_id, conversation_id, value, topic_summary, updated_at
+        """
+
+    INSERT_MIGRATED_CONVERSATION_STATEMENT = """
+        INSERT INTO conversations(user_id, conversation_id, topic_summary, updated_at)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (user_id, conversation_id) DO NOTHING
+        """
+
+    INSERT_MIGRATED_ENTRY_STATEMENT = """
+        INSERT INTO conversation_entries(user_id, conversation_id, value, created_at)
+        VALUES (%s, %s, %s, %s)
+        """
+
+    SELECT_OLDEST_ENTRIES_STATEMENT = """
+        SELECT id, value FROM conversation_entries
+         WHERE user_id=%s AND conversation_id=%s
+         ORDER BY id
+         LIMIT %s
+           FOR UPDATE
+        """
+
+    UPDATE_ENTRY_STATEMENT = """
+        UPDATE conversation_entries SET value=%s WHERE id=%s
+        """
+
+    DELETE_ENTRIES_STATEMENT = """
+        DELETE FROM conversation_entries WHERE id = ANY(%s)
+        """
+
+    DROP_LEGACY_TABLE = """
+        DROP TABLE IF EXISTS cache
+        """
+
+    NOTIFY_STATEMENT = """
+        SELECT pg_notify(%s, %s)
+        """
+
+    LISTEN_STATEMENT = f"LISTEN {constants.CACHE_INVALIDATION_CHANNEL}"
+
+    # time (in seconds) to wait for notifications in one poll
+    LISTEN_POLL_INTERVAL = 1.0
+    # time (in seconds) to wait before the lost connection is reopened
+    LISTEN_RETRY_INTERVAL = 5.0
+
+    # number of legacy conversations migrated in one transaction
+    MIGRATION_BATCH_SIZE = 100
+
+    # key of advisory lock held by replica performing eviction
+    EVICTION_LOCK_KEY = 0x6F6C7363
+
+    def __init__(
+        self, config: PostgresConfig, codec: Optional[EntryCodec] = None
+    ) -> None:
         """Create a new instance of Postgres cache."""
-        # initialize connection to DB
-        self.conn = psycopg2.connect(
+        self.codec = codec or get_codec()
+        self._connect = partial(
+            psycopg2.connect,
             host=config.host,
             port=config.port,
             user=config.user,
@@ -103,25 +260,233 @@ class PostgresCache(Cache):
             sslrootcert=config.ca_cert_path,
             gssencmode=config.gss_encmode,
         )
-        self.conn.autocommit = True
+        # initialize pool of connections to DB
+        self.pool = PostgresConnectionPool(
+            self._connect,
+            min_size=config.pool_min_size,
+            max_size=config.pool_max_size,
+            timeout=config.pool_timeout,
+            health_check_interval=config.pool_health_check_interval,
+        )
+        self.legacy_table_exists = False
         try:
             self.initialize_cache()
         except Exception as e:
-            self.conn.close()
+            self.pool.closeall()
             logger.exception("Error initializing Postgres cache:\n%s", e)
             raise
         self.capacity = config.max_entries
+        self.eviction_interval = config.eviction_interval
+        self.eviction_batch_size = config.eviction_batch_size
+        self.retention_period = config.retention_period
+
+        self._stop_eviction = threading.Event()
+        self._stop_listening = threading.Event()
+        threading.Thread(
+            target=self._eviction_loop, name="postgres-cache-eviction", daemon=True
+        ).start()
+
+        if self.legacy_table_exists:
+            threading.Thread(
+                target=self.migrate_legacy_cache,
+                name="postgres-cache-migration",
+                daemon=True,
+            ).start()
 
     def initialize_cache(self) -> None:
         """Initialize cache - clean it up etc."""
-        cur = self.conn.cursor()
-        cur.execute(PostgresCache.CREATE_CACHE_TABLE)
-        cur.execute(PostgresCache.CREATE_INDEX)
-        cur.close()
-        self.conn.commit()
+        with self.pool.connection() as conn, conn:
+            cur = conn.cursor()
+            cur.execute(PostgresCache.CREATE_CONVERSATIONS_TABLE)
+            cur.execute(PostgresCache.CREATE_CONVERSATION_ENTRIES_TABLE)
+            cur.execute(PostgresCache.CREATE_INDEXES)
+            cur.execute(PostgresCache.QUERY_LEGACY_TABLE_EXISTS)
+            value = cur.fetchone()
+            self.legacy_table_exists = value is not None and value[0] is True
+            cur.close()
+
+    def migrate_legacy_cache(self) -> None:
+        """Move all conversations from the legacy `cache` table, then drop it.
+
+        Conversations are migrated in small batches, each in its own
+        transaction, so the cache remains fully usable during the migration.
+        """
+        try:
+            while self._run("PostgresCache.migrate", self._migrate_batch):
+                pass
+            self._run(
+                "PostgresCache.migrate",
+                lambda cursor: cursor.execute(PostgresCache.DROP_LEGACY_TABLE),
+            )
+            self.legacy_table_exists = False
+            logger.info("legacy Postgres cache table migrated")
+        except Exception as e:
+            # conversations are still migrated on demand
+            logger.error("unable to migrate legacy Postgres cache table: %s", e)
+
+    def _eviction_loop(self) -> None:
+        """Evict conversations periodically until the eviction is stopped."""
+        while not self._stop_eviction.wait(self.eviction_interval):
+            try:
+                self.evict()
+            except Exception as e:
+                logger.error("Postgres cache eviction failed: %s", e)
+
+    def stop_eviction(self) -> None:
+        """Stop the background eviction job."""
+        self._stop_eviction.set()
+
+    def publish_invalidation(self, message: str) -> None:
+        """Send the invalidation as notification to all listening replicas."""
+        self._run(
+            "PostgresCache.publish_invalidation",
+            lambda cursor: cursor.execute(
+                PostgresCache.NOTIFY_STATEMENT,
+                (constants.CACHE_INVALIDATION_CHANNEL, message),
+            ),
+        )
+
+    def subscribe_invalidations(
+        self, callback: Callable[[Optional[str]], None]
+    ) -> bool:
+        """Listen to notifications with invalidations in background thread."""
+        threading.Thread(
+            target=self._listen,
+            args=(callback,),
+            name="postgres-cache-invalidation",
+            daemon=True,
+        ).start()
+        return True
+
+    def stop_listening(self) -> None:
+        """Stop listening to notifications with invalidations."""
+        self._stop_listening.set()
+
+    def _listen(self, callback: Callable[[Optional[str]], None]) -> None:
+        """Receive notifications on dedicated connection until stopped.
+
+        The connection is not taken from the pool as it is blocked by the
+        listener all the time. It is reopened when lost; notifications sent
+        in the meantime are lost, so the callback is called with None.
+        """
+        while not self._stop_listening.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(PostgresCache.LISTEN_STATEMENT)
+                callback(None)
+                while not self._stop_listening.is_set():
+                    readable, _, _ = select.select(
+                        [conn], [], [], PostgresCache.LISTEN_POLL_INTERVAL
+                    )
+                    if not readable:
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        callback(conn.notifies.pop(0).payload)
+            except CONNECTION_ERRORS as e:
+                logger.warning("listening to Postgres notifications failed: %s", e)
+                callback(None)
+                self._stop_listening.wait(PostgresCache.LISTEN_RETRY_INTERVAL)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def evict(self) -> int:
+        """Evict expired conversations and conversations over the capacity.
+
+        Conversations are deleted in batches, each in its own transaction,
+        so the tables are never locked for a long time. The sweep is skipped
+        when other replica is performing it.
+
+        Returns:
+            Number of evicted conversations.
+        """
+        # metrics module constructs auth dependency when imported
+        from ols.app import metrics
+
+        sweeps = []
+        if self.retention_period is not None:
+            sweeps.append(
+                (
+                    "retention",
+                    PostgresCache.EVICT_EXPIRED_STATEMENT,
+                    self.retention_period,
+                )
+            )
+        sweeps.append(
+            ("capacity", PostgresCache.EVICT_OVER_CAPACITY_STATEMENT, self.capacity)
+        )
+
+        evicted = 0
+        with metrics.postgres_cache_eviction_duration_seconds.time():
+            for reason, statement, threshold in sweeps:
+                evict_batch = partial(
+                    PostgresCache._evict_batch,
+                    statement=statement,
+                    params=(threshold, self.eviction_batch_size),
+                )
+                count = self.eviction_batch_size
+                while count == self.eviction_batch_size:
+                    count = self._run("PostgresCache.evict", evict_batch)
+                    if count is None:
+                        logger.debug("Postgres cache eviction performed elsewhere")
+                        return evicted
+                    metrics.postgres_cache_evicted_total.labels(reason).inc(count)
+                    evicted += count
+        if evicted:
+            logger.info("%d conversations evicted from Postgres cache", evicted)
+        return evicted
+
+    @contextmanager
+    def _transaction(self) -> Iterator[psycopg2.extensions.cursor]:
+        """Borrow connection from the pool and run statements in one transaction."""
+        with self.pool.connection() as conn, conn, conn.cursor() as cursor:
+            yield cursor
+
+    def _run(
+        self, operation: str, func: Callable[[psycopg2.extensions.cursor], T]
+    ) -> T:
+        """Run the operation in transaction, retry it once if connection is lost.
+
+        Args:
+            operation: Name of the operation used in logs and errors.
+            func: Function performing the operation using given cursor.
+
+        Returns:
+            The value returned by the function.
+
+        Raises:
+            CacheError: If the operation fails.
+        """
+        retry = True
+        while True:
+            try:
+                with self._transaction() as cursor:
+                    return func(cursor)
+            except PoolTimeoutError as e:
+                logger.error("%s: %s", operation, e)
+                raise CacheError(operation, e) from e
+            except CONNECTION_ERRORS as e:
+                # broken connection has been discarded, new one will be used
+                if retry:
+                    logger.warning("%s: connection lost, retrying: %s", operation, e)
+                    retry = False
+                    continue
+                logger.error("%s: %s", operation, e)
+                raise CacheError(operation, e) from e
+            except psycopg2.DatabaseError as e:
+                logger.error("%s: %s", operation, e)
+                raise CacheError(operation, e) from e
 
     def get(
-        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+        self,
+        user_id: str,
+        conversation_id: str,
+        skip_user_id_check: bool = False,
+        limit: Optional[int] = None,
     ) -> list[CacheEntry]:
         """Get the value associated with the given key.
 
@@ -129,19 +494,19 @@ class PostgresCache(Cache):
             user_id: User identification.
             conversation_id: Conversation ID unique for given user.
             skip_user_id_check: Skip user_id suid check.
+            limit: Number of most recent entries to return, all if not set.
 
         Returns:
             The value associated with the key, or None if not found.
         """
-        with self.conn.cursor() as cursor:
-            try:
-                value = PostgresCache._select(cursor, user_id, conversation_id)
-                if value is None:
-                    return []
-                return [CacheEntry.from_dict(cache_entry) for cache_entry in value]
-            except psycopg2.DatabaseError as e:
-                logger.error("PostgresCache.get %s", e)
-                raise CacheError("PostgresCache.get", e) from e
+
+        def select(cursor: psycopg2.extensions.cursor) -> list[Any]:
+            if self.legacy_table_exists:
+                self._migrate_conversation(cursor, user_id, conversation_id)
+            return PostgresCache._select(cursor, user_id, conversation_id, limit)
+
+        value = self._run("PostgresCache.get", select)
+        return [decode_entry(cache_entry) for cache_entry in value]
 
     def insert_or_append(
         self,
@@ -160,32 +525,63 @@ class PostgresCache(Cache):
             topic_summary: Summary of the conversation's initial topic.
             skip_user_id_check: Skip user_id suid check.
         """
-        value = cache_entry.to_dict()
+        value = self.codec.encode(cache_entry)
+
+        def insert_or_append(cursor: psycopg2.extensions.cursor) -> None:
+            if self.legacy_table_exists:
+                self._migrate_conversation(cursor, user_id, conversation_id)
+            cursor.execute(
+                PostgresCache.APPEND_CONVERSATION_ENTRY_STATEMENT,
+                (user_id, conversation_id, topic_summary, value),
+            )
+
         # the whole operation is run in one transaction
-        with self.conn.cursor() as cursor:
-            try:
-                old_value = self._select(cursor, user_id, conversation_id)
-                if old_value:
-                    old_value.append(value)
-                    PostgresCache._update(
-                        cursor,
-                        user_id,
-                        conversation_id,
-                        json.dumps(old_value, cls=MessageEncoder).encode("utf-8"),
-                    )
-                else:
-                    PostgresCache._insert(
-                        cursor,
-                        user_id,
-                        conversation_id,
-                        json.dumps([value], cls=MessageEncoder).encode("utf-8"),
-                        topic_summary,
-                    )
-                    PostgresCache._cleanup(cursor, self.capacity)
-                # commit is implicit at this point
-            except psycopg2.DatabaseError as e:
-                logger.error("PostgresCache.insert_or_append: %s", e)
-                raise CacheError("PostgresCache.insert_or_append", e) from e
+        self._run("PostgresCache.insert_or_append", insert_or_append)
+
+    def compact(
+        self,
+        user_id: str,
+        conversation_id: str,
+        folded: list[CacheEntry],
+        summary: CacheEntry,
+        skip_user_id_check: bool = False,
+    ) -> bool:
+        """Replace the oldest entries of the conversation by their summary.
+
+        The folded rows are locked, so concurrent compaction of the same
+        conversation waits and then finds out that the rows have changed.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            folded: The oldest entries of the conversation being replaced.
+            summary: The entry with summary of the folded entries.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            bool: True if entries were replaced, False otherwise.
+        """
+        super().construct_key(user_id, conversation_id, skip_user_id_check)
+        value = self.codec.encode(summary)
+
+        def compact(cursor: psycopg2.extensions.cursor) -> bool:
+            cursor.execute(
+                PostgresCache.SELECT_OLDEST_ENTRIES_STATEMENT,
+                (user_id, conversation_id, len(folded)),
+            )
+            rows = cursor.fetchall()
+            if not folded or len(rows) < len(folded):
+                return False
+            if decode_entry(rows[0][1]) != folded[0]:
+                return False
+            # the last folded row is replaced, so the order is kept
+            ids = [row[0] for row in rows]
+            cursor.execute(PostgresCache.UPDATE_ENTRY_STATEMENT, (value, ids[-1]))
+            if len(ids) > 1:
+                cursor.execute(PostgresCache.DELETE_ENTRIES_STATEMENT, (ids[:-1],))
+            return True
+
+        return self._run("PostgresCache.compact", compact)
 
     def delete(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
@@ -201,101 +597,133 @@ class PostgresCache(Cache):
             bool: True if the conversation was deleted, False if not found.
 
         """
-        with self.conn.cursor() as cursor:
-            try:
-                return PostgresCache._delete(cursor, user_id, conversation_id)
-            except psycopg2.DatabaseError as e:
-                logger.error("PostgresCache.delete: %s", e)
-                raise CacheError("PostgresCache.delete", e) from e
+
+        def delete(cursor: psycopg2.extensions.cursor) -> bool:
+            migrated = False
+            if self.legacy_table_exists:
+                migrated = self._migrate_conversation(cursor, user_id, conversation_id)
+            return PostgresCache._delete(cursor, user_id, conversation_id) or migrated
+
+        return self._run("PostgresCache.delete", delete)
 
     def list(
-        self, user_id: str, skip_user_id_check: bool = False
+        self,
+        user_id: str,
+        skip_user_id_check: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0,
     ) -> list[dict[str, str]]:
         """List all conversations for a given user_id.
 
         Args:
             user_id: User identification.
             skip_user_id_check: Skip user_id suid check.
+            limit: Maximum number of returned conversations, all if not set.
+            offset: Number of the most recent conversations to skip.
 
         Returns:
              A list of dictionaries containing conversation_id and topic_summary
 
         """
-        with self.conn.cursor() as cursor:
-            try:
-                cursor.execute(PostgresCache.LIST_CONVERSATIONS_STATEMENT, (user_id,))
-                rows = cursor.fetchall()
-                return [
-                    {"conversation_id": row[0], "topic_summary": row[1]} for row in rows
-                ]
-            except psycopg2.DatabaseError as e:
-                logger.error("PostgresCache.list: %s", e)
-                raise CacheError("PostgresCache.list", e) from e
+
+        def list_conversations(cursor: psycopg2.extensions.cursor) -> list[Any]:
+            # LIMIT NULL means no limit
+            cursor.execute(
+                PostgresCache.LIST_CONVERSATIONS_STATEMENT, (user_id, limit, offset)
+            )
+            return cursor.fetchall()
+
+        rows = self._run("PostgresCache.list", list_conversations)
+        return [{"conversation_id": row[0], "topic_summary": row[1]} for row in rows]
+
+    @staticmethod
+    def _load_legacy(value: Any) -> Any:
+        """Deserialize whole conversation history stored in the legacy table."""
+        # bytea columns are returned as memoryview objects
+        if isinstance(value, memoryview):
+            value = value.tobytes()
+        return json.loads(value, cls=MessageDecoder)
 
     @staticmethod
     def _select(
         cursor: psycopg2.extensions.cursor,
         user_id: str,
         conversation_id: str,
-        skip_user_id_check: bool = False,
+        limit: Optional[int] = None,
     ) -> Any:
         """Select conversation history for given user_id and conversation_id."""
+        # LIMIT NULL means no limit
         cursor.execute(
             PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id),
+            (user_id, conversation_id, limit),
         )
-        value = cursor.fetchone()
-
-        # check if history exists at all
-        if value is None:
-            return None
-
-        # check the retrieved value
-        if len(value) != 1:
-            raise ValueError("Invalid value read from cache:", value)
+        return [row[0] for row in cursor.fetchall()]
 
-        # try to deserialize the value
-        return json.loads(value[0], cls=MessageDecoder)
-
-    @staticmethod
-    def _update(
-        cursor: psycopg2.extensions.cursor,
-        user_id: str,
-        conversation_id: str,
-        value: bytes,
+    def _store_legacy_rows(
+        self, cursor: psycopg2.extensions.cursor, rows: Iterable[tuple]
     ) -> None:
-        """Update conversation history for given user_id and conversation_id."""
+        """Store conversations read from the legacy table, one row per turn."""
+        for user_id, conversation_id, value, topic_summary, updated_at in rows:
+            cursor.execute(
+                PostgresCache.INSERT_MIGRATED_CONVERSATION_STATEMENT,
+                (user_id, conversation_id, topic_summary, updated_at),
+            )
+            history = PostgresCache._load_legacy(value) if value else []
+            cursor.executemany(
+                PostgresCache.INSERT_MIGRATED_ENTRY_STATEMENT,
+                [
+                    (
+                        user_id,
+                        conversation_id,
+                        self.codec.encode(CacheEntry.from_dict(entry)),
+                        updated_at,
+                    )
+                    for entry in history
+                ],
+            )
+
+    def _migrate_conversation(
+        self, cursor: psycopg2.extensions.cursor, user_id: str, conversation_id: str
+    ) -> bool:
+        """Migrate one conversation from the legacy table if it is stored there."""
+        # the legacy table might be dropped by other replica at any time
+        cursor.execute("SAVEPOINT legacy_migration")
+        try:
+            cursor.execute(
+                PostgresCache.MIGRATE_LEGACY_CONVERSATION_STATEMENT,
+                (user_id, conversation_id),
+            )
+        except errors.UndefinedTable:
+            cursor.execute("ROLLBACK TO SAVEPOINT legacy_migration")
+            self.legacy_table_exists = False
+            return False
+        rows = cursor.fetchall()
+        self._store_legacy_rows(cursor, rows)
+        return len(rows) > 0
+
+    def _migrate_batch(self, cursor: psycopg2.extensions.cursor) -> int:
+        """Migrate one batch of conversations from the legacy table."""
         cursor.execute(
-            PostgresCache.UPDATE_CONVERSATION_HISTORY_STATEMENT,
-            (value, user_id, conversation_id),
+            PostgresCache.MIGRATE_LEGACY_BATCH_STATEMENT,
+            (PostgresCache.MIGRATION_BATCH_SIZE,),
         )
+        rows = cursor.fetchall()
+        self._store_legacy_rows(cursor, rows)
+        return len(rows)
 
     @staticmethod
-    def _insert(
-        cursor: psycopg2.extensions.cursor,
-        user_id: str,
-        conversation_id: str,
-        value: bytes,
-        topic_summary: str,
-    ) -> None:
-        """Insert new conversation history for given user_id and conversation_id."""
+    def _evict_batch(
+        cursor: psycopg2.extensions.cursor, statement: str, params: tuple
+    ) -> Optional[int]:
+        """Delete one batch of conversations, None if eviction runs elsewhere."""
         cursor.execute(
-            PostgresCache.INSERT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id, value, topic_summary),
+            PostgresCache.ACQUIRE_EVICTION_LOCK, (PostgresCache.EVICTION_LOCK_KEY,)
         )
-
-    @staticmethod
-    def _cleanup(cursor: psycopg2.extensions.cursor, capacity: int) -> None:
-        """Perform cleanup old conversation histories."""
-        cursor.execute(PostgresCache.QUERY_CACHE_SIZE)
         value = cursor.fetchone()
-        if value is not None:
-            count = value[0]
-            limit = count - capacity
-            if limit > 0:
-                cursor.execute(
-                    f"{PostgresCache.DELETE_CONVERSATION_HISTORY_STATEMENT} {count - capacity})"
-                )
+        if value is None or value[0] is not True:
+            return None
+        cursor.execute(statement, params)
+        return cursor.rowcount
 
     @staticmethod
     def _delete(
@@ -0,0 +1,182 @@
+"""Bounded pool of connections to Postgres."""
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+logger = logging.getLogger(__name__)
+
+# errors that mean the connection itself can not be used anymore
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+
+class PoolTimeoutError(psycopg2.OperationalError):
+    """No connection became available in time."""
+
+
+class PostgresConnectionPool:
+    """Thread-safe bounded pool of Postgres connections.
+
+    Unlike `psycopg2.pool.ThreadedConnectionPool` the pool waits for a free
+    connection instead of failing immediately when all connections are in
+    use, keeps up to `max_size` idle connections open and checks health of
+    connections that were idle for a long time before handing them out.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], extensions.connection],
+        min_size: int,
+        max_size: int,
+        timeout: float,
+        health_check_interval: float,
+    ) -> None:
+        """Initialize the pool and open `min_size` connections.
+
+        Args:
+            connect: Function that opens new connection.
+            min_size: Number of connections opened in advance.
+            max_size: Maximum number of opened connections.
+            timeout: Maximum time (in seconds) to wait for free connection.
+            health_check_interval: Connections idle for longer time (in
+                seconds) are checked before they are handed out.
+        """
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._idle: deque[tuple[extensions.connection, float]] = deque()
+        self._size = 0
+        self._condition = threading.Condition()
+        for _ in range(min_size):
+            self._idle.append((self._open(), time.monotonic()))
+            self._size += 1
+
+    def _open(self) -> extensions.connection:
+        """Open new connection, operations are performed in transactions."""
+        conn = self._connect()
+        conn.autocommit = False
+        return conn
+
+    @staticmethod
+    def _is_broken(conn: extensions.connection) -> bool:
+        """Check if connection to server has been lost."""
+        try:
+            status = conn.info.transaction_status
+        except CONNECTION_ERRORS:
+            return True
+        return status == extensions.TRANSACTION_STATUS_UNKNOWN
+
+    @staticmethod
+    def _ping(conn: extensions.connection) -> bool:
+        """Check that the server responds on given connection."""
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except CONNECTION_ERRORS:
+            return False
+
+    @staticmethod
+    def _close(conn: extensions.connection) -> None:
+        """Close the connection, errors are not important at this point."""
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug("unable to close Postgres connection: %s", e)
+
+    def getconn(self) -> extensions.connection:
+        """Retrieve healthy connection, wait for it if all are in use.
+
+        Raises:
+            PoolTimeoutError: If no connection became available in time.
+        """
+        # metrics module imports the configuration that constructs caches
+        from ols.app import metrics
+
+        start = time.monotonic()
+        deadline = start + self.timeout
+        conn: Optional[extensions.connection] = None
+        with self._condition:
+            while True:
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics.postgres_pool_timeouts_total.inc()
+                    raise PoolTimeoutError(
+                        f"no Postgres connection available in {self.timeout} seconds"
+                    )
+                self._condition.wait(remaining)
+        metrics.postgres_pool_wait_duration_seconds.observe(time.monotonic() - start)
+
+        if conn is not None:
+            idle_time = time.monotonic() - released_at
+            if not self._is_broken(conn) and (
+                idle_time < self.health_check_interval or self._ping(conn)
+            ):
+                return conn
+            logger.warning("Postgres connection is broken, reconnecting")
+            self._close(conn)
+
+        try:
+            return self._open()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def putconn(self, conn: extensions.connection, discard: bool = False) -> None:
+        """Return connection to the pool.
+
+        Args:
+            conn: The connection retrieved by `getconn`.
+            discard: Close the connection instead of reusing it.
+        """
+        if not discard and not self._is_broken(conn):
+            if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            with self._condition:
+                self._idle.append((conn, time.monotonic()))
+                self._condition.notify()
+            return
+
+        self._close(conn)
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[extensions.connection]:
+        """Context manager that borrows connection from the pool."""
+        conn = self.getconn()
+        try:
+            yield conn
+        except CONNECTION_ERRORS:
+            self.putconn(conn, discard=True)
+            raise
+        except BaseException:
+            self.putconn(conn)
+            raise
+        self.putconn(conn)
+
+    def closeall(self) -> None:
+        """Close all idle connections."""
+        with self._condition:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._close(conn)
+                self._size -= 1
@@ -1,73 +1,209 @@
 """Cache that uses Redis to store cached values."""
 
 import json
+import logging
 import threading
-from typing import Any, Dict, Optional
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Union
 
 import redis
 from redis.backoff import ExponentialBackoff
-from redis.exceptions import BusyLoadingError, RedisError
+from redis.exceptions import BusyLoadingError, RedisError, WatchError
 from redis.exceptions import ConnectionError as RedisConnectionError
 from redis.retry import Retry
 
+from ols import constants
 from ols.app.models.config import RedisConfig
-from ols.app.models.models import CacheEntry, MessageDecoder, MessageEncoder
+from ols.app.models.models import CacheEntry, MessageDecoder
 from ols.src.cache.cache import Cache
+from ols.src.cache.codec import EntryCodec, decode_entry, get_codec
+from ols.utils.suid import check_suid
+
+logger = logging.getLogger(__name__)
+
+
+def create_redis_client(
+    config: RedisConfig, decode_responses: bool
+) -> redis.StrictRedis:
+    """Create Redis client with connection and retry parameters from configuration.
+
+    Args:
+        config: Configuration of the Redis server.
+        decode_responses: Whether the client decodes responses to strings.
+
+    Returns:
+        The Redis client.
+    """
+    kwargs: dict[str, Any] = {}
+    if config.password is not None:
+        kwargs["password"] = config.password
+    if config.ca_cert_path is not None:
+        kwargs["ssl"] = True
+        kwargs["ssl_cert_reqs"] = "required"
+        kwargs["ssl_ca_certs"] = config.ca_cert_path
+
+    # setup Redis retry logic
+    retry: Optional[Retry] = None
+    if config.number_of_retries is not None and config.number_of_retries > 0:
+        retry = Retry(ExponentialBackoff(), config.number_of_retries)  # type: ignore [no-untyped-call]
+
+    retry_on_error: Optional[list[type[RedisError]]] = None
+    if config.retry_on_error:
+        retry_on_error = [BusyLoadingError, RedisConnectionError]
+
+    return redis.StrictRedis(
+        host=str(config.host),
+        port=int(config.port),
+        decode_responses=decode_responses,
+        retry=retry,
+        retry_on_timeout=bool(config.retry_on_timeout),
+        retry_on_error=retry_on_error,
+        **kwargs,
+    )
 
 
 class RedisCache(Cache):
-    """Cache that uses Redis to store cached values."""
+    """Cache that uses Redis to store cached values.
+
+    Every conversation is stored in two Redis keys - list with history
+    entries serialized by the codec (new entries are appended with RPUSH) and hash with
+    conversation metadata, like topic summary. Conversations stored in the
+    older format (one JSON blob per conversation) are migrated when accessed.
+
+    Conversations of every user are indexed in sorted set scored by the time
+    of the last update, so listing them does not need to scan the keyspace.
+    Indexes are updated by every insert and delete and listing relies on them
+    only. Conversations stored before the indexes existed are indexed once, in
+    background when the cache is initialized and the fact that indexes were
+    built is not recorded in Redis, or on demand by `build_index`.
+    """
+
+    HISTORY_KEY_SUFFIX = "history"
+    METADATA_KEY_SUFFIX = "meta"
+    INDEX_KEY_PREFIX = "ols:conversations"
+    INDEX_BUILT_KEY = "ols:conversations-index-built"
+    # number of keys read by one SCAN call and indexed by one pipeline
+    INDEX_BATCH_SIZE = 1000
+
+    # time (in seconds) to wait for invalidation messages in one poll
+    SUBSCRIPTION_POLL_INTERVAL = 1.0
+    # time (in seconds) to wait before the interrupted subscription is renewed
+    SUBSCRIPTION_RETRY_INTERVAL = 5.0
 
     _instance = None
     _lock = threading.Lock()
 
-    def __new__(cls: type["RedisCache"], config: RedisConfig) -> "RedisCache":
+    def __new__(
+        cls: type["RedisCache"],
+        config: RedisConfig,
+        codec: Optional[EntryCodec] = None,
+    ) -> "RedisCache":
         """Create a new instance of the `RedisCache` class."""
         with cls._lock:
             if not cls._instance:
                 cls._instance = super().__new__(cls)
-                cls._instance.initialize_redis(config)
+                cls._instance.initialize_redis(config, codec)
         return cls._instance
 
-    def initialize_redis(self, config: RedisConfig) -> None:
+    def initialize_redis(
+        self, config: RedisConfig, codec: Optional[EntryCodec] = None
+    ) -> None:
         """Initialize the Redis client and logger.
 
         This method sets up the Redis client with custom configuration parameters.
         """
-        kwargs: dict[str, Any] = {}
-        if config.password is not None:
-            kwargs["password"] = config.password
-        if config.ca_cert_path is not None:
-            kwargs["ssl"] = True
-            kwargs["ssl_cert_reqs"] = "required"
-            kwargs["ssl_ca_certs"] = config.ca_cert_path
-
-        # setup Redis retry logic
-        retry: Optional[Retry] = None
-        if config.number_of_retries is not None and config.number_of_retries > 0:
-            retry = Retry(ExponentialBackoff(), config.number_of_retries)  # type: ignore [no-untyped-call]
-
-        retry_on_error: Optional[list[type[RedisError]]] = None
-        if config.retry_on_error:
-            retry_on_error = [BusyLoadingError, RedisConnectionError]
-
-        # initialize Redis client
         # pylint: disable=W0201
-        self.redis_client = redis.StrictRedis(
-            host=str(config.host),
-            port=int(config.port),
-            decode_responses=False,  # we store serialized messages as bytes, not strings
-            retry=retry,
-            retry_on_timeout=bool(config.retry_on_timeout),
-            retry_on_error=retry_on_error,
-            **kwargs,
+        self.codec = codec or get_codec()
+        self._index_lock = threading.Lock()
+        self._index_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="redis-index"
         )
+        # we store serialized messages as bytes, not strings
+        self.redis_client = create_redis_client(config, decode_responses=False)
         # Set custom configuration parameters
         self.redis_client.config_set("maxmemory", config.max_memory)
         self.redis_client.config_set("maxmemory-policy", config.max_memory_policy)
+        # conversations stored before the indexes existed are indexed once
+        if not self.redis_client.exists(RedisCache.INDEX_BUILT_KEY):
+            self._index_executor.submit(self.build_index)
+
+    @staticmethod
+    def _history_key(key: str) -> str:
+        """Construct key of the list with conversation history entries."""
+        return f"{key}{Cache.COMPOUND_KEY_SEPARATOR}{RedisCache.HISTORY_KEY_SUFFIX}"
+
+    @staticmethod
+    def _metadata_key(key: str) -> str:
+        """Construct key of the hash with conversation metadata."""
+        return f"{key}{Cache.COMPOUND_KEY_SEPARATOR}{RedisCache.METADATA_KEY_SUFFIX}"
+
+    @staticmethod
+    def _index_key(user_id: str) -> str:
+        """Construct key of the sorted set with conversations of given user."""
+        return f"{RedisCache.INDEX_KEY_PREFIX}{Cache.COMPOUND_KEY_SEPARATOR}{user_id}"
+
+    @staticmethod
+    def _decode_str(value: Optional[Union[bytes, str]]) -> str:
+        """Decode string value returned by Redis client."""
+        if value is None:
+            return ""
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return value
+
+    def _migrate_legacy_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Migrate conversation stored as one JSON blob into the list layout.
+
+        Args:
+            key: The compound key of the conversation.
+
+        Returns:
+            A dictionary containing history and topic_summary, or None if
+            there is no conversation stored in the legacy format.
+        """
+        history_key = self._history_key(key)
+        with self.redis_client.pipeline(transaction=True) as pipeline:
+            while True:
+                try:
+                    # both keys are watched, so entries appended concurrently
+                    # are not lost and the conversation is not migrated twice
+                    pipeline.watch(key, history_key)
+                    value = pipeline.get(key)
+                    if value is None:
+                        return None
+                    db_entry = json.loads(value, cls=MessageDecoder)
+                    # entries appended in meantime are kept after the migrated ones
+                    appended = pipeline.lrange(history_key, 0, -1)
+                    entries = [
+                        self.codec.encode(entry) for entry in db_entry["history"]
+                    ]
+                    pipeline.multi()
+                    pipeline.delete(history_key)
+                    if entries or appended:
+                        pipeline.rpush(history_key, *entries, *appended)
+                    pipeline.hset(
+                        self._metadata_key(key),
+                        "topic_summary",
+                        db_entry.get("topic_summary", ""),
+                    )
+                    pipeline.delete(key)
+                    pipeline.execute()
+                    break
+                except WatchError:
+                    logger.debug("conversation %s changed during migration", key)
+        logger.debug("conversation %s migrated to list layout", key)
+
+        db_entry["history"].extend(decode_entry(entry) for entry in appended)
+        return db_entry
 
     def get(
-        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+        self,
+        user_id: str,
+        conversation_id: str,
+        skip_user_id_check: bool = False,
+        limit: Optional[int] = None,
     ) -> list[CacheEntry]:
         """Get the value associated with the given key.
 
@@ -75,19 +211,25 @@ class RedisCache(Cache):
             user_id: User identification.
             conversation_id: Conversation ID unique for given user.
             skip_user_id_check: Skip user_id suid check.
+            limit: Number of most recent entries to return, all if not set.
 
         Returns:
              A list of CacheEntry objects, or None if not found.
         """
         key = super().construct_key(user_id, conversation_id, skip_user_id_check)
 
-        value = self.redis_client.get(key)
-        if value is None:
-            return None
+        # only the requested tail of the list is transferred
+        start = -limit if limit is not None else 0
+        entries = self.redis_client.lrange(self._history_key(key), start, -1)
+        if entries:
+            return [decode_entry(entry) for entry in entries]
 
-        decoded_value = json.loads(value, cls=MessageDecoder)
-        cache_entries = decoded_value["history"]  # New format
-        return cache_entries
+        db_entry = self._migrate_legacy_entry(key)
+        if db_entry is None:
+            return None
+        if limit is not None:
+            return db_entry["history"][-limit:]
+        return db_entry["history"]
 
     def get_db_entry(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
@@ -104,11 +246,17 @@ class RedisCache(Cache):
         """
         key = super().construct_key(user_id, conversation_id, skip_user_id_check)
 
-        value = self.redis_client.get(key)
-        if value is None:
-            return None
+        pipeline = self.redis_client.pipeline(transaction=False)
+        pipeline.lrange(self._history_key(key), 0, -1)
+        pipeline.hget(self._metadata_key(key), "topic_summary")
+        entries, topic_summary = pipeline.execute()
+        if not entries:
+            return self._migrate_legacy_entry(key)
 
-        return json.loads(value, cls=MessageDecoder)
+        return {
+            "history": [decode_entry(entry) for entry in entries],
+            "topic_summary": self._decode_str(topic_summary),
+        }
 
     def insert_or_append(
         self,
@@ -120,6 +268,9 @@ class RedisCache(Cache):
     ) -> None:
         """Set the value associated with the given key.
 
+        Only the new entry is sent to Redis and appended to the conversation
+        history list. Topic summary is stored for new conversations only.
+
         Args:
             user_id: User identification.
             conversation_id: Conversation ID unique for given user.
@@ -133,13 +284,65 @@ class RedisCache(Cache):
         """
         key = super().construct_key(user_id, conversation_id, skip_user_id_check)
 
-        with self._lock:
-            old_value = self.get_db_entry(user_id, conversation_id, skip_user_id_check)
-            if old_value:
-                old_value["history"].append(cache_entry)
-            else:
-                old_value = {"history": [cache_entry], "topic_summary": topic_summary}
-            self.redis_client.set(key, json.dumps(old_value, cls=MessageEncoder))
+        pipeline = self.redis_client.pipeline(transaction=True)
+        pipeline.hsetnx(self._metadata_key(key), "topic_summary", topic_summary)
+        pipeline.rpush(self._history_key(key), self.codec.encode(cache_entry))
+        pipeline.zadd(self._index_key(user_id), {conversation_id: time.time()})
+        _, length, _ = pipeline.execute()
+
+        # first entry in the list - the conversation might be stored in
+        # the legacy format, it needs to be migrated to keep entries ordered
+        if length == 1:
+            self._migrate_legacy_entry(key)
+
+    def compact(
+        self,
+        user_id: str,
+        conversation_id: str,
+        folded: list[CacheEntry],
+        summary: CacheEntry,
+        skip_user_id_check: bool = False,
+    ) -> bool:
+        """Replace the oldest entries of the conversation by their summary.
+
+        The history list is watched, so the entries are not replaced when
+        the conversation is compacted concurrently. Entries appended in the
+        meantime do not change the beginning of the list and they are kept.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            folded: The oldest entries of the conversation being replaced.
+            summary: The entry with summary of the folded entries.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            bool: True if entries were replaced, False otherwise.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        history_key = self._history_key(key)
+        if not folded:
+            return False
+
+        with self.redis_client.pipeline(transaction=True) as pipeline:
+            try:
+                pipeline.watch(history_key)
+                first = pipeline.lindex(history_key, 0)
+                if (
+                    first is None
+                    or pipeline.llen(history_key) < len(folded)
+                    or decode_entry(first) != folded[0]
+                ):
+                    return False
+                # the last folded entry is replaced, the older ones removed
+                pipeline.multi()
+                pipeline.lset(history_key, len(folded) - 1, self.codec.encode(summary))
+                pipeline.ltrim(history_key, len(folded) - 1, -1)
+                pipeline.execute()
+            except WatchError:
+                logger.debug("conversation %s compacted concurrently", key)
+                return False
+        return True
 
     def delete(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
@@ -155,45 +358,141 @@ class RedisCache(Cache):
             bool: True if the conversation was deleted, False if not found.
         """
         key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+
+        pipeline = self.redis_client.pipeline(transaction=True)
+        pipeline.delete(self._history_key(key), self._metadata_key(key), key)
+        pipeline.zrem(self._index_key(user_id), conversation_id)
         # Redis del() returns the number of keys that were removed
-        return bool(self.redis_client.delete(key))
+        deleted, _ = pipeline.execute()
+        return bool(deleted)
+
+    def _add_to_index(self, keys: list[Union[bytes, str]]) -> None:
+        """Add conversations with given (legacy, history or metadata) keys to indexes."""
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            parts = self._decode_str(key).split(Cache.COMPOUND_KEY_SEPARATOR)
+            if len(parts) not in {2, 3} or not check_suid(parts[1]):
+                continue
+            if len(parts) == 3 and parts[2] not in {
+                RedisCache.HISTORY_KEY_SUFFIX,
+                RedisCache.METADATA_KEY_SUFFIX,
+            }:
+                continue
+            # time of the last update is not known
+            pipeline.zadd(self._index_key(parts[0]), {parts[1]: 0}, nx=True)
+        pipeline.execute()
+
+    def build_index(self) -> bool:
+        """Index conversations of all users stored in Redis.
+
+        Keys are scanned and indexed in batches, so neither Redis nor the
+        service is blocked by large keyspace. The fact that indexes were built
+        is recorded in Redis, so other replicas do not build them again.
+
+        Returns:
+            bool: True if the indexes were built, False otherwise.
+        """
+        with self._index_lock:
+            logger.info("building index of conversations stored in Redis")
+            try:
+                batch: list[Union[bytes, str]] = []
+                for key in self.redis_client.scan_iter(
+                    match="*", count=RedisCache.INDEX_BATCH_SIZE
+                ):
+                    batch.append(key)
+                    if len(batch) == RedisCache.INDEX_BATCH_SIZE:
+                        self._add_to_index(batch)
+                        batch = []
+                self._add_to_index(batch)
+                self.redis_client.set(RedisCache.INDEX_BUILT_KEY, 1)
+            except Exception as e:
+                logger.error("unable to build index of conversations: %s", e)
+                return False
+        logger.info("index of conversations stored in Redis built")
+        return True
 
     def list(
-        self, user_id: str, skip_user_id_check: bool = False
+        self,
+        user_id: str,
+        skip_user_id_check: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0,
     ) -> list[dict[str, str]]:
-        """List all conversations for a given user_id.
+        """List conversations for a given user_id, the most recent first.
 
         Args:
             user_id: User identification.
             skip_user_id_check: Skip user_id suid check.
+            limit: Maximum number of returned conversations, all if not set.
+            offset: Number of the most recent conversations to skip.
 
         Returns:
              A list of dictionaries containing conversation_id and topic_summary
         """
-        # Get all keys matching the user_id prefix
         super()._check_user_id(user_id, skip_user_id_check)
-        prefix = f"{user_id}{Cache.COMPOUND_KEY_SEPARATOR}"
-        pattern = f"{prefix}*"
-        keys = self.redis_client.keys(pattern)
 
-        # Initialize result list
-        conversations = []
+        index_key = self._index_key(user_id)
+        # only the requested page of the index is transferred
+        stop = -1 if limit is None else offset + limit - 1
+        conversation_ids = [
+            self._decode_str(conversation_id)
+            for conversation_id in self.redis_client.zrevrange(index_key, offset, stop)
+        ]
+        if not conversation_ids:
+            return []
+
+        # just topic summaries are fetched, all of them in one round trip
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for conversation_id in conversation_ids:
+            key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+            pipeline.hget(self._metadata_key(key), "topic_summary")
+        topic_summaries = pipeline.execute()
 
-        # Fetch data for each conversation
-        for key in keys:
-            # Extract conversation_id from the key
-            conversation_id = key[len(prefix) :]
-
-            # Get the conversation data
-            conversation_data = self.get_db_entry(
-                user_id, conversation_id, skip_user_id_check
-            )
-            if conversation_data is not None:
-                conversations.append(
-                    {
-                        "conversation_id": conversation_id,
-                        "topic_summary": conversation_data.get("topic_summary", ""),
-                    }
+        conversations = []
+        for conversation_id, stored_summary in zip(conversation_ids, topic_summaries):
+            if stored_summary is not None:
+                topic_summary = self._decode_str(stored_summary)
+            else:
+                # conversation stored in legacy format or already evicted
+                conversation_data = self.get_db_entry(
+                    user_id, conversation_id, skip_user_id_check
                 )
+                if conversation_data is None:
+                    self.redis_client.zrem(index_key, conversation_id)
+                    continue
+                topic_summary = conversation_data.get("topic_summary", "")
+            conversations.append(
+                {"conversation_id": conversation_id, "topic_summary": topic_summary}
+            )
 
         return conversations
+
+    def publish_invalidation(self, message: str) -> None:
+        """Publish the invalidation to Redis channel."""
+        self.redis_client.publish(constants.CACHE_INVALIDATION_CHANNEL, message)
+
+    def subscribe_invalidations(
+        self, callback: Callable[[Optional[str]], None]
+    ) -> bool:
+        """Subscribe to Redis channel with invalidations.
+
+        Messages are received in background thread, the subscription is
+        renewed automatically when the connection is interrupted.
+        """
+
+        def handle_message(message: dict[str, Any]) -> None:
+            callback(self._decode_str(message["data"]))
+
+        def handle_error(error: Exception, *_: Any) -> None:
+            logger.warning("Redis invalidations subscription interrupted: %s", error)
+            callback(None)
+            time.sleep(RedisCache.SUBSCRIPTION_RETRY_INTERVAL)
+
+        pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{constants.CACHE_INVALIDATION_CHANNEL: handle_message})
+        pubsub.run_in_thread(
+            sleep_time=RedisCache.SUBSCRIPTION_POLL_INTERVAL,
+            daemon=True,
+            exception_handler=handle_error,
+        )
+        return True
@@ -0,0 +1,180 @@
+"""Cache of answers to first questions of conversations looked up by similarity."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from ols.app.models.config import SemanticCacheConfig
+from ols.app.models.models import RagChunk
+
+logger = logging.getLogger(__name__)
+
+# provider, model and system prompt the answer was generated with
+Partition = tuple[str, str, str]
+
+
+@dataclass
+class CachedAnswer:
+    """Answer stored in semantic cache.
+
+    Attributes:
+        partition: Provider, model and system prompt used to generate it.
+        response: The response of LLM.
+        rag_chunks: RAG chunks referenced by the response.
+        expires_at: Monotonic time the answer expires at.
+    """
+
+    partition: Partition
+    response: str
+    rag_chunks: list[RagChunk]
+    expires_at: float
+
+
+class SemanticCache:
+    """Answers to first questions of conversations kept in process memory.
+
+    Questions are embedded by the embedding model of the RAG index and the
+    answer of the most similar cached question is returned when it was
+    generated by the same provider, model and system prompt. Embeddings are
+    normalized and kept in one preallocated matrix, so the lookup is a single
+    matrix-vector product; free slots are zero vectors and never match.
+
+    The cache is bound to the RAG index the answers refer to, a new cache is
+    constructed when the index is loaded again (see `AppConfig`).
+    """
+
+    # queries embedded by `get` that are likely to be stored by `put` soon
+    PENDING_EMBEDDINGS = 64
+
+    def __init__(
+        self, config: SemanticCacheConfig, embed: Callable[[str], list[float]]
+    ) -> None:
+        """Initialize the semantic cache.
+
+        Args:
+            config: Configuration of the semantic cache.
+            embed: Function returning embedding of the query.
+        """
+        self.max_entries = config.max_entries
+        self.ttl = config.ttl
+        self.similarity_threshold = config.similarity_threshold
+        self._embed = embed
+        # allocated when the first answer is stored, dimension is not known before
+        self._embeddings: Optional[np.ndarray] = None
+        self._answers: list[Optional[CachedAnswer]] = [None] * self.max_entries
+        # used slots in LRU order and slots that can be used
+        self._used: OrderedDict[int, None] = OrderedDict()
+        self._free = list(range(self.max_entries - 1, -1, -1))
+        self._pending: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return number of cached answers."""
+        return len(self._used)
+
+    def _query_embedding(self, query: str) -> np.ndarray:
+        """Return normalized embedding of the query."""
+        with self._lock:
+            embedding = self._pending.get(query)
+        if embedding is not None:
+            return embedding
+        embedding = np.asarray(self._embed(query), dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding /= norm
+        with self._lock:
+            self._pending[query] = embedding
+            while len(self._pending) > SemanticCache.PENDING_EMBEDDINGS:
+                self._pending.popitem(last=False)
+        return embedding
+
+    def _drop(self, slot: int) -> None:
+        """Free the slot, must be called with the lock held."""
+        self._embeddings[slot] = 0.0  # type: ignore[index]
+        self._answers[slot] = None
+        del self._used[slot]
+        self._free.append(slot)
+
+    def get(self, query: str, partition: Partition) -> Optional[CachedAnswer]:
+        """Get answer of the most similar cached question.
+
+        Args:
+            query: The (redacted) question.
+            partition: Provider, model and system prompt used for the answer.
+
+        Returns:
+            The cached answer, None if no similar question was answered.
+        """
+        # metrics module constructs auth dependency when imported
+        from ols.app import metrics
+
+        embedding = self._query_embedding(query)
+        answer = None
+        with self._lock:
+            if self._embeddings is not None and len(embedding) == len(
+                self._embeddings[0]
+            ):
+                scores = self._embeddings @ embedding
+                candidates = np.flatnonzero(scores >= self.similarity_threshold)
+                now = time.monotonic()
+                for slot in candidates[np.argsort(-scores[candidates])]:
+                    candidate = self._answers[slot]
+                    if candidate is None or candidate.partition != partition:
+                        continue
+                    if candidate.expires_at <= now:
+                        self._drop(int(slot))
+                        continue
+                    self._used.move_to_end(int(slot))
+                    answer = candidate
+                    break
+        metrics.semantic_cache_requests_total.labels(
+            "miss" if answer is None else "hit"
+        ).inc()
+        return answer
+
+    def put(
+        self,
+        query: str,
+        partition: Partition,
+        response: str,
+        rag_chunks: list[RagChunk],
+    ) -> None:
+        """Store answer of the question, the least recently used one is dropped.
+
+        Args:
+            query: The (redacted) question.
+            partition: Provider, model and system prompt used for the answer.
+            response: The response of LLM.
+            rag_chunks: RAG chunks referenced by the response.
+        """
+        embedding = self._query_embedding(query)
+        with self._lock:
+            self._pending.pop(query, None)
+            if self._embeddings is None:
+                self._embeddings = np.zeros(
+                    (self.max_entries, len(embedding)), dtype=np.float32
+                )
+            elif len(embedding) != len(self._embeddings[0]):
+                logger.warning("embedding dimension changed, answer is not cached")
+                return
+            if not self._free:
+                self._drop(next(iter(self._used)))
+            slot = self._free.pop()
+            self._embeddings[slot] = embedding
+            self._answers[slot] = CachedAnswer(
+                partition, response, list(rag_chunks), time.monotonic() + self.ttl
+            )
+            self._used[slot] = None
+
+    def invalidate(self) -> None:
+        """Drop all cached answers."""
+        with self._lock:
+            for slot in list(self._used):
+                self._drop(slot)
+            self._pending.clear()
@@ -0,0 +1,247 @@
+"""Long-lived HTTP clients used to communicate with LLM providers."""
+
+import asyncio
+import importlib.util
+import logging
+import ssl
+import threading
+import weakref
+from collections.abc import Coroutine
+from typing import Any, Optional, Union
+
+import httpx
+
+from ols.app.models.config import ConnectionPoolConfig, LLMProviders, ProviderConfig
+from ols.utils import tls
+
+logger = logging.getLogger(__name__)
+
+HTTPClient = Union[httpx.Client, httpx.AsyncClient]
+
+
+def construct_verify(
+    provider_config: ProviderConfig, use_custom_certificate_store: bool
+) -> Union[bool, str, ssl.SSLContext]:
+    """Construct the `verify` parameter for HTTPX clients.
+
+    TLS security profile and certificates store set for the provider are
+    taken into account.
+    """
+    sec_profile = provider_config.tls_security_profile
+
+    # if security profile is not set, use default verification
+    if sec_profile is None or sec_profile.profile_type is None:
+        if use_custom_certificate_store:
+            return provider_config.certificates_store
+        return True
+
+    # security profile is set -> we need to retrieve SSL version and list of allowed ciphers
+    ciphers = tls.ciphers_as_string(sec_profile.ciphers, sec_profile.profile_type)
+    logger.info("list of ciphers: %s", ciphers)
+
+    min_tls_version = tls.min_tls_version(
+        sec_profile.min_tls_version, sec_profile.profile_type
+    )
+    logger.info("min TLS version: %s", min_tls_version)
+
+    ssl_version = tls.ssl_tls_version(min_tls_version)
+    logger.info("SSL version: %d", ssl_version)
+
+    context = ssl.create_default_context()
+
+    if ssl_version is not None:
+        context.minimum_version = ssl_version
+
+    if ciphers is not None:
+        context.set_ciphers(ciphers)
+
+    if use_custom_certificate_store:
+        context.load_verify_locations(provider_config.certificates_store)
+
+    return context
+
+
+def http2_enabled(pool_config: ConnectionPoolConfig) -> bool:
+    """Check if HTTP/2 is requested and can be used."""
+    if not pool_config.http2:
+        return False
+    # HTTP/2 support in HTTPX is optional and requires h2 package
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 requested, but h2 package is not installed")
+        return False
+    return True
+
+
+def construct_client(
+    provider_config: ProviderConfig,
+    use_custom_certificate_store: bool,
+    use_async: bool = False,
+) -> HTTPClient:
+    """Construct HTTPX client (sync or async one) for given provider."""
+    pool_config = provider_config.connection_pool or ConnectionPoolConfig()
+    limits = httpx.Limits(
+        max_connections=pool_config.max_connections,
+        max_keepalive_connections=pool_config.max_keepalive_connections,
+        keepalive_expiry=pool_config.keepalive_expiry,
+    )
+    client_class = httpx.AsyncClient if use_async else httpx.Client
+    return client_class(
+        verify=construct_verify(provider_config, use_custom_certificate_store),
+        limits=limits,
+        http2=http2_enabled(pool_config),
+    )
+
+
+# tasks closing async clients, referenced until they are done
+_closing_tasks: set[asyncio.Task] = set()
+
+
+def _close_async(closing: Coroutine[Any, Any, None]) -> None:
+    """Run coroutine closing async client or transport.
+
+    The coroutine is scheduled in the running event loop, or it is run in a
+    new one when called outside of event loop (e.g. from a finalizer).
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        try:
+            asyncio.run(closing)
+        except Exception as e:
+            logger.debug("unable to close async HTTP client: %s", e)
+        return
+    task = loop.create_task(closing)
+    _closing_tasks.add(task)
+    task.add_done_callback(_closing_tasks.discard)
+
+
+def _close_transport(
+    transport: Union[httpx.BaseTransport, httpx.AsyncBaseTransport],
+) -> None:
+    """Close connections of transport of HTTP client that is not used anymore."""
+    if isinstance(transport, httpx.AsyncBaseTransport):
+        _close_async(transport.aclose())
+    else:
+        transport.close()
+
+
+def close_when_unused(client: HTTPClient) -> None:
+    """Close connections of the client once the last reference to it is dropped.
+
+    LLM instances constructed for previous provider configuration can still
+    be serving requests, so the client can not be closed right away.
+    """
+    # the finalizer must not reference the client itself, so the transport
+    # (which holds all the connections) is closed instead
+    finalizer = weakref.finalize(client, _close_transport, client._transport)
+    finalizer.atexit = False
+
+
+class HTTPClientsPool:
+    """Pool of long-lived HTTP clients, one sync and one async per provider.
+
+    HTTPX clients maintain their own keep-alive connection pools, so
+    sharing them between all LLM instances of one provider means that
+    requests does not need to pay for new TCP and TLS handshakes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the pool."""
+        self._clients: dict[tuple, tuple[ProviderConfig, HTTPClient]] = {}
+        self._lock = threading.Lock()
+
+    def _get(
+        self,
+        provider_config: ProviderConfig,
+        use_custom_certificate_store: bool,
+        use_async: bool,
+    ) -> HTTPClient:
+        """Retrieve existing HTTP client or construct a new one."""
+        key = (provider_config.name, use_custom_certificate_store, use_async)
+        with self._lock:
+            item = self._clients.get(key)
+            # client constructed for different (previous) configuration
+            # can not be used anymore
+            if item is not None and item[0] is provider_config:
+                return item[1]
+            if item is not None:
+                close_when_unused(item[1])
+            client = construct_client(
+                provider_config, use_custom_certificate_store, use_async
+            )
+            self._clients[key] = (provider_config, client)
+            return client
+
+    def get_client(
+        self, provider_config: ProviderConfig, use_custom_certificate_store: bool
+    ) -> httpx.Client:
+        """Return shared sync HTTP client for given provider."""
+        return self._get(provider_config, use_custom_certificate_store, False)
+
+    def get_async_client(
+        self, provider_config: ProviderConfig, use_custom_certificate_store: bool
+    ) -> httpx.AsyncClient:
+        """Return shared async HTTP client for given provider."""
+        return self._get(provider_config, use_custom_certificate_store, True)
+
+    def prewarm(self, providers: Optional[LLMProviders]) -> None:
+        """Open connections to all providers that have pre-warming enabled.
+
+        Only sync clients are pre-warmed, because connections of async
+        clients are bound to the event loop they were opened in.
+        """
+        if providers is None:
+            return
+        for provider_config in providers.providers.values():
+            pool_config = provider_config.connection_pool
+            if pool_config is None or not pool_config.prewarm:
+                continue
+            url = provider_url(provider_config)
+            if url is None:
+                continue
+            use_custom_certificate_store = (
+                provider_config.certificates_store is not None
+            )
+            client = self.get_client(provider_config, use_custom_certificate_store)
+            try:
+                # response itself is not important, the TCP and TLS handshakes are
+                client.head(url)
+                logger.info(
+                    "connection to provider %s pre-warmed", provider_config.name
+                )
+            except Exception as e:
+                logger.warning(
+                    "unable to pre-warm connection to provider %s: %s",
+                    provider_config.name,
+                    e,
+                )
+
+    def clear(self) -> None:
+        """Close and remove all HTTP clients."""
+        with self._lock:
+            for _, client in self._clients.values():
+                if isinstance(client, httpx.AsyncClient):
+                    _close_async(client.aclose())
+                else:
+                    client.close()
+            self._clients.clear()
+
+
+def provider_url(provider_config: ProviderConfig) -> Optional[str]:
+    """Retrieve URL of provider, provider-specific configuration has precedence."""
+    for specific_config in (
+        provider_config.openai_config,
+        provider_config.azure_config,
+        provider_config.rhoai_vllm_config,
+        provider_config.rhelai_vllm_config,
+        provider_config.watsonx_config,
+        provider_config.bam_config,
+    ):
+        if specific_config is not None:
+            return str(specific_config.url)
+    if provider_config.url is not None:
+        return str(provider_config.url)
+    return None
+
+
+http_clients_pool: HTTPClientsPool = HTTPClientsPool()
@@ -7,6 +7,7 @@ from langchain.llms.base import LLM
 
 from ols import config, constants
 from ols.app.models.config import LLMProviders, ProviderConfig
+from ols.src.llms.llm_pool import LLMPool, llm_pool
 from ols.src.llms.providers.registry import LLMProvidersRegistry
 
 logger = logging.getLogger(__name__)
@@ -60,6 +61,10 @@ def load_llm(
 ) -> LLM:
     """Load LLM according to input provider and model.
 
+    Loaded LLM instances are pooled and reused by subsequent calls with the
+    same provider, model, parameters and streaming flag, as long as the
+    configuration is not changed or reloaded.
+
     Args:
         provider: The provider name.
         model: The model name.
@@ -95,9 +100,16 @@ def load_llm(
             f"Unsupported LLM provider type '{provider_config.type}'."
         )
 
-    logger.debug("loading LLM model '%s' from provider '%s'", model, provider)
-
     llm_provider = llm_providers_reg.llm_providers[provider_config.type]
-    return llm_provider(
-        model, provider_config, generic_llm_params or {}, streaming
-    ).load()
+
+    def loader() -> LLM:
+        logger.debug("loading LLM model '%s' from provider '%s'", model, provider)
+        return llm_provider(
+            model, provider_config, generic_llm_params or {}, streaming
+        ).load()
+
+    key = LLMPool.construct_key(provider, model, generic_llm_params, streaming)
+    # pooled instance is not reused when provider or developer configuration
+    # (developer configuration can override LLM parameters) has been changed
+    fingerprint = (provider_config, config.dev_config, llm_provider)
+    return llm_pool.get_or_load(key, fingerprint, loader)
@@ -0,0 +1,109 @@
+"""Process-wide pool of loaded LLM instances."""
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Optional
+
+from langchain.llms.base import LLM
+
+from ols import constants
+
+logger = logging.getLogger(__name__)
+
+
+class LLMPool:
+    """Bounded LRU pool of loaded LLM instances.
+
+    Constructing an LLM instance is not cheap - provider parameters are
+    remapped and validated, new HTTP client is created and for some
+    providers even a remote call is made. The pool makes it possible to
+    construct the instance once and reuse it by all requests that use the
+    same provider, model, parameters and streaming mode.
+
+    Every pooled instance is stored together with a fingerprint - tuple of
+    objects the instance was constructed from (typically provider and
+    developer configurations). When the fingerprint passed to `get_or_load`
+    is not identical to the stored one, the configuration has been changed
+    or reloaded and the pooled instance is thrown away.
+    """
+
+    def __init__(self, max_size: int = constants.LLM_POOL_MAX_SIZE) -> None:
+        """Initialize the pool.
+
+        Args:
+            max_size: Maximum number of LLM instances kept in the pool.
+        """
+        self.max_size = max_size
+        self._pool: OrderedDict[Hashable, tuple[tuple, LLM]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def construct_key(
+        provider: str,
+        model: str,
+        generic_llm_params: Optional[dict[str, Any]],
+        streaming: Optional[bool],
+    ) -> tuple:
+        """Construct pool key from parameters used to load LLM."""
+        # parameter values does not need to be hashable
+        params = tuple(
+            sorted(
+                (key, repr(value)) for key, value in (generic_llm_params or {}).items()
+            )
+        )
+        return provider, model, params, bool(streaming)
+
+    @staticmethod
+    def _same_fingerprint(stored: tuple, fingerprint: tuple) -> bool:
+        """Check if all parts of fingerprints are the very same objects."""
+        return len(stored) == len(fingerprint) and all(
+            s is f for s, f in zip(stored, fingerprint)
+        )
+
+    def get_or_load(
+        self, key: Hashable, fingerprint: tuple, loader: Callable[[], LLM]
+    ) -> LLM:
+        """Return pooled LLM instance or load (and pool) new one.
+
+        Args:
+            key: The pool key, see `construct_key`.
+            fingerprint: Objects the LLM instance is constructed from.
+            loader: Function that loads the new LLM instance.
+
+        Returns:
+            The LLM instance.
+        """
+        with self._lock:
+            item = self._pool.get(key)
+            if item is not None:
+                if self._same_fingerprint(item[0], fingerprint):
+                    self._pool.move_to_end(key)
+                    return item[1]
+                logger.debug("configuration changed, invalidating pooled LLM %s", key)
+                del self._pool[key]
+
+        # the loading is performed outside the lock as it might be slow
+        logger.debug("loading new LLM instance for %s", key)
+        llm = loader()
+
+        with self._lock:
+            self._pool[key] = (fingerprint, llm)
+            self._pool.move_to_end(key)
+            while len(self._pool) > self.max_size:
+                evicted_key, _ = self._pool.popitem(last=False)
+                logger.debug("pooled LLM %s evicted", evicted_key)
+        return llm
+
+    def clear(self) -> None:
+        """Remove all LLM instances from the pool."""
+        with self._lock:
+            self._pool.clear()
+
+    def __len__(self) -> int:
+        """Return number of pooled LLM instances."""
+        return len(self._pool)
+
+
+llm_pool: LLMPool = LLMPool()
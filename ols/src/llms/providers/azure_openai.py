@@ -72,6 +72,7 @@ class AzureOpenAI(LLMProvider):
             "max_tokens": 512,
             "verbose": False,
             "http_client": self._construct_httpx_client(False),
+            "http_async_client": self._construct_httpx_async_client(False),
         }
 
         if self.credentials is not None:
@@ -44,6 +44,7 @@ class OpenAI(LLMProvider):
             "max_tokens": 512,
             "verbose": False,
             "http_client": self._construct_httpx_client(False),
+            "http_async_client": self._construct_httpx_async_client(False),
         }
 
     def load(self) -> LLM:
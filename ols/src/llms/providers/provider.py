@@ -2,7 +2,6 @@
 
 import abc
 import logging
-import ssl
 from dataclasses import dataclass
 from typing import Any, Optional
 
@@ -22,7 +21,7 @@ from ols.constants import (
     PROVIDER_WATSONX,
     GenericLLMParameters,
 )
-from ols.utils import tls
+from ols.src.llms.http_clients import http_clients_pool
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +49,7 @@ AzureOpenAIParameters = {
     ProviderParameter("max_tokens", int),
     ProviderParameter("verbose", bool),
     ProviderParameter("http_client", httpx.Client),
+    ProviderParameter("http_async_client", httpx.AsyncClient),
 }
 
 OpenAIParameters = {
@@ -66,6 +66,7 @@ OpenAIParameters = {
     ProviderParameter("max_tokens", int),
     ProviderParameter("verbose", bool),
     ProviderParameter("http_client", httpx.Client),
+    ProviderParameter("http_async_client", httpx.AsyncClient),
 }
 
 RHOAIVLLMParameters = {
@@ -81,6 +82,7 @@ RHOAIVLLMParameters = {
     ProviderParameter("max_tokens", int),
     ProviderParameter("verbose", bool),
     ProviderParameter("http_client", httpx.Client),
+    ProviderParameter("http_async_client", httpx.AsyncClient),
 }
 
 RHELAIVLLMParameters = {
@@ -96,6 +98,7 @@ RHELAIVLLMParameters = {
     ProviderParameter("max_tokens", int),
     ProviderParameter("verbose", bool),
     ProviderParameter("http_client", httpx.Client),
+    ProviderParameter("http_async_client", httpx.AsyncClient),
 }
 
 BAMParameters = {
@@ -348,36 +351,19 @@ class LLMProvider(AbstractLLMProvider):
     def _construct_httpx_client(
         self, use_custom_certificate_store: bool
     ) -> httpx.Client:
-        """Construct HTTPX client instance to be used to communicate with LLM."""
-        sec_profile = self.provider_config.tls_security_profile
+        """Return HTTPX client instance to be used to communicate with LLM.
 
-        # if security profile is not set, use httpx.Client as is
-        if sec_profile is None or sec_profile.profile_type is None:
-            if use_custom_certificate_store:
-                return httpx.Client(verify=self.provider_config.certificates_store)
-            return httpx.Client()
-
-        # security profile is set -> we need to retrieve SSL version and list of allowed ciphers
-        ciphers = tls.ciphers_as_string(sec_profile.ciphers, sec_profile.profile_type)
-        logger.info("list of ciphers: %s", ciphers)
-
-        min_tls_version = tls.min_tls_version(
-            sec_profile.min_tls_version, sec_profile.profile_type
+        The client is shared by all LLM instances of the provider, so the
+        keep-alive connections are reused between requests.
+        """
+        return http_clients_pool.get_client(
+            self.provider_config, use_custom_certificate_store
         )
-        logger.info("min TLS version: %s", min_tls_version)
-
-        ssl_version = tls.ssl_tls_version(min_tls_version)
-        logger.info("SSL version: %d", ssl_version)
-
-        context = ssl.create_default_context()
 
-        if ssl_version is not None:
-            context.minimum_version = ssl_version
-
-        if ciphers is not None:
-            context.set_ciphers(ciphers)
-
-        if use_custom_certificate_store:
-            context.load_verify_locations(self.provider_config.certificates_store)
-
-        return httpx.Client(verify=context)
+    def _construct_httpx_async_client(
+        self, use_custom_certificate_store: bool
+    ) -> httpx.AsyncClient:
+        """Return async HTTPX client instance to be used to stream from LLM."""
+        return http_clients_pool.get_async_client(
+            self.provider_config, use_custom_certificate_store
+        )
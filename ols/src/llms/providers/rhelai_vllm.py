@@ -45,6 +45,7 @@ class RHELAIVLLM(LLMProvider):
             "max_tokens": 512,
             "verbose": False,
             "http_client": self._construct_httpx_client(True),
+            "http_async_client": self._construct_httpx_async_client(True),
         }
 
     def load(self) -> LLM:
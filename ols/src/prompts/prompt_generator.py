@@ -1,6 +1,9 @@
 """Prompt generator based on model / context."""
 
+import threading
+from collections import OrderedDict
 from copy import copy
+from dataclasses import dataclass
 
 from langchain_core.messages import BaseMessage, HumanMessage
 from langchain_core.prompts import (
@@ -11,7 +14,7 @@ from langchain_core.prompts import (
     SystemMessagePromptTemplate,
 )
 
-from ols.constants import ModelFamily
+from ols.constants import PROMPT_TEMPLATE_REGISTRY_SIZE, ModelFamily
 from ols.customize import prompts
 
 
@@ -49,6 +52,156 @@ def restructure_history(message: BaseMessage, model: str) -> BaseMessage:
     return new_message
 
 
+def model_family(model: str) -> ModelFamily:
+    """Get family of the model, prompts are the same for all models of family."""
+    return ModelFamily.GRANITE if ModelFamily.GRANITE in model else ModelFamily.GPT
+
+
+def _prompt_template_gpt(
+    system_instruction: str, has_context: bool, has_history: bool
+) -> ChatPromptTemplate:
+    """Generate prompt template for GPT."""
+    prompt_message = []
+    sys_intruction = system_instruction.strip() + "\n"
+
+    if has_context:
+        sys_intruction = sys_intruction + "\n" + prompts.USE_CONTEXT_INSTRUCTION.strip()
+    if has_history:
+        sys_intruction = sys_intruction + "\n" + prompts.USE_HISTORY_INSTRUCTION.strip()
+    if has_context:
+        sys_intruction = sys_intruction + "\n{context}"
+
+    prompt_message.append(SystemMessagePromptTemplate.from_template(sys_intruction))
+
+    if has_history:
+        prompt_message.append(MessagesPlaceholder("chat_history"))
+
+    prompt_message.append(HumanMessagePromptTemplate.from_template("{query}"))
+    return ChatPromptTemplate.from_messages(prompt_message)
+
+
+def _prompt_template_granite(
+    system_instruction: str, has_context: bool, has_history: bool
+) -> PromptTemplate:
+    """Generate prompt template for Granite."""
+    prompt_message = "<|system|>\n" + system_instruction.strip() + "\n"
+
+    if has_context:
+        prompt_message = prompt_message + "\n" + prompts.USE_CONTEXT_INSTRUCTION.strip()
+    if has_history:
+        prompt_message = prompt_message + "\n" + prompts.USE_HISTORY_INSTRUCTION.strip()
+    if has_context:
+        prompt_message = prompt_message + "\n{context}"
+    if has_history:
+        prompt_message = prompt_message + "\n{chat_history}"
+
+    prompt_message = prompt_message + "\n<|user|>\n{query}\n<|assistant|>\n"
+    return PromptTemplate.from_template(prompt_message)
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """Prompt template together with token count of its fixed part.
+
+    Attributes:
+        template: Prompt template, it must not be modified.
+        skeleton_tokens: Tokens of the prompt formatted with empty query,
+            context and history.
+    """
+
+    template: ChatPromptTemplate | PromptTemplate
+    skeleton_tokens: int
+
+
+class PromptTemplateRegistry:
+    """Prompt templates compiled once and reused by subsequent queries.
+
+    Templates depend only on the model family, system instruction and on
+    whether the context and history are used, so the token count of their
+    fixed part is computed only once too. The least recently used templates
+    are dropped, as system instruction can be set by the query request.
+    """
+
+    def __init__(self, max_entries: int = PROMPT_TEMPLATE_REGISTRY_SIZE) -> None:
+        """Initialize the registry."""
+        self.max_entries = max_entries
+        self._templates: OrderedDict[tuple, CompiledPrompt] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        model: str,
+        system_instruction: str,
+        has_context: bool,
+        has_history: bool,
+    ) -> CompiledPrompt:
+        """Get compiled prompt, it is compiled when it is not in the registry.
+
+        Args:
+            model: Model name; prompt is generated for its family.
+            system_instruction: System instruction of the prompt.
+            has_context: Whether the prompt contains RAG context.
+            has_history: Whether the prompt contains conversation history.
+
+        Returns:
+            Compiled prompt template.
+        """
+        key = (model_family(model), system_instruction, has_context, has_history)
+        with self._lock:
+            compiled = self._templates.get(key)
+            if compiled is not None:
+                self._templates.move_to_end(key)
+                return compiled
+
+        # two threads can compile the same template, the result is the same
+        compiled = PromptTemplateRegistry._compile(*key)
+        with self._lock:
+            self._templates[key] = compiled
+            while len(self._templates) > self.max_entries:
+                self._templates.popitem(last=False)
+        return compiled
+
+    def clear(self) -> None:
+        """Drop all compiled templates, ex. when prompts are customized."""
+        with self._lock:
+            self._templates.clear()
+
+    @staticmethod
+    def _compile(
+        family: ModelFamily,
+        system_instruction: str,
+        has_context: bool,
+        has_history: bool,
+    ) -> CompiledPrompt:
+        """Generate the prompt template and count tokens of its fixed part."""
+        # token handler restructures the context and history by this module
+        from ols.utils.token_handler import TokenHandler
+
+        empty_values: dict = {"query": ""}
+        if family == ModelFamily.GRANITE:
+            template = _prompt_template_granite(
+                system_instruction, has_context, has_history
+            )
+            if has_history:
+                empty_values["chat_history"] = ""
+        else:
+            template = _prompt_template_gpt(
+                system_instruction, has_context, has_history
+            )
+            if has_history:
+                empty_values["chat_history"] = []
+        if has_context:
+            empty_values["context"] = ""
+
+        skeleton_tokens = TokenHandler().text_to_token_count(
+            template.format(**empty_values)
+        )
+        return CompiledPrompt(template, skeleton_tokens)
+
+
+prompt_templates = PromptTemplateRegistry()
+
+
 class GeneratePrompt:
     """Generate prompt dynamically."""
 
@@ -65,67 +218,34 @@ class GeneratePrompt:
         self._history = history
         self._sys_instruction = system_instruction
 
-    def _generate_prompt_gpt(self) -> tuple[ChatPromptTemplate, dict]:
-        """Generate prompt for GPT."""
-        prompt_message = []
-        sys_intruction = self._sys_instruction.strip() + "\n"
+    def compiled_prompt(self, model: str) -> CompiledPrompt:
+        """Get compiled prompt template for the model from the registry."""
+        return prompt_templates.get(
+            model,
+            self._sys_instruction,
+            len(self._rag_context) > 0,
+            len(self._history) > 0,
+        )
+
+    def _input_values(self, model: str) -> dict:
+        """Generate input values of the prompt template."""
         llm_input_values: dict = {"query": self._query}
 
         if len(self._rag_context) > 0:
             llm_input_values["context"] = "".join(self._rag_context)
-            sys_intruction = (
-                sys_intruction + "\n" + prompts.USE_CONTEXT_INSTRUCTION.strip()
-            )
 
         if len(self._history) > 0:
-            llm_input_values["chat_history"] = self._history
-
-            sys_intruction = (
-                sys_intruction + "\n" + prompts.USE_HISTORY_INSTRUCTION.strip()
-            )
-
-        if "context" in llm_input_values:
-            sys_intruction = sys_intruction + "\n{context}"
-
-        prompt_message.append(SystemMessagePromptTemplate.from_template(sys_intruction))
-
-        if "chat_history" in llm_input_values:
-            prompt_message.append(MessagesPlaceholder("chat_history"))
-
-        prompt_message.append(HumanMessagePromptTemplate.from_template("{query}"))
-        return ChatPromptTemplate.from_messages(prompt_message), llm_input_values
-
-    def _generate_prompt_granite(self) -> tuple[PromptTemplate, dict]:
-        """Generate prompt for Granite."""
-        prompt_message = "<|system|>\n" + self._sys_instruction.strip() + "\n"
-        llm_input_values = {"query": self._query}
-
-        if len(self._rag_context) > 0:
-            llm_input_values["context"] = "".join(self._rag_context)
-            prompt_message = (
-                prompt_message + "\n" + prompts.USE_CONTEXT_INSTRUCTION.strip()
-            )
-
-        if len(self._history) > 0:
-            prompt_message = (
-                prompt_message + "\n" + prompts.USE_HISTORY_INSTRUCTION.strip()
-            )
-            llm_input_values["chat_history"] = ""
-            for message in self._history:
-                llm_input_values["chat_history"] += message.content
-
-        if "context" in llm_input_values:
-            prompt_message = prompt_message + "\n{context}"
-        if "chat_history" in llm_input_values:
-            prompt_message = prompt_message + "\n{chat_history}"
+            if model_family(model) == ModelFamily.GRANITE:
+                llm_input_values["chat_history"] = "".join(
+                    message.content for message in self._history
+                )
+            else:
+                llm_input_values["chat_history"] = self._history
 
-        prompt_message = prompt_message + "\n<|user|>\n{query}\n<|assistant|>\n"
-        return PromptTemplate.from_template(prompt_message), llm_input_values
+        return llm_input_values
 
     def generate_prompt(
         self, model: str
     ) -> tuple[ChatPromptTemplate | PromptTemplate, dict]:
         """Generate prompt."""
-        if ModelFamily.GRANITE in model:
-            return self._generate_prompt_granite()
-        return self._generate_prompt_gpt()
+        return self.compiled_prompt(model).template, self._input_values(model)
@@ -1,32 +1,35 @@
 """A class for summarizing documentation context."""
 
+import asyncio
 import logging
 from typing import Any, AsyncGenerator, Optional
 
 from langchain.chains import LLMChain
-from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.messages import BaseMessage
 from langchain_core.prompts import ChatPromptTemplate
 from llama_index.core import VectorStoreIndex
 
 from ols import config
-from ols.app.metrics import TokenMetricUpdater
+from ols.app.metrics import GenericTokenCounter, TokenMetricUpdater
 from ols.app.models.models import RagChunk, SummarizerResponse
 from ols.constants import RAG_CONTENT_LIMIT, GenericLLMParameters
 from ols.customize import reranker
-from ols.src.prompts.prompt_generator import (
-    GeneratePrompt,
-    restructure_history,
-    restructure_rag_context,
-)
+from ols.src.prompts.prompt_generator import GeneratePrompt, prompt_templates
 from ols.src.query_helpers.query_helper import QueryHelper
 from ols.utils.token_handler import TokenHandler
 
 logger = logging.getLogger(__name__)
 
+# final prompt, input values, RAG chunks and a flag for truncated history
+PreparedPrompt = tuple[ChatPromptTemplate, dict[str, str], list[RagChunk], bool]
+
 
 class DocsSummarizer(QueryHelper):
     """A class for summarizing documentation context."""
 
+    # responses streamed by `generate_response` are not cached
+    llm_call_cache_name = "docs_summarizer"
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         """Initialize the QuestionValidator."""
         super().__init__(*args, **kwargs)
@@ -44,18 +47,21 @@ class DocsSummarizer(QueryHelper):
             self.provider, self.model, self.generic_llm_params, self.streaming
         )
 
-    def _prepare_prompt(
+    def prepare_prompt(
         self,
         query: str,
         vector_index: Optional[VectorStoreIndex] = None,
         history: Optional[list[BaseMessage]] = None,
-    ) -> tuple[ChatPromptTemplate, dict[str, str], list[RagChunk], bool]:
+        history_token_counts: Optional[list[dict[str, int]]] = None,
+    ) -> PreparedPrompt:
         """Summarize the given query based on the provided conversation context.
 
         Args:
             query: The query to be summarized.
             vector_index: Vector index to get RAG data/context.
             history: The history of the conversation (if available).
+            history_token_counts: Token counts of history messages stored
+                in conversation cache (if available).
 
         Returns:
             A tuple containing the final prompt, input values, RAG chunks,
@@ -75,20 +81,19 @@ class DocsSummarizer(QueryHelper):
 
         token_handler = TokenHandler()
 
-        # Use sample text for context/history to get complete prompt
-        # instruction. This is used to calculate available tokens.
-        temp_prompt, temp_prompt_input = GeneratePrompt(
-            # Sample prompt's context/history must be re-structured for the given model,
-            # to ensure the further right available token calculation.
-            query,
-            [restructure_rag_context("sample", self.model)],
-            [restructure_history(AIMessage("sample"), self.model)],
-            self._system_prompt,
-        ).generate_prompt(self.model)
-        available_tokens = token_handler.calculate_and_check_available_tokens(
-            temp_prompt.format(**temp_prompt_input),
-            self.model_config.context_window_size,
-            self.model_config.parameters.max_tokens_for_response,
+        context_window_size = self.model_config.context_window_size
+        max_tokens_for_response = self.model_config.parameters.max_tokens_for_response
+
+        # Prompt with both context and history has the largest fixed part,
+        # its token count is computed once, when the template is compiled.
+        query_tokens = token_handler.text_to_token_count(query)
+        full_prompt = prompt_templates.get(
+            self.model, self._system_prompt, has_context=True, has_history=True
+        )
+        available_tokens = token_handler.check_available_tokens(
+            full_prompt.skeleton_tokens + query_tokens,
+            context_window_size,
+            max_tokens_for_response,
         )
 
         # Retrieve RAG content
@@ -96,63 +101,81 @@ class DocsSummarizer(QueryHelper):
             retriever = vector_index.as_retriever(similarity_top_k=RAG_CONTENT_LIMIT)
             retrieved_nodes = retriever.retrieve(query)
             retrieved_nodes = reranker.rerank(retrieved_nodes)
-            rag_chunks, available_tokens = token_handler.truncate_rag_context(
-                retrieved_nodes, self.model, available_tokens
+            rag_chunks, rag_available_tokens = token_handler.truncate_rag_context(
+                retrieved_nodes, self.model, available_tokens, config.rag_chunk_tokens
             )
+            rag_tokens = available_tokens - rag_available_tokens
+            available_tokens = rag_available_tokens
         else:
             logger.warning("Proceeding without RAG content. Check start up messages.")
             rag_chunks = []
+            rag_tokens = 0
         rag_context = [rag_chunk.text for rag_chunk in rag_chunks]
         if len(rag_context) == 0:
             logger.debug("Using llm to answer the query without reference content")
 
         # Truncate history
-        history, truncated = token_handler.limit_conversation_history(
-            history or [], self.model, available_tokens
+        limited_history, truncated = token_handler.limit_conversation_history(
+            history, self.model, available_tokens, history_token_counts
+        )
+        if history_token_counts is not None:
+            # token counts of the messages that were kept
+            history_token_counts = history_token_counts[
+                len(history) - len(limited_history) :
+            ]
+        history_tokens = token_handler.history_to_token_count(
+            limited_history, self.model, history_token_counts
+        )
+
+        prompt_generator = GeneratePrompt(
+            query, rag_context, limited_history, self._system_prompt
         )
+        compiled_prompt = prompt_generator.compiled_prompt(self.model)
+        final_prompt, llm_input_values = prompt_generator.generate_prompt(self.model)
 
-        final_prompt, llm_input_values = GeneratePrompt(
-            query, rag_context, history, self._system_prompt
-        ).generate_prompt(self.model)
-
-        # Tokens-check: We trigger the computation of the token count
-        # without care about the return value. This is to ensure that
-        # the query is within the token limit.
-        token_handler.calculate_and_check_available_tokens(
-            final_prompt.format(**llm_input_values),
-            self.model_config.context_window_size,
-            self.model_config.parameters.max_tokens_for_response,
+        # Tokens-check: the final prompt is not tokenized again, tokens of its
+        # parts are summed to ensure that the query is within the token limit.
+        token_handler.check_available_tokens(
+            compiled_prompt.skeleton_tokens
+            + query_tokens
+            + rag_tokens
+            + history_tokens,
+            context_window_size,
+            max_tokens_for_response,
         )
 
         return final_prompt, llm_input_values, rag_chunks, truncated
 
-    def create_response(
-        self,
-        query: str,
-        vector_index: Optional[VectorStoreIndex] = None,
-        history: Optional[list[str]] = None,
-    ) -> SummarizerResponse:
-        """Create a response for the given query based on the provided conversation context."""
-        final_prompt, llm_input_values, rag_chunks, truncated = self._prepare_prompt(
-            query, vector_index, history
-        )
+    def _prepare_chain(
+        self, prepared_prompt: PreparedPrompt
+    ) -> tuple[LLMChain, TokenMetricUpdater]:
+        """Prepare the chat chain together with the token counter for it."""
+        final_prompt, llm_input_values, _, _ = prepared_prompt
 
-        print(final_prompt.format(**llm_input_values))
+        # formatting the whole prompt is not cheap, skip it when not logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s", final_prompt.format(**llm_input_values))
         chat_engine = LLMChain(
             llm=self.bare_llm,
             prompt=final_prompt,
             verbose=self.verbose,
         )
 
-        with TokenMetricUpdater(
+        token_metric_updater = TokenMetricUpdater(
             llm=self.bare_llm,
             provider=self.provider_config.type,
             model=self.model,
-        ) as generic_token_counter:
-            summary = chat_engine.invoke(
-                input=llm_input_values,
-                config={"callbacks": [generic_token_counter]},
-            )
+        )
+        return chat_engine, token_metric_updater
+
+    @staticmethod
+    def _process_response(
+        summary: dict[str, Any],
+        prepared_prompt: PreparedPrompt,
+        generic_token_counter: GenericTokenCounter,
+    ) -> SummarizerResponse:
+        """Construct summarizer response from the text returned by LLM."""
+        _, _, rag_chunks, truncated = prepared_prompt
         # retrieve text response returned from LLM, strip whitespace characters from beginning/end
         response = summary["text"].strip()
         # TODO: Better handling of stop token.
@@ -163,16 +186,76 @@ class DocsSummarizer(QueryHelper):
             response, rag_chunks, truncated, generic_token_counter.token_counter
         )
 
+    def create_response(
+        self,
+        query: str,
+        vector_index: Optional[VectorStoreIndex] = None,
+        history: Optional[list[str]] = None,
+        prepared_prompt: Optional[PreparedPrompt] = None,
+        history_token_counts: Optional[list[dict[str, int]]] = None,
+    ) -> SummarizerResponse:
+        """Create a response for the given query based on the provided conversation context.
+
+        The prompt (including RAG retrieval) is prepared from the query, vector
+        index and history unless it has already been prepared by the caller.
+        """
+        if prepared_prompt is None:
+            prepared_prompt = self.prepare_prompt(
+                query, vector_index, history, history_token_counts
+            )
+        chat_engine, token_metric_updater = self._prepare_chain(prepared_prompt)
+        llm_input_values = prepared_prompt[1]
+
+        with token_metric_updater as generic_token_counter:
+            summary = self.invoke_llm_chain(
+                chat_engine, llm_input_values, [generic_token_counter]
+            )
+        return self._process_response(summary, prepared_prompt, generic_token_counter)
+
+    async def acreate_response(
+        self,
+        query: str,
+        vector_index: Optional[VectorStoreIndex] = None,
+        history: Optional[list[str]] = None,
+        prepared_prompt: Optional[PreparedPrompt] = None,
+        history_token_counts: Optional[list[dict[str, int]]] = None,
+    ) -> SummarizerResponse:
+        """Create a response asynchronously, see `create_response`.
+
+        The prompt preparation (including RAG retrieval) is blocking, so it
+        is offloaded to worker thread when it needs to be performed.
+        """
+        if prepared_prompt is None:
+            prepared_prompt = await asyncio.to_thread(
+                self.prepare_prompt, query, vector_index, history, history_token_counts
+            )
+        chat_engine, token_metric_updater = self._prepare_chain(prepared_prompt)
+        llm_input_values = prepared_prompt[1]
+
+        with token_metric_updater as generic_token_counter:
+            summary = await self.ainvoke_llm_chain(
+                chat_engine, llm_input_values, [generic_token_counter]
+            )
+        return self._process_response(summary, prepared_prompt, generic_token_counter)
+
     async def generate_response(
         self,
         query: str,
         vector_index: Optional[VectorStoreIndex] = None,
         history: Optional[list[str]] = None,
+        prepared_prompt: Optional[PreparedPrompt] = None,
+        history_token_counts: Optional[list[dict[str, int]]] = None,
     ) -> AsyncGenerator[str, SummarizerResponse]:
-        """Generate a response for the given query based on the provided conversation context."""
-        final_prompt, llm_input_values, rag_chunks, truncated = self._prepare_prompt(
-            query, vector_index, history
-        )
+        """Generate a response for the given query based on the provided conversation context.
+
+        The prompt (including RAG retrieval) is prepared from the query, vector
+        index and history unless it has already been prepared by the caller.
+        """
+        if prepared_prompt is None:
+            prepared_prompt = self.prepare_prompt(
+                query, vector_index, history, history_token_counts
+            )
+        final_prompt, llm_input_values, rag_chunks, truncated = prepared_prompt
 
         with TokenMetricUpdater(
             llm=self.bare_llm,
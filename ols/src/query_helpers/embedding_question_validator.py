@@ -0,0 +1,132 @@
+"""Validation of questions by similarity of their embeddings, without LLM call."""
+
+import logging
+from collections.abc import Callable, Sequence
+from typing import Any, Optional
+
+import numpy as np
+
+from ols import constants
+from ols.app.models.config import EmbeddingValidationConfig
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    """Normalize embeddings (rows of the matrix) to unit length."""
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return embeddings / np.where(norms > 0, norms, 1.0)
+
+
+def index_centroid(vector_index: Any) -> Optional[np.ndarray]:
+    """Compute centroid of normalized embeddings of the index documents.
+
+    Embeddings are read from FAISS index in batches, so the whole index is
+    never copied. None is returned when the embeddings can not be read (the
+    index is stored in Postgres or the FAISS index does not keep vectors).
+
+    Args:
+        vector_index: The loaded RAG index.
+
+    Returns:
+        Normalized centroid of the document embeddings.
+    """
+    try:
+        faiss_index = vector_index.vector_store._faiss_index
+        total = faiss_index.ntotal
+        if total == 0:
+            return None
+        centroid = np.zeros(faiss_index.d, dtype=np.float64)
+        batch_size = constants.EMBEDDING_VALIDATION_CENTROID_BATCH_SIZE
+        for start in range(0, total, batch_size):
+            batch = faiss_index.reconstruct_n(start, min(batch_size, total - start))
+            centroid += _normalize(np.asarray(batch, dtype=np.float64)).sum(axis=0)
+    except Exception as e:
+        logger.info("unable to compute centroid of RAG index embeddings: %s", e)
+        return None
+    return _normalize(centroid).astype(np.float32)
+
+
+class EmbeddingQuestionValidator:
+    """Classify questions as on-topic or off-topic by their embeddings.
+
+    The question is embedded by the embedding model of the RAG index and
+    scored by its similarity to on-topic content (the centroid of the index
+    documents and the allowed examples) minus its similarity to the rejected
+    examples. Questions scored within the configured margin around the
+    threshold are ambiguous and can be validated by LLM instead.
+    """
+
+    def __init__(
+        self,
+        config: EmbeddingValidationConfig,
+        embed: Callable[[str], list[float]],
+        allowed_examples: Sequence[str],
+        rejected_examples: Sequence[str],
+        centroid: Optional[np.ndarray] = None,
+    ) -> None:
+        """Initialize the validator, the examples are embedded right away.
+
+        Args:
+            config: Configuration of embedding based validation.
+            embed: Function returning embedding of the text.
+            allowed_examples: Questions that are on-topic.
+            rejected_examples: Questions that are off-topic.
+            centroid: Normalized centroid of the index document embeddings.
+        """
+        self.threshold = config.threshold
+        self.margin = config.margin
+        self.llm_fallback = config.llm_fallback
+        self._embed = embed
+        allowed = [self._embed_text(text) for text in allowed_examples]
+        if centroid is not None:
+            allowed.append(centroid)
+        rejected = [self._embed_text(text) for text in rejected_examples]
+        if not allowed or not rejected:
+            raise ValueError("on-topic and off-topic examples are required")
+        self._allowed = np.stack(allowed)
+        self._rejected = np.stack(rejected)
+
+    def _embed_text(self, text: str) -> np.ndarray:
+        """Return normalized embedding of the text."""
+        return _normalize(np.asarray(self._embed(text), dtype=np.float32))
+
+    def score(self, query: str) -> float:
+        """Score the question, higher score means the question is on-topic.
+
+        Args:
+            query: The (redacted) question.
+
+        Returns:
+            Similarity to on-topic content minus similarity to off-topic examples.
+        """
+        embedding = self._embed_text(query)
+        if self._allowed.shape[1] != embedding.shape[0]:
+            raise ValueError("embedding dimension of the question does not match")
+        return float(np.max(self._allowed @ embedding)) - float(
+            np.max(self._rejected @ embedding)
+        )
+
+    def validate_question(self, query: str) -> Optional[bool]:
+        """Validate the question.
+
+        Args:
+            query: The (redacted) question.
+
+        Returns:
+            True if the question is on-topic, False if it is off-topic, None
+            if it is ambiguous and it is to be validated by LLM.
+        """
+        # metrics module constructs auth dependency when imported
+        from ols.app import metrics
+
+        score = self.score(query)
+        logger.debug("question validation score: %.3f", score)
+        if self.llm_fallback and abs(score - self.threshold) < self.margin:
+            metrics.embedding_validation_total.labels("ambiguous").inc()
+            return None
+        valid = score >= self.threshold
+        metrics.embedding_validation_total.labels(
+            "allowed" if valid else "rejected"
+        ).inc()
+        return valid
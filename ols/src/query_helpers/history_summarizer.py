@@ -0,0 +1,119 @@
+"""Class responsible for summarizing older turns of long conversations."""
+
+import logging
+from typing import Any, Optional
+
+from langchain.chains import LLMChain
+from langchain.prompts import PromptTemplate
+from langchain_core.messages import BaseMessage
+
+from ols import config
+from ols.app.metrics import TokenMetricUpdater
+from ols.constants import GenericLLMParameters
+from ols.customize import prompts
+from ols.src.query_helpers.query_helper import QueryHelper
+from ols.utils.token_handler import TokenHandler
+
+logger = logging.getLogger(__name__)
+
+
+class HistorySummarizer(QueryHelper):
+    """This class is responsible for folding conversation history into summary."""
+
+    max_tokens_for_response = 512
+
+    llm_call_cache_name = "history_summarizer"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the HistorySummarizer."""
+        super().__init__(*args, **kwargs)
+        self._prepare_llm()
+        self.verbose = config.ols_config.logging_config.app_log_level == logging.DEBUG
+
+    def _prepare_llm(self) -> None:
+        """Prepare the LLM configuration."""
+        self.provider_config = config.llm_config.providers.get(self.provider)
+        self.model_config = self.provider_config.models.get(self.model)
+        # summary is never longer than the model response is allowed to be
+        self.max_tokens_for_response = min(
+            HistorySummarizer.max_tokens_for_response,
+            self.model_config.parameters.max_tokens_for_response,
+        )
+        self.generic_llm_params = {
+            GenericLLMParameters.MAX_TOKENS_FOR_RESPONSE: self.max_tokens_for_response
+        }
+        self.bare_llm = self.llm_loader(
+            self.provider, self.model, self.generic_llm_params, self.streaming
+        )
+
+    def summarize_history(
+        self,
+        conversation_id: str,
+        history: list[BaseMessage],
+        history_token_counts: Optional[list[dict[str, int]]] = None,
+    ) -> str:
+        """Summarize the conversation history.
+
+        The oldest messages are left out when the history does not fit into
+        the model context window.
+
+        Args:
+          conversation_id: The identifier for the conversation or task context.
+          history: Messages of the conversation to be summarized.
+          history_token_counts: Token counts of the messages stored in
+            conversation cache (if available).
+
+        Returns:
+            str: summary of the conversation, empty if summarization is disabled
+        """
+        if not prompts.HISTORY_SUMMARY_PROMPT_TEMPLATE:
+            logger.debug(
+                "HISTORY_SUMMARY_PROMPT_TEMPLATE is not set. History summarization is skipped."
+            )
+            return ""
+
+        prompt_instructions = PromptTemplate.from_template(
+            prompts.HISTORY_SUMMARY_PROMPT_TEMPLATE
+        )
+        token_handler = TokenHandler()
+        available_tokens = token_handler.calculate_and_check_available_tokens(
+            prompt_instructions.format(history=""),
+            self.model_config.context_window_size,
+            self.max_tokens_for_response,
+        )
+        history, truncated = token_handler.limit_conversation_history(
+            history, self.model, available_tokens, history_token_counts
+        )
+        if truncated:
+            logger.warning(
+                "%s history is too long, the oldest messages are not summarized",
+                conversation_id,
+            )
+
+        llm_chain = LLMChain(
+            llm=self.bare_llm,
+            prompt=prompt_instructions,
+            verbose=self.verbose,
+        )
+        token_metric_updater = TokenMetricUpdater(
+            llm=self.bare_llm,
+            provider=self.provider_config.type,
+            model=self.model,
+        )
+
+        logger.debug(
+            "%s summarizing %d history messages", conversation_id, len(history)
+        )
+        with token_metric_updater as generic_token_counter:
+            response = self.invoke_llm_chain(
+                llm_chain,
+                {
+                    "history": "\n".join(
+                        f"{message.type}: {message.content}" for message in history
+                    )
+                },
+                [generic_token_counter],
+            )
+        summary = str(response["text"]).strip()
+        logger.debug("%s history summary: %s", conversation_id, summary)
+        return summary
@@ -2,12 +2,15 @@
 
 import logging
 from collections.abc import Callable
-from typing import Optional
+from typing import Any, Optional
 
+from langchain.chains import LLMChain
 from langchain.llms.base import LLM
+from langchain_core.callbacks import BaseCallbackHandler
 
 from ols import config
 from ols.customize import prompts
+from ols.src.cache.llm_call_cache import LLMCallCache
 from ols.src.llms.llm_loader import load_llm
 
 logger = logging.getLogger(__name__)
@@ -16,6 +19,9 @@ logger = logging.getLogger(__name__)
 class QueryHelper:
     """Base class for query helpers."""
 
+    # name of the helper used to enable caching of its LLM calls in configuration
+    llm_call_cache_name: Optional[str] = None
+
     def __init__(
         self,
         provider: Optional[str] = None,
@@ -41,3 +47,113 @@ class QueryHelper:
             or prompts.QUERY_SYSTEM_INSTRUCTION
         )
         logger.debug("System prompt: %s", self._system_prompt)
+
+    @property
+    def system_prompt(self) -> str:
+        """Return the system prompt used by the query helper."""
+        return self._system_prompt
+
+    def _llm_call_cache(self) -> Optional[LLMCallCache]:
+        """Return the LLM call cache, None if it is not enabled for the helper."""
+        cache_config = config.ols_config.llm_call_cache
+        if cache_config is None or self.llm_call_cache_name not in cache_config.helpers:
+            return None
+        return config.llm_call_cache
+
+    def _llm_call_key(self, llm_chain: LLMChain, input_values: dict[str, Any]) -> str:
+        """Construct cache key of the LLM call made by the chain."""
+        return LLMCallCache.construct_key(
+            self.provider,
+            self.model,
+            llm_chain.prompt.format(**input_values),
+            self.generic_llm_params,
+        )
+
+    def _record_llm_call_cache_request(self, hit: bool) -> None:
+        """Record lookup of the LLM call in the cache."""
+        # metrics module constructs auth dependency when imported
+        from ols.app import metrics
+
+        metrics.llm_call_cache_requests_total.labels(
+            self.llm_call_cache_name, "hit" if hit else "miss"
+        ).inc()
+
+    def invoke_llm_chain(
+        self,
+        llm_chain: LLMChain,
+        input_values: dict[str, Any],
+        callbacks: list[BaseCallbackHandler],
+    ) -> dict[str, Any]:
+        """Invoke the chain, its response is cached when it is enabled for the helper.
+
+        Failures of the cache are logged only, the LLM is called instead.
+
+        Args:
+            llm_chain: The chain to be invoked.
+            input_values: Values of the prompt variables.
+            callbacks: Callbacks of the LLM call (token counters).
+
+        Returns:
+            Response of the chain with the generated text.
+        """
+        cache = self._llm_call_cache()
+        if cache is None:
+            return llm_chain.invoke(input=input_values, config={"callbacks": callbacks})
+
+        key = self._llm_call_key(llm_chain, input_values)
+        try:
+            text = cache.get(key)
+        except Exception as e:
+            logger.error("unable to read LLM call cache: %s", e)
+            text = None
+        self._record_llm_call_cache_request(text is not None)
+        if text is not None:
+            return {"text": text}
+
+        response = llm_chain.invoke(input=input_values, config={"callbacks": callbacks})
+        try:
+            cache.set(key, str(response["text"]))
+        except Exception as e:
+            logger.error("unable to store LLM call into cache: %s", e)
+        return response
+
+    async def ainvoke_llm_chain(
+        self,
+        llm_chain: LLMChain,
+        input_values: dict[str, Any],
+        callbacks: list[BaseCallbackHandler],
+    ) -> dict[str, Any]:
+        """Invoke the chain asynchronously, see `invoke_llm_chain`.
+
+        Args:
+            llm_chain: The chain to be invoked.
+            input_values: Values of the prompt variables.
+            callbacks: Callbacks of the LLM call (token counters).
+
+        Returns:
+            Response of the chain with the generated text.
+        """
+        cache = self._llm_call_cache()
+        if cache is None:
+            return await llm_chain.ainvoke(
+                input=input_values, config={"callbacks": callbacks}
+            )
+
+        key = self._llm_call_key(llm_chain, input_values)
+        try:
+            text = await cache.aget(key)
+        except Exception as e:
+            logger.error("unable to read LLM call cache: %s", e)
+            text = None
+        self._record_llm_call_cache_request(text is not None)
+        if text is not None:
+            return {"text": text}
+
+        response = await llm_chain.ainvoke(
+            input=input_values, config={"callbacks": callbacks}
+        )
+        try:
+            await cache.aset(key, str(response["text"]))
+        except Exception as e:
+            logger.error("unable to store LLM call into cache: %s", e)
+        return response
@@ -24,6 +24,8 @@ class QuestionValidator(QueryHelper):
     # a fixed responses for that
     max_tokens_for_response = 4
 
+    llm_call_cache_name = "question_validator"
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         """Initialize the QuestionValidator."""
         generic_llm_params = {
@@ -31,19 +33,10 @@ class QuestionValidator(QueryHelper):
         }
         super().__init__(*args, **dict(kwargs, generic_llm_params=generic_llm_params))
 
-    def validate_question(
-        self, conversation_id: str, query: str, verbose: bool = False
-    ) -> bool:
-        """Validate a question and provides a one-word response.
-
-        Args:
-          conversation_id: The identifier for the conversation or task context.
-          query: The question to be validated.
-          verbose: If `LLMChain` should be verbose. Defaults to `False`.
-
-        Returns:
-            bool: true/false indicating if the question was deemed valid
-        """
+    def _prepare_chain(
+        self, conversation_id: str, query: str, verbose: bool
+    ) -> tuple[LLMChain, TokenMetricUpdater]:
+        """Prepare the validation chain together with the token counter for it."""
         settings_string = (
             f"conversation_id: {conversation_id}, "
             f"query: {query}, "
@@ -78,14 +71,16 @@ class QuestionValidator(QueryHelper):
 
         logger.debug("%s validating user query: %s", conversation_id, query)
 
-        with TokenMetricUpdater(
+        token_metric_updater = TokenMetricUpdater(
             llm=bare_llm,
             provider=provider_config.type,
             model=self.model,
-        ) as generic_token_counter:
-            response = llm_chain.invoke(
-                input={"query": query}, config={"callbacks": [generic_token_counter]}
-            )
+        )
+        return llm_chain, token_metric_updater
+
+    @staticmethod
+    def _process_response(conversation_id: str, response: dict[str, Any]) -> bool:
+        """Check the validation response returned by LLM."""
         clean_response = str(response["text"]).strip()
 
         logger.debug(
@@ -95,3 +90,47 @@ class QuestionValidator(QueryHelper):
         # Default to be permissive(allow the question) if we don't get a clean
         # rejection from the LLM.
         return SUBJECT_REJECTED not in clean_response
+
+    def validate_question(
+        self, conversation_id: str, query: str, verbose: bool = False
+    ) -> bool:
+        """Validate a question and provides a one-word response.
+
+        Args:
+          conversation_id: The identifier for the conversation or task context.
+          query: The question to be validated.
+          verbose: If `LLMChain` should be verbose. Defaults to `False`.
+
+        Returns:
+            bool: true/false indicating if the question was deemed valid
+        """
+        llm_chain, token_metric_updater = self._prepare_chain(
+            conversation_id, query, verbose
+        )
+        with token_metric_updater as generic_token_counter:
+            response = self.invoke_llm_chain(
+                llm_chain, {"query": query}, [generic_token_counter]
+            )
+        return self._process_response(conversation_id, response)
+
+    async def avalidate_question(
+        self, conversation_id: str, query: str, verbose: bool = False
+    ) -> bool:
+        """Validate a question asynchronously, see `validate_question`.
+
+        Args:
+          conversation_id: The identifier for the conversation or task context.
+          query: The question to be validated.
+          verbose: If `LLMChain` should be verbose. Defaults to `False`.
+
+        Returns:
+            bool: true/false indicating if the question was deemed valid
+        """
+        llm_chain, token_metric_updater = self._prepare_chain(
+            conversation_id, query, verbose
+        )
+        with token_metric_updater as generic_token_counter:
+            response = await self.ainvoke_llm_chain(
+                llm_chain, {"query": query}, [generic_token_counter]
+            )
+        return self._process_response(conversation_id, response)
@@ -1,7 +1,7 @@
 """Class responsible for validating questions and providing one-word responses."""
 
 import logging
-from typing import Any
+from typing import Any, Optional
 
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
@@ -21,6 +21,8 @@ class TopicSummarizer(QueryHelper):
 
     max_tokens_for_response = 4
 
+    llm_call_cache_name = "topic_summarizer"
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         """Initialize the QuestionValidator."""
         super().__init__(*args, **kwargs)
@@ -38,21 +40,18 @@ class TopicSummarizer(QueryHelper):
             self.provider, self.model, self.generic_llm_params, self.streaming
         )
 
-    def summarize_topic(self, conversation_id: str, query: str) -> str:
-        """Summarize the user initial purpose and return a topic in responses.
+    def _prepare_chain(
+        self, conversation_id: str, query: str
+    ) -> Optional[tuple[LLMChain, TokenMetricUpdater]]:
+        """Prepare the summarization chain together with the token counter for it.
 
-        Args:
-          conversation_id: The identifier for the conversation or task context.
-          query: The question to be summarized.
-
-        Returns:
-            str: summarized conversation topic
+        None is returned when topic summarization is not enabled.
         """
         if not prompts.TOPIC_SUMMARY_PROMPT_TEMPLATE:
             logger.debug(
                 "TOPIC_SUMMARY_PROMPT_TEMPLATE is not set. Topic summarization is skipped."
             )
-            return ""
+            return None
 
         settings_string = (
             f"conversation_id: {conversation_id}, "
@@ -67,10 +66,6 @@ class TopicSummarizer(QueryHelper):
             prompts.TOPIC_SUMMARY_PROMPT_TEMPLATE
         )
 
-        bare_llm = self.llm_loader(
-            self.provider, self.model, self.generic_llm_params, self.streaming
-        )
-
         # Tokens-check: We trigger the computation of the token count
         # without care about the return value. This is to ensure that
         # the query is within the token limit.
@@ -81,23 +76,67 @@ class TopicSummarizer(QueryHelper):
         )
 
         llm_chain = LLMChain(
-            llm=bare_llm,
+            llm=self.bare_llm,
             prompt=prompt_instructions,
             verbose=self.verbose,
         )
 
         logger.debug("%s summarizing user query: %s", conversation_id, query)
 
-        with TokenMetricUpdater(
-            llm=bare_llm,
+        token_metric_updater = TokenMetricUpdater(
+            llm=self.bare_llm,
             provider=provider_config.type,
             model=self.model,
-        ) as generic_token_counter:
-            response = llm_chain.invoke(
-                input={"query": query}, config={"callbacks": [generic_token_counter]}
-            )
+        )
+        return llm_chain, token_metric_updater
+
+    @staticmethod
+    def _process_response(conversation_id: str, response: dict[str, Any]) -> str:
+        """Clean up the summary returned by LLM."""
         clean_response = str(response["text"]).strip()
 
         logger.debug("%s summarizer response: %s", conversation_id, clean_response)
 
         return clean_response
+
+    def summarize_topic(self, conversation_id: str, query: str) -> str:
+        """Summarize the user initial purpose and return a topic in responses.
+
+        Args:
+          conversation_id: The identifier for the conversation or task context.
+          query: The question to be summarized.
+
+        Returns:
+            str: summarized conversation topic
+        """
+        prepared = self._prepare_chain(conversation_id, query)
+        if prepared is None:
+            return ""
+        llm_chain, token_metric_updater = prepared
+
+        with token_metric_updater as generic_token_counter:
+            response = self.invoke_llm_chain(
+                llm_chain, {"query": query}, [generic_token_counter]
+            )
+        return self._process_response(conversation_id, response)
+
+    async def asummarize_topic(self, conversation_id: str, query: str) -> str:
+        """Summarize the user initial purpose asynchronously, see `summarize_topic`.
+
+        Args:
+          conversation_id: The identifier for the conversation or task context.
+          query: The question to be summarized.
+
+        Returns:
+            str: summarized conversation topic
+        """
+        prepared = self._prepare_chain(conversation_id, query)
+        if prepared is None:
+            return ""
+        llm_chain, token_metric_updater = prepared
+
+        with token_metric_updater as generic_token_counter:
+            response = await self.ainvoke_llm_chain(
+                llm_chain, {"query": query}, [generic_token_counter]
+            )
+        return self._process_response(conversation_id, response)
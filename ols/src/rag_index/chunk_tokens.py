@@ -0,0 +1,171 @@
+"""Tokens of RAG chunks computed once, when the index is loaded."""
+
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from ols.utils.token_handler import TokenHandler
+
+logger = logging.getLogger(__name__)
+
+# sidecar file stored next to the FAISS index, one per tokenizer
+CHUNK_TOKENS_FILE = "rag_chunk_tokens.{encoding}.npz"
+
+
+def fingerprint(chunks: dict[str, str]) -> str:
+    """Compute fingerprint of the chunks, so stale sidecar file is detected."""
+    digest = hashlib.sha256()
+    for node_id in sorted(chunks):
+        digest.update(node_id.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(chunks[node_id].encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ChunkTokens:
+    """Tokens of the text of RAG chunks keyed by node ID.
+
+    Tokens of all chunks are kept in one array, so the memory overhead per
+    chunk is small. Tags prepended to the chunks for given model family are
+    not part of the tokens, they are tokenized separately when the chunk is
+    used (see `TokenHandler.truncate_rag_context`).
+    """
+
+    def __init__(
+        self,
+        encoding_name: str,
+        node_ids: list[str],
+        offsets: np.ndarray,
+        tokens: np.ndarray,
+    ) -> None:
+        """Initialize the chunk tokens.
+
+        Args:
+            encoding_name: Name of the tokenizer used to tokenize the chunks.
+            node_ids: IDs of the nodes in the order of their tokens.
+            offsets: Start of tokens of every node and the end of the last one.
+            tokens: Concatenated tokens of all nodes.
+        """
+        self.encoding_name = encoding_name
+        self._offsets = offsets
+        self._tokens = tokens
+        self._index = {node_id: i for i, node_id in enumerate(node_ids)}
+
+    def __len__(self) -> int:
+        """Return number of chunks."""
+        return len(self._index)
+
+    def get(self, node_id: Optional[str]) -> Optional[list[int]]:
+        """Return tokens of the chunk text, None if the chunk is not known."""
+        i = self._index.get(node_id)  # type: ignore[arg-type]
+        if i is None:
+            return None
+        return self._tokens[self._offsets[i] : self._offsets[i + 1]].tolist()
+
+    @classmethod
+    def build(
+        cls, chunks: dict[str, str], token_handler: TokenHandler
+    ) -> "ChunkTokens":
+        """Tokenize text of the chunks.
+
+        Args:
+            chunks: Text of the chunks keyed by node ID.
+            token_handler: Token handler used to tokenize the text.
+
+        Returns:
+            Tokens of the chunks.
+        """
+        node_ids = sorted(chunks)
+        tokenized = [token_handler.text_to_tokens(chunks[i]) for i in node_ids]
+        offsets = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum([len(tokens) for tokens in tokenized], out=offsets[1:])
+        tokens = np.fromiter(
+            (token for chunk in tokenized for token in chunk),
+            dtype=np.uint32,
+            count=int(offsets[-1]),
+        )
+        return cls(token_handler.encoding_name, node_ids, offsets, tokens)
+
+    def save(self, path: str, chunks_fingerprint: str) -> None:
+        """Store the tokens into file, it is replaced atomically."""
+        node_ids = [""] * len(self._index)
+        for node_id, i in self._index.items():
+            node_ids[i] = node_id
+        directory = os.path.dirname(path) or "."
+        with tempfile.NamedTemporaryFile(
+            dir=directory, suffix=".npz", delete=False
+        ) as f:
+            try:
+                np.savez(
+                    f,
+                    fingerprint=np.array(chunks_fingerprint),
+                    encoding=np.array(self.encoding_name),
+                    node_ids=np.array(node_ids, dtype=np.str_),
+                    offsets=self._offsets,
+                    tokens=self._tokens,
+                )
+            except Exception:
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, path)
+
+    @classmethod
+    def load(cls, path: str, chunks_fingerprint: str) -> Optional["ChunkTokens"]:
+        """Load the tokens from file, None if they are stale or missing."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            if str(data["fingerprint"]) != chunks_fingerprint:
+                logger.info("RAG chunk tokens in %s are stale", path)
+                return None
+            return cls(
+                str(data["encoding"]),
+                data["node_ids"].tolist(),
+                data["offsets"],
+                data["tokens"],
+            )
+
+
+def load_chunk_tokens(index_path: Optional[str], chunks: dict[str, str]) -> ChunkTokens:
+    """Load tokens of the chunks from sidecar file or tokenize the chunks.
+
+    Tokens computed when the sidecar file is missing or stale are stored,
+    so other replicas (and restarts) do not need to tokenize the chunks.
+
+    Args:
+        index_path: Directory with the index, sidecar file is not used if None.
+        chunks: Text of the chunks keyed by node ID.
+
+    Returns:
+        Tokens of the chunks.
+    """
+    token_handler = TokenHandler()
+    chunks_fingerprint = fingerprint(chunks)
+    path = None
+    if index_path is not None:
+        path = os.path.join(
+            index_path, CHUNK_TOKENS_FILE.format(encoding=token_handler.encoding_name)
+        )
+        try:
+            chunk_tokens = ChunkTokens.load(path, chunks_fingerprint)
+            if chunk_tokens is not None:
+                logger.info("RAG chunk tokens loaded from %s", path)
+                return chunk_tokens
+        except Exception as e:
+            logger.warning("unable to load RAG chunk tokens from %s: %s", path, e)
+
+    logger.info("Tokenizing %d RAG chunks...", len(chunks))
+    chunk_tokens = ChunkTokens.build(chunks, token_handler)
+    if path is not None:
+        try:
+            chunk_tokens.save(path, chunks_fingerprint)
+            logger.info("RAG chunk tokens stored into %s", path)
+        except OSError as e:
+            # index is typically part of read-only image
+            logger.info("unable to store RAG chunk tokens into %s: %s", path, e)
+    return chunk_tokens
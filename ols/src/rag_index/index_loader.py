@@ -53,6 +53,7 @@ class IndexLoader:
 
         load_llama_index_deps(self._vector_store_type)
         self._index = None
+        self._chunk_tokens = None
 
         self._index_config = index_config
         logger.debug("Config used for index load: %s", str(self._index_config))
@@ -135,12 +136,42 @@ class IndexLoader:
                     logger.info("Vector index is loaded.")
                 except Exception as err:
                     logger.exception("Error loading vector index:", exc_info=err)
+                    return
+                self._load_chunk_tokens()
         elif self._vector_store_type == VectorStoreType.POSTGRES:
             self._set_context()
             self._index = VectorStoreIndex.from_vector_store(
                 vector_store=self._vector_store,
             )
 
+    def _load_chunk_tokens(self) -> None:
+        """Tokenize chunks of the index, so they are not tokenized by every query."""
+        # pylint: disable=C0415
+        from ols.src.rag_index.chunk_tokens import load_chunk_tokens
+
+        try:
+            chunks = {
+                node_id: node.get_text()
+                for node_id, node in self._index.docstore.docs.items()
+            }
+            self._chunk_tokens = load_chunk_tokens(str(self._index_path), chunks)
+            logger.info("Tokens of %d RAG chunks are ready.", len(chunks))
+        except Exception as err:
+            # chunks are tokenized when they are used
+            logger.warning("Unable to precompute tokens of RAG chunks: %s", err)
+
+    @property
+    def chunk_tokens(self) -> Optional[Any]:
+        """Get tokens of the index chunks, None if they are not available."""
+        return self._chunk_tokens
+
+    @property
+    def embed_model(self) -> Optional[Any]:
+        """Get embedding model used by the index, None if the index is not loaded."""
+        if self._index is None:
+            return None
+        return Settings.embed_model
+
     @property
     def vector_index(self) -> Optional[ReferenceContent]:
         """Get index."""
@@ -1,14 +1,23 @@
 """Configuration loader."""
 
+import threading
 import traceback
 from io import TextIOBase
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 import yaml
 
 import ols.app.models.config as config_model
+from ols import constants
+from ols.customize import prompts
 from ols.src.cache.cache import Cache
 from ols.src.cache.cache_factory import CacheFactory
+from ols.src.cache.llm_call_cache import LLMCallCache
+from ols.src.cache.semantic_cache import SemanticCache
+from ols.src.query_helpers.embedding_question_validator import (
+    EmbeddingQuestionValidator,
+    index_centroid,
+)
 
 # as the index_loader.py is excluded from type checks, it confuses
 # mypy a bit, hence the [attr-defined] bellow
@@ -21,6 +30,9 @@ from ols.utils.redactor import Redactor
 # Here, we need it just for typing, so we use Any instead.
 BaseIndex = Any
 
+if TYPE_CHECKING:
+    from ols.src.rag_index.chunk_tokens import ChunkTokens
+
 
 class AppConfig:
     """Singleton class to load and store the configuration."""
@@ -38,7 +50,13 @@ class AppConfig:
         self.config = config_model.Config()
         self._query_filters: Optional[Redactor] = None
         self._rag_index: Optional[BaseIndex] = None
+        self._rag_chunk_tokens: Optional["ChunkTokens"] = None
+        self._rag_embed_model: Optional[Any] = None
         self._conversation_cache: Optional[Cache] = None
+        self._semantic_cache: Optional[SemanticCache] = None
+        self._semantic_cache_lock = threading.Lock()
+        self._llm_call_cache: Optional[LLMCallCache] = None
+        self._embedding_question_validator: Optional[EmbeddingQuestionValidator] = None
 
     @property
     def llm_config(self) -> config_model.LLMProviders:
@@ -82,11 +100,81 @@ class AppConfig:
         """Return the RAG index."""
         # TODO: OLS-380 Config object mirrors configuration
         if self._rag_index is None:
-            self._rag_index = IndexLoader(
-                self.ols_config.reference_content
-            ).vector_index
+            index_loader = IndexLoader(self.ols_config.reference_content)
+            self._rag_chunk_tokens = index_loader.chunk_tokens
+            self._rag_embed_model = index_loader.embed_model
+            # cached answers refer to the previously loaded index
+            self._semantic_cache = None
+            # the validator embeds its examples, so it is built together
+            # with the index and not on the request path
+            self._embedding_question_validator = (
+                self._build_embedding_question_validator(index_loader.vector_index)
+            )
+            self._rag_index = index_loader.vector_index
         return self._rag_index
 
+    def _build_embedding_question_validator(
+        self, vector_index: Optional[BaseIndex]
+    ) -> Optional[EmbeddingQuestionValidator]:
+        """Build the embedding based question validator if it is configured."""
+        if (
+            vector_index is None
+            or self.ols_config.query_validation_method
+            != constants.QueryValidationMethod.EMBEDDING
+        ):
+            return None
+        # questions are embedded by the embedding model of the index
+        return EmbeddingQuestionValidator(
+            self.ols_config.embedding_validation,
+            self._rag_embed_model.get_query_embedding,
+            prompts.QUESTION_VALIDATOR_ALLOWED_EXAMPLES,
+            prompts.QUESTION_VALIDATOR_REJECTED_EXAMPLES,
+            index_centroid(vector_index),
+        )
+
+    @property
+    def rag_chunk_tokens(self) -> Optional["ChunkTokens"]:
+        """Return tokens of the RAG index chunks, loaded together with the index."""
+        return self._rag_chunk_tokens
+
+    @property
+    def semantic_cache(self) -> Optional[SemanticCache]:
+        """Return the semantic cache, None if it is not enabled or there is no index."""
+        if self.ols_config.semantic_cache is None or self.rag_index is None:
+            return None
+        if self._semantic_cache is None:
+            with self._semantic_cache_lock:
+                # concurrent requests must not create (and fill) separate caches
+                if self._semantic_cache is None:
+                    # questions are embedded by the embedding model of the index
+                    self._semantic_cache = SemanticCache(
+                        self.ols_config.semantic_cache,
+                        self._rag_embed_model.get_query_embedding,
+                    )
+        return self._semantic_cache
+
+    @property
+    def embedding_question_validator(self) -> Optional[EmbeddingQuestionValidator]:
+        """Return the embedding based question validator, built with the index.
+
+        None is returned when there is no index or embedding based validation
+        is not configured.
+        """
+        if self.rag_index is None:
+            return None
+        return self._embedding_question_validator
+
+    @property
+    def llm_call_cache(self) -> Optional[LLMCallCache]:
+        """Return the LLM call cache, None if it is not enabled."""
+        if self.ols_config.llm_call_cache is None:
+            return None
+        if self._llm_call_cache is None:
+            self._llm_call_cache = CacheFactory.llm_call_cache(
+                self.ols_config.llm_call_cache
+            )
+        return self._llm_call_cache
+
     def reload_empty(self) -> None:
         """Reload the configuration with empty values."""
         self.config = config_model.Config()
@@ -119,6 +207,11 @@ class AppConfig:
             # values
             self._query_filters = None
             self._rag_index = None
+            self._rag_chunk_tokens = None
+            self._rag_embed_model = None
+            self._semantic_cache = None
+            self._llm_call_cache = None
+            self._embedding_question_validator = None
         except Exception as e:
             print(f"Failed to load config file {config_file}: {e!s}")
             print(traceback.format_exc())
@@ -0,0 +1,96 @@
+"""Matching of many keywords by one compiled regular expression."""
+
+import logging
+import re
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from ols.constants import KeywordMatchMode
+
+logger = logging.getLogger(__name__)
+
+# inflections of the keyword accepted when whole words are matched
+WORD_SUFFIXES = ("s", "es", "ed", "ing")
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Construct regular expression matching any of the words.
+
+    The words are merged into prefix tree, so the expression does not try
+    every word at every position of the text; e.g. `auto`, `automation` and
+    `autoscale` become `auto(?:mation|scale)?`. The longest word is matched
+    at given position.
+
+    Args:
+        words: Words to be matched, they are matched literally.
+
+    Returns:
+        The regular expression, it never matches when there are no words.
+    """
+    trie: dict[str, Any] = {}
+    for word in words:
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}  # end of word marker
+
+    def build(node: dict[str, Any]) -> str:
+        branches = [
+            re.escape(char) + build(child)
+            for char, child in sorted(node.items())
+            if char != ""
+        ]
+        if not branches:
+            return ""
+        if "" in node:
+            return "(?:" + "|".join(branches) + ")?"
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    if not trie:
+        return "(?!)"
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Find keywords in the (lower-cased) text.
+
+    In `substring` mode keywords are found anywhere in the text, even inside
+    other words. In `word` mode only whole words match, the keyword can be
+    followed by a common inflection suffix (`clusters` matches `cluster`).
+    """
+
+    def __init__(
+        self,
+        keywords: Iterable[str],
+        mode: KeywordMatchMode = KeywordMatchMode.SUBSTRING,
+    ) -> None:
+        """Compile the keywords into one regular expression.
+
+        Args:
+            keywords: Keywords to be matched, case is ignored.
+            mode: How the keywords are matched.
+        """
+        self.mode = mode
+        self.keywords = frozenset(keyword.lower() for keyword in keywords)
+        pattern = f"(?P<keyword>{trie_pattern(self.keywords)})"
+        if mode == KeywordMatchMode.WORD:
+            suffixes = "|".join(WORD_SUFFIXES)
+            pattern = rf"\b{pattern}(?:{suffixes})?\b"
+        self.pattern = re.compile(pattern)
+
+    def search(self, text: str) -> Optional[str]:
+        """Return the first keyword found in the text, None if there is none."""
+        match = self.pattern.search(text.lower())
+        return None if match is None else match.group("keyword")
+
+    def matches(self, text: str) -> set[str]:
+        """Return all keywords found in the text.
+
+        Occurrences of the keywords do not overlap; a keyword found as part
+        of a longer one (`auto` in `automation`) is not reported.
+        """
+        return {match.group("keyword") for match in self.pattern.finditer(text.lower())}
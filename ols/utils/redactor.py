@@ -1,15 +1,569 @@
 """A class helps redact the question based on the regex filters provided in the config file."""
 
+import functools
 import logging
 import re
+import time
 from collections import namedtuple
+from collections.abc import Iterable, Iterator
+from re import _constants as sre_constants  # type: ignore [attr-defined]
+from re import _parser as sre_parse  # type: ignore [attr-defined]
+from typing import Any, Optional
 
+from ols import constants
 from ols.app.models.config import QueryFilter
 
 logger = logging.getLogger(__name__)
 
 RegexFilter = namedtuple("RegexFilter", "pattern, name, replace_with")
 
+# metrics label of the passes made by merged filters
+MERGED_FILTERS = "merged"
+
+
+def required_literal(pattern: re.Pattern) -> str:
+    """Return the longest literal every match of the pattern contains.
+
+    Texts not containing the literal can not be matched by the pattern, so
+    the (much slower) regular expression search can be skipped for them.
+
+    Args:
+        pattern: Compiled regular expression.
+
+    Returns:
+        The literal, empty string when the pattern requires no literal.
+    """
+    if pattern.flags & re.IGNORECASE:
+        return ""
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return ""
+
+    runs: list[str] = []
+    run: list[str] = []
+
+    def walk(items: Iterable) -> None:
+        for op, av in items:
+            if op == sre_constants.LITERAL:
+                run.append(chr(av))
+                continue
+            # groups are required as a whole unless they change flags
+            if op == sre_constants.SUBPATTERN and not av[1] & re.IGNORECASE:
+                walk(av[3])
+                continue
+            runs.append("".join(run))
+            run.clear()
+
+    walk(parsed)
+    runs.append("".join(run))
+    return max(runs, key=len)
+
+
+_GROUPREF_OPCODES = frozenset(
+    (
+        sre_constants.GROUPREF,
+        sre_constants.GROUPREF_EXISTS,
+        sre_constants.GROUPREF_IGNORE,
+        sre_constants.GROUPREF_LOC_IGNORE,
+        sre_constants.GROUPREF_UNI_IGNORE,
+    )
+)
+
+# opcodes whose result depends on the characters around the match
+_CONTEXT_OPCODES = frozenset(
+    (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT)
+)
+
+
+def _opcodes(node: object) -> Iterator:
+    """Yield opcodes of the parsed expression, including nested ones."""
+    if isinstance(node, sre_parse.SubPattern):
+        for op, av in node:
+            yield op
+            yield from _opcodes(av)
+    elif isinstance(node, (list, tuple)):
+        for item in node:
+            yield from _opcodes(item)
+
+
+def _mergeable(regex_filter: RegexFilter) -> bool:
+    """Check if the filter can be merged with others into one pass."""
+    pattern = regex_filter.pattern
+    if "\\" in regex_filter.replace_with or pattern.groupindex:
+        # group references in replacement or named groups
+        return False
+    if pattern.flags & ~re.UNICODE:
+        # global inline flags are not allowed in the middle of the expression
+        return False
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return False
+    if parsed.getwidth()[0] == 0:
+        # empty matches do not replace anything themselves, but they make
+        # positions of the matches of other filters depend on each other
+        return False
+    # group numbers are shifted in merged expression; anchors, word
+    # boundaries and lookarounds depend on the characters around the match,
+    # which are changed by replacements of the preceding filters
+    return not any(
+        op in _GROUPREF_OPCODES or op in _CONTEXT_OPCODES for op in _opcodes(parsed)
+    )
+
+
+def _independent(regex_filter: RegexFilter, group: list[RegexFilter]) -> bool:
+    """Check that the filter can not match any part of replacements of the group.
+
+    Matches spanning a boundary of the replacement contain its first or last
+    character, so it is enough to check these and the replacement itself.
+    """
+    alphabet = _alphabet_pattern(regex_filter.pattern)
+    if alphabet is None:
+        return False
+    return not any(
+        # removed text joins the characters around it
+        not other.replace_with
+        or regex_filter.pattern.search(other.replace_with)
+        or alphabet.search(other.replace_with[0] + other.replace_with[-1])
+        for other in group
+    )
+
+
+class _FilterPass:
+    """One filter applied over the whole text."""
+
+    def __init__(self, regex_filter: RegexFilter) -> None:
+        self.filter = regex_filter
+        self.literal = required_literal(regex_filter.pattern)
+
+    def apply(self, text: str) -> str:
+        """Redact the text by the filter."""
+        # metrics module constructs auth dependency when imported
+        from ols.app import metrics
+
+        if self.literal not in text:
+            return text
+        start = time.perf_counter()
+        text, count = self.filter.pattern.subn(self.filter.replace_with, text)
+        metrics.redaction_duration_seconds.labels(self.filter.name).observe(
+            time.perf_counter() - start
+        )
+        if count:
+            metrics.redaction_matches_total.labels(self.filter.name).inc(count)
+        logger.debug("Replaced: %d matched with filter: %s", count, self.filter.name)
+        return text
+
+
+@functools.lru_cache(maxsize=256)
+def _merged_pattern(patterns: tuple[str, ...]) -> re.Pattern:
+    """Compile the patterns into one alternation."""
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+def _matched_pass(passes: list[_FilterPass], text: str, pos: int) -> int:
+    """Return index of the first filter matching at the position."""
+    return next(
+        index
+        for index, filter_pass in enumerate(passes)
+        if filter_pass.filter.pattern.match(text, pos)
+    )
+
+
+def _starts_inside(
+    filter_pass: _FilterPass,
+    match: re.Match,
+    following: dict[_FilterPass, Optional[re.Match]],
+) -> bool:
+    """Check if a match of the filter starts inside of the match of other one."""
+    # the filter is searched when it was not yet or its last match is behind
+    found = following.get(filter_pass, match)
+    if found is not None and found.start() <= match.start():
+        found = filter_pass.filter.pattern.search(match.string, match.start() + 1)
+        following[filter_pass] = found
+    return found is not None and found.start() < match.end()
+
+
+class _MergedPass:
+    """Filters applied by one search over the text.
+
+    Filters that can match the text (their literal is found in it) are
+    merged into one alternation. At each position the first filter (in
+    configured order) matching there wins, as it would when the filters are
+    applied one by one. The result is the same unless a match of a filter
+    preceding the winner starts inside of its match; the text is redacted by
+    the filters one by one when it does.
+    """
+
+    def __init__(self, regex_filters: list[RegexFilter]) -> None:
+        self.passes = [_FilterPass(regex_filter) for regex_filter in regex_filters]
+
+    def _redact(self, passes: list[_FilterPass], text: str) -> Optional[str]:
+        """Redact the text, None if matches of the filters overlap."""
+        # metrics module constructs auth dependency when imported
+        from ols.app import metrics
+
+        pattern = _merged_pattern(
+            tuple(filter_pass.filter.pattern.pattern for filter_pass in passes)
+        )
+        # next matches of the filters, searched again only once passed, so a
+        # long match is not searched for at each of its positions
+        following: dict[_FilterPass, Optional[re.Match]] = {}
+        parts = []
+        counts: dict[str, int] = {}
+        end = 0
+        for match in pattern.finditer(text):
+            winner = _matched_pass(passes, text, match.start())
+            if any(
+                _starts_inside(filter_pass, match, following)
+                for filter_pass in passes[:winner]
+            ):
+                return None
+            regex_filter = passes[winner].filter
+            parts.append(text[end : match.start()])
+            parts.append(regex_filter.replace_with)
+            counts[regex_filter.name] = counts.get(regex_filter.name, 0) + 1
+            end = match.end()
+        parts.append(text[end:])
+        for name, count in counts.items():
+            metrics.redaction_matches_total.labels(name).inc(count)
+        logger.debug("Replaced: %s matched with merged filters", counts)
+        return "".join(parts)
+
+    def apply(self, text: str) -> str:
+        """Redact the text by all filters."""
+        # metrics module constructs auth dependency when imported
+        from ols.app import metrics
+
+        passes = [
+            filter_pass for filter_pass in self.passes if filter_pass.literal in text
+        ]
+        if len(passes) <= 1:
+            return passes[0].apply(text) if passes else text
+        start = time.perf_counter()
+        redacted = self._redact(passes, text)
+        metrics.redaction_duration_seconds.labels(MERGED_FILTERS).observe(
+            time.perf_counter() - start
+        )
+        if redacted is not None:
+            return redacted
+        logger.debug("Matches of merged filters overlap, applying them one by one")
+        for filter_pass in self.passes:
+            text = filter_pass.apply(text)
+        return text
+
+
+def compile_passes(
+    regex_filters: list[RegexFilter],
+) -> list[_FilterPass | _MergedPass]:
+    """Group consecutive filters that can be applied by one pass.
+
+    Filters using backreferences, group references in replacement, global
+    flags, anchors, word boundaries, lookarounds or matching empty strings
+    are applied on their own. A filter that can match a part of replacement
+    of a preceding filter in the group starts a new group.
+    """
+    passes: list[_FilterPass | _MergedPass] = []
+    group: list[RegexFilter] = []
+
+    def close_group() -> None:
+        if len(group) > 1:
+            passes.append(_MergedPass(group))
+        elif group:
+            passes.append(_FilterPass(group[0]))
+        group.clear()
+
+    for regex_filter in regex_filters:
+        if not _mergeable(regex_filter):
+            close_group()
+            passes.append(_FilterPass(regex_filter))
+            continue
+        if not _independent(regex_filter, group):
+            close_group()
+        group.append(regex_filter)
+    close_group()
+    return passes
+
+
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: r"\d",
+    sre_constants.CATEGORY_NOT_DIGIT: r"\D",
+    sre_constants.CATEGORY_SPACE: r"\s",
+    sre_constants.CATEGORY_NOT_SPACE: r"\S",
+    sre_constants.CATEGORY_WORD: r"\w",
+    sre_constants.CATEGORY_NOT_WORD: r"\W",
+}
+
+_REPEAT_OPCODES = frozenset(
+    (
+        sre_constants.MAX_REPEAT,
+        sre_constants.MIN_REPEAT,
+        sre_constants.POSSESSIVE_REPEAT,
+    )
+)
+
+# opcodes not consuming any other characters than those of other opcodes
+_ZERO_WIDTH_OPCODES = frozenset((sre_constants.AT,)) | (
+    _GROUPREF_OPCODES - {sre_constants.GROUPREF_EXISTS}
+)
+
+
+def _charset(op: int, av: Any) -> Optional[list[str]]:
+    """Return character class items of literal or set, None if not supported."""
+    if op == sre_constants.LITERAL:
+        return [re.escape(chr(av))]
+    items = []
+    for item_op, item_av in av:
+        if item_op == sre_constants.LITERAL:
+            items.append(re.escape(chr(item_av)))
+        elif item_op == sre_constants.RANGE:
+            low, high = item_av
+            items.append(f"{re.escape(chr(low))}-{re.escape(chr(high))}")
+        elif item_op == sre_constants.CATEGORY and item_av in _CATEGORIES:
+            items.append(_CATEGORIES[item_av])
+        else:
+            # negated sets and the like
+            return None
+    return items
+
+
+def _nested(op: int, av: Any) -> Optional[list]:
+    """Return expressions nested in the opcode, None if it matches any character."""
+    if op == sre_constants.SUBPATTERN:
+        return [av[3]]
+    if op == sre_constants.BRANCH:
+        return list(av[1])
+    if op in _REPEAT_OPCODES:
+        return [av[2]]
+    if op == sre_constants.ATOMIC_GROUP:
+        return [av]
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        # characters looked ahead at need to be held back, too
+        direction, lookaround = av
+        return [lookaround] if direction == 1 else []
+    if op == sre_constants.GROUPREF_EXISTS:
+        return [branch for branch in av[1:] if branch is not None]
+    if op in _ZERO_WIDTH_OPCODES:
+        return []
+    return None
+
+
+def _alphabet(items: Iterable, parts: list[str]) -> bool:
+    """Collect characters the items can match, False if any character."""
+    for op, av in items:
+        if op in (sre_constants.LITERAL, sre_constants.IN):
+            charset = _charset(op, av)
+            if charset is None:
+                return False
+            parts.extend(charset)
+            continue
+        nested = _nested(op, av)
+        if nested is None or not all(_alphabet(item, parts) for item in nested):
+            return False
+    return True
+
+
+def _alphabet_pattern(pattern: re.Pattern) -> Optional[re.Pattern]:
+    """Return expression matching characters that can be a part of a match.
+
+    Case is ignored, so the expression can match more characters than the
+    pattern does.
+
+    Args:
+        pattern: Compiled regular expression.
+
+    Returns:
+        Compiled expression matching one character, None if the pattern can
+        match any character.
+    """
+    parts: list[str] = []
+    try:
+        bounded = _alphabet(sre_parse.parse(pattern.pattern, pattern.flags), parts)
+    except Exception:
+        bounded = False
+    if not bounded:
+        return None
+    if not parts:
+        return re.compile(r"[^\s\S]")
+    return re.compile(f"[{''.join(parts)}]", re.IGNORECASE)
+
+
+def trailing_run(pattern: re.Pattern) -> re.Pattern:
+    """Return expression matching the run of characters at the end of the text.
+
+    The run consists of characters that can be part of a match of the
+    pattern (case is ignored), so the match can not span the character
+    before the run. When the text is streamed, only the run needs to be held
+    back until the next chunk arrives.
+
+    Args:
+        pattern: Compiled regular expression.
+
+    Returns:
+        Compiled expression matching the run at the end of the text.
+    """
+    alphabet = _alphabet_pattern(pattern)
+    if alphabet is None:
+        return re.compile(r"(?s:.)*\Z")
+    return re.compile(f"{alphabet.pattern}*\\Z", re.IGNORECASE)
+
+
+def leading_literal(pattern: re.Pattern) -> str:
+    """Return the literal every match of the pattern starts with."""
+    if pattern.flags & re.IGNORECASE:
+        return ""
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return ""
+    literal = []
+    for op, av in parsed:
+        if op == sre_constants.LITERAL:
+            literal.append(chr(av))
+        elif op != sre_constants.AT or literal:
+            break
+    return "".join(literal)
+
+
+class _TailFilter:
+    """Finds the end of the streamed text that can be a part of a match."""
+
+    def __init__(self, regex_filter: RegexFilter) -> None:
+        self.pattern = regex_filter.pattern
+        self.run = trailing_run(regex_filter.pattern)
+        self.prefix = leading_literal(regex_filter.pattern)
+
+    def start(self, text: str, floor: int) -> int:
+        """Return start of the end of the text that can be a part of a match."""
+        run = self.run.search(text, floor)
+        start = len(text) if run is None else run.start()
+        if not self.prefix:
+            return start
+        # matches start with the prefix; those ending before the end of the
+        # text are complete, the rest can still be extended
+        found = text.find(self.prefix, start)
+        while found >= 0:
+            match = self.pattern.match(text, found)
+            if match is None or match.end() == len(text):
+                return found
+            found = text.find(self.prefix, match.end())
+        for size in range(min(len(self.prefix) - 1, len(text) - start), 0, -1):
+            if text.endswith(self.prefix[:size]):
+                return len(text) - size
+        return len(text)
+
+
+class _FilterStream:
+    """One filter applied to the streamed text."""
+
+    def __init__(
+        self, regex_filter: RegexFilter, tail_filter: _TailFilter, max_lookback: int
+    ) -> None:
+        self.filter = regex_filter
+        self.tail_filter = tail_filter
+        self.max_lookback = max_lookback
+        # text not returned yet
+        self._pending = ""
+        # the character before the pending text, for lookbehinds and \b
+        self._context = ""
+
+    def _cut(self, text: str, cut: int, floor: int) -> int:
+        """Move the cut so no match of the filter spans it."""
+        offset = len(self._context)
+        current = self._context + text
+        for match in self.filter.pattern.finditer(current, offset):
+            start, end = match.start() - offset, match.end() - offset
+            if start >= cut:
+                break
+            if end > cut:
+                # matches longer than the lookback are redacted as found,
+                # the text before them is not held back again
+                return start if start >= floor else end
+        return cut
+
+    def _emit(self, text: str, cut: int) -> str:
+        """Redact and return the text before the cut, hold back the rest."""
+        if cut <= 0:
+            self._pending = text
+            return ""
+        offset = len(self._context)
+        current = self._context + text
+        parts = []
+        last = offset
+        for match in self.filter.pattern.finditer(current, offset):
+            if match.end() > offset + cut:
+                break
+            parts.append(current[last : match.start()])
+            parts.append(match.expand(self.filter.replace_with))
+            last = match.end()
+        parts.append(current[last : offset + cut])
+        self._context = text[cut - 1]
+        self._pending = text[cut:]
+        return "".join(parts)
+
+    def redact(self, chunk: str) -> str:
+        """Redact the chunk, hold back the end that can be a part of a match."""
+        text = self._pending + chunk
+        floor = max(0, len(text) - self.max_lookback)
+        cut = self.tail_filter.start(text, floor)
+        return self._emit(text, self._cut(text, cut, floor))
+
+    def flush(self) -> str:
+        """Redact and return the text held back, the stream has ended."""
+        return self._emit(self._pending, len(self._pending))
+
+
+class StreamRedactor:
+    """Redact text streamed in chunks, like tokens of LLM response.
+
+    Matches of the filters can span chunk boundaries, so the end of the text
+    that can be part of a match is held back until the next chunk arrives
+    (or the stream ends). Other text is redacted and returned right away.
+    Each filter is applied to the text returned by the preceding one, as it
+    is when the whole text is redacted.
+    """
+
+    def __init__(
+        self,
+        regex_filters: list[RegexFilter],
+        max_lookback: int,
+        tail_filters: Optional[list[_TailFilter]] = None,
+    ) -> None:
+        """Initialize the redactor of one stream.
+
+        Args:
+            regex_filters: The filters, in order they are applied.
+            max_lookback: Maximum number of characters held back by a filter.
+            tail_filters: Precompiled tail filters of the filters.
+        """
+        tail_filters = tail_filters or [
+            _TailFilter(regex_filter) for regex_filter in regex_filters
+        ]
+        self._streams = [
+            _FilterStream(regex_filter, tail_filter, max_lookback)
+            for regex_filter, tail_filter in zip(regex_filters, tail_filters)
+        ]
+
+    def redact(self, chunk: str) -> str:
+        """Redact the chunk, returned text can be shorter or longer.
+
+        Args:
+            chunk: Next chunk of the streamed text.
+
+        Returns:
+            Redacted text that can not be affected by the following chunks.
+        """
+        for stream in self._streams:
+            chunk = stream.redact(chunk)
+        return chunk
+
+    def flush(self) -> str:
+        """Redact and return the text held back, the stream has ended."""
+        text = ""
+        for stream in self._streams:
+            text = stream.redact(text) + stream.flush()
+        return text
+
 
 # TODO: OLS-380 Config object mirrors configuration
 
@@ -35,15 +589,32 @@ class Redactor:
             )
         self.regex_filters = regex_filters
 
+    @property
+    def regex_filters(self) -> list[RegexFilter]:
+        """Return the filters, in order they are applied."""
+        return self._regex_filters
+
+    @regex_filters.setter
+    def regex_filters(self, regex_filters: list[RegexFilter]) -> None:
+        """Set the filters and compile them into redaction passes."""
+        self._regex_filters = regex_filters
+        self._passes = compile_passes(regex_filters)
+        self._tail_filters = [
+            _TailFilter(regex_filter) for regex_filter in regex_filters
+        ]
+
     def redact(self, conversation_id: str, text_input: str) -> str:
         """Redact the input using regex built."""
         logger.debug("Redacting conversation %s", conversation_id)
-        for regex_filter in self.regex_filters:
-            text_input, count = regex_filter.pattern.subn(
-                regex_filter.replace_with, text_input
-            )
-            logger.debug(
-                "Replaced: %d matched with filter: %s", count, regex_filter.name
-            )
+        for redaction_pass in self._passes:
+            text_input = redaction_pass.apply(text_input)
         logger.debug("Redacted conversation %s input: %s", conversation_id, text_input)
         return text_input
+
+    def stream(self) -> StreamRedactor:
+        """Return redactor of text streamed in chunks, one per stream."""
+        return StreamRedactor(
+            self.regex_filters,
+            constants.RESPONSE_REDACTION_MAX_LOOKBACK,
+            self._tail_filters,
+        )
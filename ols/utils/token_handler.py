@@ -2,6 +2,7 @@
 
 import logging
 from math import ceil
+from typing import TYPE_CHECKING, Optional
 
 from langchain_core.messages import BaseMessage
 from llama_index.core.schema import NodeWithScore
@@ -15,11 +16,15 @@ from ols.constants import (
     TOKEN_BUFFER_WEIGHT,
 )
 from ols.src.prompts.prompt_generator import (
+    model_family,
     restructure_history,
     restructure_rag_context_post,
     restructure_rag_context_pre,
 )
 
+if TYPE_CHECKING:
+    from ols.src.rag_index.chunk_tokens import ChunkTokens
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +45,7 @@ class TokenHandler:
         # Note: We need an approximate tokens count.
         # For different models, exact tokens may vary due to different tokenizer.
         self._encoder = get_encoding(encoding_name)
+        self.encoding_name = encoding_name
 
     def text_to_tokens(self, text: str) -> list[int]:
         """Convert text to tokens.
@@ -65,13 +71,22 @@ class TokenHandler:
         """
         return self._encoder.decode(tokens)
 
+    def text_to_token_count(self, text: str) -> int:
+        """Get approximate tokens count of the text."""
+        return TokenHandler._get_token_count(self.text_to_tokens(text))
+
     @staticmethod
     def _get_token_count(tokens: list[int]) -> int:
         """Get approximate tokens count."""
+        return TokenHandler._estimate_token_count(len(tokens))
+
+    @staticmethod
+    def _estimate_token_count(count: int) -> int:
+        """Get approximate tokens count from number of tokens."""
         # Note: As we get approximate tokens count, we want to have enough
         # buffer so that there is less chance of under-estimation.
         # We increase by certain percentage to nearest integer (ceil).
-        return ceil(len(tokens) * TOKEN_BUFFER_WEIGHT)
+        return ceil(count * TOKEN_BUFFER_WEIGHT)
 
     def calculate_and_check_available_tokens(
         self, prompt: str, context_window_size: int, max_tokens_for_response: int
@@ -83,6 +98,26 @@ class TokenHandler:
             context_window_size: context window size of LLM
             max_tokens_for_response: max tokens allowed for response (estimation)
 
+        Returns:
+            available_tokens: int, tokens that can be used for augmentation.
+        """
+        return self.check_available_tokens(
+            self.text_to_token_count(prompt),
+            context_window_size,
+            max_tokens_for_response,
+        )
+
+    @staticmethod
+    def check_available_tokens(
+        prompt_token_count: int, context_window_size: int, max_tokens_for_response: int
+    ) -> int:
+        """Get available tokens for prompt with already counted tokens.
+
+        Args:
+            prompt_token_count: approximate tokens count of the prompt
+            context_window_size: context window size of LLM
+            max_tokens_for_response: max tokens allowed for response (estimation)
+
         Returns:
             available_tokens: int, tokens that can be used for augmentation.
         """
@@ -91,8 +126,6 @@ class TokenHandler:
             context_window_size,
             max_tokens_for_response,
         )
-
-        prompt_token_count = TokenHandler._get_token_count(self.text_to_tokens(prompt))
         logger.debug("Prompt tokens: %d", prompt_token_count)
 
         # The context_window_size is the maximum number of tokens that
@@ -114,7 +147,11 @@ class TokenHandler:
         return available_tokens
 
     def truncate_rag_context(
-        self, retrieved_nodes: list[NodeWithScore], model: str, max_tokens: int = 500
+        self,
+        retrieved_nodes: list[NodeWithScore],
+        model: str,
+        max_tokens: int = 500,
+        chunk_tokens: Optional["ChunkTokens"] = None,
     ) -> tuple[list[RagChunk], int]:
         """Process retrieved node text and truncate if required.
 
@@ -122,6 +159,7 @@ class TokenHandler:
             retrieved_nodes: retrieved nodes object from index
             model: model name; required for adding proper tags
             max_tokens: maximum tokens allowed for rag context
+            chunk_tokens: tokens of chunks computed when the index was loaded
 
         Returns:
             list of `RagChunk` objects, available tokens after context usage
@@ -150,10 +188,10 @@ class TokenHandler:
             # else:
             #    tokens_count += 3
             # ```
-            node_text = node.get_text()
-            node_text = restructure_rag_context_pre(node_text, model)
-            tokens = self.text_to_tokens(node_text)
-            tokens_count = TokenHandler._get_token_count(tokens)
+            tags, tags_count, tokens = self._rag_chunk_to_tokens(
+                node, model, chunk_tokens
+            )
+            tokens_count = TokenHandler._estimate_token_count(tags_count + len(tokens))
             logger.debug("RAG content tokens count: %d.", tokens_count)
 
             available_tokens = min(tokens_count, max_tokens)
@@ -163,7 +201,9 @@ class TokenHandler:
                 logger.debug("%d tokens are less than threshold.", available_tokens)
                 break
 
-            node_text = self.tokens_to_text(tokens[:available_tokens])
+            node_text = tags + self.tokens_to_text(
+                tokens[: max(0, available_tokens - tags_count)]
+            )
             node_text = restructure_rag_context_post(node_text, model)
             rag_chunks.append(
                 RagChunk(
@@ -177,19 +217,90 @@ class TokenHandler:
 
         return rag_chunks, max_tokens
 
+    def _rag_chunk_to_tokens(
+        self,
+        node: NodeWithScore,
+        model: str,
+        chunk_tokens: Optional["ChunkTokens"],
+    ) -> tuple[str, int, list[int]]:
+        """Get model specific tags of the chunk and tokens of the rest.
+
+        Tokens of the chunk text are taken from tokens computed when the
+        index was loaded, the chunk is tokenized together with the tags
+        when they are not available.
+
+        Returns:
+            Tags prepended to the text, number of their tokens and tokens
+            of the rest of the chunk.
+        """
+        cached = None
+        if chunk_tokens is not None:
+            cached = chunk_tokens.get(getattr(node, "node_id", None))
+        if cached is None:
+            return (
+                "",
+                0,
+                self.text_to_tokens(
+                    restructure_rag_context_pre(node.get_text(), model)
+                ),
+            )
+        tags = restructure_rag_context_pre("", model)
+        return tags, len(self.text_to_tokens(tags)), cached
+
+    def message_to_token_count(self, message: BaseMessage) -> int:
+        """Get approximate tokens count of conversation history message."""
+        return TokenHandler._get_token_count(
+            self.text_to_tokens(f"{message.type}: {message.content}")
+        )
+
+    def history_token_key(self, model: str) -> str:
+        """Get key of token counts of history messages restructured for the model."""
+        # history messages are restructured only for granite models
+        return f"{self.encoding_name}:{model_family(model)}"
+
+    def history_token_counts(
+        self, messages: list[BaseMessage], model: str
+    ) -> dict[str, list[int]]:
+        """Count tokens of history messages, so they can be stored in cache entry.
+
+        Args:
+            messages: History messages, ex: query and response of one turn.
+            model: model name; history is restructured for the model
+
+        Returns:
+            Token counts of the messages keyed by `history_token_key`.
+        """
+        return {
+            self.history_token_key(model): [
+                self.message_to_token_count(restructure_history(message, model))
+                for message in messages
+            ]
+        }
+
     def limit_conversation_history(
-        self, history: list[BaseMessage], model: str, limit: int = 0
+        self,
+        history: list[BaseMessage],
+        model: str,
+        limit: int = 0,
+        token_counts: Optional[list[dict[str, int]]] = None,
     ) -> tuple[list[BaseMessage], bool]:
-        """Limit conversation history to specified number of tokens."""
+        """Limit conversation history to specified number of tokens.
+
+        Token counts stored together with the history are used when they
+        were counted for the model, other messages are tokenized.
+        """
         total_length = 0
         formatted_history: list[BaseMessage] = []
+        key = self.history_token_key(model)
+        if token_counts is None or len(token_counts) != len(history):
+            token_counts = [{}] * len(history)
 
-        for original_message in reversed(history):
+        for original_message, counts in zip(reversed(history), reversed(token_counts)):
             # Restructure messages as per model
             message = restructure_history(original_message, model)
-            message_length = TokenHandler._get_token_count(
-                self.text_to_tokens(f"{message.type}: {message.content}")
-            )
+            message_length = counts.get(key)
+            if message_length is None:
+                message_length = self.message_to_token_count(message)
             total_length += message_length
             # if total length of already checked messages is higher than limit
             # then skip all remaining messages (we need to skip from top)
@@ -201,3 +312,27 @@ class TokenHandler:
             formatted_history.append(message)
 
         return formatted_history[::-1], False  # reverse back to original order
+
+    def history_to_token_count(
+        self,
+        history: list[BaseMessage],
+        model: str,
+        token_counts: Optional[list[dict[str, int]]] = None,
+    ) -> int:
+        """Get approximate tokens count of history restructured for the model.
+
+        Args:
+            history: history messages returned by `limit_conversation_history`
+            model: model name; history has been restructured for the model
+            token_counts: token counts stored together with the messages
+
+        Returns:
+            Tokens count of all messages.
+        """
+        key = self.history_token_key(model)
+        if token_counts is None or len(token_counts) != len(history):
+            token_counts = [{}] * len(history)
+        return sum(
+            counts[key] if key in counts else self.message_to_token_count(message)
+            for message, counts in zip(history, token_counts)
+        )
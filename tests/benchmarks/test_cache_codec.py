@@ -0,0 +1,69 @@
+"""Benchmarks for codecs used to serialize conversation history entries."""
+
+# pylint: disable=W0621
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ols.app.models.models import Attachment, CacheEntry
+from ols.src.cache.codec import JSONCodec, MsgpackCodec, zstd_available
+
+CODECS = {
+    "json": JSONCodec(),
+    "msgpack": MsgpackCodec(None),
+}
+if zstd_available():
+    CODECS["msgpack+zstd"] = MsgpackCodec(4096)
+
+
+@pytest.fixture
+def long_conversation():
+    """Conversation with many turns and one large attachment."""
+    history = [
+        CacheEntry(
+            query=HumanMessage(f"How do I scale deployment number {i}?"),
+            response=AIMessage(
+                "Use the `oc scale deployment` command with --replicas option. " * 20
+            ),
+        )
+        for i in range(50)
+    ]
+    history.append(
+        CacheEntry(
+            query=HumanMessage("Why does my pod crash?"),
+            response=AIMessage("The container is killed because it is out of memory."),
+            attachments=[
+                Attachment(
+                    attachment_type="log",
+                    content_type="text/plain",
+                    content="ERROR: container exceeded memory limit\n" * 2000,
+                )
+            ],
+        )
+    )
+    return history
+
+
+@pytest.mark.parametrize("codec_name", CODECS.keys())
+def test_encode(benchmark, long_conversation, codec_name):
+    """Benchmark the serialization of the whole conversation."""
+    codec = CODECS[codec_name]
+
+    def encode():
+        return [codec.encode(entry) for entry in long_conversation]
+
+    encoded = benchmark(encode)
+    benchmark.extra_info["bytes"] = sum(len(value) for value in encoded)
+
+
+@pytest.mark.parametrize("codec_name", CODECS.keys())
+def test_decode(benchmark, long_conversation, codec_name):
+    """Benchmark the deserialization of the whole conversation."""
+    codec = CODECS[codec_name]
+    encoded = [codec.encode(entry) for entry in long_conversation]
+
+    def decode():
+        return [codec.decode(value) for value in encoded]
+
+    assert benchmark(decode) == long_conversation
+    benchmark.extra_info["bytes"] = sum(len(value) for value in encoded)
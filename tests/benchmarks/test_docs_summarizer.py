@@ -132,3 +132,24 @@ def test_summarize_no_reference_content(benchmark, summarizer_no_reference_conte
 
     # run the benchmark
     benchmark(summarizer_no_reference_content.create_response, question)
+
+
+@patch("ols.utils.token_handler.RAG_SIMILARITY_CUTOFF", 0.4)
+def test_prepare_prompt_history_with_token_counts(benchmark, rag_index, summarizer):
+    """Benchmark for preparing prompt with history token counts stored in cache."""
+    from ols.utils.token_handler import TokenHandler
+
+    question = "What's the ultimate question with answer 42?"
+    history = [HumanMessage("What is Kubernetes?")] * 10
+    token_counts = [
+        TokenHandler().history_token_counts([message], summarizer.model)
+        for message in history
+    ]
+    history_token_counts = [
+        {key: counts[0] for key, counts in message_counts.items()}
+        for message_counts in token_counts
+    ]
+
+    benchmark(
+        summarizer.prepare_prompt, question, rag_index, history, history_token_counts
+    )
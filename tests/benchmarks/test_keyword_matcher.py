@@ -0,0 +1,36 @@
+"""Benchmarks for keyword based question validation."""
+
+# pylint: disable=W0621
+
+import pytest
+
+from ols.constants import KeywordMatchMode
+from ols.customize import keywords
+from ols.utils.keyword_matcher import KeywordMatcher
+
+# log lines attached to the question, they contain none of the keywords
+ATTACHMENT_LINE = "2024-05-01T10:00:00Z INFO request 8f3a served in 12ms by thread 7\n"
+
+
+def keyword_loop(query):
+    """Look for every keyword in the query, the way it was done before."""
+    query_temp = query.lower()
+    return any(kw in query_temp for kw in keywords.KEYWORDS)
+
+
+@pytest.fixture(params=[1, 1000, 5000], ids=["short", "100kB", "500kB"])
+def query(request):
+    """Query without any keyword followed by attachment with given number of lines."""
+    return "What does 42 signify?\n" + ATTACHMENT_LINE * request.param
+
+
+def test_keyword_loop(benchmark, query):
+    """Benchmark looking for every keyword separately."""
+    assert not benchmark(keyword_loop, query)
+
+
+@pytest.mark.parametrize("mode", list(KeywordMatchMode))
+def test_keyword_matcher(benchmark, query, mode):
+    """Benchmark looking for keywords by compiled matcher."""
+    matcher = KeywordMatcher(keywords.KEYWORDS, mode)
+    assert benchmark(matcher.search, query) is None
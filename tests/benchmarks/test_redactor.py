@@ -6,8 +6,50 @@ import re
 
 import pytest
 
-from ols.utils.config import AppConfig
-from ols.utils.redactor import Redactor, RegexFilter
+from ols import config as ols_config
+
+# needs to be setup there before metrics (used by the redactor) are imported
+ols_config.ols_config.authentication_config.module = "k8s"
+
+from ols.utils.config import AppConfig  # noqa: E402
+from ols.utils.redactor import Redactor, RegexFilter  # noqa: E402
+
+# log lines attached to the question, they contain no personal information
+ATTACHMENT_LINE = "2024-05-01T10:00:00Z INFO request 8f3a served in 12ms by thread 7\n"
+
+PII_FILTERS = [
+    RegexFilter(re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+"), "email", "<EMAIL>"),
+    RegexFilter(re.compile(r"\b\d{3}[-.]?\d{3}[-.]?\d{4}\b"), "phone", "<PHONE>"),
+    RegexFilter(re.compile(r"\b\d{3}-\d{2}-\d{4}\b"), "ssn", "<SSN>"),
+    RegexFilter(re.compile(r"\b(?:\d[ -]*?){13,16}\b"), "card", "<CARD>"),
+    RegexFilter(re.compile(r"AKIA[0-9A-Z]{16}"), "aws_key", "<AWS_KEY>"),
+    RegexFilter(re.compile(r"ghp_[0-9A-Za-z]{36}"), "github_token", "<GITHUB_TOKEN>"),
+    RegexFilter(re.compile(r"password=\S+"), "password", "password=<PASSWORD>"),
+    RegexFilter(re.compile(r"Bearer [\w.-]+"), "bearer", "Bearer <TOKEN>"),
+    RegexFilter(re.compile(r"xox[baprs]-[\w-]+"), "slack_token", "<SLACK_TOKEN>"),
+    RegexFilter(
+        re.compile(r"-----BEGIN [A-Z ]*PRIVATE KEY-----"), "private_key", "<KEY>"
+    ),
+] + [
+    RegexFilter(re.compile(rf"\bcustomer-{i}\b"), f"customer_{i}", "<CUSTOMER>")
+    for i in range(10)
+]
+
+
+def redact_sequentially(text):
+    """Apply every filter to the whole text, the way it was done before."""
+    for regex_filter in PII_FILTERS:
+        text = regex_filter.pattern.sub(regex_filter.replace_with, text)
+    return text
+
+
+@pytest.fixture(params=[False, True], ids=["clean", "with-pii"])
+def attachment(request):
+    """Attachment with 5000 log lines, optionally with some personal information."""
+    text = ATTACHMENT_LINE * 5000
+    if request.param:
+        text += "contact john@example.com, password=hunter2\n"
+    return text
 
 
 @pytest.fixture
@@ -122,3 +164,30 @@ def test_redact_question_100_filters(benchmark, config):
     query = "write a deployment yaml for\
     the mongodb image from www.mongodb.com and call me at 123-456-7890"
     benchmark(query_filter.redact, "test_id", query)
+
+
+def test_redact_attachment_sequentially(benchmark, attachment):
+    """Benchmark redaction of large attachment by 20 filters applied one by one."""
+    benchmark(redact_sequentially, attachment)
+
+
+def test_redact_attachment(benchmark, config, attachment):
+    """Benchmark redaction of large attachment by 20 compiled filters."""
+    query_filter = Redactor(config.ols_config.query_filters)
+    query_filter.regex_filters = PII_FILTERS
+    assert benchmark(query_filter.redact, "test_id", attachment) == (
+        redact_sequentially(attachment)
+    )
+
+
+def test_redact_long_match(benchmark, config):
+    """Benchmark redaction of a text with one long match by merged filters."""
+    query_filter = Redactor(config.ols_config.query_filters)
+    query_filter.regex_filters = [
+        RegexFilter(re.compile(r"secret"), "secret", "<SECRET>"),
+        RegexFilter(re.compile(r"[A-Za-z0-9+/]{40,}"), "token", "<TOKEN>"),
+    ]
+    query = "my secret key: " + "A" * 32000
+    assert benchmark(query_filter.redact, "test_id", query) == (
+        "my <SECRET> key: <TOKEN>"
+    )
@@ -3,7 +3,9 @@
 from langchain_core.messages import AIMessage, HumanMessage
 
 from ols.constants import ModelFamily
+from ols.src.rag_index.chunk_tokens import ChunkTokens
 from ols.utils.token_handler import TokenHandler
+from tests.mock_classes.mock_retrieved_node import MockRetrievedNode
 
 
 def benchmark_token_hander(
@@ -102,3 +104,39 @@ def test_limit_conversation_history_huge_history(benchmark):
     ] * 10000
 
     benchmark_limit_conversation_history(benchmark, history)
+
+
+def retrieved_chunks(count=5, words=400):
+    """Construct retrieved nodes with long text."""
+    return [
+        MockRetrievedNode(
+            {
+                "node_id": f"node-{i}",
+                "text": f"chunk {i} " + "text of the product documentation " * words,
+                "score": 0.9,
+                "metadata": {"docs_url": f"data/doc{i}.pdf", "title": f"Doc{i}"},
+            }
+        )
+        for i in range(count)
+    ]
+
+
+def test_truncate_rag_context(benchmark):
+    """Benchmark for truncating RAG context tokenized by every query."""
+    token_handler = TokenHandler()
+    nodes = retrieved_chunks()
+
+    benchmark(token_handler.truncate_rag_context, nodes, ModelFamily.GPT, 3000)
+
+
+def test_truncate_rag_context_precomputed_tokens(benchmark):
+    """Benchmark for truncating RAG context tokenized when index was loaded."""
+    token_handler = TokenHandler()
+    nodes = retrieved_chunks()
+    chunk_tokens = ChunkTokens.build(
+        {node.node_id: node.get_text() for node in nodes}, token_handler
+    )
+
+    benchmark(
+        token_handler.truncate_rag_context, nodes, ModelFamily.GPT, 3000, chunk_tokens
+    )
@@ -5,8 +5,10 @@ from unittest.mock import patch
 import pytest
 import requests
 from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage, HumanMessage
 
-from ols import config
+from ols import config, constants
+from ols.app.models.models import CacheEntry
 from ols.utils import suid
 from tests.mock_classes.mock_langchain_interface import mock_langchain_interface
 from tests.mock_classes.mock_llm_chain import mock_llm_chain
@@ -85,6 +87,34 @@ def test_get_conversation_with_history(_setup, endpoint):
         assert history[3]["type"] == "ai"
 
 
+def test_get_compacted_conversation(_setup):
+    """Test that the summary of compacted turns is not shown as user question."""
+    conversation_id = suid.get_suid()
+    flag = {constants.HISTORY_SUMMARY_FLAG: True}
+    for entry in (
+        CacheEntry(
+            query=HumanMessage(constants.HISTORY_SUMMARY_QUERY, additional_kwargs=flag),
+            response=AIMessage("We talked about pods.", additional_kwargs=flag),
+        ),
+        CacheEntry(query=HumanMessage("Next question"), response=AIMessage("Answer")),
+    ):
+        config.conversation_cache.insert_or_append(
+            constants.DEFAULT_USER_UID, conversation_id, entry
+        )
+
+    response = pytest.client.get(f"/conversations/{conversation_id}")
+    assert response.status_code == requests.codes.ok
+
+    history = response.json()["chat_history"]
+    assert [(message["type"], message["content"]) for message in history] == [
+        ("ai", "We talked about pods."),
+        ("human", "Next question"),
+        ("ai", "Answer"),
+    ]
+    assert history[0]["additional_kwargs"] == flag
+    assert history[1]["additional_kwargs"] == {}
+
+
 @pytest.mark.parametrize("endpoint", ("/conversations/{conversation_id}",))
 def test_get_conversation_with_history_length(_setup, endpoint):
     """Test getting conversation history with history_length param."""
@@ -247,6 +277,16 @@ def test_list_conversations_with_history_length(_setup, endpoint):
 
         conversations = response.json()["conversations"]
         assert len(conversations) == 1  # Return exact one conversation
+        assert conversations[0]["conversation_id"] == conv_id_2
+
+        # Test listing the next page of conversations
+        response = pytest.client.get(
+            endpoint, params={"history_length": 1, "offset": 1, "user_id": "testuser"}
+        )
+        assert response.status_code == requests.codes.ok
+
+        conversations = response.json()["conversations"]
+        assert [conv["conversation_id"] for conv in conversations] == [conv_id_1]
 
 
 @pytest.mark.parametrize("endpoint", ("/conversations/{conversation_id}",))
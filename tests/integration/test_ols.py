@@ -77,7 +77,7 @@ def test_post_question_on_invalid_question(_setup, endpoint):
     """Check the REST API /v1/query for invalid question."""
     # let's pretend the question is invalid without even asking LLM
     with (
-        patch("ols.app.endpoints.ols.validate_question", return_value=False),
+        patch("ols.app.endpoints.ols.avalidate_question", return_value=False),
         patch(
             "ols.src.query_helpers.topic_summarizer.LLMChain",
             new=mock_llm_chain(None),
@@ -116,11 +116,11 @@ def test_post_question_on_generic_response_type_summarize_error(_setup, endpoint
     answer = True
     with (
         patch(
-            "ols.src.query_helpers.question_validator.QuestionValidator.validate_question",
+            "ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question",
             return_value=answer,
         ),
         patch(
-            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response",
+            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response",
             side_effect=Exception("summarizer error"),
         ),
         patch(
@@ -153,7 +153,7 @@ def test_post_question_that_is_not_validated(_setup, endpoint):
     """Check the REST API query endpoints for question that is not validated."""
     # let's pretend the question can not be validated
     with patch(
-        "ols.app.endpoints.ols.QuestionValidator.validate_question",
+        "ols.app.endpoints.ols.QuestionValidator.avalidate_question",
         side_effect=Exception("can not validate"),
     ):
         conversation_id = suid.get_suid()
@@ -279,7 +279,8 @@ def test_post_question_improper_conversation_id(_setup, endpoint) -> None:
     config.dev_config.disable_auth = True
     answer = True
     with patch(
-        "ols.app.endpoints.ols.QuestionValidator.validate_question", return_value=answer
+        "ols.app.endpoints.ols.QuestionValidator.avalidate_question",
+        return_value=answer,
     ):
         conversation_id = "not-correct-uuid"
         response = pytest.client.post(
@@ -335,7 +336,7 @@ def test_post_question_on_noyaml_response_type(_setup, endpoint) -> None:
     "ols.app.endpoints.ols.config.ols_config.query_validation_method",
     constants.QueryValidationMethod.KEYWORD,
 )
-@patch("ols.app.endpoints.ols.QuestionValidator.validate_question")
+@patch("ols.app.endpoints.ols.QuestionValidator.avalidate_question")
 def test_post_question_with_keyword(mock_llm_validation, _setup, endpoint) -> None:
     """Check the REST API /v1/query with keyword validation."""
     query = "What is Openshift ?"
@@ -391,7 +392,7 @@ def test_post_query_with_query_filters_response_type(_setup, endpoint) -> None:
     config.ols_config.query_filters = query_filters
 
     with patch(
-        "ols.src.query_helpers.question_validator.QuestionValidator.validate_question",
+        "ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question",
         return_value=answer,
     ):
         ml = mock_langchain_interface("test response")
@@ -439,14 +440,14 @@ def test_post_query_for_conversation_history(_setup, endpoint) -> None:
     # we need to import it here because these modules triggers config
     # load too -> causes exception in auth module because of missing config
     # values
-    from ols.app.endpoints.ols import retrieve_previous_input  # pylint: disable=C0415
+    from ols.app.endpoints.ols import aretrieve_previous_input  # pylint: disable=C0415
     from ols.app.models.models import CacheEntry  # pylint: disable=C0415
 
     actual_returned_history = []
 
-    def capture_return_value(*args, **kwargs):
+    async def capture_return_value(*args, **kwargs):
         nonlocal actual_returned_history
-        actual_returned_history = retrieve_previous_input(*args, **kwargs)
+        actual_returned_history = await aretrieve_previous_input(*args, **kwargs)
         return actual_returned_history
 
     ml = mock_langchain_interface("test response")
@@ -460,7 +461,7 @@ def test_post_query_for_conversation_history(_setup, endpoint) -> None:
             new=mock_llm_loader(ml()),
         ),
         patch(
-            "ols.app.endpoints.ols.retrieve_previous_input",
+            "ols.app.endpoints.ols.aretrieve_previous_input",
             side_effect=capture_return_value,
         ),
         patch(
@@ -529,7 +530,7 @@ def test_post_question_without_attachments(_setup, endpoint) -> None:
         return answer
 
     with patch(
-        "ols.app.endpoints.ols.QuestionValidator.validate_question",
+        "ols.app.endpoints.ols.QuestionValidator.avalidate_question",
         side_effect=validate_question,
     ):
         ml = mock_langchain_interface("test response")
@@ -577,7 +578,7 @@ def test_post_question_with_empty_list_of_attachments(_setup, endpoint) -> None:
         return answer
 
     with patch(
-        "ols.app.endpoints.ols.QuestionValidator.validate_question",
+        "ols.app.endpoints.ols.QuestionValidator.avalidate_question",
         side_effect=validate_question,
     ):
         ml = mock_langchain_interface("test response")
@@ -626,7 +627,7 @@ def test_post_question_with_one_plaintext_attachment(_setup, endpoint) -> None:
         return answer
 
     with patch(
-        "ols.app.endpoints.ols.QuestionValidator.validate_question",
+        "ols.app.endpoints.ols.QuestionValidator.avalidate_question",
         side_effect=validate_question,
     ):
         ml = mock_langchain_interface("test response")
@@ -688,7 +689,7 @@ def test_post_question_with_one_yaml_attachment(_setup, endpoint) -> None:
         return answer
 
     with patch(
-        "ols.app.endpoints.ols.QuestionValidator.validate_question",
+        "ols.app.endpoints.ols.QuestionValidator.avalidate_question",
         side_effect=validate_question,
     ):
         ml = mock_langchain_interface("test response")
@@ -759,7 +760,7 @@ def test_post_question_with_two_yaml_attachments(_setup, endpoint) -> None:
         return answer
 
     with patch(
-        "ols.app.endpoints.ols.QuestionValidator.validate_question",
+        "ols.app.endpoints.ols.QuestionValidator.avalidate_question",
         side_effect=validate_question,
     ):
         ml = mock_langchain_interface("test response")
@@ -850,7 +851,7 @@ def test_post_question_with_one_yaml_without_kind_attachment(_setup, endpoint) -
         return answer
 
     with patch(
-        "ols.app.endpoints.ols.QuestionValidator.validate_question",
+        "ols.app.endpoints.ols.QuestionValidator.avalidate_question",
         side_effect=validate_question,
     ):
         ml = mock_langchain_interface("test response")
@@ -919,7 +920,7 @@ def test_post_question_with_one_yaml_without_name_attachment(_setup, endpoint) -
         return answer
 
     with patch(
-        "ols.app.endpoints.ols.QuestionValidator.validate_question",
+        "ols.app.endpoints.ols.QuestionValidator.avalidate_question",
         side_effect=validate_question,
     ):
         ml = mock_langchain_interface("test response")
@@ -990,7 +991,7 @@ def test_post_question_with_one_invalid_yaml_attachment(_setup, endpoint) -> Non
         return answer
 
     with patch(
-        "ols.app.endpoints.ols.QuestionValidator.validate_question",
+        "ols.app.endpoints.ols.QuestionValidator.avalidate_question",
         side_effect=validate_question,
     ):
         ml = mock_langchain_interface("test response")
@@ -1064,7 +1065,7 @@ logs:
         yaml += f"    log{i}: 'this is log message #{i}"
 
     with patch(
-        "ols.app.endpoints.ols.QuestionValidator.validate_question",
+        "ols.app.endpoints.ols.QuestionValidator.avalidate_question",
         side_effect=validate_question,
     ):
         ml = mock_langchain_interface("test response")
@@ -1140,7 +1141,7 @@ def _post_with_system_prompt_override(_setup, caplog, query, system_prompt):
     logger.handlers = [caplog.handler]  # add caplog handler to logger
 
     with patch(
-        "ols.app.endpoints.ols.QuestionValidator.validate_question",
+        "ols.app.endpoints.ols.QuestionValidator.avalidate_question",
         side_effect=lambda x, y: True,
     ):
         ml = mock_langchain_interface("test response")
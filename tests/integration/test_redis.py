@@ -33,7 +33,7 @@ def setup():
 def test_conversation_in_redis():
     """Check the elementary GET operation and insert_or_append operation."""
     # make sure the cache is empty
-    pytest.redis_cache.redis_client.delete(USER_ID + ":" + CONVERSATION_ID)
+    pytest.redis_cache.delete(USER_ID, CONVERSATION_ID)
 
     # the initial value should be empty
     retrieved = pytest.redis_cache.get(USER_ID, CONVERSATION_ID)
@@ -47,7 +47,7 @@ class MockK8sResponseStatus:
             self.user = None
 
 
-def mock_token_review_response(token_review):
+def mock_token_review_response(token_review, **kwargs):
     """Mock TokenReview Response.
 
     Simulates a response to a Kubernetes TokenReview request,
@@ -55,6 +55,7 @@ def mock_token_review_response(token_review):
 
     Args:
         token_review: The TokenReview object being simulated.
+        kwargs: Additional call parameters, like request timeout.
 
     Returns:
         A MockK8sResponse object with authentication status and user details.
@@ -66,7 +67,7 @@ def mock_token_review_response(token_review):
     return MockK8sResponse(False)
 
 
-def mock_subject_access_review_response(sar):
+def mock_subject_access_review_response(sar, **kwargs):
     """Mock SubjectAccessReview Response.
 
     Simulates a response to a Kubernetes SubjectAccessReview request,
@@ -74,6 +75,7 @@ def mock_subject_access_review_response(sar):
 
     Args:
         sar: The SubjectAccessReview object being simulated.
+        kwargs: Additional call parameters, like request timeout.
 
     Returns:
         A MockK8sResponse object with authorization status.
@@ -39,4 +39,13 @@ def mock_llm_chain(retval):
             input["text"] = input["query"]
             return input
 
+        async def ainvoke(
+            self,
+            input,  # noqa: A002
+            config=None,
+            **kwargs,  # pylint: disable=W0622
+        ):
+            """Perform asynchronous invocation of the LLM chain."""
+            return self.invoke(input, config, **kwargs)
+
     return MockLLMChain
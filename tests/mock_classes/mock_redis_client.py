@@ -21,6 +21,7 @@ class MockRedisClient:
         self.kwargs = kwargs
         print(kwargs)
         self.cache = {}
+        self.published = []
 
     def config_set(self, parameter, value):
         """Allow passing any parameter."""
@@ -44,15 +45,151 @@ class MockRedisClient:
 
         self.cache[key] = value
 
-    def delete(self, key):
-        """Return item from cache (implementation of DELETE command)."""
-        # real Redis accepts keys as strings only
+    def delete(self, *keys):
+        """Delete items from cache (implementation of DEL command)."""
+        deleted = 0
+        for key in keys:
+            # real Redis accepts keys as strings only
+            assert isinstance(key, str)
+
+            if key in self.cache:
+                del self.cache[key]
+                deleted += 1
+        # number of deleted keys, zero when no key did exist
+        return deleted
+
+    def rpush(self, key, *values):
+        """Append values to list (implementation of RPUSH command)."""
         assert isinstance(key, str)
+        assert values, "RPUSH requires at least one value"
+        for value in values:
+            assert isinstance(value, (str, bytes, int, float))
 
-        if key in self.cache:
+        self.cache.setdefault(key, []).extend(values)
+        return len(self.cache[key])
+
+    def lrange(self, key, start, end):
+        """Return range of list items (implementation of LRANGE command)."""
+        assert isinstance(key, str)
+
+        items = self.cache.get(key, [])
+        end = len(items) if end == -1 else end + 1
+        return list(items[start:end])
+
+    def lindex(self, key, index):
+        """Return list item at given index (implementation of LINDEX command)."""
+        assert isinstance(key, str)
+
+        items = self.cache.get(key, [])
+        if -len(items) <= index < len(items):
+            return items[index]
+        return None
+
+    def llen(self, key):
+        """Return length of list (implementation of LLEN command)."""
+        assert isinstance(key, str)
+
+        return len(self.cache.get(key, []))
+
+    def lset(self, key, index, value):
+        """Set list item at given index (implementation of LSET command)."""
+        assert isinstance(key, str)
+        assert isinstance(value, (str, bytes, int, float))
+
+        self.cache[key][index] = value
+        return True
+
+    def ltrim(self, key, start, end):
+        """Keep the given range of list items (implementation of LTRIM command)."""
+        assert isinstance(key, str)
+
+        self.cache[key] = self.lrange(key, start, end)
+        return True
+
+    def hset(self, key, field, value):
+        """Set field in hash (implementation of HSET command)."""
+        assert isinstance(key, str)
+        assert isinstance(value, (str, bytes, int, float))
+
+        self.cache.setdefault(key, {})[field] = value
+        return 1
+
+    def hsetnx(self, key, field, value):
+        """Set field in hash if it does not exist (implementation of HSETNX)."""
+        assert isinstance(key, str)
+        assert isinstance(value, (str, bytes, int, float))
+
+        fields = self.cache.setdefault(key, {})
+        if field in fields:
+            return 0
+        fields[field] = value
+        return 1
+
+    def hget(self, key, field):
+        """Return field from hash (implementation of HGET command)."""
+        assert isinstance(key, str)
+
+        return self.cache.get(key, {}).get(field)
+
+    def exists(self, *keys):
+        """Return number of existing keys (implementation of EXISTS command)."""
+        return sum(1 for key in keys if key in self.cache)
+
+    def zadd(self, key, mapping, nx=False):
+        """Add members to sorted set (implementation of ZADD command)."""
+        assert isinstance(key, str)
+
+        members = self.cache.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            if member not in members:
+                added += 1
+            elif nx:
+                continue
+            members[member] = score
+        return added
+
+    def zrem(self, key, *members):
+        """Remove members from sorted set (implementation of ZREM command)."""
+        assert isinstance(key, str)
+
+        removed = 0
+        for member in members:
+            if member in self.cache.get(key, {}):
+                del self.cache[key][member]
+                removed += 1
+        if key in self.cache and not self.cache[key]:
             del self.cache[key]
-            return True  # successfuly deleted, return True
-        return False  # Key did not exist, return False
+        return removed
+
+    def zrevrange(self, key, start, end):
+        """Return members ordered from the highest score (ZREVRANGE command)."""
+        assert isinstance(key, str)
+
+        members = sorted(
+            self.cache.get(key, {}).items(),
+            key=lambda item: (item[1], item[0]),
+            reverse=True,
+        )
+        end = len(members) if end == -1 else end + 1
+        return [member for member, _ in members[start:end]]
+
+    def scan_iter(self, match=None, count=None):
+        """Iterate over keys matching a given pattern (SCAN command)."""
+        return iter(self.keys(match or "*"))
+
+    def publish(self, channel, message):
+        """Record published message (implementation of PUBLISH command)."""
+        # real Redis accepts channels as strings only
+        assert isinstance(channel, str)
+
+        self.published.append((channel, message))
+        # number of subscribers that received the message
+        return 0
+
+    def pipeline(self, transaction=True):
+        """Return pipeline that executes commands when `execute` is called."""
+        return MockRedisPipeline(self)
 
     def keys(self, pattern):
         """List keys matching a given pattern (implementation of KEYS command)."""
@@ -62,3 +199,52 @@ class MockRedisClient:
         # Use fnmatch to match keys against the pattern
         matching_keys = [key for key in self.cache if fnmatch.fnmatch(key, pattern)]
         return matching_keys
+
+
+class MockRedisPipeline:
+    """Mock for Redis pipeline, queued commands are executed in order.
+
+    Commands are executed immediately after `watch` is called, until
+    the transaction is started by `multi`, the same as in real pipeline.
+    """
+
+    def __init__(self, client):
+        """Initialize pipeline for given mocked client."""
+        self.client = client
+        self.commands = []
+        self.watching = False
+
+    def __enter__(self):
+        """Use the pipeline as context manager."""
+        return self
+
+    def __exit__(self, *args):
+        """Reset the pipeline when leaving the context."""
+        self.commands = []
+        self.watching = False
+
+    def watch(self, *keys):
+        """Watch keys, following commands are executed immediately."""
+        self.watching = True
+
+    def multi(self):
+        """Start the transaction, following commands are queued."""
+        self.watching = False
+
+    def __getattr__(self, name):
+        """Queue the command instead of executing it."""
+        method = getattr(self.client, name)
+        if self.watching:
+            return method
+
+        def queue(*args, **kwargs):
+            self.commands.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        """Execute all queued commands and return their results."""
+        results = [method(*args, **kwargs) for method, args, kwargs in self.commands]
+        self.commands = []
+        return results
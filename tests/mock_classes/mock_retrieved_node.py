@@ -11,6 +11,7 @@ class MockRetrievedNode:
         self._text = node_detail["text"]
         self._score = node_detail["score"]
         self._metadata = node_detail["metadata"]
+        self.node_id = node_detail.get("node_id")
 
     def get_text(self) -> str:
         """Mock get_text."""
@@ -1,11 +1,13 @@
 """Unit tests for OLS endpoint."""
 
+import asyncio
 import json
 import re
+import threading
 import time
 from http import HTTPStatus
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, PropertyMock, patch
 
 import pytest
 from fastapi import HTTPException
@@ -13,7 +15,11 @@ from langchain_core.messages import AIMessage, HumanMessage
 
 from ols import config, constants
 from ols.app.endpoints import ols
-from ols.app.models.config import UserDataCollection
+from ols.app.models.config import (
+    HistoryCompactionConfig,
+    SemanticCacheConfig,
+    UserDataCollection,
+)
 from ols.app.models.models import (
     Attachment,
     CacheEntry,
@@ -22,11 +28,12 @@ from ols.app.models.models import (
     SummarizerResponse,
 )
 from ols.customize import prompts
+from ols.src.cache.semantic_cache import SemanticCache
 from ols.src.llms.llm_loader import LLMConfigurationError
 from ols.utils import suid
 from ols.utils.errors_parsing import DEFAULT_ERROR_MESSAGE
 from ols.utils.redactor import Redactor, RegexFilter
-from ols.utils.token_handler import PromptTooLongError
+from ols.utils.token_handler import PromptTooLongError, TokenHandler
 
 
 @pytest.fixture(scope="function")
@@ -110,6 +117,184 @@ def test_retrieve_previous_input_for_previous_history(get):
     assert previous_input == "input"
 
 
+def conversation_turns(count):
+    """Construct conversation history with given number of turns."""
+    return [
+        CacheEntry(query=HumanMessage(f"question {i}"), response=AIMessage(f"a {i}"))
+        for i in range(count)
+    ]
+
+
+@pytest.mark.usefixtures("_load_config")
+def test_history_limit():
+    """Check that history read is limited only when compaction is enabled."""
+    assert ols.history_limit() is None
+
+    config.ols_config.conversation_cache.history_compaction = HistoryCompactionConfig(
+        max_turns=10, keep_turns=3
+    )
+    # the summary is read together with the most recent turns
+    assert ols.history_limit() == 11
+
+
+def test_count_history_tokens():
+    """Check that token counts stored in cache entries are used."""
+    entry = CacheEntry(
+        query=HumanMessage("question"),
+        response=AIMessage("answer"),
+        token_counts={"cl100k_base:gpt": [100, 200]},
+    )
+    assert ols.count_history_tokens([entry]) == 300
+
+    token_handler = TokenHandler()
+    entry = CacheEntry(query=HumanMessage("question"), response=AIMessage("answer"))
+    assert ols.count_history_tokens([entry]) == token_handler.message_to_token_count(
+        entry.query
+    ) + token_handler.message_to_token_count(entry.response)
+
+
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.app.endpoints.ols.compaction_executor")
+def test_schedule_history_compaction(executor):
+    """Check that only long conversations are compacted, each one once."""
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(query="Tell me about Kubernetes", provider="p", model="m")
+
+    # compaction is not configured
+    ols.schedule_history_compaction(
+        constants.DEFAULT_USER_UID, conversation_id, conversation_turns(50), llm_request
+    )
+    executor.submit.assert_not_called()
+
+    config.ols_config.conversation_cache.history_compaction = HistoryCompactionConfig(
+        max_turns=10, keep_turns=3
+    )
+    ols.schedule_history_compaction(
+        constants.DEFAULT_USER_UID, conversation_id, conversation_turns(9), llm_request
+    )
+    executor.submit.assert_not_called()
+
+    history = conversation_turns(10)
+    ols.schedule_history_compaction(
+        constants.DEFAULT_USER_UID, conversation_id, history, llm_request
+    )
+    executor.submit.assert_called_once_with(
+        ols.compact_history,
+        constants.DEFAULT_USER_UID,
+        conversation_id,
+        history,
+        "p",
+        "m",
+        False,
+    )
+
+    # the conversation is being compacted already
+    ols.schedule_history_compaction(
+        constants.DEFAULT_USER_UID, conversation_id, history, llm_request
+    )
+    assert executor.submit.call_count == 1
+    ols._compacting.clear()
+
+
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.app.endpoints.ols.compaction_executor")
+def test_schedule_history_compaction_by_tokens(executor):
+    """Check that shorter conversations are passed to token check in background."""
+    config.ols_config.conversation_cache.history_compaction = HistoryCompactionConfig(
+        max_turns=10, keep_turns=3, max_tokens=1000
+    )
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+
+    ols.schedule_history_compaction(
+        constants.DEFAULT_USER_UID, suid.get_suid(), conversation_turns(3), llm_request
+    )
+    executor.submit.assert_not_called()
+
+    ols.schedule_history_compaction(
+        constants.DEFAULT_USER_UID, suid.get_suid(), conversation_turns(4), llm_request
+    )
+    executor.submit.assert_called_once()
+    ols._compacting.clear()
+
+
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.app.endpoints.ols.HistorySummarizer")
+def test_compact_history(summarizer):
+    """Check that the oldest turns are replaced by summary in the cache."""
+    config.ols_config.conversation_cache.history_compaction = HistoryCompactionConfig(
+        max_turns=4, keep_turns=2
+    )
+    summarizer.return_value.summarize_history.return_value = "summary"
+    conversation_id = suid.get_suid()
+    history = conversation_turns(5)
+    for entry in history:
+        config.conversation_cache.insert_or_append(
+            constants.DEFAULT_USER_UID, conversation_id, entry
+        )
+    ols._compacting.add(f"{constants.DEFAULT_USER_UID}:{conversation_id}")
+
+    ols.compact_history(
+        constants.DEFAULT_USER_UID, conversation_id, history[1:], "p", "m"
+    )
+
+    summarizer.assert_called_once_with(provider="p", model="m")
+    folded = summarizer.return_value.summarize_history.call_args.args[1]
+    assert [message.content for message in folded] == [
+        "question 0",
+        "a 0",
+        "question 1",
+        "a 1",
+        "question 2",
+        "a 2",
+    ]
+    compacted = config.conversation_cache.get(
+        constants.DEFAULT_USER_UID, conversation_id
+    )
+    assert compacted[0].query.content == constants.HISTORY_SUMMARY_QUERY
+    assert compacted[0].response.content == "summary"
+    assert compacted[0].response.additional_kwargs == {
+        constants.HISTORY_SUMMARY_FLAG: True
+    }
+    assert compacted[1:] == history[3:]
+    assert not ols._compacting
+
+
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.app.endpoints.ols.HistorySummarizer")
+def test_compact_history_under_token_limit(summarizer):
+    """Check that conversation fitting into token limit is not compacted."""
+    config.ols_config.conversation_cache.history_compaction = HistoryCompactionConfig(
+        max_turns=10, keep_turns=2, max_tokens=1000
+    )
+
+    ols.compact_history(
+        constants.DEFAULT_USER_UID, suid.get_suid(), conversation_turns(5), "p", "m"
+    )
+    summarizer.assert_not_called()
+
+
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.app.endpoints.ols.HistorySummarizer")
+def test_compact_history_on_error(summarizer):
+    """Check that conversation is kept as it is when summarization fails."""
+    config.ols_config.conversation_cache.history_compaction = HistoryCompactionConfig(
+        max_turns=4, keep_turns=2
+    )
+    summarizer.return_value.summarize_history.side_effect = Exception("LLM error")
+    conversation_id = suid.get_suid()
+    history = conversation_turns(4)
+    for entry in history:
+        config.conversation_cache.insert_or_append(
+            constants.DEFAULT_USER_UID, conversation_id, entry
+        )
+
+    ols.compact_history(constants.DEFAULT_USER_UID, conversation_id, history, "p", "m")
+    assert (
+        config.conversation_cache.get(constants.DEFAULT_USER_UID, conversation_id)
+        == history
+    )
+
+
 @pytest.mark.usefixtures("_load_config")
 def test_retrieve_attachments_on_no_input():
     """Check the function to retrieve attachments from payload when attachments are not send."""
@@ -226,7 +411,48 @@ def test_store_conversation_history(insert_or_append):
         topic_summary,
     )
 
-    expected_history = CacheEntry(query=HumanMessage(query))
+    expected_history = CacheEntry(
+        query=HumanMessage(query),
+        token_counts=TokenHandler().history_token_counts(
+            [HumanMessage(query), AIMessage("")], config.ols_config.default_model
+        ),
+    )
+    insert_or_append.assert_called_with(
+        constants.DEFAULT_USER_UID,
+        conversation_id,
+        expected_history,
+        topic_summary,
+        skip_user_id_check,
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.config.conversation_cache.insert_or_append")
+async def test_astore_conversation_history(insert_or_append):
+    """Test if operation to store conversation history to cache is called."""
+    conversation_id = suid.get_suid()
+    skip_user_id_check = False
+    query = "Tell me about Kubernetes"
+    llm_request = LLMRequest(query=query)
+    topic_summary = "test summary"
+
+    await ols.astore_conversation_history(
+        constants.DEFAULT_USER_UID,
+        conversation_id,
+        llm_request,
+        "",
+        [],
+        [],
+        topic_summary,
+    )
+
+    expected_history = CacheEntry(
+        query=HumanMessage(query),
+        token_counts=TokenHandler().history_token_counts(
+            [HumanMessage(query), AIMessage("")], config.ols_config.default_model
+        ),
+    )
     insert_or_append.assert_called_with(
         constants.DEFAULT_USER_UID,
         conversation_id,
@@ -253,7 +479,40 @@ def test_store_conversation_history_some_response(insert_or_append):
     )
 
     expected_history = CacheEntry(
-        query=HumanMessage(query), response=AIMessage(response)
+        query=HumanMessage(query),
+        response=AIMessage(response),
+        token_counts=TokenHandler().history_token_counts(
+            [HumanMessage(query), AIMessage(response)], config.ols_config.default_model
+        ),
+    )
+    insert_or_append.assert_called_with(
+        user_id, conversation_id, expected_history, topic_summary, skip_user_id_check
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.config.conversation_cache.insert_or_append")
+async def test_astore_conversation_history_some_response(insert_or_append):
+    """Test if operation to store conversation history to cache is called."""
+    user_id = "1234"
+    conversation_id = suid.get_suid()
+    query = "Tell me about Kubernetes"
+    llm_request = LLMRequest(query=query)
+    response = "*response*"
+    topic_summary = "some summary"
+    skip_user_id_check = False
+
+    await ols.astore_conversation_history(
+        user_id, conversation_id, llm_request, response, [], [], topic_summary
+    )
+
+    expected_history = CacheEntry(
+        query=HumanMessage(query),
+        response=AIMessage(response),
+        token_counts=TokenHandler().history_token_counts(
+            [HumanMessage(query), AIMessage(response)], config.ols_config.default_model
+        ),
     )
     insert_or_append.assert_called_with(
         user_id, conversation_id, expected_history, topic_summary, skip_user_id_check
@@ -293,6 +552,52 @@ def test_store_conversation_history_store_metadata(insert_or_append):
                 "provider": provider,
             },
         ),
+        token_counts=TokenHandler().history_token_counts(
+            [HumanMessage(query), AIMessage(response)], model
+        ),
+    )
+    insert_or_append.assert_called_with(
+        user_id, conversation_id, expected_history, topic_summary, skip_user_id_check
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.config.conversation_cache.insert_or_append")
+async def test_astore_conversation_history_store_metadata(insert_or_append):
+    """Test if operation to store conversation history to cache is called."""
+    user_id = "1234"
+    conversation_id = suid.get_suid()
+    query = "Tell me about Kubernetes"
+    provider = "some-provider"
+    model = "some-model"
+    llm_request = LLMRequest(query=query, provider=provider, model=model)
+    response = "*response*"
+    skip_user_id_check = False
+    start_time = time.time()
+    response_time = time.time()
+    timestamps = {"start": start_time, "generate response": response_time}
+    topic_summary = "some summary"
+
+    await ols.astore_conversation_history(
+        user_id, conversation_id, llm_request, response, [], timestamps, topic_summary
+    )
+
+    expected_history = CacheEntry(
+        query=HumanMessage(
+            content=llm_request.query, response_metadata={"created_at": start_time}
+        ),
+        response=AIMessage(
+            content=response,
+            response_metadata={
+                "created_at": response_time,
+                "model": model,
+                "provider": provider,
+            },
+        ),
+        token_counts=TokenHandler().history_token_counts(
+            [HumanMessage(query), AIMessage(response)], model
+        ),
     )
     insert_or_append.assert_called_with(
         user_id, conversation_id, expected_history, topic_summary, skip_user_id_check
@@ -315,6 +620,23 @@ def test_store_conversation_history_empty_user_id():
         )
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+async def test_astore_conversation_history_empty_user_id():
+    """Test if basic input verification is done during history store operation."""
+    user_id = ""
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+    with pytest.raises(HTTPException, match="Invalid user ID"):
+        await ols.astore_conversation_history(
+            user_id, conversation_id, llm_request, "", [], [], ""
+        )
+    with pytest.raises(HTTPException, match="Invalid user ID"):
+        await ols.astore_conversation_history(
+            user_id, conversation_id, llm_request, None, [], [], ""
+        )
+
+
 @pytest.mark.usefixtures("_load_config")
 def test_store_conversation_history_improper_user_id():
     """Test if basic input verification is done during history store operation."""
@@ -327,6 +649,19 @@ def test_store_conversation_history_improper_user_id():
         )
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+async def test_astore_conversation_history_improper_user_id():
+    """Test if basic input verification is done during history store operation."""
+    user_id = "::::"
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+    with pytest.raises(HTTPException, match="Invalid user ID"):
+        await ols.astore_conversation_history(
+            user_id, conversation_id, llm_request, "", [], [], ""
+        )
+
+
 @pytest.mark.usefixtures("_load_config")
 def test_store_conversation_history_improper_conversation_id():
     """Test if basic input verification is done during history store operation."""
@@ -338,6 +673,18 @@ def test_store_conversation_history_improper_conversation_id():
         )
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+async def test_astore_conversation_history_improper_conversation_id():
+    """Test if basic input verification is done during history store operation."""
+    conversation_id = "::::"
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+    with pytest.raises(HTTPException, match="Invalid conversation ID"):
+        await ols.astore_conversation_history(
+            constants.DEFAULT_USER_UID, conversation_id, llm_request, "", [], [], ""
+        )
+
+
 @pytest.mark.usefixtures("_load_config")
 @patch(
     "ols.app.endpoints.ols.config.ols_config.query_validation_method",
@@ -355,6 +702,24 @@ def test_validate_question_valid_kw(llm_validate_question_mock):
     assert llm_validate_question_mock.call_count == 0
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch(
+    "ols.app.endpoints.ols.config.ols_config.query_validation_method",
+    constants.QueryValidationMethod.KEYWORD,
+)
+@patch("ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question")
+async def test_avalidate_question_valid_kw(llm_validate_question_mock):
+    """Check the behaviour of avalidate_question function using valid keyword."""
+    conversation_id = suid.get_suid()
+    query = "Tell me about Kubernetes?"
+    llm_request = LLMRequest(query=query, conversation_id=conversation_id)
+    resp = await ols.avalidate_question(conversation_id, llm_request)
+
+    assert resp
+    assert llm_validate_question_mock.call_count == 0
+
+
 @pytest.mark.usefixtures("_load_config")
 @patch(
     "ols.app.endpoints.ols.config.ols_config.query_validation_method",
@@ -375,6 +740,27 @@ def test_validate_question_too_long_query(llm_validate_question_mock):
         ols.validate_question(conversation_id, llm_request)
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch(
+    "ols.app.endpoints.ols.config.ols_config.query_validation_method",
+    constants.QueryValidationMethod.LLM,
+)
+@patch(
+    "ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question",
+    side_effect=PromptTooLongError("Prompt length 10000 exceeds LLM"),
+)
+async def test_avalidate_question_too_long_query(llm_validate_question_mock):
+    """Check the behaviour of avalidate_question function with too long query."""
+    # This test case is applicable only for LLM based query validation.
+    conversation_id = suid.get_suid()
+    query = "Tell me about Kubernetes?"
+    llm_request = LLMRequest(query=query, conversation_id=conversation_id)
+    # PromptTooLongError should be caught and HTTPException needs to be raised
+    with pytest.raises(HTTPException, match=r"413: {'response': 'Prompt is too long'"):
+        await ols.avalidate_question(conversation_id, llm_request)
+
+
 @pytest.mark.usefixtures("_load_config")
 @patch(
     "ols.app.endpoints.ols.config.ols_config.query_validation_method",
@@ -389,6 +775,66 @@ def test_validate_question_invalid_kw():
     assert not resp
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch(
+    "ols.app.endpoints.ols.config.ols_config.query_validation_method",
+    constants.QueryValidationMethod.KEYWORD,
+)
+async def test_avalidate_question_invalid_kw():
+    """Check the behaviour of avalidate_question function using invalid keyword."""
+    conversation_id = suid.get_suid()
+    query = "What does 42 signify ?"
+    llm_request = LLMRequest(query=query, conversation_id=conversation_id)
+    resp = await ols.avalidate_question(conversation_id, llm_request)
+    assert not resp
+
+
+@pytest.mark.usefixtures("_load_config")
+@patch(
+    "ols.app.endpoints.ols.config.ols_config.query_validation_method",
+    constants.QueryValidationMethod.KEYWORD,
+)
+def test_validate_question_kw_word_mode():
+    """Check that only whole words match in word mode of keyword validation."""
+    conversation_id = suid.get_suid()
+    # "oc" is one of the keywords
+    llm_request = LLMRequest(query="How do I bake chocolate cake?")
+    assert ols.validate_question(conversation_id, llm_request)
+
+    with patch.object(
+        config.ols_config.keyword_validation,
+        "match_mode",
+        constants.KeywordMatchMode.WORD,
+    ):
+        assert not ols.validate_question(conversation_id, llm_request)
+        llm_request = LLMRequest(query="How do I list pods?")
+        assert ols.validate_question(conversation_id, llm_request)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch(
+    "ols.app.endpoints.ols.config.ols_config.query_validation_method",
+    constants.QueryValidationMethod.KEYWORD,
+)
+async def test_avalidate_question_kw_word_mode():
+    """Check that only whole words match in word mode of keyword validation."""
+    conversation_id = suid.get_suid()
+    # "oc" is one of the keywords
+    llm_request = LLMRequest(query="How do I bake chocolate cake?")
+    assert await ols.avalidate_question(conversation_id, llm_request)
+
+    with patch.object(
+        config.ols_config.keyword_validation,
+        "match_mode",
+        constants.KeywordMatchMode.WORD,
+    ):
+        assert not await ols.avalidate_question(conversation_id, llm_request)
+        llm_request = LLMRequest(query="How do I list pods?")
+        assert await ols.avalidate_question(conversation_id, llm_request)
+
+
 @pytest.mark.usefixtures("_load_config")
 @patch(
     "ols.app.endpoints.ols.config.ols_config.query_validation_method",
@@ -404,6 +850,22 @@ def test_validate_question_llm(validate_question_mock):
     validate_question_mock.assert_called_with(conversation_id, query)
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch(
+    "ols.app.endpoints.ols.config.ols_config.query_validation_method",
+    constants.QueryValidationMethod.LLM,
+)
+@patch("ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question")
+async def test_avalidate_question_llm(validate_question_mock):
+    """Check the behaviour of avalidate_question function with LLM."""
+    conversation_id = suid.get_suid()
+    query = "Tell me about Kubernetes"
+    llm_request = LLMRequest(query=query, conversation_id=conversation_id)
+    await ols.avalidate_question(conversation_id, llm_request)
+    validate_question_mock.assert_called_with(conversation_id, query)
+
+
 @pytest.mark.usefixtures("_load_config")
 @patch(
     "ols.app.endpoints.ols.config.ols_config.query_validation_method",
@@ -423,6 +885,26 @@ def test_validate_question_on_configuration_error_llm(validate_question_mock):
         ols.validate_question(conversation_id, llm_request)
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch(
+    "ols.app.endpoints.ols.config.ols_config.query_validation_method",
+    constants.QueryValidationMethod.LLM,
+)
+@patch("ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question")
+async def test_avalidate_question_on_configuration_error_llm(validate_question_mock):
+    """Check the behaviour of avalidate_question function when wrong configuration is detected."""
+    # This test case is applicable only for LLM based query validation.
+    conversation_id = suid.get_suid()
+    query = "Tell me about Kubernetes"
+    llm_request = LLMRequest(query=query, conversation_id=conversation_id)
+    validate_question_mock.side_effect = LLMConfigurationError
+
+    # HTTP exception should be raises
+    with pytest.raises(HTTPException, match="Unable to process this request"):
+        await ols.avalidate_question(conversation_id, llm_request)
+
+
 @pytest.mark.usefixtures("_load_config")
 @patch(
     "ols.app.endpoints.ols.config.ols_config.query_validation_method",
@@ -443,6 +925,27 @@ def test_validate_question_on_validation_error(validate_question_mock):
         ols.validate_question(conversation_id, llm_request)
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch(
+    "ols.app.endpoints.ols.config.ols_config.query_validation_method",
+    constants.QueryValidationMethod.LLM,
+)
+@patch("ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question")
+async def test_avalidate_question_on_validation_error(validate_question_mock):
+    """Check the behaviour of avalidate_question function when query is not validated properly."""
+    conversation_id = suid.get_suid()
+    query = "Tell me about Kubernetes"
+    llm_request = LLMRequest(query=query, conversation_id=conversation_id)
+    validate_question_mock.side_effect = (
+        ValueError  # any exception except HTTPException can be used there
+    )
+
+    # HTTP exception should be raises
+    with pytest.raises(HTTPException, match="Error while validating question"):
+        await ols.avalidate_question(conversation_id, llm_request)
+
+
 @patch("ols.app.endpoints.ols._validate_question_keyword")
 @patch("ols.src.query_helpers.question_validator.QuestionValidator.validate_question")
 def test_validate_question_disabled(
@@ -451,13 +954,154 @@ def test_validate_question_disabled(
     """Check the behaviour of validate_question function when it is disabled."""
     # This is the default behavior; no query validation.
     conversation_id = suid.get_suid()
-    query = "What does 42 signify ?"
-    llm_request = LLMRequest(query=query, conversation_id=conversation_id)
-    resp = ols.validate_question(conversation_id, llm_request)
-
-    assert validate_question_llm_mock.call_count == 0
-    assert validate_question_kw_mock.call_count == 0
-    assert resp
+    query = "What does 42 signify ?"
+    llm_request = LLMRequest(query=query, conversation_id=conversation_id)
+    resp = ols.validate_question(conversation_id, llm_request)
+
+    assert validate_question_llm_mock.call_count == 0
+    assert validate_question_kw_mock.call_count == 0
+    assert resp
+
+
+@pytest.mark.asyncio
+@patch("ols.app.endpoints.ols._validate_question_keyword")
+@patch("ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question")
+async def test_avalidate_question_disabled(
+    validate_question_llm_mock, validate_question_kw_mock
+):
+    """Check the behaviour of avalidate_question function when it is disabled."""
+    # This is the default behavior; no query validation.
+    conversation_id = suid.get_suid()
+    query = "What does 42 signify ?"
+    llm_request = LLMRequest(query=query, conversation_id=conversation_id)
+    resp = await ols.avalidate_question(conversation_id, llm_request)
+
+    assert validate_question_llm_mock.call_count == 0
+    assert validate_question_kw_mock.call_count == 0
+    assert resp
+
+
+@pytest.mark.usefixtures("_load_config")
+@patch(
+    "ols.app.endpoints.ols.config.ols_config.query_validation_method",
+    constants.QueryValidationMethod.EMBEDDING,
+)
+@pytest.mark.parametrize("valid", [True, False])
+@patch("ols.src.query_helpers.question_validator.QuestionValidator.validate_question")
+def test_validate_question_embedding(validate_question_llm_mock, valid):
+    """Check the behaviour of validate_question function with embeddings."""
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+    validator = Mock()
+    validator.validate_question.return_value = valid
+    with patch.object(
+        type(config), "embedding_question_validator", new_callable=PropertyMock
+    ) as validator_property:
+        validator_property.return_value = validator
+        assert ols.validate_question(conversation_id, llm_request) is valid
+
+    validator.validate_question.assert_called_once_with("Tell me about Kubernetes")
+    assert validate_question_llm_mock.call_count == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch(
+    "ols.app.endpoints.ols.config.ols_config.query_validation_method",
+    constants.QueryValidationMethod.EMBEDDING,
+)
+@pytest.mark.parametrize("valid", [True, False])
+@patch("ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question")
+async def test_avalidate_question_embedding(validate_question_llm_mock, valid):
+    """Check the behaviour of avalidate_question function with embeddings."""
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+    validator = Mock()
+    validator.validate_question.return_value = valid
+    with patch.object(
+        type(config), "embedding_question_validator", new_callable=PropertyMock
+    ) as validator_property:
+        validator_property.return_value = validator
+        assert await ols.avalidate_question(conversation_id, llm_request) is valid
+
+    validator.validate_question.assert_called_once_with("Tell me about Kubernetes")
+    assert validate_question_llm_mock.call_count == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch(
+    "ols.app.endpoints.ols.config.ols_config.query_validation_method",
+    constants.QueryValidationMethod.EMBEDDING,
+)
+@patch(
+    "ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question",
+    return_value=False,
+)
+async def test_avalidate_question_embedding_ambiguous(validate_question_llm_mock):
+    """Check that ambiguous questions are validated by LLM."""
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+    validator = Mock()
+    validator.validate_question.return_value = None
+    with patch.object(
+        type(config), "embedding_question_validator", new_callable=PropertyMock
+    ) as validator_property:
+        validator_property.return_value = validator
+        assert not await ols.avalidate_question(conversation_id, llm_request)
+
+    validate_question_llm_mock.assert_called_once_with(
+        conversation_id, "Tell me about Kubernetes"
+    )
+
+
+@pytest.mark.usefixtures("_load_config")
+@patch(
+    "ols.app.endpoints.ols.config.ols_config.query_validation_method",
+    constants.QueryValidationMethod.EMBEDDING,
+)
+@patch("ols.src.query_helpers.question_validator.QuestionValidator.validate_question")
+def test_validate_question_embedding_without_index(validate_question_llm_mock):
+    """Check that questions are validated by keywords or LLM without RAG index."""
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(query="What does 42 signify ?")
+    with patch.object(
+        type(config), "embedding_question_validator", new_callable=PropertyMock
+    ) as validator_property:
+        validator_property.return_value = None
+        assert not ols.validate_question(conversation_id, llm_request)
+        assert validate_question_llm_mock.call_count == 0
+
+        with patch.object(config.ols_config.embedding_validation, "llm_fallback", True):
+            ols.validate_question(conversation_id, llm_request)
+        validate_question_llm_mock.assert_called_once_with(
+            conversation_id, "What does 42 signify ?"
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch(
+    "ols.app.endpoints.ols.config.ols_config.query_validation_method",
+    constants.QueryValidationMethod.EMBEDDING,
+)
+@patch("ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question")
+async def test_avalidate_question_embedding_without_index(validate_question_llm_mock):
+    """Check that questions are validated by keywords or LLM without RAG index."""
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(query="What does 42 signify ?")
+    with patch.object(
+        type(config), "embedding_question_validator", new_callable=PropertyMock
+    ) as validator_property:
+        validator_property.return_value = None
+        assert not await ols.avalidate_question(conversation_id, llm_request)
+        assert validate_question_llm_mock.call_count == 0
+
+        with patch.object(config.ols_config.embedding_validation, "llm_fallback", True):
+            await ols.avalidate_question(conversation_id, llm_request)
+        validate_question_llm_mock.assert_called_once_with(
+            conversation_id, "What does 42 signify ?"
+        )
 
 
 @pytest.mark.usefixtures("_load_config")
@@ -533,6 +1177,33 @@ def test_query_filter_on_redact_error():
             ols.redact_query(conversation_id, llm_request)
 
 
+@pytest.mark.usefixtures("_load_config")
+def test_response_redact_filter():
+    """Test the function to redact LLM response."""
+    conversation_id = suid.get_suid()
+    q = Redactor(config.ols_config.query_filters)
+    q.regex_filters = [
+        RegexFilter(
+            pattern=re.compile(r"\b\d{3}-\d{3}-\d{4}\b"),
+            name="phone-filter",
+            replace_with="<PHONE>",
+        )
+    ]
+    config._query_filters = q
+
+    result = ols.redact_response(conversation_id, "Call 123-456-7890 now")
+    assert result == "Call <PHONE> now"
+
+
+@pytest.mark.usefixtures("_load_config")
+def test_response_redact_on_redact_error():
+    """Test the function to redact LLM response when redactor raises an error."""
+    conversation_id = suid.get_suid()
+    with pytest.raises(HTTPException, match="Error while redacting response"):
+        with patch("ols.utils.redactor.Redactor.redact", side_effect=Exception):
+            ols.redact_response(conversation_id, "Call 123-456-7890 now")
+
+
 @pytest.mark.usefixtures("_load_config")
 def test_attachments_redact_on_no_filters_defined():
     """Test the function to redact attachments when no filters are setup."""
@@ -678,16 +1349,17 @@ def test_attachments_redact_on_redact_error():
             ols.redact_attachments(conversation_id, attachments)
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
 @patch(
     "ols.app.endpoints.ols.config.ols_config.query_validation_method",
     constants.QueryValidationMethod.LLM,
 )
-@patch("ols.src.query_helpers.question_validator.QuestionValidator.validate_question")
-@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response")
+@patch("ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question")
+@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response")
 @patch("ols.config.conversation_cache.get")
-@patch("ols.src.query_helpers.topic_summarizer.TopicSummarizer.summarize_topic")
-def test_conversation_request(
+@patch("ols.src.query_helpers.topic_summarizer.TopicSummarizer.asummarize_topic")
+async def test_conversation_request(
     mock_summarize_topic,
     mock_conversation_cache_get,
     mock_summarize,
@@ -707,7 +1379,7 @@ def test_conversation_request(
         token_counter=None,
     )
     llm_request = LLMRequest(query="Tell me about Kubernetes")
-    response = ols.conversation_request(llm_request, auth)
+    response = await ols.conversation_request(llm_request, auth)
     assert (
         response.response
         == "Kubernetes is an open-source container-orchestration system..."
@@ -719,7 +1391,7 @@ def test_conversation_request(
     # invalid question
     mock_validate_question.return_value = False
     llm_request = LLMRequest(query="Generate a yaml")
-    response = ols.conversation_request(llm_request, auth)
+    response = await ols.conversation_request(llm_request, auth)
     assert response.response == prompts.INVALID_QUERY_RESP
     assert suid.check_suid(
         response.conversation_id
@@ -729,17 +1401,18 @@ def test_conversation_request(
     mock_validate_question.side_effect = HTTPException
     with pytest.raises(HTTPException) as excinfo:
         llm_request = LLMRequest(query="Generate a yaml")
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
         assert excinfo.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
         assert len(response.conversation_id) == 0
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-@patch("ols.src.query_helpers.question_validator.QuestionValidator.validate_question")
-@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response")
+@patch("ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question")
+@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response")
 @patch("ols.config.conversation_cache.get")
-@patch("ols.src.query_helpers.topic_summarizer.TopicSummarizer.summarize_topic")
-def test_conversation_request_dedup_ref_docs(
+@patch("ols.src.query_helpers.topic_summarizer.TopicSummarizer.asummarize_topic")
+async def test_conversation_request_dedup_ref_docs(
     mock_summarize_topic,
     mock_conversation_cache_get,
     mock_summarize,
@@ -760,7 +1433,7 @@ def test_conversation_request_dedup_ref_docs(
         token_counter=None,
     )
     llm_request = LLMRequest(query="some query")
-    response = ols.conversation_request(llm_request, auth)
+    response = await ols.conversation_request(llm_request, auth)
 
     assert len(response.referenced_documents) == 2
     assert response.referenced_documents[0].docs_url == "url-b"
@@ -769,14 +1442,15 @@ def test_conversation_request_dedup_ref_docs(
     assert response.referenced_documents[1].title == "title-a"
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
 @patch(
     "ols.app.endpoints.ols.config.ols_config.query_validation_method",
     constants.QueryValidationMethod.LLM,
 )
-@patch("ols.src.query_helpers.question_validator.QuestionValidator.validate_question")
+@patch("ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question")
 @patch("ols.config.conversation_cache.get")
-def test_conversation_request_on_wrong_configuration(
+async def test_conversation_request_on_wrong_configuration(
     mock_conversation_cache_get,
     mock_validate_question,
     auth,
@@ -791,17 +1465,18 @@ def test_conversation_request_on_wrong_configuration(
 
     # call must fail because we mocked invalid configuration state
     with pytest.raises(HTTPException, match="Unable to process this request"):
-        ols.conversation_request(llm_request, auth)
+        await ols.conversation_request(llm_request, auth)
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-@patch("ols.app.endpoints.ols.retrieve_previous_input", new=Mock(return_value=[]))
+@patch("ols.app.endpoints.ols.aretrieve_previous_input", new=AsyncMock(return_value=[]))
 @patch(
-    "ols.app.endpoints.ols.validate_question",
-    new=Mock(return_value=False),
+    "ols.app.endpoints.ols.avalidate_question",
+    new=AsyncMock(return_value=False),
 )
-@patch("ols.src.query_helpers.topic_summarizer.TopicSummarizer.summarize_topic")
-def test_question_validation_in_conversation_start(mock_summarize_topic, auth):
+@patch("ols.src.query_helpers.topic_summarizer.TopicSummarizer.asummarize_topic")
+async def test_question_validation_in_conversation_start(mock_summarize_topic, auth):
     """Test if question validation is skipped in follow-up conversation."""
     # note the `validate_question` is patched to always return as `SUBJECT_REJECTED`
     # this should resolve in rejection in summarization
@@ -809,23 +1484,24 @@ def test_question_validation_in_conversation_start(mock_summarize_topic, auth):
     query = "some elaborate question"
     llm_request = LLMRequest(query=query, conversation_id=conversation_id)
 
-    response = ols.conversation_request(llm_request, auth)
+    response = await ols.conversation_request(llm_request, auth)
 
     assert response.response.startswith(prompts.INVALID_QUERY_RESP)
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
 @patch(
-    "ols.app.endpoints.ols.retrieve_previous_input",
-    new=Mock(return_value=[CacheEntry(query=HumanMessage("some question"))]),
+    "ols.app.endpoints.ols.aretrieve_previous_input",
+    new=AsyncMock(return_value=[CacheEntry(query=HumanMessage("some question"))]),
 )
 @patch(
-    "ols.app.endpoints.ols.validate_question",
-    new=Mock(return_value=constants.SUBJECT_REJECTED),
+    "ols.app.endpoints.ols.avalidate_question",
+    new=AsyncMock(return_value=constants.SUBJECT_REJECTED),
 )
-@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response")
-@patch("ols.src.query_helpers.topic_summarizer.TopicSummarizer.summarize_topic")
-def test_no_question_validation_in_follow_up_conversation(
+@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response")
+@patch("ols.src.query_helpers.topic_summarizer.TopicSummarizer.asummarize_topic")
+async def test_no_question_validation_in_follow_up_conversation(
     mock_summarize_topic, mock_summarize, auth
 ):
     """Test if question validation is skipped in follow-up conversation."""
@@ -841,15 +1517,16 @@ def test_no_question_validation_in_follow_up_conversation(
     query = "some elaborate question"
     llm_request = LLMRequest(query=query, conversation_id=conversation_id)
 
-    response = ols.conversation_request(llm_request, auth)
+    response = await ols.conversation_request(llm_request, auth)
 
     assert response.response == "some elaborate answer"
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-@patch("ols.app.endpoints.ols.validate_question")
-@patch("ols.src.query_helpers.topic_summarizer.TopicSummarizer.summarize_topic")
-def test_conversation_request_invalid_subject(
+@patch("ols.app.endpoints.ols.avalidate_question")
+@patch("ols.src.query_helpers.topic_summarizer.TopicSummarizer.asummarize_topic")
+async def test_conversation_request_invalid_subject(
     mock_summarize_topic, mock_validate, auth
 ):
     """Test how generate_response function checks validation results."""
@@ -857,12 +1534,115 @@ def test_conversation_request_invalid_subject(
     llm_request = LLMRequest(query="Tell me about Kubernetes")
 
     mock_validate.return_value = False
-    response = ols.conversation_request(llm_request, auth)
+    response = await ols.conversation_request(llm_request, auth)
     assert response.response == prompts.INVALID_QUERY_RESP
     assert len(response.referenced_documents) == 0
     assert not response.truncated
 
 
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.app.endpoints.ols.retrieve_previous_input", new=Mock(return_value=[]))
+@patch("ols.app.endpoints.ols.get_topic_summary")
+@patch("ols.app.endpoints.ols.validate_question")
+def test_question_validation_runs_concurrently_with_topic_summary(
+    mock_validate, mock_topic_summary, auth
+):
+    """Test that topic summary is generated while the question is validated."""
+    topic_summary_started = threading.Event()
+
+    def summarize(conversation_id, llm_request):
+        topic_summary_started.set()
+        return "topic"
+
+    def validate(conversation_id, llm_request):
+        # would time out when topic summary is waiting for validation result
+        return topic_summary_started.wait(timeout=5)
+
+    mock_topic_summary.side_effect = summarize
+    mock_validate.side_effect = validate
+
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+    processed_request = ols.process_request(auth, llm_request)
+
+    assert processed_request.valid
+    assert processed_request.topic_summary.result() == "topic"
+    assert processed_request.prepared_response is not None
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.app.endpoints.ols.aretrieve_previous_input", new=AsyncMock(return_value=[]))
+@patch("ols.app.endpoints.ols.aget_topic_summary")
+@patch("ols.app.endpoints.ols.avalidate_question")
+async def test_question_validation_runs_concurrently_with_async_topic_summary(
+    mock_validate, mock_topic_summary, auth
+):
+    """Test that topic summary is generated while the question is validated."""
+    topic_summary_started = asyncio.Event()
+
+    async def summarize(conversation_id, llm_request):
+        topic_summary_started.set()
+        return "topic"
+
+    async def validate(conversation_id, llm_request):
+        # would time out when topic summary is waiting for validation result
+        await asyncio.wait_for(topic_summary_started.wait(), timeout=5)
+        return True
+
+    mock_topic_summary.side_effect = summarize
+    mock_validate.side_effect = validate
+
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+    processed_request = await ols.aprocess_request(auth, llm_request)
+
+    assert processed_request.valid
+    assert await processed_request.topic_summary == "topic"
+    assert processed_request.prepared_response is not None
+    ols.cancel_futures(processed_request.prepared_response)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.app.endpoints.ols.aretrieve_previous_input", new=AsyncMock(return_value=[]))
+@patch("ols.app.endpoints.ols.aget_topic_summary", new=AsyncMock(return_value="topic"))
+@patch("ols.app.endpoints.ols.avalidate_question", new=AsyncMock(return_value=False))
+@patch("ols.app.endpoints.ols.prepare_response")
+@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response")
+async def test_rejected_question_drops_prepared_response(
+    mock_create_response, mock_prepare_response, auth
+):
+    """Test that no response is generated for rejected question."""
+    llm_request = LLMRequest(query="Generate a yaml")
+    response = await ols.conversation_request(llm_request, auth)
+
+    assert response.response == prompts.INVALID_QUERY_RESP
+    mock_create_response.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.app.endpoints.ols.aretrieve_previous_input", new=AsyncMock(return_value=[]))
+@patch("ols.app.endpoints.ols.aget_topic_summary", new=AsyncMock(return_value="topic"))
+@patch("ols.app.endpoints.ols.avalidate_question", new=AsyncMock(return_value=True))
+@patch("ols.utils.config.AppConfig.rag_index", new=None)
+@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response")
+async def test_conversation_request_uses_prepared_prompt(mock_create_response, auth):
+    """Test that speculatively prepared prompt is used to generate response."""
+    mock_create_response.return_value = SummarizerResponse(
+        "some answer", [], False, token_counter=None
+    )
+    prepared_prompt = Mock()
+    with patch(
+        "ols.src.query_helpers.docs_summarizer.DocsSummarizer.prepare_prompt",
+        return_value=prepared_prompt,
+    ):
+        llm_request = LLMRequest(query="Tell me about Kubernetes")
+        response = await ols.conversation_request(llm_request, auth)
+
+    assert response.response == "some answer"
+    assert mock_create_response.call_args.args[-1] is prepared_prompt
+
+
 @pytest.mark.usefixtures("_load_config")
 @patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response")
 def test_generate_response_valid_subject(mock_summarize):
@@ -894,6 +1674,38 @@ def test_generate_response_valid_subject(mock_summarize):
     assert summarizer_response.history_truncated is False
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response")
+async def test_agenerate_response_valid_subject(mock_summarize):
+    """Test how generate_response function checks validation results."""
+    # mock the DocsSummarizer
+    mock_response = (
+        "Kubernetes is an open-source container-orchestration system..."  # summary
+    )
+    mock_summarize.return_value = SummarizerResponse(
+        mock_response,
+        [],
+        False,
+        token_counter=None,
+    )
+
+    # prepare arguments for DocsSummarizer
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+    previous_input = []
+
+    # try to get response
+    summarizer_response = await ols.agenerate_response(
+        conversation_id, llm_request, previous_input
+    )
+
+    # check the response
+    assert "Kubernetes" in summarizer_response.response
+    assert summarizer_response.rag_chunks == []
+    assert summarizer_response.history_truncated is False
+
+
 @pytest.mark.usefixtures("_load_config")
 @patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response")
 def test_generate_response_on_summarizer_error(mock_summarize):
@@ -911,6 +1723,239 @@ def test_generate_response_on_summarizer_error(mock_summarize):
         ols.generate_response(conversation_id, llm_request, previous_input)
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response")
+async def test_agenerate_response_on_summarizer_error(mock_summarize):
+    """Test how generate_response function checks validation results."""
+    # mock the DocsSummarizer
+    mock_summarize.side_effect = Exception  # any exception might occur
+
+    # prepare arguments for DocsSummarizer
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+    previous_input = []
+
+    # try to get response
+    with pytest.raises(HTTPException, match=DEFAULT_ERROR_MESSAGE):
+        await ols.agenerate_response(conversation_id, llm_request, previous_input)
+
+
+@pytest.fixture
+def semantic_cache():
+    """Enable semantic cache with embeddings of known queries."""
+    embeddings = {
+        "how do I create a job template": [1.0, 0.0],
+        "How do I create job template?": [0.99, 0.1],
+        "what is an inventory": [0.0, 1.0],
+    }
+    cache_config = SemanticCacheConfig()
+    cache = SemanticCache(cache_config, lambda query: embeddings[query])
+    with (
+        patch.object(config.ols_config, "semantic_cache", cache_config),
+        patch.object(type(config), "rag_index", new_callable=PropertyMock) as index,
+        patch.object(
+            type(config), "semantic_cache", new_callable=PropertyMock
+        ) as semantic_cache,
+    ):
+        index.return_value = None
+        semantic_cache.return_value = cache
+        yield cache
+
+
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response")
+def test_generate_response_from_semantic_cache(mock_summarize, semantic_cache):
+    """Test that answers of similar first questions are cached."""
+    rag_chunks = [RagChunk("text", "https://docs.example.com/job-templates", "Job")]
+    mock_summarize.return_value = SummarizerResponse(
+        "Use the UI.", rag_chunks, False, token_counter=None
+    )
+    conversation_id = suid.get_suid()
+
+    response = ols.generate_response(
+        conversation_id, LLMRequest(query="how do I create a job template"), []
+    )
+    assert response.response == "Use the UI."
+    assert len(semantic_cache) == 1
+
+    response = ols.generate_response(
+        conversation_id, LLMRequest(query="How do I create job template?"), []
+    )
+    assert response == SummarizerResponse("Use the UI.", rag_chunks, False, None)
+    assert mock_summarize.call_count == 1
+
+    # answers are cached for the provider, model and system prompt used
+    assert semantic_cache.get(
+        "how do I create a job template",
+        ("bam", "ibm/granite-3-8b-instruct", prompts.QUERY_SYSTEM_INSTRUCTION),
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response")
+async def test_agenerate_response_from_semantic_cache(mock_summarize, semantic_cache):
+    """Test that answers of similar first questions are cached."""
+    rag_chunks = [RagChunk("text", "https://docs.example.com/job-templates", "Job")]
+    mock_summarize.return_value = SummarizerResponse(
+        "Use the UI.", rag_chunks, False, token_counter=None
+    )
+    conversation_id = suid.get_suid()
+
+    response = await ols.agenerate_response(
+        conversation_id, LLMRequest(query="how do I create a job template"), []
+    )
+    assert response.response == "Use the UI."
+    assert len(semantic_cache) == 1
+
+    response = await ols.agenerate_response(
+        conversation_id, LLMRequest(query="How do I create job template?"), []
+    )
+    assert response == SummarizerResponse("Use the UI.", rag_chunks, False, None)
+    assert mock_summarize.call_count == 1
+
+    # answers are cached for the provider, model and system prompt used
+    assert semantic_cache.get(
+        "how do I create a job template",
+        ("bam", "ibm/granite-3-8b-instruct", prompts.QUERY_SYSTEM_INSTRUCTION),
+    )
+
+
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response")
+def test_generate_response_semantic_cache_first_question_only(
+    mock_summarize, semantic_cache
+):
+    """Test that follow-up questions and questions with attachments are not cached."""
+    mock_summarize.return_value = SummarizerResponse(
+        "A list of hosts.", [], False, token_counter=None
+    )
+    conversation_id = suid.get_suid()
+    previous_input = [
+        CacheEntry(query=HumanMessage("question"), response=AIMessage("answer"))
+    ]
+    attachment = Attachment(
+        attachment_type="log", content_type="text/plain", content="log"
+    )
+
+    for _ in range(2):
+        ols.generate_response(
+            conversation_id, LLMRequest(query="what is an inventory"), previous_input
+        )
+        ols.generate_response(
+            conversation_id,
+            LLMRequest(query="what is an inventory", attachments=[attachment]),
+            [],
+        )
+    assert mock_summarize.call_count == 4
+    assert len(semantic_cache) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response")
+async def test_agenerate_response_semantic_cache_first_question_only(
+    mock_summarize, semantic_cache
+):
+    """Test that follow-up questions and questions with attachments are not cached."""
+    mock_summarize.return_value = SummarizerResponse(
+        "A list of hosts.", [], False, token_counter=None
+    )
+    conversation_id = suid.get_suid()
+    previous_input = [
+        CacheEntry(query=HumanMessage("question"), response=AIMessage("answer"))
+    ]
+    attachment = Attachment(
+        attachment_type="log", content_type="text/plain", content="log"
+    )
+
+    for _ in range(2):
+        await ols.agenerate_response(
+            conversation_id, LLMRequest(query="what is an inventory"), previous_input
+        )
+        await ols.agenerate_response(
+            conversation_id,
+            LLMRequest(query="what is an inventory", attachments=[attachment]),
+            [],
+        )
+    assert mock_summarize.call_count == 4
+    assert len(semantic_cache) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+async def test_agenerate_streamed_response_from_semantic_cache(semantic_cache):
+    """Test that streamed answers are cached and streamed from cache."""
+
+    async def generate_response(*args, **kwargs):
+        yield "Use "
+        yield "the UI."
+        yield SummarizerResponse("", [], False, None)
+
+    conversation_id = suid.get_suid()
+    with patch(
+        "ols.src.query_helpers.docs_summarizer.DocsSummarizer.generate_response",
+        side_effect=generate_response,
+    ) as mock_generate_response:
+        for query in (
+            "how do I create a job template",
+            "How do I create job template?",
+        ):
+            generator = await ols.agenerate_response(
+                conversation_id, LLMRequest(query=query), [], streaming=True
+            )
+            items = [item async for item in generator]
+            assert "".join(item for item in items if isinstance(item, str)) == (
+                "Use the UI."
+            )
+            assert isinstance(items[-1], SummarizerResponse)
+
+    assert mock_generate_response.call_count == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response")
+async def test_agenerate_response_stores_answer_outside_event_loop(
+    mock_summarize, semantic_cache
+):
+    """Test that answers are embedded and stored into cache in worker threads."""
+
+    async def generate_response(*args, **kwargs):
+        yield "Use the UI."
+        yield SummarizerResponse("", [], False, None)
+
+    mock_summarize.return_value = SummarizerResponse(
+        "Use the UI.", [], False, token_counter=None
+    )
+    put_threads = []
+
+    def put(*args):
+        put_threads.append(threading.get_ident())
+
+    with (
+        patch.object(semantic_cache, "put", side_effect=put),
+        patch(
+            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.generate_response",
+            side_effect=generate_response,
+        ),
+    ):
+        await ols.agenerate_response(
+            suid.get_suid(), LLMRequest(query="how do I create a job template"), []
+        )
+        generator = await ols.agenerate_response(
+            suid.get_suid(),
+            LLMRequest(query="what is an inventory"),
+            [],
+            streaming=True,
+        )
+        _ = [item async for item in generator]
+
+    assert len(put_threads) == 2
+    assert threading.get_ident() not in put_threads
+
+
 @patch(
     "ols.src.query_helpers.question_validator.QuestionValidator.validate_question",
     side_effect=Exception("mocked exception"),
@@ -927,6 +1972,23 @@ def test_generate_response_unknown_validation_result(exc):
         ols.generate_response(conversation_id, llm_request, previous_input)
 
 
+@pytest.mark.asyncio
+@patch(
+    "ols.src.query_helpers.question_validator.QuestionValidator.avalidate_question",
+    side_effect=Exception("mocked exception"),
+)
+async def test_agenerate_response_unknown_validation_result(exc):
+    """Test how generate_response function checks validation results."""
+    # prepare arguments for DocsSummarizer
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+    previous_input = None
+
+    # try to get response
+    with pytest.raises(HTTPException, match=DEFAULT_ERROR_MESSAGE):
+        await ols.agenerate_response(conversation_id, llm_request, previous_input)
+
+
 @pytest.fixture
 def transcripts_location(tmpdir):
     """Fixture sets feedback location to tmpdir and return the path."""
@@ -936,7 +1998,17 @@ def transcripts_location(tmpdir):
     return tmpdir.strpath
 
 
-def test_transcripts_are_not_stored_when_disabled(transcripts_location, auth):
+def stored_transcripts(transcripts_dir: Path) -> list[dict]:
+    """Load all transcripts stored in the directory and its subdirectories."""
+    transcripts = []
+    for transcript_path in transcripts_dir.glob("**/*.json"):
+        with open(transcript_path, encoding="utf-8") as f:
+            transcripts.append(json.load(f))
+    return transcripts
+
+
+@pytest.mark.asyncio
+async def test_transcripts_are_not_stored_when_disabled(transcripts_location, auth):
     """Test nothing is stored when the transcript collection is disabled."""
     with (
         patch(
@@ -944,29 +2016,54 @@ def test_transcripts_are_not_stored_when_disabled(transcripts_location, auth):
             True,
         ),
         patch(
-            "ols.app.endpoints.ols.validate_question",
+            "ols.app.endpoints.ols.avalidate_question",
             return_value=True,
         ),
         patch(
-            "ols.app.endpoints.ols.generate_response",
+            "ols.app.endpoints.ols.agenerate_response",
             return_value=SummarizerResponse("something", [], False, None),
         ),
         patch(
-            "ols.app.endpoints.ols.store_conversation_history",
+            "ols.app.endpoints.ols.astore_conversation_history",
             return_value=None,
         ),
         patch(
-            "ols.app.endpoints.ols.get_topic_summary",
+            "ols.app.endpoints.ols.aget_topic_summary",
             return_value="some summary",
         ),
     ):
         llm_request = LLMRequest(query="Tell me about Kubernetes")
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
         assert response
         assert response.response == "something"
 
-        transcript_dir = Path(transcripts_location)
-        assert list(transcript_dir.glob("*/*/*.json")) == []
+        assert stored_transcripts(Path(transcripts_location)) == []
+
+
+@pytest.mark.asyncio
+async def test_astore_transcript(transcripts_location):
+    """Test that transcript is stored asynchronously."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+
+    await ols.astore_transcript(
+        user_id,
+        conversation_id,
+        True,
+        "Tell me about Kubernetes",
+        llm_request,
+        "some response",
+        [],
+        False,
+        [],
+    )
+
+    transcripts = stored_transcripts(
+        Path(transcripts_location) / user_id / conversation_id
+    )
+    assert len(transcripts) == 1
+    assert transcripts[0]["llm_response"] == "some response"
 
 
 def test_construct_transcripts_path(transcripts_location):
@@ -1071,6 +2168,28 @@ def test_get_topic_summary_valid_subject(mock_summarize_topic):
     assert summarizer_response == mock_response
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.src.query_helpers.topic_summarizer.TopicSummarizer.asummarize_topic")
+async def test_aget_topic_summary_valid_subject(mock_summarize_topic):
+    """Test how generate_response function checks validation results."""
+    # mock the TopicSummarizer
+    mock_response = "OpenShift vs Kubernetes Comparison"
+    mock_summarize_topic.return_value = mock_response
+
+    # prepare arguments for TopicSummarizer
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(
+        query="Tell me about differences between Kubernetes and Openshift"
+    )
+
+    # try to get response
+    summarizer_response = await ols.aget_topic_summary(conversation_id, llm_request)
+
+    # check the response
+    assert summarizer_response == mock_response
+
+
 @pytest.mark.usefixtures("_load_config")
 @patch("ols.src.query_helpers.topic_summarizer.TopicSummarizer.summarize_topic")
 def test_get_topic_summary_on_summarizer_error(mock_summarize_topic):
@@ -1081,8 +2200,24 @@ def test_get_topic_summary_on_summarizer_error(mock_summarize_topic):
     # prepare arguments for TopicSummarizer
     conversation_id = suid.get_suid()
     llm_request = LLMRequest(query="Tell me about Kubernetes")
-    previous_input = None
 
     # try to get response
     with pytest.raises(HTTPException, match=DEFAULT_ERROR_MESSAGE):
-        ols.generate_response(conversation_id, llm_request, previous_input)
+        ols.get_topic_summary(conversation_id, llm_request)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+@patch("ols.src.query_helpers.topic_summarizer.TopicSummarizer.asummarize_topic")
+async def test_aget_topic_summary_on_summarizer_error(mock_summarize_topic):
+    """Test how generate_response function checks validation results."""
+    # mock the TopicSummarizer
+    mock_summarize_topic.side_effect = Exception  # any exception might occur
+
+    # prepare arguments for TopicSummarizer
+    conversation_id = suid.get_suid()
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+
+    # try to get response
+    with pytest.raises(HTTPException, match=DEFAULT_ERROR_MESSAGE):
+        await ols.aget_topic_summary(conversation_id, llm_request)
@@ -1,23 +1,39 @@
 """Unit tests for streaming_ols.py."""
 
+import asyncio
 import json
+import re
+from concurrent.futures import Future
+from unittest.mock import patch
 
 import pytest
+from fastapi import HTTPException
 
 from ols import config, constants
+from ols.app import metrics
 from ols.app.endpoints.streaming_ols import (
+    TokenCoalescer,
     build_referenced_docs,
     build_yield_item,
+    coalesce_tokens,
     format_stream_data,
     generic_llm_error,
     invalid_response_generator,
     prompt_too_long_error,
+    response_processing_wrapper,
+    retrieve_topic_summary,
     stream_end_event,
     stream_start_event,
 )
-from ols.app.models.models import RagChunk, TokenCounter
+from ols.app.models.models import (
+    LLMRequest,
+    RagChunk,
+    SummarizerResponse,
+    TokenCounter,
+)
 from ols.customize import prompts
 from ols.utils import suid
+from ols.utils.redactor import Redactor, RegexFilter
 
 conversation_id = suid.get_suid()
 
@@ -173,3 +189,165 @@ def test_format_stream_data():
         assert output == data_in_event_stream_data_format
     finally:
         config.ols_config.enable_event_stream_format = saved_value
+
+
+@pytest.mark.asyncio
+async def test_retrieve_topic_summary():
+    """Test retrieval of topic summary generated concurrently."""
+    assert await retrieve_topic_summary(conversation_id, None) == ""
+
+    future = Future()
+    future.set_result("some topic")
+    assert await retrieve_topic_summary(conversation_id, future) == "some topic"
+
+    # errors can not be reported after response is streamed
+    future = Future()
+    future.set_exception(HTTPException(status_code=500, detail="error"))
+    assert await retrieve_topic_summary(conversation_id, future) == ""
+
+
+async def tokens_generator(tokens):
+    """Yield the tokens followed by summarizer response."""
+    for token in tokens:
+        yield token
+    yield SummarizerResponse("", [], False, None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("redact_responses", [False, True])
+@pytest.mark.usefixtures("_load_config")
+async def test_response_processing_wrapper_redaction(redact_responses):
+    """Test that streamed response is redacted when it is enabled."""
+    q = Redactor(config.ols_config.query_filters)
+    q.regex_filters = [
+        RegexFilter(re.compile(r"\b\d{3}-\d{3}-\d{4}\b"), "phone", "<PHONE>"),
+        RegexFilter(re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+"), "email", "<EMAIL>"),
+    ]
+    config._query_filters = q
+    config.ols_config.redact_responses = redact_responses
+    tokens = ["Call", " 123", "-456", "-7890", " or", " mail", " j", "@example", ".com"]
+
+    frames_before = metrics.streaming_response_frames._sum.get()
+
+    with (
+        patch("ols.app.endpoints.streaming_ols.astore_data") as astore_data,
+        patch("ols.app.endpoints.streaming_ols.log_processing_durations"),
+    ):
+        items = [
+            item
+            async for item in response_processing_wrapper(
+                tokens_generator(tokens),
+                "user",
+                conversation_id,
+                LLMRequest(query="How to contact you?"),
+                [],
+                True,
+                "How to contact you?",
+                constants.MEDIA_TYPE_TEXT,
+                {},
+                None,
+                False,
+            )
+        ]
+
+    response = "".join(items)
+    if redact_responses:
+        assert response == "Call <PHONE> or mail <EMAIL>"
+        # the first token is sent as soon as it can not be a part of redacted text
+        assert items[0] == "Call "
+    else:
+        # tokens are followed by (empty) end of the stream
+        assert items == [*tokens, ""]
+    # response stored in conversation history is the one returned
+    assert astore_data.call_args.args[3] == response
+    frames = len([item for item in items if item])
+    assert metrics.streaming_response_frames._sum.get() == frames_before + frames
+
+
+def test_token_coalescer():
+    """Test that tokens are joined into chunks of given size."""
+    coalescer = TokenCoalescer(max_bytes=4, max_delay=10)
+    assert coalescer.timeout() is None
+
+    # the first token is sent right away
+    assert coalescer.add("He") == ["He"]
+    assert coalescer.add("l") == []
+    assert 0 < coalescer.timeout() <= 10
+    assert coalescer.add("lo") == []
+    # size is counted in bytes
+    assert coalescer.add("ü") == ["lloü"]
+    assert coalescer.add("!") == []
+
+    summarizer_response = SummarizerResponse("", [], False, None)
+    assert coalescer.add(summarizer_response) == ["!", summarizer_response]
+    assert coalescer.flush() == []
+
+
+async def delayed_tokens(tokens):
+    """Yield the tokens, each after given delay."""
+    for token, delay in tokens:
+        await asyncio.sleep(delay)
+        if isinstance(token, Exception):
+            raise token
+        yield token
+
+
+@pytest.mark.asyncio
+async def test_coalesce_tokens_by_size():
+    """Test that chunk is sent when it is big enough."""
+    tokens = [("a", 0), ("b", 0), ("c", 0), ("d", 0), ("e", 0), ("f", 0)]
+    chunks = [
+        chunk
+        async for chunk in coalesce_tokens(
+            delayed_tokens(tokens), max_bytes=2, max_delay=10
+        )
+    ]
+    assert chunks == ["a", "bc", "de", "f"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_tokens_by_time():
+    """Test that chunk is sent when its tokens waited long enough."""
+    tokens = [("a", 0), ("b", 0), ("c", 0), ("d", 0.5), ("e", 0)]
+    chunks = [
+        chunk
+        async for chunk in coalesce_tokens(
+            delayed_tokens(tokens), max_bytes=100, max_delay=0.05
+        )
+    ]
+    # "bc" is sent while the next token is still awaited
+    assert chunks == ["a", "bc", "de"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_tokens_error():
+    """Test that tokens received before error are sent before it is raised."""
+    tokens = [("a", 0), ("b", 0), ("c", 0), (ValueError("LLM error"), 0)]
+    chunks = coalesce_tokens(delayed_tokens(tokens), max_bytes=100, max_delay=10)
+    assert await anext(chunks) == "a"
+    assert await anext(chunks) == "bc"
+    with pytest.raises(ValueError, match="LLM error"):
+        await anext(chunks)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("awaited", (False, True))
+async def test_coalesce_tokens_closes_generator(awaited):
+    """Test that the source generator is closed when the stream is closed early."""
+    closed = asyncio.Event()
+
+    async def tokens():
+        try:
+            yield "a"
+            yield "b"
+            await asyncio.Event().wait()
+        finally:
+            closed.set()
+
+    chunks = coalesce_tokens(tokens(), max_bytes=100, max_delay=0.01)
+    assert await anext(chunks) == "a"
+    if awaited:
+        # "b" is sent by timeout while the next item is being awaited
+        assert await anext(chunks) == "b"
+    await chunks.aclose()
+    assert closed.is_set()
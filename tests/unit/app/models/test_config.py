@@ -14,11 +14,17 @@ from ols.app.models.config import (
     Config,
     ConversationCacheConfig,
     DevConfig,
+    EmbeddingValidationConfig,
+    HistoryCompactionConfig,
     InMemoryCacheConfig,
+    KeywordValidationConfig,
+    LLMCallCacheConfig,
+    LLMCallMemoryCacheConfig,
     LLMProviders,
     LoggingConfig,
     ModelConfig,
     ModelParameters,
+    NearCacheConfig,
     OLSConfig,
     PostgresConfig,
     ProviderConfig,
@@ -26,6 +32,9 @@ from ols.app.models.config import (
     QuotaLimiterConfig,
     RedisConfig,
     ReferenceContent,
+    SemanticCacheConfig,
+    SQLiteCacheConfig,
+    StreamCoalescingConfig,
     TLSConfig,
     TLSSecurityProfile,
     UserDataCollection,
@@ -2023,6 +2032,24 @@ def test_memory_cache_config_improper_entries():
         )
 
 
+def test_memory_cache_config_size_and_shards():
+    """Test the size limit and number of shards of MemoryCacheConfig model."""
+    memory_cache_config = InMemoryCacheConfig({"max_entries": 100})
+    assert memory_cache_config.max_bytes is None
+    assert memory_cache_config.shards == constants.IN_MEMORY_CACHE_SHARDS
+
+    memory_cache_config = InMemoryCacheConfig(
+        {"max_entries": 100, "max_bytes": "1000000", "shards": 4}
+    )
+    assert memory_cache_config.max_bytes == 1000000
+    assert memory_cache_config.shards == 4
+
+    with pytest.raises(InvalidConfigurationError, match="invalid max_bytes"):
+        InMemoryCacheConfig({"max_bytes": 0})
+    with pytest.raises(InvalidConfigurationError, match="invalid shards"):
+        InMemoryCacheConfig({"shards": "many"})
+
+
 def test_memory_config_equality():
     """Test the MemoryConfig equality check."""
     memory_config_1 = InMemoryCacheConfig()
@@ -2133,6 +2160,91 @@ def test_conversation_cache_config_validation():
         conversation_cache_config.validate_yaml()
 
 
+def test_conversation_cache_config_codec():
+    """Test the codec options of ConversationCacheConfig."""
+    conversation_cache_config = ConversationCacheConfig(
+        {"type": "memory", "memory": {}}
+    )
+    assert conversation_cache_config.codec == constants.CACHE_CODEC_MSGPACK
+    assert (
+        conversation_cache_config.compression_threshold
+        == constants.CACHE_CODEC_COMPRESSION_THRESHOLD
+    )
+
+    conversation_cache_config = ConversationCacheConfig(
+        {"type": "memory", "memory": {}, "codec": "json", "compression_threshold": None}
+    )
+    assert conversation_cache_config.codec == constants.CACHE_CODEC_JSON
+    assert conversation_cache_config.compression_threshold is None
+
+    with pytest.raises(
+        InvalidConfigurationError, match="unknown conversation cache codec: xml"
+    ):
+        ConversationCacheConfig({"type": "memory", "memory": {}, "codec": "xml"})
+
+    for threshold in (-1, "foo"):
+        with pytest.raises(
+            InvalidConfigurationError,
+            match="compression_threshold needs to be a non-negative integer",
+        ):
+            ConversationCacheConfig(
+                {"type": "memory", "memory": {}, "compression_threshold": threshold}
+            )
+
+
+def test_conversation_cache_config_near_cache():
+    """Test the near cache options of ConversationCacheConfig."""
+    conversation_cache_config = ConversationCacheConfig({"type": "redis", "redis": {}})
+    assert conversation_cache_config.near_cache is None
+
+    conversation_cache_config = ConversationCacheConfig(
+        {"type": "redis", "redis": {}, "near_cache": {"max_entries": 10}}
+    )
+    assert conversation_cache_config.near_cache == NearCacheConfig(
+        max_entries=10, ttl=constants.NEAR_CACHE_TTL, invalidation=True
+    )
+
+    with pytest.raises(ValidationError):
+        ConversationCacheConfig(
+            {"type": "redis", "redis": {}, "near_cache": {"ttl": 0}}
+        )
+
+    with pytest.raises(
+        InvalidConfigurationError,
+        match="near cache can not be used with memory conversation cache",
+    ):
+        ConversationCacheConfig({"type": "memory", "memory": {}, "near_cache": {}})
+
+
+def test_conversation_cache_config_history_compaction():
+    """Test the history compaction options of ConversationCacheConfig."""
+    conversation_cache_config = ConversationCacheConfig(
+        {"type": "memory", "memory": {}}
+    )
+    assert conversation_cache_config.history_compaction is None
+
+    conversation_cache_config = ConversationCacheConfig(
+        {"type": "memory", "memory": {}, "history_compaction": {"max_tokens": 2000}}
+    )
+    assert conversation_cache_config.history_compaction == HistoryCompactionConfig(
+        max_turns=constants.HISTORY_COMPACTION_MAX_TURNS,
+        keep_turns=constants.HISTORY_COMPACTION_KEEP_TURNS,
+        max_tokens=2000,
+    )
+
+    with pytest.raises(
+        ValidationError,
+        match="The number of kept turns needs to be lower than the maximal one",
+    ):
+        ConversationCacheConfig(
+            {
+                "type": "memory",
+                "memory": {},
+                "history_compaction": {"max_turns": 5, "keep_turns": 5},
+            }
+        )
+
+
 def test_conversation_cache_config_equality():
     """Test the ConversationCacheConfig equality check."""
     conversation_cache_config_1 = ConversationCacheConfig()
@@ -2145,6 +2257,10 @@ def test_conversation_cache_config_equality():
     conversation_cache_config_2.type = "some non-default type"
     assert conversation_cache_config_1 != conversation_cache_config_2
 
+    conversation_cache_config_2 = ConversationCacheConfig()
+    conversation_cache_config_2.codec = constants.CACHE_CODEC_JSON
+    assert conversation_cache_config_1 != conversation_cache_config_2
+
     # compare with value of different type
     other_value = "foo"
     assert conversation_cache_config_1 != other_value
@@ -2387,6 +2503,42 @@ def test_ols_config_equality(subtests):
         ols_config_1.quota_limiter = QuotaLimiterConfig()
         assert ols_config_1 != ols_config_2
 
+    # semantic cache attribute (SemanticCacheConfig)
+    with subtests.test(msg="Different attribute: semantic_cache"):
+        ols_config_1, ols_config_2 = get_ols_configs()
+        ols_config_1.semantic_cache = SemanticCacheConfig()
+        assert ols_config_1 != ols_config_2
+
+    # embedding validation attribute (EmbeddingValidationConfig)
+    with subtests.test(msg="Different attribute: embedding_validation"):
+        ols_config_1, ols_config_2 = get_ols_configs()
+        ols_config_1.embedding_validation = EmbeddingValidationConfig(llm_fallback=True)
+        assert ols_config_1 != ols_config_2
+
+    # keyword validation attribute (KeywordValidationConfig)
+    with subtests.test(msg="Different attribute: keyword_validation"):
+        ols_config_1, ols_config_2 = get_ols_configs()
+        ols_config_1.keyword_validation = KeywordValidationConfig(match_mode="word")
+        assert ols_config_1 != ols_config_2
+
+    # redact responses attribute
+    with subtests.test(msg="Different attribute: redact_responses"):
+        ols_config_1, ols_config_2 = get_ols_configs()
+        ols_config_1.redact_responses = True
+        assert ols_config_1 != ols_config_2
+
+    # stream coalescing attribute (StreamCoalescingConfig)
+    with subtests.test(msg="Different attribute: stream_coalescing"):
+        ols_config_1, ols_config_2 = get_ols_configs()
+        ols_config_1.stream_coalescing = StreamCoalescingConfig()
+        assert ols_config_1 != ols_config_2
+
+    # LLM call cache attribute (LLMCallCacheConfig)
+    with subtests.test(msg="Different attribute: llm_call_cache"):
+        ols_config_1, ols_config_2 = get_ols_configs()
+        ols_config_1.llm_call_cache = LLMCallCacheConfig({"type": "memory"})
+        assert ols_config_1 != ols_config_2
+
     # compare OLSConfig with other object
     assert ols_config_1 != "foo"
     assert ols_config_2 != {}
@@ -3659,6 +3811,159 @@ def test_ols_config_with_non_readable_system_prompt(tmpdir):
         )
 
 
+def test_ols_config_with_semantic_cache():
+    """Test OLSConfig model with semantic cache section specified."""
+    ols_config = OLSConfig({"default_provider": "p1", "default_model": "m1"})
+    assert ols_config.semantic_cache is None
+
+    ols_config = OLSConfig(
+        {
+            "default_provider": "p1",
+            "default_model": "m1",
+            "semantic_cache": {"max_entries": 100, "similarity_threshold": 0.9},
+        }
+    )
+    assert ols_config.semantic_cache == SemanticCacheConfig(
+        max_entries=100,
+        ttl=constants.SEMANTIC_CACHE_TTL,
+        similarity_threshold=0.9,
+    )
+
+    with pytest.raises(ValidationError):
+        OLSConfig({"semantic_cache": {"ttl": 0}})
+
+    with pytest.raises(
+        ValidationError, match=r"Similarity threshold needs to be at most 1\.0"
+    ):
+        OLSConfig({"semantic_cache": {"similarity_threshold": 1.5}})
+
+
+def test_ols_config_with_embedding_validation():
+    """Test OLSConfig model with embedding validation section specified."""
+    ols_config = OLSConfig({"default_provider": "p1", "default_model": "m1"})
+    assert ols_config.embedding_validation == EmbeddingValidationConfig(
+        threshold=constants.EMBEDDING_VALIDATION_THRESHOLD,
+        margin=constants.EMBEDDING_VALIDATION_MARGIN,
+        llm_fallback=False,
+    )
+
+    ols_config = OLSConfig(
+        {
+            "query_validation_method": "embedding",
+            "embedding_validation": {"threshold": -0.1, "llm_fallback": True},
+        }
+    )
+    assert (
+        ols_config.query_validation_method == constants.QueryValidationMethod.EMBEDDING
+    )
+    assert ols_config.embedding_validation.threshold == -0.1
+    assert ols_config.embedding_validation.llm_fallback is True
+
+    with pytest.raises(ValidationError):
+        OLSConfig({"embedding_validation": {"margin": -1}})
+
+
+def test_ols_config_with_keyword_validation():
+    """Test OLSConfig model with keyword validation section specified."""
+    ols_config = OLSConfig({"default_provider": "p1", "default_model": "m1"})
+    assert (
+        ols_config.keyword_validation.match_mode == constants.KeywordMatchMode.SUBSTRING
+    )
+
+    ols_config = OLSConfig({"keyword_validation": {"match_mode": "word"}})
+    assert ols_config.keyword_validation.match_mode == constants.KeywordMatchMode.WORD
+
+    with pytest.raises(ValidationError):
+        OLSConfig({"keyword_validation": {"match_mode": "lemma"}})
+
+
+def test_ols_config_with_redact_responses():
+    """Test OLSConfig model with redaction of responses enabled."""
+    ols_config = OLSConfig({"default_provider": "p1", "default_model": "m1"})
+    assert ols_config.redact_responses is False
+
+    ols_config = OLSConfig({"redact_responses": True})
+    assert ols_config.redact_responses is True
+
+
+def test_ols_config_with_stream_coalescing():
+    """Test OLSConfig model with stream coalescing section specified."""
+    ols_config = OLSConfig({"default_provider": "p1", "default_model": "m1"})
+    assert ols_config.stream_coalescing is None
+
+    ols_config = OLSConfig({"stream_coalescing": {}})
+    assert ols_config.stream_coalescing.max_bytes == (
+        constants.STREAM_COALESCING_MAX_BYTES
+    )
+    assert ols_config.stream_coalescing.max_delay == (
+        constants.STREAM_COALESCING_MAX_DELAY
+    )
+
+    ols_config = OLSConfig({"stream_coalescing": {"max_bytes": 64, "max_delay": 0.02}})
+    assert ols_config.stream_coalescing == StreamCoalescingConfig(
+        max_bytes=64, max_delay=0.02
+    )
+
+    with pytest.raises(ValidationError):
+        OLSConfig({"stream_coalescing": {"max_delay": 0}})
+
+
+def test_ols_config_with_llm_call_cache(tmp_path):
+    """Test OLSConfig model with LLM call cache section specified."""
+    ols_config = OLSConfig({"default_provider": "p1", "default_model": "m1"})
+    assert ols_config.llm_call_cache is None
+
+    ols_config = OLSConfig({"llm_call_cache": {"type": "memory"}})
+    assert ols_config.llm_call_cache.ttl == constants.LLM_CALL_CACHE_TTL
+    assert ols_config.llm_call_cache.helpers == [
+        "question_validator",
+        "topic_summarizer",
+    ]
+    assert ols_config.llm_call_cache.memory == LLMCallMemoryCacheConfig()
+
+    ols_config = OLSConfig(
+        {
+            "llm_call_cache": {
+                "type": "sqlite",
+                "ttl": 60,
+                "helpers": ["docs_summarizer"],
+                "sqlite": {"db_path": str(tmp_path / "llm_call_cache.db")},
+            }
+        }
+    )
+    assert ols_config.llm_call_cache.ttl == 60.0
+    assert ols_config.llm_call_cache.helpers == ["docs_summarizer"]
+    assert ols_config.llm_call_cache.sqlite == SQLiteCacheConfig(
+        db_path=str(tmp_path / "llm_call_cache.db")
+    )
+
+    ols_config = OLSConfig(
+        {"llm_call_cache": {"type": "redis", "redis": {"host": "localhost"}}}
+    )
+    assert ols_config.llm_call_cache.redis.host == "localhost"
+
+
+@pytest.mark.parametrize(
+    ("data", "message"),
+    [
+        ({}, "missing LLM call cache type"),
+        ({"type": "postgres"}, "unknown LLM call cache type: postgres"),
+        ({"type": "redis"}, "redis LLM call cache type is specified"),
+        ({"type": "sqlite"}, "sqlite LLM call cache type is specified"),
+        ({"type": "memory", "ttl": 0}, "invalid ttl for LLM call cache"),
+        ({"type": "memory", "ttl": "x"}, "invalid ttl for LLM call cache"),
+        (
+            {"type": "memory", "helpers": ["question_validator", "foo"]},
+            "unknown query helpers in LLM call cache",
+        ),
+    ],
+)
+def test_llm_call_cache_config_invalid(data, message):
+    """Test LLMCallCacheConfig model with invalid values."""
+    with pytest.raises(InvalidConfigurationError, match=message):
+        LLMCallCacheConfig(data)
+
+
 def test_ols_config_with_quota_limiter_section():
     """Test OLSConfig model with quota limiters section specified."""
     ols_config = OLSConfig(
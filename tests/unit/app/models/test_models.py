@@ -21,7 +21,12 @@ from ols.app.models.models import (
     ReferencedDocument,
     StatusResponse,
 )
-from ols.constants import MEDIA_TYPE_JSON, MEDIA_TYPE_TEXT
+from ols.constants import (
+    HISTORY_SUMMARY_FLAG,
+    HISTORY_SUMMARY_QUERY,
+    MEDIA_TYPE_JSON,
+    MEDIA_TYPE_TEXT,
+)
 from ols.utils import suid
 
 
@@ -375,6 +380,35 @@ class TestCacheEntry:
             "attachments": [],
         }
 
+    @staticmethod
+    def test_to_dict_with_token_counts():
+        """Test that token counts are stored and restored."""
+        cache_entry = CacheEntry(
+            query=HumanMessage("query"),
+            response=AIMessage("response"),
+            token_counts={"cl100k_base:gpt": [3, 3]},
+        )
+        assert cache_entry.to_dict()["token_counts"] == {"cl100k_base:gpt": [3, 3]}
+        assert CacheEntry.from_dict(cache_entry.to_dict()) == cache_entry
+
+    @staticmethod
+    def test_cache_entries_to_token_counts():
+        """Test the token counts of history messages."""
+        cache_entries = [
+            CacheEntry(
+                query=HumanMessage("query"),
+                response=AIMessage("response"),
+                token_counts={"cl100k_base:gpt": [3, 4], "cl100k_base:granite": [5, 6]},
+            ),
+            CacheEntry(query=HumanMessage("query"), response=AIMessage("response")),
+        ]
+        assert CacheEntry.cache_entries_to_token_counts(cache_entries) == [
+            {"cl100k_base:gpt": 3, "cl100k_base:granite": 5},
+            {"cl100k_base:gpt": 4, "cl100k_base:granite": 6},
+            {},
+            {},
+        ]
+
     @staticmethod
     def test_from_dict():
         """Test the from_dict method of the CacheEntry model."""
@@ -409,6 +443,24 @@ class TestCacheEntry:
             AIMessage("response2"),
         ]
 
+    @staticmethod
+    def test_cache_entries_to_messages():
+        """Test that the query of history summary entry is not shown to the user."""
+        flag = {HISTORY_SUMMARY_FLAG: True}
+        cache_entries = [
+            CacheEntry(
+                query=HumanMessage(HISTORY_SUMMARY_QUERY, additional_kwargs=flag),
+                response=AIMessage("summary"),
+            ),
+            CacheEntry(query=HumanMessage("query2"), response=AIMessage("response2")),
+        ]
+        messages = CacheEntry.cache_entries_to_messages(cache_entries)
+        assert messages == [
+            AIMessage("summary", additional_kwargs=flag),
+            HumanMessage("query2"),
+            AIMessage("response2"),
+        ]
+
     @staticmethod
     def test_cache_entries_to_history_no_whitespace():
         """Test content is stripped."""
@@ -0,0 +1,63 @@
+"""Unit tests for the cache of authentication decisions."""
+
+from unittest.mock import patch
+
+from ols.src.auth.auth_cache import AuthDecisionCache
+
+
+def test_construct_key():
+    """Test that the token is not part of the key."""
+    key = AuthDecisionCache.construct_key("some-token", "/ols-access")
+    assert "some-token" not in key
+    assert key.endswith(":/ols-access")
+    assert key != AuthDecisionCache.construct_key("some-token", "/ols-metrics")
+    assert key != AuthDecisionCache.construct_key("other-token", "/ols-access")
+
+
+def test_get_and_set():
+    """Test storing and retrieving decisions."""
+    cache = AuthDecisionCache()
+    assert cache.get("key") is None
+
+    cache.set("key", ("uid", "user"), 10)
+    assert cache.get("key") == ("uid", "user")
+    assert len(cache) == 1
+
+    cache.clear()
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_zero_ttl_disables_caching():
+    """Test that decisions with zero TTL are not cached."""
+    cache = AuthDecisionCache()
+    cache.set("key", ("uid", "user"), 0)
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_expiration():
+    """Test that expired decisions are removed."""
+    cache = AuthDecisionCache()
+    with patch("ols.src.auth.auth_cache.time.monotonic", return_value=100.0):
+        cache.set("key", "denied", 5)
+    with patch("ols.src.auth.auth_cache.time.monotonic", return_value=104.0):
+        assert cache.get("key") == "denied"
+    with patch("ols.src.auth.auth_cache.time.monotonic", return_value=105.0):
+        assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_eviction():
+    """Test that the least recently used decision is evicted."""
+    cache = AuthDecisionCache(max_entries=2)
+    cache.set("key1", "value1", 10)
+    cache.set("key2", "value2", 10)
+    # make the first key recently used
+    assert cache.get("key1") == "value1"
+    cache.set("key3", "value3", 10)
+
+    assert len(cache) == 2
+    assert cache.get("key1") == "value1"
+    assert cache.get("key2") is None
+    assert cache.get("key3") == "value3"
@@ -1,6 +1,9 @@
 """Unit tests for auth/k8s module."""
 
+import asyncio
 import os
+import threading
+import time
 from typing import Optional
 from unittest.mock import MagicMock, patch
 
@@ -10,13 +13,19 @@ from kubernetes.client import AuthenticationV1Api, AuthorizationV1Api
 from kubernetes.client.rest import ApiException
 
 from ols import config
-from ols.src.auth.k8s import (
+
+# needs to be setup there before is_user_authorized is imported
+config.ols_config.authentication_config.module = "k8s"
+
+from ols.app import metrics  # noqa:E402
+from ols.src.auth.k8s import (  # noqa:E402
     CLUSTER_ID_LOCAL,
     AuthDependency,
     ClusterIDUnavailableError,
     K8sClientSingleton,
+    run_k8s_call,
 )
-from tests.mock_classes.mock_k8s_api import (
+from tests.mock_classes.mock_k8s_api import (  # noqa:E402
     MockK8sResponseStatus,
     mock_subject_access_review_response,
     mock_token_review_response,
@@ -199,3 +208,162 @@ def test_get_cluster_id_outside_of_cluster(_mock_new):
     # ensure cluster_id is None to trigger the condition
     K8sClientSingleton._cluster_id = None
     assert K8sClientSingleton.get_cluster_id() == CLUSTER_ID_LOCAL
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+@patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api")
+@patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api")
+async def test_auth_dependency_request_timeout_is_passed(
+    mock_authz_api, mock_authn_api
+):
+    """Test that the configured timeout is used for calls to Kubernetes API."""
+    mock_authn_api.return_value.create_token_review.side_effect = (
+        mock_token_review_response
+    )
+    mock_authz_api.return_value.create_subject_access_review.side_effect = (
+        mock_subject_access_review_response
+    )
+    config.ols_config.authentication_config.k8s_request_timeout = 3.5
+
+    request = Request(
+        scope={"type": "http", "headers": [(b"authorization", b"Bearer valid-token")]}
+    )
+    await auth_dependency(request)
+
+    create_token_review = mock_authn_api.return_value.create_token_review
+    assert create_token_review.call_args.kwargs["_request_timeout"] == 3.5
+    create_sar = mock_authz_api.return_value.create_subject_access_review
+    assert create_sar.call_args.kwargs["_request_timeout"] == 3.5
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_does_not_block_event_loop():
+    """Test that the slow Kubernetes API does not block other coroutines."""
+    event = threading.Event()
+
+    def slow_get_user_info(token, timeout):
+        # blocks until the coroutine running in the event loop sets the event
+        assert event.wait(5)
+
+    async def set_event():
+        event.set()
+
+    request = Request(
+        scope={"type": "http", "headers": [(b"authorization", b"Bearer valid-token")]}
+    )
+    with patch("ols.src.auth.k8s.get_user_info", side_effect=slow_get_user_info):
+        with pytest.raises(HTTPException) as exc_info:
+            await asyncio.gather(auth_dependency(request), set_event())
+    # no user info returned by the mocked call
+    assert exc_info.value.status_code == 403
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_timeout():
+    """Test that the slow Kubernetes API call is interrupted by the timeout."""
+    config.ols_config.authentication_config.k8s_request_timeout = 0.01
+    event = threading.Event()
+    failures = metrics.k8s_auth_call_failures_total.labels("token_review", "timeout")
+    failures_before = failures._value.get()
+
+    request = Request(
+        scope={"type": "http", "headers": [(b"authorization", b"Bearer valid-token")]}
+    )
+    try:
+        with patch(
+            "ols.src.auth.k8s.get_user_info",
+            side_effect=lambda token, timeout: event.wait(5),
+        ):
+            with pytest.raises(HTTPException) as exc_info:
+                await auth_dependency(request)
+    finally:
+        event.set()
+
+    assert exc_info.value.status_code == 503
+    assert failures._value.get() == failures_before + 1
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_run_k8s_call_measures_duration():
+    """Test that the duration of the Kubernetes API call is observed."""
+    histogram = metrics.k8s_auth_call_duration_seconds.labels("some_review")
+    observed_before = histogram._sum.get()
+
+    result = await run_k8s_call("some_review", lambda x: time.sleep(0.01) or x, 42)
+
+    assert result == 42
+    assert histogram._sum.get() >= observed_before + 0.01
+
+    # errors are counted and propagated
+    errors = metrics.k8s_auth_call_failures_total.labels("some_review", "error")
+    with pytest.raises(ApiException):
+        await run_k8s_call("some_review", MagicMock(side_effect=ApiException()))
+    assert errors._value.get() == 1
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+@patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api")
+@patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api")
+async def test_auth_dependency_cached_decisions(mock_authz_api, mock_authn_api):
+    """Test that the decisions are cached and Kubernetes API is not called again."""
+    create_token_review = mock_authn_api.return_value.create_token_review
+    create_token_review.side_effect = mock_token_review_response
+    create_sar = mock_authz_api.return_value.create_subject_access_review
+    create_sar.side_effect = mock_subject_access_review_response
+    hits_before = metrics.auth_cache_hits_total._value.get()
+    misses_before = metrics.auth_cache_misses_total._value.get()
+
+    valid_request = Request(
+        scope={"type": "http", "headers": [(b"authorization", b"Bearer valid-token")]}
+    )
+    invalid_request = Request(
+        scope={"type": "http", "headers": [(b"authorization", b"Bearer invalid-token")]}
+    )
+    for _ in range(3):
+        user_uid, username, _, _ = await auth_dependency(valid_request)
+        assert (user_uid, username) == ("valid-uid", "valid-user")
+        with pytest.raises(HTTPException, match="Invalid or expired token"):
+            await auth_dependency(invalid_request)
+
+    assert create_token_review.call_count == 2
+    assert create_sar.call_count == 1
+    assert metrics.auth_cache_hits_total._value.get() == hits_before + 4
+    assert metrics.auth_cache_misses_total._value.get() == misses_before + 2
+
+    # the decision is cached per virtual path
+    other_dependency = AuthDependency(virtual_path="/ols-metrics-access")
+    other_dependency.cache = auth_dependency.cache
+    await other_dependency(valid_request)
+    assert create_sar.call_count == 2
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+@patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api")
+@patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api")
+async def test_auth_dependency_caching_disabled(mock_authz_api, mock_authn_api):
+    """Test that the decisions are not cached when TTLs are set to zero."""
+    create_token_review = mock_authn_api.return_value.create_token_review
+    create_token_review.side_effect = mock_token_review_response
+    mock_authz_api.return_value.create_subject_access_review.side_effect = (
+        mock_subject_access_review_response
+    )
+    config.ols_config.authentication_config.k8s_auth_cache_ttl = 0
+    config.ols_config.authentication_config.k8s_auth_cache_negative_ttl = 0
+
+    for token in (b"Bearer valid-token", b"Bearer invalid-token") * 2:
+        request = Request(
+            scope={"type": "http", "headers": [(b"authorization", token)]}
+        )
+        try:
+            await auth_dependency(request)
+        except HTTPException:
+            pass
+
+    assert create_token_review.call_count == 4
+    assert len(auth_dependency.cache) == 0
@@ -9,6 +9,7 @@ from ols.app.models.config import ConversationCacheConfig
 from ols.src.cache.cache_factory import (
     CacheFactory,
     InMemoryCache,
+    NearCache,
     PostgresCache,
     RedisCache,
 )
@@ -86,3 +87,19 @@ def test_conversation_cache_wrong_cache(invalid_cache_type_config):
     """Check if wrong cache configuration is detected properly."""
     with pytest.raises(ValueError, match="Invalid cache type"):
         CacheFactory.conversation_cache(invalid_cache_type_config)
+
+
+@patch("psycopg2.connect")
+def test_conversation_cache_with_near_cache(mock):
+    """Check if the cache is decorated by NearCache when it is configured."""
+    config = ConversationCacheConfig(
+        {
+            "type": constants.CACHE_TYPE_POSTGRES,
+            constants.CACHE_TYPE_POSTGRES: {"host": "localhost", "port": 5432},
+            "near_cache": {"max_entries": 10, "invalidation": False},
+        }
+    )
+    cache = CacheFactory.conversation_cache(config)
+    assert isinstance(cache, NearCache), type(cache)
+    assert isinstance(cache.cache, PostgresCache), type(cache.cache)
+    assert cache.max_entries == 10
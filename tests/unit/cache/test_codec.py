@@ -0,0 +1,134 @@
+"""Unit tests for codecs used to serialize cache entries."""
+
+import json
+from unittest.mock import patch
+
+import msgpack
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ols.app.models.models import Attachment, CacheEntry, MessageEncoder
+from ols.src.cache.codec import (
+    BINARY_FORMAT_MARKER,
+    BINARY_FORMAT_VERSION,
+    FLAG_ZSTD,
+    JSONCodec,
+    MsgpackCodec,
+    decode_entry,
+    get_codec,
+    zstd_available,
+)
+
+cache_entry = CacheEntry(
+    query=HumanMessage("user message", additional_kwargs={"key": "value"}),
+    response=AIMessage("ai message", response_metadata={"model": "granite"}),
+    attachments=[
+        Attachment(attachment_type="log", content_type="text/plain", content="some log")
+    ],
+    token_counts={"cl100k_base:gpt": [3, 3]},
+)
+
+large_cache_entry = CacheEntry(
+    query=HumanMessage("user message"),
+    response=AIMessage("ai message"),
+    attachments=[
+        Attachment(
+            attachment_type="log", content_type="text/plain", content="log\n" * 5000
+        )
+    ],
+)
+
+
+@pytest.mark.parametrize("codec", [JSONCodec(), MsgpackCodec(None)])
+def test_roundtrip(codec):
+    """Test that the entry is the same after it is encoded and decoded."""
+    data = codec.encode(cache_entry)
+    assert isinstance(data, bytes)
+    assert codec.decode(data) == cache_entry
+    assert decode_entry(data) == cache_entry
+
+
+def test_msgpack_without_response():
+    """Test the entry without response."""
+    entry = CacheEntry(query=HumanMessage("user message"))
+    codec = MsgpackCodec(None)
+    assert codec.decode(codec.encode(entry)) == entry
+
+
+def test_msgpack_is_smaller_than_json():
+    """Test that the binary format is more compact than JSON."""
+    assert len(MsgpackCodec(None).encode(cache_entry)) < len(
+        JSONCodec().encode(cache_entry)
+    )
+
+
+def test_msgpack_header():
+    """Test that the payload starts with the format marker and version."""
+    data = MsgpackCodec(None).encode(cache_entry)
+    assert data[0] == BINARY_FORMAT_MARKER
+    assert data[1] == 1
+    assert data[2] == 0
+
+
+@pytest.mark.skipif(not zstd_available(), reason="zstandard is not installed")
+def test_msgpack_compression():
+    """Test that only payloads bigger than threshold are compressed."""
+    codec = MsgpackCodec(4096)
+
+    data = codec.encode(large_cache_entry)
+    assert data[2] & FLAG_ZSTD
+    assert len(data) < len(MsgpackCodec(None).encode(large_cache_entry))
+    assert decode_entry(data) == large_cache_entry
+
+    data = codec.encode(cache_entry)
+    assert not data[2] & FLAG_ZSTD
+    assert decode_entry(data) == cache_entry
+
+
+def test_msgpack_compression_without_zstandard():
+    """Test that compression is disabled when zstandard is not installed."""
+    with patch("importlib.util.find_spec", return_value=None):
+        codec = MsgpackCodec(4096)
+    assert codec.compression_threshold is None
+    assert not codec.encode(large_cache_entry)[2] & FLAG_ZSTD
+
+
+def test_msgpack_without_token_counts():
+    """Test the entry stored before token counts were introduced."""
+    entry = CacheEntry(query=HumanMessage("user message"), response=AIMessage("ai"))
+    payload = msgpack.packb(
+        [["user message", {}, {}], ["ai", {}, {}], []],
+    )
+    data = bytes((BINARY_FORMAT_MARKER, BINARY_FORMAT_VERSION, 0)) + payload
+    assert decode_entry(data) == entry
+
+
+def test_msgpack_unsupported_version():
+    """Test that payloads in unknown format version are rejected."""
+    data = bytearray(MsgpackCodec(None).encode(cache_entry))
+    data[1] = 42
+    with pytest.raises(ValueError, match="Unsupported binary format version 42"):
+        decode_entry(data)
+
+
+def test_decode_legacy_entries():
+    """Test that entries stored as JSON before the codec was introduced are read."""
+    # entries stored by Redis cache
+    entry = CacheEntry(query=HumanMessage("user message"), response=AIMessage("ai"))
+    data = json.dumps(entry, cls=MessageEncoder)
+    assert decode_entry(data) == entry
+    assert decode_entry(data.encode("utf-8")) == entry
+
+    # entries stored by Postgres cache
+    data = json.dumps(cache_entry.to_dict(), cls=MessageEncoder).encode("utf-8")
+    assert decode_entry(memoryview(data)) == cache_entry
+
+
+def test_get_codec():
+    """Test the construction of codecs."""
+    assert isinstance(get_codec("json"), JSONCodec)
+    codec = get_codec("msgpack", None)
+    assert isinstance(codec, MsgpackCodec)
+    assert codec.compression_threshold is None
+    with pytest.raises(KeyError):
+        get_codec("xml")
@@ -3,11 +3,16 @@
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
-from ols import constants
-from ols.app.models.config import InMemoryCacheConfig
-from ols.app.models.models import CacheEntry
-from ols.src.cache.in_memory_cache import InMemoryCache
-from ols.utils import suid
+from ols import config, constants
+
+# needs to be setup there before metrics (used by the cache) are imported
+config.ols_config.authentication_config.module = "k8s"
+
+from ols.app import metrics  # noqa:E402
+from ols.app.models.config import InMemoryCacheConfig  # noqa:E402
+from ols.app.models.models import CacheEntry  # noqa:E402
+from ols.src.cache.in_memory_cache import InMemoryCache  # noqa:E402
+from ols.utils import suid  # noqa:E402
 
 conversation_id = suid.get_suid()
 user_provided_user_id = "test-user1"
@@ -51,6 +56,32 @@ def test_insert_or_append_skip_user_id_check(cache):
     ]
 
 
+@pytest.mark.asyncio
+async def test_async_insert_or_append_and_get(cache):
+    """Test the behavior of asynchronous insert_or_append and get methods."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    await cache.ainsert_or_append(
+        user_id,
+        conversation_id,
+        cache_entry_1,
+        "topic",
+        False,
+    )
+    await cache.ainsert_or_append(
+        user_id,
+        conversation_id,
+        cache_entry_2,
+        "",
+        False,
+    )
+
+    assert await cache.aget(user_id, conversation_id, False) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+
+
 def test_insert_or_append_existing_key(cache):
     """Test the behavior of insert_or_append method for existing item."""
     cache.insert_or_append(
@@ -71,6 +102,20 @@ def test_insert_or_append_existing_key(cache):
     assert cache.get(constants.DEFAULT_USER_UID, conversation_id) == expected_cache
 
 
+def test_get_last_entries(cache):
+    """Test that only the requested number of most recent entries is returned."""
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, cache_entry_1)
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, cache_entry_2)
+
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_id, limit=1) == [
+        cache_entry_2
+    ]
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_id) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+
+
 def test_insert_or_append_overflow(cache):
     """Test if items in cache with defined capacity is handled correctly."""
     # remove last hex digit from user UUID
@@ -96,6 +141,113 @@ def test_insert_or_append_overflow(cache):
     )
 
 
+def test_get_marks_conversation_as_recently_used(cache):
+    """Test that the conversation read from cache is not evicted first."""
+    user_id = suid.get_suid()
+    conversation_ids = [suid.get_suid() for _ in range(3)]
+    cache.capacity = 3
+    for conversation_id in conversation_ids:
+        cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    cache.get(user_id, conversation_ids[0])
+    cache.insert_or_append(user_id, suid.get_suid(), cache_entry_1)
+
+    assert cache.get(user_id, conversation_ids[0]) is not None
+    assert cache.get(user_id, conversation_ids[1]) is None
+    assert cache.get(user_id, conversation_ids[2]) is not None
+
+
+def test_insert_or_append_bytes_overflow(cache):
+    """Test that conversations are evicted when the size limit is exceeded."""
+    user_id = suid.get_suid()
+    conversation_id_1 = suid.get_suid()
+    conversation_id_2 = suid.get_suid()
+    entry_size = len(cache.codec.encode(cache_entry_1))
+    cache.max_bytes = entry_size * 2
+    evicted_before = metrics.in_memory_cache_evicted_total.labels("bytes")._value.get()
+
+    cache.insert_or_append(user_id, conversation_id_1, cache_entry_1)
+    cache.insert_or_append(user_id, conversation_id_2, cache_entry_1)
+    assert cache.get(user_id, conversation_id_1) is not None
+
+    # the least recently used conversation is evicted
+    cache.insert_or_append(user_id, conversation_id_2, cache_entry_1)
+    assert cache.get(user_id, conversation_id_1) is None
+    assert cache.get(user_id, conversation_id_2) == [cache_entry_1, cache_entry_1]
+    assert metrics.in_memory_cache_size_bytes._value.get() == entry_size * 2
+    assert metrics.in_memory_cache_entries._value.get() == 1
+    assert (
+        metrics.in_memory_cache_evicted_total.labels("bytes")._value.get()
+        == evicted_before + 1
+    )
+
+    # the only conversation is kept even when it is too big
+    cache.insert_or_append(user_id, conversation_id_2, cache_entry_1)
+    assert len(cache.get(user_id, conversation_id_2)) == 3
+
+
+def test_compact(cache):
+    """Test that the oldest entries are replaced by summary."""
+    summary = CacheEntry(query=HumanMessage("summarize"), response=AIMessage("sum"))
+    user_id = suid.get_suid()
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+    shard = cache._shard(user_id)
+    size = shard.size
+
+    assert cache.compact(
+        user_id, conversation_id, [cache_entry_1, cache_entry_2], summary
+    )
+    assert cache.get(user_id, conversation_id) == [summary, cache_entry_1]
+    key = cache.construct_key(user_id, conversation_id, False)
+    assert shard.conversations[key]["size"] == sum(
+        len(entry) for entry in shard.conversations[key]["history"]
+    )
+    assert shard.size == size - len(cache.codec.encode(cache_entry_1)) - len(
+        cache.codec.encode(cache_entry_2)
+    ) + len(cache.codec.encode(summary))
+
+
+def test_compact_changed_conversation(cache):
+    """Test that conversation is not compacted when its beginning has changed."""
+    summary = CacheEntry(query=HumanMessage("summarize"), response=AIMessage("sum"))
+    user_id = suid.get_suid()
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+
+    assert not cache.compact(user_id, conversation_id, [cache_entry_2], summary)
+    assert not cache.compact(
+        user_id, conversation_id, [cache_entry_1, cache_entry_2, summary], summary
+    )
+    assert not cache.compact(user_id, suid.get_suid(), [cache_entry_1], summary)
+    assert cache.get(user_id, conversation_id) == [cache_entry_1, cache_entry_2]
+
+
+def test_sharding():
+    """Test that big caches are split into shards and user stays in one shard."""
+    # singleton instance is not used, as it is shared by other tests
+    cache = object.__new__(InMemoryCache)
+    cache.initialize_cache(
+        InMemoryCacheConfig(
+            {
+                "max_entries": 4 * constants.IN_MEMORY_CACHE_MIN_ENTRIES_PER_SHARD,
+                "shards": 16,
+            }
+        )
+    )
+    assert len(cache.shards) == 4
+
+    user_id = suid.get_suid()
+    for topic in ("topic1", "topic2"):
+        cache.insert_or_append(user_id, suid.get_suid(), cache_entry_1, topic)
+    assert sum(len(shard.conversations) for shard in cache.shards) == 2
+    assert sum(user_id in shard.users for shard in cache.shards) == 1
+
+    cache.initialize_cache(InMemoryCacheConfig({"max_entries": 10, "shards": 16}))
+    assert len(cache.shards) == 1
+
+
 def test_get_nonexistent_user(cache):
     """Test how non-existent items are handled by the cache."""
     # this UUID is different from DEFAULT_USER_UID
@@ -163,6 +315,34 @@ def test_list_conversations(cache):
         assert conv["topic_summary"] in [topic_1, topic_2]
 
 
+def test_list_conversations_limit(cache):
+    """Test listing limited number of conversations for a user."""
+    user_id = suid.get_suid()
+    for topic in ("topic1", "topic2", "topic3"):
+        cache.insert_or_append(user_id, suid.get_suid(), cache_entry_1, topic)
+
+    assert len(cache.list(user_id, limit=2)) == 2
+    assert len(cache.list(user_id, limit=5)) == 3
+
+
+def test_list_conversations_order(cache):
+    """Test that the most recently updated conversations are listed first."""
+    user_id = suid.get_suid()
+    conversation_ids = [suid.get_suid() for _ in range(3)]
+    for conversation_id in conversation_ids:
+        cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+    cache.insert_or_append(user_id, conversation_ids[0], cache_entry_2)
+
+    listed = [c["conversation_id"] for c in cache.list(user_id)]
+    assert listed == [conversation_ids[0], conversation_ids[2], conversation_ids[1]]
+    listed = [c["conversation_id"] for c in cache.list(user_id, limit=1)]
+    assert listed == [conversation_ids[0]]
+    listed = [c["conversation_id"] for c in cache.list(user_id, limit=1, offset=1)]
+    assert listed == [conversation_ids[2]]
+    listed = [c["conversation_id"] for c in cache.list(user_id, offset=2)]
+    assert listed == [conversation_ids[1]]
+
+
 def test_list_conversations_skip_user_id_check(cache):
     """Test listing conversations for a user."""
     # Create multiple conversations
@@ -0,0 +1,178 @@
+"""Unit tests for LLM call cache classes."""
+
+from unittest.mock import patch
+
+import pytest
+
+from ols import constants
+from ols.app.models.config import (
+    LLMCallCacheConfig,
+    LLMCallMemoryCacheConfig,
+    RedisConfig,
+    SQLiteCacheConfig,
+)
+from ols.src.cache.cache_factory import CacheFactory
+from ols.src.cache.llm_call_cache import (
+    InMemoryLLMCallCache,
+    LLMCallCache,
+    RedisLLMCallCache,
+    SQLiteLLMCallCache,
+)
+from tests.mock_classes.mock_redis_client import MockRedisClient
+
+
+def test_construct_key():
+    """Test that the key depends on every part of the LLM call."""
+    key = LLMCallCache.construct_key("p1", "m1", "prompt", {"max_new_tokens": 4})
+    assert key == LLMCallCache.construct_key(
+        "p1", "m1", "prompt", {"max_new_tokens": 4}
+    )
+    assert len(key) == 64
+
+    assert key != LLMCallCache.construct_key(
+        "p2", "m1", "prompt", {"max_new_tokens": 4}
+    )
+    assert key != LLMCallCache.construct_key(
+        "p1", "m2", "prompt", {"max_new_tokens": 4}
+    )
+    assert key != LLMCallCache.construct_key(
+        "p1", "m1", "prompt!", {"max_new_tokens": 4}
+    )
+    assert key != LLMCallCache.construct_key(
+        "p1", "m1", "prompt", {"max_new_tokens": 5}
+    )
+    # the parts can not be shifted to produce the same key
+    assert LLMCallCache.construct_key("p1", "m1p", "rompt", {}) != (
+        LLMCallCache.construct_key("p1", "m1", "prompt", {})
+    )
+
+
+@pytest.fixture
+def sqlite_cache(tmp_path):
+    """Fixture with LLM call cache stored in SQLite database."""
+    return SQLiteLLMCallCache(
+        SQLiteCacheConfig(db_path=str(tmp_path / "cache" / "llm.db")), ttl=60
+    )
+
+
+@pytest.fixture
+def redis_cache():
+    """Fixture with LLM call cache stored in mocked Redis."""
+    with patch("redis.StrictRedis", new=MockRedisClient):
+        return RedisLLMCallCache(RedisConfig({}), ttl=60)
+
+
+@pytest.fixture
+def memory_cache():
+    """Fixture with LLM call cache kept in memory."""
+    return InMemoryLLMCallCache(LLMCallMemoryCacheConfig(max_entries=2), ttl=60)
+
+
+@pytest.fixture(params=["memory_cache", "sqlite_cache", "redis_cache"])
+def cache(request):
+    """Fixture with all LLM call cache implementations."""
+    return request.getfixturevalue(request.param)
+
+
+def test_get_set(cache):
+    """Test that stored responses are returned."""
+    assert cache.get("key1") is None
+    cache.set("key1", "ALLOWED")
+    cache.set("key2", "Job templates")
+    assert cache.get("key1") == "ALLOWED"
+    assert cache.get("key2") == "Job templates"
+
+    cache.set("key1", "REJECTED")
+    assert cache.get("key1") == "REJECTED"
+
+
+@pytest.mark.asyncio
+async def test_async_get_set(cache):
+    """Test the asynchronous variants of get and set."""
+    assert await cache.aget("key1") is None
+    await cache.aset("key1", "ALLOWED")
+    assert await cache.aget("key1") == "ALLOWED"
+
+
+@pytest.mark.parametrize("cache_fixture", ["memory_cache", "sqlite_cache"])
+def test_ttl(request, cache_fixture):
+    """Test that expired responses are not returned."""
+    cache = request.getfixturevalue(cache_fixture)
+    clock = "time.monotonic" if cache_fixture == "memory_cache" else "time.time"
+    with patch(clock, return_value=1000):
+        cache.set("key1", "ALLOWED")
+    with patch(clock, return_value=1059):
+        assert cache.get("key1") == "ALLOWED"
+    with patch(clock, return_value=1061):
+        assert cache.get("key1") is None
+
+
+def test_memory_cache_lru_eviction(memory_cache):
+    """Test that the least recently used responses are dropped."""
+    memory_cache.set("key1", "1")
+    memory_cache.set("key2", "2")
+    assert memory_cache.get("key1") == "1"
+    memory_cache.set("key3", "3")
+
+    assert len(memory_cache) == 2
+    assert memory_cache.get("key2") is None
+    assert memory_cache.get("key1") == "1"
+    assert memory_cache.get("key3") == "3"
+
+
+def test_sqlite_cache_purges_expired_responses(sqlite_cache):
+    """Test that expired responses are deleted by writers."""
+    with patch("time.time", return_value=1000):
+        sqlite_cache.set("key1", "1")
+    with patch("time.time", return_value=2000):
+        for i in range(SQLiteLLMCallCache.PURGE_INTERVAL - 1):
+            sqlite_cache.set(f"other{i}", "2")
+    rows = sqlite_cache.connection.execute("SELECT key FROM llm_call_cache")
+    assert "key1" not in [row[0] for row in rows]
+
+
+def test_sqlite_cache_survives_restart(tmp_path):
+    """Test that responses are kept in the database file."""
+    config = SQLiteCacheConfig(db_path=str(tmp_path / "llm.db"))
+    SQLiteLLMCallCache(config, ttl=60).set("key1", "ALLOWED")
+    assert SQLiteLLMCallCache(config, ttl=60).get("key1") == "ALLOWED"
+
+
+def test_redis_cache_keys(redis_cache):
+    """Test that responses are stored under prefixed keys with expiration."""
+    with patch.object(redis_cache.redis_client, "set") as redis_set:
+        redis_cache.set("key1", "ALLOWED")
+    redis_set.assert_called_once_with("ols:llm-call:key1", "ALLOWED", px=60000)
+    assert redis_cache.redis_client.kwargs["decode_responses"] is True
+
+
+@patch("redis.StrictRedis", new=MockRedisClient)
+@pytest.mark.parametrize(
+    ("cache_type", "cache_class"),
+    [
+        (constants.CACHE_TYPE_MEMORY, InMemoryLLMCallCache),
+        (constants.CACHE_TYPE_REDIS, RedisLLMCallCache),
+        (constants.CACHE_TYPE_SQLITE, SQLiteLLMCallCache),
+    ],
+)
+def test_cache_factory(tmp_path, cache_type, cache_class):
+    """Test that LLM call cache of configured type is constructed."""
+    config = LLMCallCacheConfig(
+        {
+            "type": cache_type,
+            "ttl": 30,
+            "redis": {},
+            "sqlite": {"db_path": str(tmp_path / "llm.db")},
+        }
+    )
+    cache = CacheFactory.llm_call_cache(config)
+    assert isinstance(cache, cache_class)
+    assert cache.ttl == 30
+
+
+def test_cache_factory_invalid_type():
+    """Test that unknown LLM call cache type is refused."""
+    config = LLMCallCacheConfig()
+    config.type = "foo"
+    with pytest.raises(ValueError, match="Invalid LLM call cache type: foo"):
+        CacheFactory.llm_call_cache(config)
@@ -0,0 +1,263 @@
+"""Unit tests for NearCache class."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ols import config
+
+# needs to be setup there before metrics (used by the cache) are imported
+config.ols_config.authentication_config.module = "k8s"
+
+from ols.app import metrics  # noqa:E402
+from ols.app.models.config import InMemoryCacheConfig, NearCacheConfig  # noqa:E402
+from ols.app.models.models import CacheEntry  # noqa:E402
+from ols.src.cache.in_memory_cache import InMemoryCache  # noqa:E402
+from ols.src.cache.near_cache import NearCache  # noqa:E402
+from ols.utils import suid  # noqa:E402
+
+user_id = suid.get_suid()
+cache_entry_1 = CacheEntry(
+    query=HumanMessage("user message1"), response=AIMessage("ai message1")
+)
+cache_entry_2 = CacheEntry(
+    query=HumanMessage("user message2"), response=AIMessage("ai message2")
+)
+
+
+@pytest.fixture
+def shared_cache():
+    """Fixture with in-memory cache standing in for the shared cache."""
+    mc = InMemoryCacheConfig({"max_entries": "10"})
+    c = InMemoryCache(mc)
+    c.initialize_cache(mc)
+    mock = MagicMock(wraps=c)
+    mock.subscribe_invalidations.return_value = True
+    return mock
+
+
+@pytest.fixture
+def cache(shared_cache):
+    """Fixture with near cache in front of the shared cache."""
+    return NearCache(shared_cache, NearCacheConfig(max_entries=2, ttl=60))
+
+
+def test_follow_up_reads_are_served_from_memory(cache, shared_cache):
+    """Test that history written by the previous turn is not read again."""
+    conversation_id = suid.get_suid()
+    hits_before = metrics.near_cache_requests_total.labels("hit")._value.get()
+
+    # new conversation
+    assert cache.get(user_id, conversation_id) is None
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+    # follow-up question
+    assert cache.get(user_id, conversation_id) == [cache_entry_1]
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+    assert cache.get(user_id, conversation_id) == [cache_entry_1, cache_entry_2]
+    assert cache.get(user_id, conversation_id, limit=1) == [cache_entry_2]
+
+    assert shared_cache.get.call_count == 1
+    assert shared_cache.insert_or_append.call_count == 2
+    assert metrics.near_cache_requests_total.labels("hit")._value.get() == (
+        hits_before + 3
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_follow_up_reads_are_served_from_memory(cache, shared_cache):
+    """Test the asynchronous variants of get and insert_or_append."""
+    conversation_id = suid.get_suid()
+
+    assert await cache.aget(user_id, conversation_id) is None
+    await cache.ainsert_or_append(user_id, conversation_id, cache_entry_1)
+    assert await cache.aget(user_id, conversation_id) == [cache_entry_1]
+
+    assert shared_cache.aget.call_count == 1
+    shared_cache.publish_invalidation.assert_called_once_with(
+        f"{cache.instance_id} {user_id}:{conversation_id}"
+    )
+
+
+def test_cached_entries_can_not_be_modified(cache):
+    """Test that callers get copies of the cached entries."""
+    conversation_id = suid.get_suid()
+    cache.get(user_id, conversation_id)
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    cache.get(user_id, conversation_id)[0].query.content = "modified"
+    assert cache.get(user_id, conversation_id) == [cache_entry_1]
+
+
+def test_partial_history_is_not_kept(cache, shared_cache):
+    """Test that history read with limit is kept only when it is complete."""
+    conversation_id = suid.get_suid()
+    shared_cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+    shared_cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+
+    assert cache.get(user_id, conversation_id, limit=1) == [cache_entry_2]
+    assert cache.get(user_id, conversation_id, limit=3) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+    assert cache.get(user_id, conversation_id) == [cache_entry_1, cache_entry_2]
+    assert shared_cache.get.call_count == 2
+
+
+def test_history_of_requested_length_is_kept(cache, shared_cache):
+    """Test that history having exactly the requested length is kept."""
+    conversation_id = suid.get_suid()
+    shared_cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+    shared_cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+
+    # compacted conversations hold exactly the requested number of entries
+    assert cache.get(user_id, conversation_id, limit=2) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+    shared_cache.get.assert_called_once_with(user_id, conversation_id, False, 3)
+    assert cache.get(user_id, conversation_id, limit=2) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+    assert shared_cache.get.call_count == 1
+
+
+def test_unknown_conversation_is_not_populated_by_write(cache, shared_cache):
+    """Test that write does not populate history that has not been read."""
+    conversation_id = suid.get_suid()
+    shared_cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+    assert cache.get(user_id, conversation_id) == [cache_entry_1, cache_entry_2]
+    assert shared_cache.get.call_count == 1
+
+
+def test_failed_write_discards_conversation(cache, shared_cache):
+    """Test that the conversation is dropped when the shared cache fails."""
+    conversation_id = suid.get_suid()
+    cache.get(user_id, conversation_id)
+    shared_cache.insert_or_append.side_effect = Exception("connection lost")
+
+    with pytest.raises(Exception, match="connection lost"):
+        cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    cache.get(user_id, conversation_id)
+    assert shared_cache.get.call_count == 2
+    shared_cache.publish_invalidation.assert_not_called()
+
+
+def test_lru_eviction(cache, shared_cache):
+    """Test that the least recently used conversations are dropped."""
+    conversation_ids = [suid.get_suid() for _ in range(3)]
+    for conversation_id in conversation_ids:
+        cache.get(user_id, conversation_id)
+    assert shared_cache.get.call_count == 3
+
+    cache.get(user_id, conversation_ids[2])
+    cache.get(user_id, conversation_ids[1])
+    assert shared_cache.get.call_count == 3
+    cache.get(user_id, conversation_ids[0])
+    assert shared_cache.get.call_count == 4
+
+
+def test_ttl(cache, shared_cache):
+    """Test that conversations are read again when they expire."""
+    conversation_id = suid.get_suid()
+    with patch("time.monotonic", return_value=1000):
+        cache.get(user_id, conversation_id)
+    with patch("time.monotonic", return_value=1059):
+        cache.get(user_id, conversation_id)
+    assert shared_cache.get.call_count == 1
+    with patch("time.monotonic", return_value=1061):
+        cache.get(user_id, conversation_id)
+    assert shared_cache.get.call_count == 2
+
+
+def test_invalidation_from_other_replica(cache, shared_cache):
+    """Test that conversation changed by other replica is dropped."""
+    conversation_id = suid.get_suid()
+    key = f"{user_id}:{conversation_id}"
+    callback = shared_cache.subscribe_invalidations.call_args.args[0]
+    cache.get(user_id, conversation_id)
+
+    # invalidations published by this replica are ignored
+    callback(f"{cache.instance_id} {key}")
+    cache.get(user_id, conversation_id)
+    assert shared_cache.get.call_count == 1
+
+    callback(f"other-replica {key}")
+    cache.get(user_id, conversation_id)
+    assert shared_cache.get.call_count == 2
+
+    # invalidations might have been lost
+    callback(None)
+    cache.get(user_id, conversation_id)
+    assert shared_cache.get.call_count == 3
+
+
+def test_invalidation_during_read(cache, shared_cache):
+    """Test that history read before invalidation arrived is not kept."""
+    conversation_id = suid.get_suid()
+    callback = shared_cache.subscribe_invalidations.call_args.args[0]
+
+    def get(*args):
+        callback(f"other-replica {user_id}:{conversation_id}")
+
+    shared_cache.get.side_effect = get
+    cache.get(user_id, conversation_id)
+    cache.get(user_id, conversation_id)
+    assert shared_cache.get.call_count == 2
+
+
+def test_compact(cache, shared_cache):
+    """Test that compacted conversation is dropped and other replicas notified."""
+    conversation_id = suid.get_suid()
+    summary = CacheEntry(query=HumanMessage("summarize"), response=AIMessage("sum"))
+    cache.get(user_id, conversation_id)
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+
+    assert cache.compact(user_id, conversation_id, [cache_entry_1], summary)
+    assert cache.get(user_id, conversation_id) == [summary, cache_entry_2]
+    assert shared_cache.get.call_count == 2
+    assert shared_cache.publish_invalidation.call_count == 3
+
+    # nothing is changed when the conversation is not compacted
+    assert not cache.compact(user_id, conversation_id, [cache_entry_1], summary)
+    cache.get(user_id, conversation_id)
+    assert shared_cache.get.call_count == 2
+    assert shared_cache.publish_invalidation.call_count == 3
+
+
+def test_delete(cache, shared_cache):
+    """Test that deleted conversation is dropped and other replicas notified."""
+    conversation_id = suid.get_suid()
+    cache.get(user_id, conversation_id)
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    assert cache.delete(user_id, conversation_id) is True
+    assert cache.get(user_id, conversation_id) is None
+    assert shared_cache.publish_invalidation.call_count == 2
+
+
+def test_list(cache, shared_cache):
+    """Test that conversations are listed by the shared cache."""
+    conversation_id = suid.get_suid()
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1, "topic")
+    assert cache.list(user_id) == [
+        {"conversation_id": conversation_id, "topic_summary": "topic"}
+    ]
+    shared_cache.list.assert_called_once_with(user_id, False, None, 0)
+
+
+def test_invalidations_not_supported(shared_cache):
+    """Test that nothing is published when the cache does not support it."""
+    shared_cache.subscribe_invalidations.return_value = False
+    cache = NearCache(shared_cache, NearCacheConfig())
+    conversation_id = suid.get_suid()
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+    shared_cache.publish_invalidation.assert_not_called()
+
+    cache = NearCache(shared_cache, NearCacheConfig(invalidation=False))
+    assert shared_cache.subscribe_invalidations.call_count == 1
@@ -1,17 +1,24 @@
 """Unit tests for PostgresCache class."""
 
 import json
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import ANY, MagicMock, PropertyMock, call, patch
 
 import psycopg2
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
-from ols.app.models.config import PostgresConfig
-from ols.app.models.models import CacheEntry, MessageDecoder, MessageEncoder
-from ols.src.cache.cache_error import CacheError
-from ols.src.cache.postgres_cache import PostgresCache
-from ols.utils import suid
+from ols import config, constants
+
+# needs to be setup there before metrics (used by connection pool) are imported
+config.ols_config.authentication_config.module = "k8s"
+
+from ols.app import metrics  # noqa:E402
+from ols.app.models.config import PostgresConfig  # noqa:E402
+from ols.app.models.models import CacheEntry, MessageEncoder  # noqa:E402
+from ols.src.cache.cache_error import CacheError  # noqa:E402
+from ols.src.cache.codec import get_codec  # noqa:E402
+from ols.src.cache.postgres_cache import PostgresCache  # noqa:E402
+from ols.utils import suid  # noqa:E402
 
 user_id = suid.get_suid()
 conversation_id = suid.get_suid()
@@ -40,12 +47,36 @@ def test_init_cache_failure_detection(mock_connect):
     mock_connect.return_value.close.assert_called_once_with()
 
 
+@patch("psycopg2.connect")
+def test_init_cache_creates_tables(mock_connect):
+    """Test that tables are created and migration is not started without legacy table."""
+    mock_cursor = mock_connect.return_value.cursor.return_value
+    mock_cursor.fetchone.return_value = (False,)
+
+    with patch("threading.Thread") as mock_thread:
+        cache = PostgresCache(PostgresConfig())
+
+    mock_cursor.execute.assert_has_calls(
+        [
+            call(PostgresCache.CREATE_CONVERSATIONS_TABLE),
+            call(PostgresCache.CREATE_CONVERSATION_ENTRIES_TABLE),
+            call(PostgresCache.CREATE_INDEXES),
+            call(PostgresCache.QUERY_LEGACY_TABLE_EXISTS),
+        ]
+    )
+    assert cache.legacy_table_exists is False
+    # only the eviction job is started
+    mock_thread.assert_called_once_with(
+        target=cache._eviction_loop, name="postgres-cache-eviction", daemon=True
+    )
+
+
 @patch("psycopg2.connect")
 def test_get_operation_on_empty_cache(mock_connect):
     """Test the Cache.get operation on empty cache."""
     # mock the query result - empty cache
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = None
+    mock_cursor.fetchall.return_value = []
     mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
 
     # initialize Postgres cache
@@ -56,32 +87,10 @@ def test_get_operation_on_empty_cache(mock_connect):
     conversation = cache.get(user_id, conversation_id)
     assert conversation == []
     mock_cursor.execute.assert_called_once_with(
-        PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT, (user_id, conversation_id)
-    )
-    mock_cursor.fetchone.assert_called_once()
-
-
-@patch("psycopg2.connect")
-def test_get_operation_invalid_value(mock_connect):
-    """Test the Cache.get operation when invalid value is returned from cache."""
-    # mock the query result
-    mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = "Invalid value"
-    mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
-
-    # initialize Postgres cache
-    config = PostgresConfig()
-    cache = PostgresCache(config)
-
-    # call the "get" operation
-    with pytest.raises(ValueError, match="Invalid value read from cache:"):
-        cache.get(user_id, conversation_id)
-
-    # DB operation SELECT must be performed
-    mock_cursor.execute.assert_called_once_with(
-        PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT, (user_id, conversation_id)
+        PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
+        (user_id, conversation_id, None),
     )
-    mock_cursor.fetchone.assert_called_once()
+    mock_cursor.fetchall.assert_called_once()
 
 
 @patch("psycopg2.connect")
@@ -91,11 +100,14 @@ def test_get_operation_valid_value(mock_connect):
         cache_entry_1,
         cache_entry_2,
     ]
-    conversation = json.dumps([ce.to_dict() for ce in history], cls=MessageEncoder)
+    rows = [
+        (memoryview(json.dumps(ce.to_dict(), cls=MessageEncoder).encode("utf-8")),)
+        for ce in history
+    ]
 
     # mock the query result
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = (conversation,)
+    mock_cursor.fetchall.return_value = rows
     mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
 
     # initialize Postgres cache
@@ -108,9 +120,28 @@ def test_get_operation_valid_value(mock_connect):
 
     # DB operation SELECT must be performed
     mock_cursor.execute.assert_called_once_with(
-        PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT, (user_id, conversation_id)
+        PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
+        (user_id, conversation_id, None),
+    )
+    mock_cursor.fetchall.assert_called_once()
+
+
+@patch("psycopg2.connect")
+def test_get_operation_with_limit(mock_connect):
+    """Test that the number of most recent entries is pushed down to the query."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = [
+        (json.dumps(cache_entry_2.to_dict(), cls=MessageEncoder),)
+    ]
+    mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+
+    cache = PostgresCache(PostgresConfig())
+
+    assert cache.get(user_id, conversation_id, limit=1) == [cache_entry_2]
+    mock_cursor.execute.assert_called_once_with(
+        PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
+        (user_id, conversation_id, 1),
     )
-    mock_cursor.fetchone.assert_called_once()
 
 
 @patch("psycopg2.connect")
@@ -122,7 +153,7 @@ def test_get_operation_on_exception(mock_connect):
 
     # mock the query
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.side_effect = psycopg2.DatabaseError("PLSQL error")
+    mock_cursor.fetchall.side_effect = psycopg2.DatabaseError("PLSQL error")
     mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
 
     # error must be raised during cache operation
@@ -134,11 +165,9 @@ def test_get_operation_on_exception(mock_connect):
 def test_insert_or_append_operation(mock_connect):
     """Test the Cache.insert_or_append operation for first item to be inserted."""
     history = cache_entry_1
-    conversation = json.dumps([history.to_dict()], cls=MessageEncoder)
+    value = get_codec().encode(history)
 
-    # mock the query result
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = None
     mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
 
     test_topic = "some topic"
@@ -151,38 +180,20 @@ def test_insert_or_append_operation(mock_connect):
     # to insert new conversation history
     cache.insert_or_append(user_id, conversation_id, history, test_topic)
 
-    # multiple DB operations must be performed
-    calls = [
-        call(
-            PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id),
-        ),
-        call(
-            PostgresCache.INSERT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id, conversation.encode("utf-8"), test_topic),
-        ),
-        call(PostgresCache.QUERY_CACHE_SIZE),
-    ]
-    mock_cursor.execute.assert_has_calls(calls, any_order=True)
+    # only the new entry is inserted, cache size is not checked
+    mock_cursor.execute.assert_called_once_with(
+        PostgresCache.APPEND_CONVERSATION_ENTRY_STATEMENT,
+        (user_id, conversation_id, test_topic, value),
+    )
 
 
 @patch("psycopg2.connect")
 def test_insert_or_append_operation_append_item(mock_connect):
     """Test the Cache.insert_or_append operation for more item to be inserted."""
-    stored_history = cache_entry_1
-
-    old_conversation = json.dumps([stored_history.to_dict()], cls=MessageEncoder)
-
     appended_history = cache_entry_2
+    value = get_codec().encode(appended_history)
 
-    # create json object in the exactly same format
-    whole_history = json.loads(old_conversation, cls=MessageDecoder)
-    whole_history.append(appended_history.to_dict())
-    new_conversation = json.dumps(whole_history, cls=MessageEncoder)
-
-    # mock the query result
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = (old_conversation,)
     mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
 
     # initialize Postgres cache
@@ -193,18 +204,11 @@ def test_insert_or_append_operation_append_item(mock_connect):
     # to append new history to the old one
     cache.insert_or_append(user_id, conversation_id, appended_history)
 
-    # multiple DB operations must be performed
-    calls = [
-        call(
-            PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id),
-        ),
-        call(
-            PostgresCache.UPDATE_CONVERSATION_HISTORY_STATEMENT,
-            (new_conversation.encode("utf-8"), user_id, conversation_id),
-        ),
-    ]
-    mock_cursor.execute.assert_has_calls(calls, any_order=True)
+    # stored history is neither read nor rewritten
+    mock_cursor.execute.assert_called_once_with(
+        PostgresCache.APPEND_CONVERSATION_ENTRY_STATEMENT,
+        (user_id, conversation_id, "", value),
+    )
 
 
 @patch("psycopg2.connect")
@@ -214,7 +218,7 @@ def test_insert_or_append_operation_on_exception(mock_connect):
 
     # mock the query result
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.side_effect = psycopg2.DatabaseError("PLSQL error")
+    mock_cursor.execute.side_effect = psycopg2.DatabaseError("PLSQL error")
     mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
 
     # initialize Postgres cache
@@ -226,6 +230,196 @@ def test_insert_or_append_operation_on_exception(mock_connect):
         cache.insert_or_append(user_id, conversation_id, history)
 
 
+@patch("psycopg2.connect")
+def test_legacy_conversation_is_migrated_on_access(mock_connect):
+    """Test that conversation stored in the legacy table is migrated when accessed."""
+    mock_connect.return_value.cursor.return_value.fetchone.return_value = (True,)
+    legacy_value = json.dumps(
+        [cache_entry_1.to_dict(), cache_entry_2.to_dict()], cls=MessageEncoder
+    ).encode("utf-8")
+    updated_at = "2024-01-01 00:00:00"
+
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.side_effect = [
+        [(user_id, conversation_id, memoryview(legacy_value), "topic", updated_at)],
+        [],
+    ]
+    mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+
+    # background migration is tested separately
+    with patch("threading.Thread") as mock_thread:
+        cache = PostgresCache(PostgresConfig())
+    assert cache.legacy_table_exists is True
+    mock_thread.assert_any_call(
+        target=cache.migrate_legacy_cache,
+        name="postgres-cache-migration",
+        daemon=True,
+    )
+
+    cache.get(user_id, conversation_id)
+
+    mock_cursor.execute.assert_any_call(
+        PostgresCache.MIGRATE_LEGACY_CONVERSATION_STATEMENT,
+        (user_id, conversation_id),
+    )
+    mock_cursor.execute.assert_any_call(
+        PostgresCache.INSERT_MIGRATED_CONVERSATION_STATEMENT,
+        (user_id, conversation_id, "topic", updated_at),
+    )
+    mock_cursor.executemany.assert_called_once_with(
+        PostgresCache.INSERT_MIGRATED_ENTRY_STATEMENT,
+        [
+            (
+                user_id,
+                conversation_id,
+                cache.codec.encode(entry),
+                updated_at,
+            )
+            for entry in (cache_entry_1, cache_entry_2)
+        ],
+    )
+
+
+@patch("psycopg2.connect")
+def test_legacy_table_dropped_by_other_replica(mock_connect):
+    """Test that on demand migration stops when the legacy table is dropped."""
+    mock_connect.return_value.cursor.return_value.fetchone.return_value = (True,)
+    mock_cursor = MagicMock()
+    mock_cursor.execute.side_effect = [
+        None,
+        psycopg2.errors.UndefinedTable("relation cache does not exist"),
+        None,
+        None,
+    ]
+    mock_cursor.fetchall.return_value = []
+    mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+
+    with patch("threading.Thread"):
+        cache = PostgresCache(PostgresConfig())
+
+    assert cache.get(user_id, conversation_id) == []
+    assert cache.legacy_table_exists is False
+    mock_cursor.execute.assert_any_call("ROLLBACK TO SAVEPOINT legacy_migration")
+
+
+@patch("psycopg2.connect")
+def test_migrate_legacy_cache(mock_connect):
+    """Test that the legacy table is migrated in batches and dropped."""
+    mock_connect.return_value.cursor.return_value.fetchone.return_value = (True,)
+    legacy_value = json.dumps([cache_entry_1.to_dict()], cls=MessageEncoder)
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.side_effect = [
+        [(user_id, conversation_id, legacy_value, "topic", None)],
+        [],
+    ]
+    mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+
+    with patch("threading.Thread"):
+        cache = PostgresCache(PostgresConfig())
+    cache.migrate_legacy_cache()
+
+    batch = call(
+        PostgresCache.MIGRATE_LEGACY_BATCH_STATEMENT,
+        (PostgresCache.MIGRATION_BATCH_SIZE,),
+    )
+    executed = mock_cursor.execute.call_args_list
+    assert executed.count(batch) == 2
+    assert executed[-1] == call(PostgresCache.DROP_LEGACY_TABLE)
+    mock_cursor.executemany.assert_called_once()
+    assert cache.legacy_table_exists is False
+
+
+@patch("psycopg2.connect")
+def test_evict_over_capacity(mock_connect):
+    """Test that conversations over the capacity are evicted in batches."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = (True,)
+    mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+
+    cache = PostgresCache(
+        PostgresConfig(max_entries=10, eviction_batch_size=2, eviction_interval=3600)
+    )
+    evicted_before = metrics.postgres_cache_evicted_total.labels(
+        "capacity"
+    )._value.get()
+
+    # two full batches and the last, partial, one
+    type(mock_cursor).rowcount = PropertyMock(side_effect=[2, 2, 1])
+    assert cache.evict() == 5
+
+    sweep = call(PostgresCache.EVICT_OVER_CAPACITY_STATEMENT, (10, 2))
+    assert mock_cursor.execute.call_args_list.count(sweep) == 3
+    mock_cursor.execute.assert_any_call(
+        PostgresCache.ACQUIRE_EVICTION_LOCK, (PostgresCache.EVICTION_LOCK_KEY,)
+    )
+    # expired conversations are not evicted without retention period
+    assert (
+        call(PostgresCache.EVICT_EXPIRED_STATEMENT, ANY)
+        not in mock_cursor.execute.call_args_list
+    )
+    assert (
+        metrics.postgres_cache_evicted_total.labels("capacity")._value.get()
+        == evicted_before + 5
+    )
+
+
+@patch("psycopg2.connect")
+def test_evict_expired(mock_connect):
+    """Test that conversations older than retention period are evicted."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = (True,)
+    mock_cursor.rowcount = 0
+    mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+
+    cache = PostgresCache(PostgresConfig(retention_period=86400))
+
+    assert cache.evict() == 0
+    mock_cursor.execute.assert_any_call(
+        PostgresCache.EVICT_EXPIRED_STATEMENT,
+        (86400, cache.eviction_batch_size),
+    )
+    mock_cursor.execute.assert_any_call(
+        PostgresCache.EVICT_OVER_CAPACITY_STATEMENT,
+        (cache.capacity, cache.eviction_batch_size),
+    )
+
+
+@patch("psycopg2.connect")
+def test_evict_performed_by_other_replica(mock_connect):
+    """Test that the sweep is skipped when other replica holds the eviction lock."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = (False,)
+    mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+
+    cache = PostgresCache(PostgresConfig())
+
+    assert cache.evict() == 0
+    mock_cursor.execute.assert_called_once_with(
+        PostgresCache.ACQUIRE_EVICTION_LOCK, (PostgresCache.EVICTION_LOCK_KEY,)
+    )
+
+
+@patch("psycopg2.connect")
+def test_eviction_loop(mock_connect):
+    """Test that the eviction job runs periodically until it is stopped."""
+    cache = PostgresCache(PostgresConfig(eviction_interval=3600))
+    cache.stop_eviction()
+
+    def evict():
+        if mock_evict.call_count == 1:
+            raise CacheError("evict", "error")
+        cache.stop_eviction()
+        return 0
+
+    with patch.object(PostgresCache, "evict", side_effect=evict) as mock_evict:
+        cache._stop_eviction.clear()
+        cache.eviction_interval = 0.01
+        cache._eviction_loop()
+
+    # errors do not stop the eviction job
+    assert mock_evict.call_count == 2
+
+
 @patch("psycopg2.connect")
 def test_list_operation(mock_connect):
     """Test the Cache.list operation."""
@@ -258,7 +452,7 @@ def test_list_operation(mock_connect):
 
     # Verify the query execution
     mock_cursor.execute.assert_called_once_with(
-        PostgresCache.LIST_CONVERSATIONS_STATEMENT, (user_id,)
+        PostgresCache.LIST_CONVERSATIONS_STATEMENT, (user_id, None, 0)
     )
     mock_cursor.fetchall.assert_called_once()
 
@@ -280,12 +474,62 @@ def test_list_operation_on_exception(mock_connect):
         cache.list(user_id)
 
 
+@patch("psycopg2.connect")
+def test_compact_operation(mock_connect):
+    """Test the Cache.compact operation."""
+    summary = CacheEntry(query=HumanMessage("summarize"), response=AIMessage("sum"))
+    codec = get_codec()
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = [
+        (1, memoryview(codec.encode(cache_entry_1))),
+        (2, memoryview(codec.encode(cache_entry_2))),
+        (3, memoryview(codec.encode(cache_entry_1))),
+    ]
+    mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+
+    cache = PostgresCache(PostgresConfig())
+    folded = [cache_entry_1, cache_entry_2, cache_entry_1]
+    assert cache.compact(user_id, conversation_id, folded, summary) is True
+
+    # the last folded row holds the summary, the older ones are deleted
+    mock_cursor.execute.assert_has_calls(
+        [
+            call(
+                PostgresCache.SELECT_OLDEST_ENTRIES_STATEMENT,
+                (user_id, conversation_id, 3),
+            ),
+            call(PostgresCache.UPDATE_ENTRY_STATEMENT, (codec.encode(summary), 3)),
+            call(PostgresCache.DELETE_ENTRIES_STATEMENT, ([1, 2],)),
+        ]
+    )
+
+
+@patch("psycopg2.connect")
+def test_compact_operation_changed_conversation(mock_connect):
+    """Test that conversation is not compacted when its beginning has changed."""
+    summary = CacheEntry(query=HumanMessage("summarize"), response=AIMessage("sum"))
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = [
+        (2, memoryview(get_codec().encode(cache_entry_2))),
+    ]
+    mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+
+    cache = PostgresCache(PostgresConfig())
+    assert cache.compact(user_id, conversation_id, [cache_entry_1], summary) is False
+    # fewer rows than folded entries
+    assert (
+        cache.compact(user_id, conversation_id, [cache_entry_2, cache_entry_1], summary)
+        is False
+    )
+    assert mock_cursor.execute.call_count == 2
+
+
 @patch("psycopg2.connect")
 def test_delete_operation(mock_connect):
     """Test the Cache.delete operation."""
     # Mock the database cursor behavior
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = True
+    mock_cursor.fetchone.return_value = (conversation_id,)
     mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
 
     # Initialize Postgres cache
@@ -345,3 +589,100 @@ def test_delete_operation_on_exception(mock_connect):
     # Verify that the exception is raised
     with pytest.raises(CacheError, match="PLSQL error"):
         cache.delete(user_id, conversation_id)
+
+
+@patch("psycopg2.connect")
+def test_operation_is_retried_on_connection_error(mock_connect):
+    """Test that operation is retried with new connection when connection is lost."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.side_effect = [
+        psycopg2.OperationalError("server closed the connection"),
+        [],
+    ]
+    mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+
+    cache = PostgresCache(PostgresConfig())
+
+    assert cache.get(user_id, conversation_id) == []
+    assert mock_cursor.execute.call_count == 2
+    # broken connection has been closed and new one opened
+    mock_connect.return_value.close.assert_called_once_with()
+    assert mock_connect.call_count == 2
+
+    # operation is not retried more than once
+    mock_cursor.fetchall.side_effect = psycopg2.OperationalError("connection lost")
+    with pytest.raises(CacheError, match="connection lost"):
+        cache.get(user_id, conversation_id)
+    assert mock_cursor.execute.call_count == 4
+
+
+@patch("psycopg2.connect")
+def test_pool_configuration(mock_connect):
+    """Test that the connection pool is configured."""
+    config = PostgresConfig(pool_min_size=2, pool_max_size=5, pool_timeout=1.5)
+    cache = PostgresCache(config)
+
+    assert mock_connect.call_count == 2
+    assert cache.pool.max_size == 5
+    assert cache.pool.timeout == 1.5
+
+
+def test_pool_configuration_validation():
+    """Test that the minimal pool size can not be higher than maximal one."""
+    with pytest.raises(ValueError, match="minimal pool size"):
+        PostgresConfig(pool_min_size=6, pool_max_size=5)
+
+
+@patch("psycopg2.connect")
+def test_publish_invalidation(mock_connect):
+    """Test that invalidations are sent as notifications."""
+    mock_cursor = MagicMock()
+    mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+    cache = PostgresCache(PostgresConfig())
+
+    cache.publish_invalidation("replica user:conversation")
+    mock_cursor.execute.assert_called_with(
+        PostgresCache.NOTIFY_STATEMENT,
+        (constants.CACHE_INVALIDATION_CHANNEL, "replica user:conversation"),
+    )
+
+
+@patch("select.select")
+@patch("psycopg2.connect")
+def test_listen_invalidations(mock_connect, mock_select):
+    """Test that notifications are received on dedicated connection."""
+    mock_cursor = MagicMock()
+    mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+    cache = PostgresCache(PostgresConfig())
+    conn = MagicMock()
+    conn.notifies = []
+    received = []
+
+    def callback(message):
+        received.append(message)
+        if len(received) == 3:
+            cache.stop_listening()
+
+    def poll():
+        conn.notifies.append(MagicMock(payload="replica user:conversation"))
+
+    conn.poll.side_effect = poll
+    mock_select.side_effect = [([], [], []), ([conn], [], [])]
+
+    # listening connection is lost for the first time
+    with (
+        patch.object(
+            cache,
+            "_connect",
+            side_effect=[psycopg2.OperationalError("connection lost"), conn],
+        ),
+        patch.object(cache._stop_listening, "wait"),
+    ):
+        cache._listen(callback)
+
+    assert received == [None, None, "replica user:conversation"]
+    conn.cursor.return_value.__enter__.return_value.execute.assert_called_once_with(
+        PostgresCache.LISTEN_STATEMENT
+    )
+    assert conn.autocommit is True
+    conn.close.assert_called_once_with()
@@ -0,0 +1,153 @@
+"""Unit tests for PostgresConnectionPool class."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+import pytest
+from psycopg2 import extensions
+
+from ols import config
+
+# needs to be setup there before metrics (used by connection pool) are imported
+config.ols_config.authentication_config.module = "k8s"
+
+from ols.app import metrics  # noqa:E402
+from ols.src.cache.postgres_pool import (  # noqa:E402
+    PoolTimeoutError,
+    PostgresConnectionPool,
+)
+
+
+def new_connection():
+    """Construct mocked healthy connection."""
+    conn = MagicMock()
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+    return conn
+
+
+def construct_pool(min_size=1, max_size=2, timeout=1, health_check_interval=30):
+    """Construct pool with mocked connections."""
+    connect = MagicMock(side_effect=lambda: new_connection())
+    pool = PostgresConnectionPool(
+        connect,
+        min_size=min_size,
+        max_size=max_size,
+        timeout=timeout,
+        health_check_interval=health_check_interval,
+    )
+    return pool, connect
+
+
+def test_connections_are_reused():
+    """Test that connections are opened in advance and reused."""
+    pool, connect = construct_pool(min_size=2)
+    assert connect.call_count == 2
+
+    conn = pool.getconn()
+    assert conn.autocommit is False
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+    assert connect.call_count == 2
+
+
+def test_pool_size_is_bounded():
+    """Test that no more than max_size connections are opened."""
+    pool, connect = construct_pool(min_size=0, max_size=2, timeout=0.01)
+    timeouts = metrics.postgres_pool_timeouts_total._value.get()
+
+    pool.getconn()
+    pool.getconn()
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn()
+
+    assert connect.call_count == 2
+    assert metrics.postgres_pool_timeouts_total._value.get() == timeouts + 1
+
+
+def test_waiting_for_connection():
+    """Test that returned connection is handed to the waiting thread."""
+    pool, _ = construct_pool(min_size=1, max_size=1, timeout=5)
+    conn = pool.getconn()
+    borrowed = []
+
+    thread = threading.Thread(target=lambda: borrowed.append(pool.getconn()))
+    thread.start()
+    pool.putconn(conn)
+    thread.join()
+
+    assert borrowed == [conn]
+
+
+def test_broken_connection_is_replaced():
+    """Test that connection lost while idle is replaced by new one."""
+    pool, connect = construct_pool()
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_UNKNOWN
+
+    new_conn = pool.getconn()
+
+    assert new_conn is not conn
+    conn.close.assert_called_once()
+    assert connect.call_count == 2
+
+
+def test_idle_connection_health_check():
+    """Test that connection idle for a long time is checked before use."""
+    pool, connect = construct_pool(health_check_interval=10)
+    conn = pool.getconn()
+    pool.putconn(conn)
+
+    with patch("ols.src.cache.postgres_pool.time.monotonic", return_value=1e9):
+        assert pool.getconn() is conn
+    conn.cursor.return_value.__enter__.return_value.execute.assert_called_with(
+        "SELECT 1"
+    )
+    pool.putconn(conn)
+
+    # server does not respond anymore
+    conn.cursor.side_effect = psycopg2.OperationalError("server closed connection")
+    with patch("ols.src.cache.postgres_pool.time.monotonic", return_value=2e9):
+        assert pool.getconn() is not conn
+    assert connect.call_count == 2
+
+
+def test_connection_context_manager():
+    """Test that connection is discarded after connection error."""
+    pool, connect = construct_pool(min_size=1, max_size=1)
+
+    with pool.connection() as conn:
+        pass
+    with pool.connection() as same_conn:
+        assert same_conn is conn
+
+    with pytest.raises(ValueError), pool.connection():
+        raise ValueError("not related to connection")
+    with pytest.raises(psycopg2.OperationalError), pool.connection():
+        raise psycopg2.OperationalError("connection lost")
+
+    conn.close.assert_called_once()
+    with pool.connection() as new_conn:
+        assert new_conn is not conn
+    assert connect.call_count == 2
+
+
+def test_failed_connect_releases_slot():
+    """Test that failed attempt to connect does not decrease pool capacity."""
+    pool, connect = construct_pool(min_size=0, max_size=1, timeout=0.01)
+    connect.side_effect = psycopg2.OperationalError("unable to connect")
+    with pytest.raises(psycopg2.OperationalError, match="unable to connect"):
+        pool.getconn()
+
+    connect.side_effect = lambda: new_connection()
+    assert pool.getconn() is not None
+
+
+def test_closeall():
+    """Test that idle connections are closed."""
+    pool, _ = construct_pool(min_size=2)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    pool.closeall()
+    conn.close.assert_called_once()
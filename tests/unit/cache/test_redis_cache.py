@@ -1,16 +1,19 @@
 """Unit tests for RedisCache class."""
 
-from unittest.mock import patch
+import json
+from unittest.mock import MagicMock, patch
 
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import WatchError
 
 from ols import constants
 from ols.app.models.config import RedisConfig
-from ols.app.models.models import CacheEntry
+from ols.app.models.models import CacheEntry, MessageEncoder
 from ols.src.cache.redis_cache import RedisCache
 from ols.utils import suid
-from tests.mock_classes.mock_redis_client import MockRedisClient
+from tests.mock_classes.mock_redis_client import MockRedisClient, MockRedisPipeline
 
 conversation_id = suid.get_suid()
 cache_entry_1 = CacheEntry(
@@ -22,13 +25,24 @@ cache_entry_2 = CacheEntry(
 user_provided_user_id = "test-user1"
 
 
+class ImmediateExecutor:
+    """Executor running submitted functions right away, in the caller thread."""
+
+    def submit(self, fn, *args):
+        """Run the function."""
+        fn(*args)
+
+
 @pytest.fixture
 def cache():
     """Fixture with constucted and initialized Redis cache object."""
     # we don't want to connect to real Redis from unit tests
     # with patch("ols.src.cache.redis_cache.RedisCache.initialize_redis"):
     with patch("redis.StrictRedis", new=MockRedisClient):
-        return RedisCache(RedisConfig({}))
+        cache = RedisCache(RedisConfig({}))
+    # indexes are built in background otherwise
+    cache._index_executor = ImmediateExecutor()
+    return cache
 
 
 def test_insert_or_append(cache):
@@ -44,6 +58,32 @@ def test_insert_or_append(cache):
     assert cache.get(constants.DEFAULT_USER_UID, conversation_id) == [cache_entry_1]
 
 
+@pytest.mark.asyncio
+async def test_async_insert_or_append_and_get(cache):
+    """Test the behavior of asynchronous insert_or_append and get methods."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    await cache.ainsert_or_append(
+        user_id,
+        conversation_id,
+        cache_entry_1,
+        "topic",
+        False,
+    )
+    await cache.ainsert_or_append(
+        user_id,
+        conversation_id,
+        cache_entry_2,
+        "",
+        False,
+    )
+
+    assert await cache.aget(user_id, conversation_id, False) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+
+
 def test_insert_or_append_existing_key(cache):
     """Test the behavior of insert_or_append method for existing item."""
     # conversation IDs are separated by users
@@ -57,6 +97,20 @@ def test_insert_or_append_existing_key(cache):
     assert cache.get(user_uuid, conversation_id) == [cache_entry_1, cache_entry_2]
 
 
+def test_get_last_entries(cache):
+    """Test that only the requested number of most recent entries is returned."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+
+    assert cache.get(user_id, conversation_id, limit=1) == [cache_entry_2]
+    assert cache.get(user_id, conversation_id, limit=5) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+
+
 def test_insert_or_append_skip_user_id_check(cache):
     """Test the behavior of insert_or_append method for existing item."""
     skip_user_id_check = True
@@ -75,6 +129,316 @@ def test_insert_or_append_skip_user_id_check(cache):
     ]
 
 
+def test_insert_or_append_storage_layout(cache):
+    """Test that entries are appended to list and topic summary is stored once."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1, "topic")
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2, "other topic")
+
+    key = f"{user_id}:{conversation_id}"
+    assert key not in cache.redis_client.cache
+    assert len(cache.redis_client.cache[f"{key}:history"]) == 2
+    assert cache.redis_client.cache[f"{key}:meta"] == {"topic_summary": "topic"}
+    assert cache.get_db_entry(user_id, conversation_id) == {
+        "history": [cache_entry_1, cache_entry_2],
+        "topic_summary": "topic",
+    }
+
+
+def test_compact(cache):
+    """Test that the oldest entries are replaced by summary."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    summary = CacheEntry(query=HumanMessage("summarize"), response=AIMessage("sum"))
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1, "topic")
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    assert cache.compact(
+        user_id, conversation_id, [cache_entry_1, cache_entry_2], summary
+    )
+    assert cache.get(user_id, conversation_id) == [summary, cache_entry_1]
+    assert cache.get_db_entry(user_id, conversation_id)["topic_summary"] == "topic"
+
+
+def test_compact_changed_conversation(cache):
+    """Test that conversation is not compacted when its beginning has changed."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    summary = CacheEntry(query=HumanMessage("summarize"), response=AIMessage("sum"))
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+
+    assert not cache.compact(user_id, conversation_id, [cache_entry_2], summary)
+    assert not cache.compact(
+        user_id, conversation_id, [cache_entry_1, cache_entry_2, summary], summary
+    )
+    assert not cache.compact(user_id, suid.get_suid(), [cache_entry_1], summary)
+    assert cache.get(user_id, conversation_id) == [cache_entry_1, cache_entry_2]
+
+
+def test_compact_concurrent_change(cache):
+    """Test that conversation changed during compaction is not overwritten."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    summary = CacheEntry(query=HumanMessage("summarize"), response=AIMessage("sum"))
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    with patch(
+        "tests.mock_classes.mock_redis_client.MockRedisPipeline.execute",
+        side_effect=WatchError,
+    ):
+        assert not cache.compact(user_id, conversation_id, [cache_entry_1], summary)
+    assert cache.get(user_id, conversation_id) == [cache_entry_1]
+
+
+def store_legacy_conversation(cache, user_id, conversation_id, topic_summary):
+    """Store conversation in the format with one JSON blob per conversation."""
+    cache.redis_client.set(
+        f"{user_id}:{conversation_id}",
+        json.dumps(
+            {"history": [cache_entry_1], "topic_summary": topic_summary},
+            cls=MessageEncoder,
+        ),
+    )
+
+
+def test_get_migrates_legacy_conversation(cache):
+    """Test that conversation stored in legacy format is migrated when read."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    store_legacy_conversation(cache, user_id, conversation_id, "topic")
+
+    assert cache.get(user_id, conversation_id) == [cache_entry_1]
+
+    key = f"{user_id}:{conversation_id}"
+    assert key not in cache.redis_client.cache
+    assert len(cache.redis_client.cache[f"{key}:history"]) == 1
+    assert cache.get_db_entry(user_id, conversation_id) == {
+        "history": [cache_entry_1],
+        "topic_summary": "topic",
+    }
+
+
+def test_get_last_entries_of_legacy_conversation(cache):
+    """Test that the limit is applied to conversation stored in legacy format."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    store_legacy_conversation(cache, user_id, conversation_id, "topic")
+
+    assert cache.get(user_id, conversation_id, limit=1) == [cache_entry_1]
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+    assert cache.get(user_id, conversation_id, limit=1) == [cache_entry_2]
+
+
+def test_insert_or_append_migrates_legacy_conversation(cache):
+    """Test that conversation stored in legacy format is migrated on append."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    store_legacy_conversation(cache, user_id, conversation_id, "topic")
+
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2, "other topic")
+
+    assert f"{user_id}:{conversation_id}" not in cache.redis_client.cache
+    assert cache.get_db_entry(user_id, conversation_id) == {
+        "history": [cache_entry_1, cache_entry_2],
+        "topic_summary": "topic",
+    }
+
+
+def test_migration_keeps_concurrently_appended_entries(cache):
+    """Test that migration is retried when the history is changed meanwhile."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    store_legacy_conversation(cache, user_id, conversation_id, "topic")
+    history_key = f"{user_id}:{conversation_id}:history"
+
+    execute = MockRedisPipeline.execute
+    executed = []
+
+    def append_and_execute(pipeline):
+        if not executed:
+            # the first transaction is aborted by entry appended concurrently
+            executed.append(True)
+            pipeline.commands = []
+            cache.redis_client.rpush(history_key, cache.codec.encode(cache_entry_2))
+            raise WatchError
+        return execute(pipeline)
+
+    with patch.object(
+        MockRedisPipeline, "execute", autospec=True, side_effect=append_and_execute
+    ):
+        assert cache.get(user_id, conversation_id) == [cache_entry_1, cache_entry_2]
+
+    assert cache.get_db_entry(user_id, conversation_id) == {
+        "history": [cache_entry_1, cache_entry_2],
+        "topic_summary": "topic",
+    }
+
+
+def test_list_and_delete_legacy_conversation(cache):
+    """Test listing and deleting conversations stored in legacy format."""
+    user_id = suid.get_suid()
+    conversation_id_1 = suid.get_suid()
+    conversation_id_2 = suid.get_suid()
+    store_legacy_conversation(cache, user_id, conversation_id_1, "topic1")
+    cache.insert_or_append(user_id, conversation_id_2, cache_entry_2, "topic2")
+
+    # legacy conversations are not indexed until the index is built
+    cache.redis_client.delete(RedisCache.INDEX_BUILT_KEY)
+    assert cache.list(user_id) == [
+        {"conversation_id": conversation_id_2, "topic_summary": "topic2"}
+    ]
+    assert not cache.redis_client.exists(RedisCache.INDEX_BUILT_KEY)
+
+    assert cache.build_index() is True
+    assert cache.redis_client.exists(RedisCache.INDEX_BUILT_KEY)
+    conversations = cache.list(user_id)
+    assert sorted(conversations, key=lambda c: c["topic_summary"]) == [
+        {"conversation_id": conversation_id_1, "topic_summary": "topic1"},
+        {"conversation_id": conversation_id_2, "topic_summary": "topic2"},
+    ]
+
+    assert cache.delete(user_id, conversation_id_1) is True
+    assert cache.delete(user_id, conversation_id_2) is True
+    assert cache.list(user_id) == []
+
+
+def test_list_uses_index(cache):
+    """Test that conversations are listed from index, the most recent first."""
+    user_id = suid.get_suid()
+    conversation_ids = [suid.get_suid() for _ in range(3)]
+    with patch("ols.src.cache.redis_cache.time.time", side_effect=[3, 1, 2]):
+        for i, conversation_id in enumerate(conversation_ids):
+            cache.insert_or_append(user_id, conversation_id, cache_entry_1, f"t{i}")
+
+    with patch.object(cache.redis_client, "keys") as mock_keys:
+        conversations = cache.list(user_id)
+        limited_conversations = cache.list(user_id, limit=2)
+    mock_keys.assert_not_called()
+
+    assert conversations == [
+        {"conversation_id": conversation_ids[0], "topic_summary": "t0"},
+        {"conversation_id": conversation_ids[2], "topic_summary": "t2"},
+        {"conversation_id": conversation_ids[1], "topic_summary": "t1"},
+    ]
+    assert limited_conversations == conversations[:2]
+
+
+def test_list_with_offset(cache):
+    """Test that just the requested page of the index is listed."""
+    user_id = suid.get_suid()
+    conversation_ids = [suid.get_suid() for _ in range(4)]
+    with patch("ols.src.cache.redis_cache.time.time", side_effect=[1, 2, 3, 4]):
+        for i, conversation_id in enumerate(conversation_ids):
+            cache.insert_or_append(user_id, conversation_id, cache_entry_1, f"t{i}")
+
+    with patch.object(
+        cache.redis_client, "zrevrange", wraps=cache.redis_client.zrevrange
+    ) as zrevrange:
+        conversations = cache.list(user_id, limit=2, offset=1)
+    zrevrange.assert_called_once_with(f"{RedisCache.INDEX_KEY_PREFIX}:{user_id}", 1, 2)
+    assert conversations == [
+        {"conversation_id": conversation_ids[2], "topic_summary": "t2"},
+        {"conversation_id": conversation_ids[1], "topic_summary": "t1"},
+    ]
+
+    assert [c["conversation_id"] for c in cache.list(user_id, offset=3)] == [
+        conversation_ids[0]
+    ]
+    assert cache.list(user_id, offset=4) == []
+
+
+def test_list_does_not_scan_keyspace(cache):
+    """Test that empty or evicted index is not rebuilt by listing."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1, "topic")
+
+    # simulate eviction of the index and of the record that it was built
+    cache.redis_client.delete(
+        f"{RedisCache.INDEX_KEY_PREFIX}:{user_id}", RedisCache.INDEX_BUILT_KEY
+    )
+    with patch.object(cache.redis_client, "scan_iter") as scan_iter:
+        assert cache.list(user_id) == []
+        assert cache.list(suid.get_suid()) == []
+    scan_iter.assert_not_called()
+
+    # the conversation is indexed again once it is updated
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+    assert cache.list(user_id) == [
+        {"conversation_id": conversation_id, "topic_summary": "topic"}
+    ]
+
+
+def test_index_is_built_on_initialization():
+    """Test that index is built in background when it was not built yet."""
+    cache = RedisCache(RedisConfig({}))
+    with (
+        patch("redis.StrictRedis", new=MockRedisClient),
+        patch("ols.src.cache.redis_cache.ThreadPoolExecutor") as executor,
+    ):
+        cache.initialize_redis(RedisConfig({}))
+        executor.return_value.submit.assert_called_once_with(cache.build_index)
+
+        executor.reset_mock()
+        cache.redis_client.set(RedisCache.INDEX_BUILT_KEY, 1)
+        redis_client = cache.redis_client
+        with patch(
+            "ols.src.cache.redis_cache.create_redis_client", return_value=redis_client
+        ):
+            cache.initialize_redis(RedisConfig({}))
+        executor.return_value.submit.assert_not_called()
+
+
+def test_build_index_in_batches(cache):
+    """Test that conversations of all users are indexed in batches."""
+    user_ids = [suid.get_suid() for _ in range(3)]
+    conversation_ids = [suid.get_suid() for _ in range(3)]
+    for user_id, conversation_id in zip(user_ids, conversation_ids):
+        cache.insert_or_append(user_id, conversation_id, cache_entry_1, "topic")
+        cache.redis_client.delete(f"{RedisCache.INDEX_KEY_PREFIX}:{user_id}")
+    cache.redis_client.delete(RedisCache.INDEX_BUILT_KEY)
+
+    with (
+        patch.object(RedisCache, "INDEX_BATCH_SIZE", 2),
+        patch.object(cache, "_add_to_index", wraps=cache._add_to_index) as add,
+    ):
+        assert cache.build_index() is True
+
+    assert all(len(call.args[0]) <= 2 for call in add.call_args_list)
+    for user_id, conversation_id in zip(user_ids, conversation_ids):
+        assert cache.list(user_id) == [
+            {"conversation_id": conversation_id, "topic_summary": "topic"}
+        ]
+    assert cache.redis_client.exists(RedisCache.INDEX_BUILT_KEY)
+
+
+def test_failed_index_build(cache):
+    """Test that failed index build is not recorded as done."""
+    cache.redis_client.delete(RedisCache.INDEX_BUILT_KEY)
+    with patch.object(
+        cache.redis_client, "scan_iter", side_effect=RedisConnectionError
+    ):
+        assert cache.build_index() is False
+    assert not cache.redis_client.exists(RedisCache.INDEX_BUILT_KEY)
+
+
+def test_list_removes_evicted_conversations_from_index(cache):
+    """Test that conversations evicted by Redis are removed from index."""
+    user_id = suid.get_suid()
+    conversation_id = suid.get_suid()
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1, "topic")
+
+    # simulate eviction of conversation keys
+    key = f"{user_id}:{conversation_id}"
+    cache.redis_client.delete(f"{key}:history", f"{key}:meta")
+
+    assert cache.list(user_id) == []
+    assert f"{RedisCache.INDEX_KEY_PREFIX}:{user_id}" not in cache.redis_client.cache
+
+
 def test_get_nonexistent_key(cache):
     """Test how non-existent items are handled by the cache."""
     # this UUID is different from DEFAULT_USER_UID
@@ -366,3 +730,32 @@ def test_initialize_redis_retry_settings():
         assert cache.redis_client.kwargs["retry_on_timeout"] is True
         assert cache.redis_client.kwargs["retry_on_error"] is not None
         assert cache.redis_client.kwargs["retry"]._retries == 10
+
+
+def test_publish_invalidation(cache):
+    """Test that invalidations are published to Redis channel."""
+    cache.redis_client.published.clear()
+    cache.publish_invalidation("replica user:conversation")
+    assert cache.redis_client.published == [
+        (constants.CACHE_INVALIDATION_CHANNEL, "replica user:conversation")
+    ]
+
+
+def test_subscribe_invalidations(cache):
+    """Test that invalidations are received in background thread."""
+    callback = MagicMock()
+    pubsub = MagicMock()
+    with patch.object(cache.redis_client, "pubsub", create=True, return_value=pubsub):
+        assert cache.subscribe_invalidations(callback) is True
+
+    handlers = pubsub.subscribe.call_args.kwargs
+    handlers[constants.CACHE_INVALIDATION_CHANNEL](
+        {"data": b"replica user:conversation"}
+    )
+    callback.assert_called_once_with("replica user:conversation")
+
+    # all conversations are invalidated when the subscription is interrupted
+    exception_handler = pubsub.run_in_thread.call_args.kwargs["exception_handler"]
+    with patch("time.sleep"):
+        exception_handler(ConnectionError("lost"), pubsub, None)
+    callback.assert_called_with(None)
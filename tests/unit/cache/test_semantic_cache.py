@@ -0,0 +1,111 @@
+"""Unit tests for SemanticCache class."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ols import config
+
+# needs to be setup there before metrics (used by the cache) are imported
+config.ols_config.authentication_config.module = "k8s"
+
+from ols.app import metrics  # noqa:E402
+from ols.app.models.config import SemanticCacheConfig  # noqa:E402
+from ols.app.models.models import RagChunk  # noqa:E402
+from ols.src.cache.semantic_cache import SemanticCache  # noqa:E402
+
+partition = ("p1", "m1", "system prompt")
+rag_chunks = [RagChunk("text", "https://docs.example.com/job-templates", "Job")]
+
+# queries with embeddings that are similar (job templates) or not (others)
+embeddings = {
+    "how do I create a job template": [1.0, 0.0, 0.0],
+    "How do I create job template?": [0.99, 0.1, 0.0],
+    "what is an execution environment": [0.0, 1.0, 0.0],
+    "what is an inventory": [0.0, 0.0, 2.0],
+}
+
+
+@pytest.fixture
+def embed():
+    """Fixture with embedding function of the known queries."""
+    return MagicMock(side_effect=lambda query: embeddings[query])
+
+
+@pytest.fixture
+def cache(embed):
+    """Fixture with semantic cache."""
+    return SemanticCache(
+        SemanticCacheConfig(max_entries=2, ttl=60, similarity_threshold=0.95), embed
+    )
+
+
+def test_similar_question_is_answered_from_cache(cache, embed):
+    """Test that the answer of similar question is returned."""
+    hits_before = metrics.semantic_cache_requests_total.labels("hit")._value.get()
+    misses_before = metrics.semantic_cache_requests_total.labels("miss")._value.get()
+
+    assert cache.get("how do I create a job template", partition) is None
+    cache.put("how do I create a job template", partition, "Use the UI.", rag_chunks)
+
+    answer = cache.get("How do I create job template?", partition)
+    assert answer.response == "Use the UI."
+    assert answer.rag_chunks == rag_chunks
+    assert cache.get("what is an execution environment", partition) is None
+
+    # the query embedded by lookup is not embedded again when it is stored
+    assert embed.call_count == 3
+    assert metrics.semantic_cache_requests_total.labels("hit")._value.get() == (
+        hits_before + 1
+    )
+    assert metrics.semantic_cache_requests_total.labels("miss")._value.get() == (
+        misses_before + 2
+    )
+
+
+def test_answers_are_partitioned(cache):
+    """Test that answers generated by other model or prompt are not returned."""
+    cache.put("how do I create a job template", partition, "Use the UI.", rag_chunks)
+
+    assert (
+        cache.get("how do I create a job template", ("p1", "m2", "system prompt"))
+        is None
+    )
+    assert cache.get("how do I create a job template", ("p1", "m1", "other")) is None
+    assert cache.get("how do I create a job template", partition) is not None
+
+
+def test_ttl(cache):
+    """Test that expired answers are dropped."""
+    with patch("time.monotonic", return_value=1000):
+        cache.put("what is an inventory", partition, "A list of hosts.", [])
+    with patch("time.monotonic", return_value=1059):
+        assert cache.get("what is an inventory", partition) is not None
+    with patch("time.monotonic", return_value=1061):
+        assert cache.get("what is an inventory", partition) is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction(cache):
+    """Test that the least recently used answers are dropped."""
+    cache.put("how do I create a job template", partition, "Use the UI.", [])
+    cache.put("what is an execution environment", partition, "A container.", [])
+    assert cache.get("how do I create a job template", partition) is not None
+
+    cache.put("what is an inventory", partition, "A list of hosts.", [])
+    assert len(cache) == 2
+    assert cache.get("what is an execution environment", partition) is None
+    assert cache.get("how do I create a job template", partition) is not None
+    assert cache.get("what is an inventory", partition) is not None
+
+
+def test_invalidate(cache):
+    """Test that all answers are dropped on invalidation."""
+    cache.put("how do I create a job template", partition, "Use the UI.", [])
+    cache.put("what is an inventory", partition, "A list of hosts.", [])
+
+    cache.invalidate()
+    assert len(cache) == 0
+    assert cache.get("how do I create a job template", partition) is None
+    cache.put("what is an execution environment", partition, "A container.", [])
+    assert cache.get("what is an execution environment", partition) is not None
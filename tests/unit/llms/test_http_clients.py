@@ -0,0 +1,195 @@
+"""Unit tests for the HTTP clients pool."""
+
+import asyncio
+import gc
+from unittest.mock import call, patch
+
+import httpx
+import pytest
+
+from ols.app.models.config import ConnectionPoolConfig, LLMProviders, ProviderConfig
+from ols.src.llms.http_clients import (
+    HTTPClientsPool,
+    construct_client,
+    http2_enabled,
+    provider_url,
+)
+
+
+@pytest.fixture
+def provider_config():
+    """Fixture with provider configuration."""
+    return ProviderConfig(
+        {
+            "name": "some_provider",
+            "type": "openai",
+            "url": "http://test_url/",
+            "credentials_path": "tests/config/secret/apitoken",
+            "connection_pool": {
+                "max_connections": 10,
+                "max_keepalive_connections": 5,
+                "keepalive_expiry": 30,
+                "prewarm": True,
+            },
+            "models": [
+                {
+                    "name": "test_model_name",
+                    "url": "http://test_model_url/",
+                    "credentials_path": "tests/config/secret/apitoken",
+                }
+            ],
+        }
+    )
+
+
+def test_connection_pool_config_defaults():
+    """Test the default connection pool configuration."""
+    provider_config = ProviderConfig()
+    assert provider_config.connection_pool == ConnectionPoolConfig()
+    assert provider_config.connection_pool.http2 is False
+    assert provider_config.connection_pool.prewarm is False
+
+
+def test_construct_client(provider_config):
+    """Test that the client is constructed with configured limits."""
+    client = construct_client(provider_config, False)
+    assert isinstance(client, httpx.Client)
+    pool = client._transport._pool
+    assert pool._max_connections == 10
+    assert pool._max_keepalive_connections == 5
+    assert pool._keepalive_expiry == 30
+
+    async_client = construct_client(provider_config, False, use_async=True)
+    assert isinstance(async_client, httpx.AsyncClient)
+
+
+def test_http2_enabled():
+    """Test the HTTP/2 fallback when h2 package is not available."""
+    assert not http2_enabled(ConnectionPoolConfig())
+
+    pool_config = ConnectionPoolConfig(http2=True)
+    with patch("importlib.util.find_spec", return_value=None):
+        assert not http2_enabled(pool_config)
+    with patch("importlib.util.find_spec", return_value=object()):
+        assert http2_enabled(pool_config)
+
+
+def test_clients_are_shared(provider_config):
+    """Test that the same client is returned for the same provider."""
+    pool = HTTPClientsPool()
+    client = pool.get_client(provider_config, False)
+    assert pool.get_client(provider_config, False) is client
+
+    async_client = pool.get_async_client(provider_config, False)
+    assert isinstance(async_client, httpx.AsyncClient)
+    assert pool.get_async_client(provider_config, False) is async_client
+
+    # custom certificate store requires different client
+    assert pool.get_client(provider_config, True) is not client
+
+
+@pytest.fixture
+def new_provider_config():
+    """Fixture with changed configuration of the same provider."""
+    return ProviderConfig(
+        {
+            "name": "some_provider",
+            "type": "openai",
+            "url": "http://test_url/",
+            "credentials_path": "tests/config/secret/apitoken",
+            "models": [{"name": "test_model_name"}],
+        }
+    )
+
+
+def test_clients_are_invalidated_on_configuration_change(
+    provider_config, new_provider_config
+):
+    """Test that new client is constructed for new provider configuration."""
+    pool = HTTPClientsPool()
+    client = pool.get_client(provider_config, False)
+
+    new_client = pool.get_client(new_provider_config, False)
+    assert new_client is not client
+    # old client can still be used by LLM instances constructed before
+    assert not client.is_closed
+    assert pool.get_client(new_provider_config, False) is new_client
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_old_client_is_closed_when_unused(
+    provider_config, new_provider_config, use_async
+):
+    """Test that replaced client is closed once it is not referenced anymore."""
+    pool = HTTPClientsPool()
+    client = pool._get(provider_config, False, use_async)
+    transport = client._transport
+
+    close = "aclose" if use_async else "close"
+    with patch.object(type(transport), close, autospec=True) as mock_close:
+        pool._get(new_provider_config, False, use_async)
+        assert call(transport) not in mock_close.call_args_list
+
+        del client
+        gc.collect()
+        mock_close.assert_any_call(transport)
+
+
+def test_clear(provider_config):
+    """Test that clients are closed and removed."""
+    pool = HTTPClientsPool()
+    client = pool.get_client(provider_config, False)
+    pool.clear()
+    assert client.is_closed
+    assert pool.get_client(provider_config, False) is not client
+
+
+@pytest.mark.asyncio
+async def test_clear_async_clients(provider_config):
+    """Test that async clients are closed in the running event loop."""
+    pool = HTTPClientsPool()
+    client = pool.get_async_client(provider_config, False)
+    pool.clear()
+    await asyncio.sleep(0)
+    assert client.is_closed
+
+
+def test_provider_url(provider_config):
+    """Test the retrieval of provider URL."""
+    assert provider_url(provider_config) == "http://test_url/"
+    assert provider_url(ProviderConfig()) is None
+
+
+def test_prewarm(provider_config):
+    """Test that only providers with pre-warming enabled are pre-warmed."""
+    providers = LLMProviders()
+    providers.providers = {"some_provider": provider_config}
+    other_config = ProviderConfig(
+        {
+            "name": "other_provider",
+            "type": "openai",
+            "url": "http://other_url/",
+            "credentials_path": "tests/config/secret/apitoken",
+            "models": [{"name": "test_model_name"}],
+        }
+    )
+    providers.providers["other_provider"] = other_config
+
+    pool = HTTPClientsPool()
+    with patch.object(httpx.Client, "head") as mock_head:
+        pool.prewarm(providers)
+    mock_head.assert_called_once_with("http://test_url/")
+
+
+def test_prewarm_errors_are_not_propagated(provider_config):
+    """Test that failed pre-warming does not raise an exception."""
+    providers = LLMProviders()
+    providers.providers = {"some_provider": provider_config}
+
+    pool = HTTPClientsPool()
+    with patch.object(
+        httpx.Client, "head", side_effect=httpx.ConnectError("unreachable")
+    ):
+        pool.prewarm(providers)
+
+    pool.prewarm(None)
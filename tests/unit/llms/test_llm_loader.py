@@ -98,3 +98,49 @@ def test_load_llm_no_provider_config():
         match=f"Providers configuration missing in {constants.DEFAULT_CONFIGURATION_FILE}",
     ):
         load_llm(provider="fake-provider", model="model")
+
+
+@pytest.mark.usefixtures("_registered_fake_provider")
+@patch("ols.constants.SUPPORTED_PROVIDER_TYPES", new=["fake-provider"])
+def test_load_llm_is_pooled():
+    """Test that loaded LLM is reused until configuration is changed."""
+    providers = LLMProviders(
+        [
+            {
+                "name": "fake-provider",
+                "type": "fake-provider",
+                "models": [{"name": "model"}],
+            }
+        ]
+    )
+    config.config.llm_providers = providers
+
+    with patch(
+        "ols.src.llms.llm_loader.LLMProvidersRegistry.llm_providers",
+        new={"fake-provider": MagicMock()},
+    ) as registry:
+        provider_class = registry["fake-provider"]
+        provider_class.return_value.load.side_effect = lambda: object()
+
+        llm1 = load_llm(provider="fake-provider", model="model")
+        llm2 = load_llm(provider="fake-provider", model="model")
+        assert llm1 is llm2
+        assert provider_class.call_count == 1
+
+        # different streaming flag -> different LLM instance
+        llm3 = load_llm(provider="fake-provider", model="model", streaming=True)
+        assert llm3 is not llm1
+
+        # configuration reload invalidates pooled instances
+        config.config.llm_providers = LLMProviders(
+            [
+                {
+                    "name": "fake-provider",
+                    "type": "fake-provider",
+                    "models": [{"name": "model"}],
+                }
+            ]
+        )
+        llm4 = load_llm(provider="fake-provider", model="model")
+        assert llm4 is not llm1
+        assert provider_class.call_count == 3
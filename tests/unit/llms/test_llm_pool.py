@@ -0,0 +1,74 @@
+"""Unit tests for LLM pool."""
+
+from unittest.mock import Mock
+
+from ols.src.llms.llm_pool import LLMPool
+
+
+def test_construct_key():
+    """Test that the key does not depend on order of parameters."""
+    key1 = LLMPool.construct_key("p", "m", {"a": 1, "b": [2]}, True)
+    key2 = LLMPool.construct_key("p", "m", {"b": [2], "a": 1}, True)
+    assert key1 == key2
+    assert hash(key1) == hash(key2)
+
+    assert LLMPool.construct_key("p", "m", None, None) == LLMPool.construct_key(
+        "p", "m", {}, False
+    )
+    assert key1 != LLMPool.construct_key("p", "m", {"a": 1, "b": [2]}, False)
+
+
+def test_get_or_load_reuses_instance():
+    """Test that LLM instance is loaded just once for the same key."""
+    pool = LLMPool()
+    fingerprint = (object(),)
+    loader = Mock(side_effect=lambda: object())
+
+    llm1 = pool.get_or_load("key", fingerprint, loader)
+    llm2 = pool.get_or_load("key", fingerprint, loader)
+
+    assert llm1 is llm2
+    assert loader.call_count == 1
+    assert len(pool) == 1
+
+
+def test_get_or_load_fingerprint_change():
+    """Test that pooled instance is invalidated when fingerprint changes."""
+    pool = LLMPool()
+    loader = Mock(side_effect=lambda: object())
+
+    llm1 = pool.get_or_load("key", (object(),), loader)
+    llm2 = pool.get_or_load("key", (object(),), loader)
+
+    assert llm1 is not llm2
+    assert loader.call_count == 2
+    assert len(pool) == 1
+
+
+def test_get_or_load_eviction():
+    """Test that the least recently used instance is evicted."""
+    pool = LLMPool(max_size=2)
+    fingerprint = ()
+    loader = Mock(side_effect=lambda: object())
+
+    llm1 = pool.get_or_load("key1", fingerprint, loader)
+    pool.get_or_load("key2", fingerprint, loader)
+    # key1 is used again -> key2 is the least recently used one
+    assert pool.get_or_load("key1", fingerprint, loader) is llm1
+    pool.get_or_load("key3", fingerprint, loader)
+
+    assert len(pool) == 2
+    assert loader.call_count == 3
+    assert pool.get_or_load("key1", fingerprint, loader) is llm1
+    assert loader.call_count == 3
+
+
+def test_clear():
+    """Test that pool can be cleared."""
+    pool = LLMPool()
+    loader = Mock(side_effect=lambda: object())
+    pool.get_or_load("key", (), loader)
+    pool.clear()
+    assert len(pool) == 0
+    pool.get_or_load("key", (), loader)
+    assert loader.call_count == 2
@@ -1,5 +1,7 @@
 """Unit tests for PromptGenerator."""
 
+from unittest.mock import patch
+
 import pytest
 from langchain.prompts import (
     ChatPromptTemplate,
@@ -13,9 +15,12 @@ from langchain_core.messages import AIMessage, HumanMessage
 from ols.constants import ModelFamily
 from ols.src.prompts.prompt_generator import (
     GeneratePrompt,
+    PromptTemplateRegistry,
+    prompt_templates,
     restructure_history,
     restructure_rag_context,
 )
+from ols.utils.token_handler import TokenHandler
 
 model = ["some-granite-model", "some-gpt-model"]
 
@@ -313,3 +318,62 @@ def test_generate_prompt_without_rag_without_history(model):
         assert prompt.format(**llm_input_values) == (
             f"System: Answer user queries in the context of openshift.\n\nHuman: {query}"
         )
+
+
+@pytest.mark.parametrize("model", model)
+def test_compiled_prompt_skeleton_tokens(model):
+    """Test that tokens of the fixed part of the prompt are counted."""
+    compiled = PromptTemplateRegistry().get(model, system_instruction, True, True)
+
+    if ModelFamily.GRANITE in model:
+        empty_values = {"query": "", "context": "", "chat_history": ""}
+    else:
+        empty_values = {"query": "", "context": "", "chat_history": []}
+    assert compiled.skeleton_tokens == TokenHandler().text_to_token_count(
+        compiled.template.format(**empty_values)
+    )
+    assert compiled.skeleton_tokens > 0
+
+
+def test_prompt_template_registry():
+    """Test that templates are compiled once per model family and prompt parts."""
+    registry = PromptTemplateRegistry(max_entries=2)
+
+    with patch.object(
+        PromptTemplateRegistry, "_compile", wraps=PromptTemplateRegistry._compile
+    ) as compile_template:
+        compiled = registry.get("some-gpt-model", system_instruction, True, False)
+        assert registry.get("other-model", system_instruction, True, False) is compiled
+        assert compile_template.call_count == 1
+
+        granite = registry.get("some-granite-model", system_instruction, True, False)
+        assert granite is not compiled
+        assert registry.get("some-gpt-model", system_instruction, False, False)
+        assert compile_template.call_count == 3
+
+        # the least recently used template is dropped
+        registry.get("some-granite-model", system_instruction, True, False)
+        assert compile_template.call_count == 3
+        registry.get("some-gpt-model", system_instruction, True, False)
+        assert compile_template.call_count == 4
+
+        registry.clear()
+        registry.get("some-granite-model", system_instruction, True, False)
+        assert compile_template.call_count == 5
+
+
+@pytest.mark.parametrize("model", model)
+def test_generate_prompt_uses_compiled_template(model):
+    """Test that generated prompts share the compiled template."""
+    rag_formatted, history_formatted = _restructure_prompt_input(
+        rag_context, conversation_history, model
+    )
+    prompt_generator = GeneratePrompt(
+        query, rag_formatted, history_formatted, system_instruction
+    )
+
+    prompt, _ = prompt_generator.generate_prompt(model)
+    assert prompt is prompt_generator.compiled_prompt(model).template
+    assert (
+        prompt is prompt_templates.get(model, system_instruction, True, True).template
+    )
@@ -1,7 +1,7 @@
 """Unit tests for DocsSummarizer class."""
 
 import logging
-from unittest.mock import ANY, call, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage
@@ -13,12 +13,18 @@ config.ols_config.authentication_config.module = "k8s"
 
 
 from ols.app.models.config import LoggingConfig  # noqa:E402
+from ols.constants import ModelFamily  # noqa:E402
+from ols.src.prompts.prompt_generator import (  # noqa:E402
+    PromptTemplateRegistry,
+    prompt_templates,
+)
 from ols.src.query_helpers.docs_summarizer import (  # noqa:E402
     DocsSummarizer,
     QueryHelper,
 )
 from ols.utils import suid  # noqa:E402
 from ols.utils.logging_configurator import configure_logging  # noqa:E402
+from ols.utils.token_handler import PromptTooLongError, TokenHandler  # noqa:E402
 from tests import constants  # noqa:E402
 from tests.mock_classes.mock_langchain_interface import (  # noqa:E402
     mock_langchain_interface,
@@ -86,6 +92,26 @@ def test_summarize_empty_history():
     check_summary_result(summary, question)
 
 
+@pytest.mark.asyncio
+@patch("ols.utils.token_handler.RAG_SIMILARITY_CUTOFF", 0.4)
+@patch("ols.utils.token_handler.MINIMUM_CONTEXT_TOKEN_LIMIT", 1)
+@patch("ols.src.query_helpers.docs_summarizer.LLMChain", new=mock_llm_chain(None))
+async def test_acreate_response():
+    """Basic test for asynchronous DocsSummarizer response creation."""
+    summarizer = DocsSummarizer(llm_loader=mock_llm_loader(None))
+    question = "What's the ultimate question with answer 42?"
+    rag_index = MockLlamaIndex()
+    summary = await summarizer.acreate_response(question, rag_index, [])
+    check_summary_result(summary, question)
+
+    # already prepared prompt is used as is
+    prepared_prompt = summarizer.prepare_prompt(question, rag_index, [])
+    summary = await summarizer.acreate_response(
+        question, prepared_prompt=prepared_prompt
+    )
+    check_summary_result(summary, question)
+
+
 @patch("ols.utils.token_handler.RAG_SIMILARITY_CUTOFF", 0.4)
 @patch("ols.utils.token_handler.MINIMUM_CONTEXT_TOKEN_LIMIT", 3)
 @patch("ols.src.query_helpers.docs_summarizer.LLMChain", new=mock_llm_chain(None))
@@ -115,7 +141,7 @@ def test_summarize_history_provided():
         return_value=([], False),
     ) as token_handler:
         summary1 = summarizer.create_response(question, rag_index, history)
-        token_handler.assert_called_once_with(history, ANY, ANY)
+        token_handler.assert_called_once_with(history, ANY, ANY, None)
         check_summary_result(summary1, question)
 
     # second call without history provided
@@ -124,7 +150,7 @@ def test_summarize_history_provided():
         return_value=([], False),
     ) as token_handler:
         summary2 = summarizer.create_response(question, rag_index)
-        token_handler.assert_called_once_with([], ANY, ANY)
+        token_handler.assert_called_once_with([], ANY, ANY, None)
         check_summary_result(summary2, question)
 
 
@@ -145,27 +171,62 @@ def test_summarize_truncation():
 
 
 @patch("ols.utils.token_handler.RAG_SIMILARITY_CUTOFF", 0.4)
+@patch("ols.utils.token_handler.MINIMUM_CONTEXT_TOKEN_LIMIT", 3)
 @patch("ols.src.query_helpers.docs_summarizer.LLMChain", new=mock_llm_chain(None))
-def test_prepare_prompt_context():
-    """Basic test for DocsSummarizer to check re-structuring of context for the 'temp' prompt."""
+def test_prepare_prompt_uses_compiled_templates():
+    """Test that prompt templates are compiled only for the first query."""
     summarizer = DocsSummarizer(llm_loader=mock_llm_loader(None))
     question = "What's the ultimate question with answer 42?"
     history = [HumanMessage("What is Kubernetes?")]
     rag_index = MockLlamaIndex()
+    prompt_templates.clear()
 
-    with patch(
-        "ols.src.query_helpers.docs_summarizer.restructure_rag_context",
-        return_value="patched_history",
-    ) as restructure_rag_context:
+    with patch.object(
+        PromptTemplateRegistry, "_compile", wraps=PromptTemplateRegistry._compile
+    ) as compile_template:
+        summarizer.create_response(question, rag_index, history)
+        # the final prompt contains both context and history
+        compile_template.assert_called_once_with(
+            ModelFamily.GPT, summarizer._system_prompt, True, True
+        )
+        summarizer.create_response(question, None, history)
         summarizer.create_response(question, rag_index, history)
-        restructure_rag_context.assert_has_calls([call("sample", ANY)])
+        assert compile_template.call_count == 2
+
+
+@patch("ols.src.query_helpers.docs_summarizer.LLMChain", new=mock_llm_chain(None))
+def test_prepare_prompt_final_check():
+    """Test that the final prompt is checked without tokenizing it again."""
+    summarizer = DocsSummarizer(llm_loader=mock_llm_loader(None))
+    question = "What's the ultimate question with answer 42?"
+    history = [HumanMessage("What is Kubernetes?"), AIMessage("Container platform.")]
+    token_counts = [{}, {TokenHandler().history_token_key(summarizer.model): 1000}]
 
     with patch(
-        "ols.src.query_helpers.docs_summarizer.restructure_history",
-        return_value="patched_history",
-    ) as restructure_history:
-        summarizer.create_response(question, rag_index, history)
-        restructure_history.assert_has_calls([call(AIMessage("sample"), ANY)])
+        "ols.utils.token_handler.TokenHandler.check_available_tokens",
+        return_value=2000,
+    ) as check_available_tokens:
+        _, llm_input_values, _, truncated = summarizer.prepare_prompt(
+            question, None, history, token_counts
+        )
+
+    assert not truncated
+    assert llm_input_values["chat_history"] == history
+    # stored token count of the message is used for the final check
+    final_prompt_tokens = check_available_tokens.call_args_list[-1].args[0]
+    assert final_prompt_tokens > 1000
+    assert final_prompt_tokens < 1100
+
+
+@patch("ols.src.query_helpers.docs_summarizer.LLMChain", new=mock_llm_chain(None))
+def test_prepare_prompt_too_long_query():
+    """Test that too long query is rejected before RAG content is retrieved."""
+    summarizer = DocsSummarizer(llm_loader=mock_llm_loader(None))
+    rag_index = MagicMock()
+
+    with pytest.raises(PromptTooLongError):
+        summarizer.prepare_prompt("What is Kubernetes? " * 10000, rag_index)
+    rag_index.as_retriever.assert_not_called()
 
 
 @patch("ols.src.query_helpers.docs_summarizer.LLMChain", new=mock_llm_chain(None))
@@ -0,0 +1,141 @@
+"""Unit tests for EmbeddingQuestionValidator class."""
+
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from ols import config
+
+# needs to be setup there before metrics (used by the validator) are imported
+config.ols_config.authentication_config.module = "k8s"
+
+from ols.app import metrics  # noqa: E402
+from ols.app.models.config import EmbeddingValidationConfig  # noqa: E402
+from ols.src.query_helpers.embedding_question_validator import (  # noqa: E402
+    EmbeddingQuestionValidator,
+    index_centroid,
+)
+
+# texts with embeddings that are on-topic (first axis) or off-topic (second axis)
+embeddings = {
+    "How do I create a job template?": [1.0, 0.0, 0.0],
+    "Why is the sky blue?": [0.0, 1.0, 0.0],
+    "how do I write a playbook": [0.9, 0.1, 0.0],
+    "what is the capital of France": [0.1, 0.9, 0.0],
+    "how do I write a playbook about the sky": [0.5, 0.5, 0.1],
+}
+
+
+def embed(text):
+    """Return embedding of the known text."""
+    return embeddings[text]
+
+
+@pytest.fixture
+def validator():
+    """Fixture with validator using one example of both kinds."""
+    return EmbeddingQuestionValidator(
+        EmbeddingValidationConfig(threshold=0.0, margin=0.1, llm_fallback=True),
+        embed,
+        ["How do I create a job template?"],
+        ["Why is the sky blue?"],
+    )
+
+
+def test_validate_question(validator):
+    """Test that questions are classified by similarity to the examples."""
+    allowed_before = metrics.embedding_validation_total.labels("allowed")._value.get()
+
+    assert validator.validate_question("how do I write a playbook") is True
+    assert validator.validate_question("what is the capital of France") is False
+    assert metrics.embedding_validation_total.labels("allowed")._value.get() == (
+        allowed_before + 1
+    )
+
+
+def test_ambiguous_question(validator):
+    """Test that questions scored close to threshold are left to LLM."""
+    ambiguous_before = metrics.embedding_validation_total.labels(
+        "ambiguous"
+    )._value.get()
+
+    assert (
+        validator.validate_question("how do I write a playbook about the sky") is None
+    )
+    assert metrics.embedding_validation_total.labels("ambiguous")._value.get() == (
+        ambiguous_before + 1
+    )
+
+    # the question is decided by the threshold without LLM fallback
+    validator.llm_fallback = False
+    assert validator.validate_question("how do I write a playbook about the sky")
+
+
+def test_score(validator):
+    """Test that the score does not depend on the length of embeddings."""
+    assert validator.score("How do I create a job template?") == pytest.approx(1.0)
+    embeddings["scaled"] = [10.0, 0.0, 0.0]
+    assert validator.score("scaled") == pytest.approx(1.0)
+
+    embeddings["other dimension"] = [1.0, 0.0]
+    with pytest.raises(ValueError, match="embedding dimension"):
+        validator.score("other dimension")
+
+
+def test_centroid_is_on_topic_content():
+    """Test that the centroid of the index is used together with the examples."""
+    validator = EmbeddingQuestionValidator(
+        EmbeddingValidationConfig(),
+        embed,
+        [],
+        ["Why is the sky blue?"],
+        centroid=np.array([0.0, 0.0, 1.0], dtype=np.float32),
+    )
+    embeddings["index content"] = [0.0, 0.2, 1.0]
+    assert validator.validate_question("index content") is True
+    assert validator.validate_question("what is the capital of France") is False
+
+
+def test_examples_required():
+    """Test that both on-topic and off-topic content is required."""
+    with pytest.raises(ValueError, match="examples are required"):
+        EmbeddingQuestionValidator(
+            EmbeddingValidationConfig(), embed, ["Why is the sky blue?"], []
+        )
+
+
+def test_index_centroid():
+    """Test that the centroid is computed from normalized document embeddings."""
+    vectors = np.array([[2.0, 0.0], [0.0, 1.0], [0.0, 3.0]], dtype=np.float32)
+    faiss_index = MagicMock(ntotal=3, d=2)
+    faiss_index.reconstruct_n.side_effect = lambda start, n: vectors[start : start + n]
+    vector_index = MagicMock()
+    vector_index.vector_store._faiss_index = faiss_index
+
+    with patch("ols.constants.EMBEDDING_VALIDATION_CENTROID_BATCH_SIZE", 2):
+        centroid = index_centroid(vector_index)
+
+    expected = np.array([1.0, 2.0]) / np.sqrt(5.0)
+    np.testing.assert_allclose(centroid, expected, rtol=1e-6)
+    assert faiss_index.reconstruct_n.call_count == 2
+
+
+def test_index_centroid_not_available():
+    """Test that no centroid is computed when the embeddings can not be read."""
+    vector_index = MagicMock()
+    vector_index.vector_store._faiss_index.reconstruct_n.side_effect = RuntimeError(
+        "direct map not initialized"
+    )
+    vector_index.vector_store._faiss_index.ntotal = 10
+    vector_index.vector_store._faiss_index.d = 2
+    assert index_centroid(vector_index) is None
+
+    vector_index.vector_store = object()
+    assert index_centroid(vector_index) is None
+
+
+def test_config_validation():
+    """Test that threshold out of the score range is refused."""
+    with pytest.raises(ValueError, match="Threshold needs to be in range"):
+        EmbeddingValidationConfig(threshold=3.0)
@@ -0,0 +1,98 @@
+"""Unit tests for HistorySummarizer class."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ols import config
+from ols.constants import GenericLLMParameters
+
+# Configure test environment
+config.ols_config.authentication_config.module = "k8s"
+
+from ols.src.query_helpers.history_summarizer import (  # noqa: E402
+    HistorySummarizer,
+    QueryHelper,
+)
+from tests.mock_classes.mock_llm_chain import mock_llm_chain  # noqa: E402
+from tests.mock_classes.mock_llm_loader import mock_llm_loader  # noqa: E402
+
+conversation_id = "123e4567-e89b-12d3-a456-426614174000"
+history = [
+    HumanMessage("How do I scale a deployment?"),
+    AIMessage("Use the oc scale command."),
+    HumanMessage("And for a stateful set?"),
+    AIMessage("The same command works for stateful sets."),
+]
+
+
+@pytest.fixture(autouse=True)
+def load_config():
+    """Load the configuration with LLM providers."""
+    config.reload_from_yaml_file("tests/config/valid_config.yaml")
+
+
+def test_is_query_helper_subclass():
+    """Test that HistorySummarizer is a subclass of QueryHelper."""
+    assert issubclass(HistorySummarizer, QueryHelper)
+
+
+def test_initialization():
+    """Test that HistorySummarizer limits the length of the summary."""
+    summarizer = HistorySummarizer(llm_loader=mock_llm_loader(None))
+    assert (
+        summarizer.generic_llm_params[GenericLLMParameters.MAX_TOKENS_FOR_RESPONSE]
+        == summarizer.max_tokens_for_response
+    )
+    assert summarizer.bare_llm is not None
+
+
+def test_summarize_history():
+    """Test the summarize_history method with mocked LLM chain."""
+    chain = MagicMock()
+    chain.return_value.invoke.return_value = {"text": " Scaling workloads. \n"}
+
+    with patch("ols.src.query_helpers.history_summarizer.LLMChain", new=chain):
+        summarizer = HistorySummarizer(llm_loader=mock_llm_loader(None))
+        summary = summarizer.summarize_history(conversation_id, history)
+
+    assert summary == "Scaling workloads."
+    prompt = chain.return_value.invoke.call_args.kwargs["input"]["history"]
+    assert prompt.splitlines() == [
+        "human: How do I scale a deployment?",
+        "ai: Use the oc scale command.",
+        "human: And for a stateful set?",
+        "ai: The same command works for stateful sets.",
+    ]
+
+
+def test_summarize_too_long_history():
+    """Test that the oldest messages are left out when history is too long."""
+    chain = MagicMock()
+    chain.return_value.invoke.return_value = {"text": "summary"}
+
+    with (
+        patch("ols.src.query_helpers.history_summarizer.LLMChain", new=chain),
+        patch(
+            "ols.utils.token_handler.TokenHandler.calculate_and_check_available_tokens",
+            return_value=30,
+        ),
+    ):
+        summarizer = HistorySummarizer(llm_loader=mock_llm_loader(None))
+        assert summarizer.summarize_history(conversation_id, history) == "summary"
+
+    prompt = chain.return_value.invoke.call_args.kwargs["input"]["history"]
+    assert "How do I scale a deployment?" not in prompt
+    assert "The same command works for stateful sets." in prompt
+
+
+@patch("ols.customize.prompts.HISTORY_SUMMARY_PROMPT_TEMPLATE", "")
+@patch(
+    "ols.src.query_helpers.history_summarizer.LLMChain",
+    new=mock_llm_chain({"text": "summary"}),
+)
+def test_skip_summarize_history():
+    """Test that summarization is skipped when the prompt is not set."""
+    summarizer = HistorySummarizer(llm_loader=mock_llm_loader(None))
+    assert summarizer.summarize_history(conversation_id, history) == ""
@@ -1,6 +1,6 @@
 """Unit tests for QuestionValidator class."""
 
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -10,6 +10,8 @@ from ols.constants import GenericLLMParameters
 # needs to be setup there before is_user_authorized is imported
 config.ols_config.authentication_config.module = "k8s"
 
+from ols.app import metrics  # noqa: E402
+from ols.app.models.config import LLMCallCacheConfig  # noqa: E402
 from ols.src.query_helpers.question_validator import (  # noqa: E402
     QueryHelper,
     QuestionValidator,
@@ -90,3 +92,98 @@ def test_validate_question_llm_loader():
     question_validator.validate_question(
         "123e4567-e89b-12d3-a456-426614174000", "query"
     )
+
+
+@pytest.mark.asyncio
+@patch(
+    "ols.src.query_helpers.question_validator.LLMChain",
+    new=mock_llm_chain({"text": "REJECTED"}),
+)
+async def test_avalidate_question():
+    """Test the asynchronous question validation."""
+    config.reload_from_yaml_file("tests/config/valid_config.yaml")
+
+    question_validator = QuestionValidator(llm_loader=mock_llm_loader(None))
+    valid = await question_validator.avalidate_question(
+        "123e4567-e89b-12d3-a456-426614174000", "query"
+    )
+    assert not valid
+
+
+@pytest.fixture
+def llm_call_cache():
+    """Fixture enabling in-memory LLM call cache of question validator."""
+    config.reload_from_yaml_file("tests/config/valid_config.yaml")
+    config.ols_config.llm_call_cache = LLMCallCacheConfig({"type": "memory"})
+    yield config.llm_call_cache
+    config.ols_config.llm_call_cache = None
+    config._llm_call_cache = None
+
+
+def test_validate_question_cached(llm_call_cache):
+    """Test that the same question is validated by LLM only once."""
+    chain = MagicMock()
+    chain.return_value.invoke.return_value = {"text": "REJECTED"}
+    chain.return_value.prompt.format.side_effect = lambda query: f"prompt: {query}"
+    hits_before = metrics.llm_call_cache_requests_total.labels(
+        "question_validator", "hit"
+    )._value.get()
+    question_validator = QuestionValidator(llm_loader=mock_llm_loader(None))
+
+    with patch("ols.src.query_helpers.question_validator.LLMChain", new=chain):
+        assert not question_validator.validate_question("conversation", "query")
+        assert not question_validator.validate_question("conversation", "query")
+        question_validator.validate_question("conversation", "other query")
+
+    assert chain.return_value.invoke.call_count == 2
+    assert (
+        metrics.llm_call_cache_requests_total.labels(
+            "question_validator", "hit"
+        )._value.get()
+        == hits_before + 1
+    )
+
+
+@pytest.mark.asyncio
+async def test_avalidate_question_cached(llm_call_cache):
+    """Test that the same question is validated by LLM only once asynchronously."""
+    chain = MagicMock()
+    chain.return_value.ainvoke = AsyncMock(return_value={"text": "REJECTED"})
+    chain.return_value.prompt.format.side_effect = lambda query: f"prompt: {query}"
+    question_validator = QuestionValidator(llm_loader=mock_llm_loader(None))
+
+    with patch("ols.src.query_helpers.question_validator.LLMChain", new=chain):
+        assert not await question_validator.avalidate_question("conversation", "q")
+        assert not await question_validator.avalidate_question("conversation", "q")
+
+    assert chain.return_value.ainvoke.call_count == 1
+
+
+def test_validate_question_cache_failure(llm_call_cache):
+    """Test that the LLM is called when the LLM call cache fails."""
+    chain = MagicMock()
+    chain.return_value.invoke.return_value = {"text": "ALLOWED"}
+    chain.return_value.prompt.format.side_effect = lambda query: f"prompt: {query}"
+    question_validator = QuestionValidator(llm_loader=mock_llm_loader(None))
+
+    with (
+        patch("ols.src.query_helpers.question_validator.LLMChain", new=chain),
+        patch.object(llm_call_cache, "get", side_effect=Exception("broken")),
+        patch.object(llm_call_cache, "set", side_effect=Exception("broken")),
+    ):
+        assert question_validator.validate_question("conversation", "query")
+    chain.return_value.invoke.assert_called_once()
+
+
+def test_validate_question_cache_not_enabled_for_helper(llm_call_cache):
+    """Test that LLM calls are not cached for helpers that are not enabled."""
+    config.ols_config.llm_call_cache.helpers = ["topic_summarizer"]
+    chain = MagicMock()
+    chain.return_value.invoke.return_value = {"text": "ALLOWED"}
+    question_validator = QuestionValidator(llm_loader=mock_llm_loader(None))
+
+    with patch("ols.src.query_helpers.question_validator.LLMChain", new=chain):
+        question_validator.validate_question("conversation", "query")
+        question_validator.validate_question("conversation", "query")
+    assert chain.return_value.invoke.call_count == 2
+    assert len(llm_call_cache) == 0
@@ -73,6 +73,24 @@ def test_summarize_topic():
         assert response == expected_response
 
 
+@pytest.mark.asyncio
+async def test_asummarize_topic():
+    """Test the asynchronous summarize_topic method with mocked LLM chain."""
+    config.reload_from_yaml_file("tests/config/valid_config.yaml")
+
+    expected_response = "Technology"
+    mock_chain = mock_llm_chain({"text": expected_response})
+
+    with patch("ols.src.query_helpers.topic_summarizer.LLMChain", new=mock_chain):
+        summarizer = TopicSummarizer(llm_loader=mock_llm_loader(None))
+        response = await summarizer.asummarize_topic(
+            "123e4567-e89b-12d3-a456-426614174000",
+            "What are the latest developments in artificial intelligence?",
+        )
+
+        assert response == expected_response
+
+
 @patch("ols.customize.prompts.TOPIC_SUMMARY_PROMPT_TEMPLATE", "")
 def test_skip_summarize_topic():
     """Test topic summarizer is skipped when TOPIC_SUMMARY_PROMPT_TEMPLATE is not set."""
@@ -0,0 +1,87 @@
+"""Unit tests for tokens of RAG chunks computed when the index is loaded."""
+
+import os
+from unittest.mock import patch
+
+from ols.src.rag_index.chunk_tokens import (
+    CHUNK_TOKENS_FILE,
+    ChunkTokens,
+    load_chunk_tokens,
+)
+from ols.utils.token_handler import TokenHandler
+
+chunks = {
+    "node-1": "Use the oc scale command to scale a deployment.",
+    "node-2": "Pods are the smallest deployable units of computing.",
+    "node-3": "",
+}
+
+
+def sidecar_path(index_path):
+    """Return path of the sidecar file in the index directory."""
+    return os.path.join(
+        index_path, CHUNK_TOKENS_FILE.format(encoding=TokenHandler().encoding_name)
+    )
+
+
+def test_build():
+    """Test that chunks are tokenized by the token handler."""
+    token_handler = TokenHandler()
+    chunk_tokens = ChunkTokens.build(chunks, token_handler)
+
+    assert len(chunk_tokens) == 3
+    assert chunk_tokens.encoding_name == token_handler.encoding_name
+    for node_id, text in chunks.items():
+        assert chunk_tokens.get(node_id) == token_handler.text_to_tokens(text)
+    assert chunk_tokens.get("unknown") is None
+    assert chunk_tokens.get(None) is None
+
+
+def test_sidecar_file_is_stored_and_loaded(tmp_path):
+    """Test that chunks are not tokenized when the sidecar file exists."""
+    chunk_tokens = load_chunk_tokens(str(tmp_path), chunks)
+    assert os.path.exists(sidecar_path(str(tmp_path)))
+
+    with patch.object(ChunkTokens, "build", side_effect=AssertionError):
+        loaded = load_chunk_tokens(str(tmp_path), chunks)
+    for node_id in chunks:
+        assert loaded.get(node_id) == chunk_tokens.get(node_id)
+
+
+def test_stale_sidecar_file(tmp_path):
+    """Test that chunks are tokenized again when the index has changed."""
+    load_chunk_tokens(str(tmp_path), chunks)
+
+    changed_chunks = {**chunks, "node-1": "Use the kubectl scale command."}
+    chunk_tokens = load_chunk_tokens(str(tmp_path), changed_chunks)
+    assert chunk_tokens.get("node-1") == TokenHandler().text_to_tokens(
+        "Use the kubectl scale command."
+    )
+
+    # the sidecar file has been replaced
+    with patch.object(ChunkTokens, "build", side_effect=AssertionError):
+        load_chunk_tokens(str(tmp_path), changed_chunks)
+
+
+def test_corrupted_sidecar_file(tmp_path):
+    """Test that chunks are tokenized when the sidecar file can not be read."""
+    with open(sidecar_path(str(tmp_path)), "wb") as f:
+        f.write(b"garbage")
+
+    chunk_tokens = load_chunk_tokens(str(tmp_path), chunks)
+    assert len(chunk_tokens) == 3
+
+
+def test_read_only_index(tmp_path):
+    """Test that tokens are used even if they can not be stored."""
+    with patch.object(ChunkTokens, "save", side_effect=PermissionError("read-only")):
+        chunk_tokens = load_chunk_tokens(str(tmp_path), chunks)
+    assert len(chunk_tokens) == 3
+    assert os.listdir(tmp_path) == []
+
+
+def test_without_index_path(tmp_path):
+    """Test that sidecar file is not used when index path is not known."""
+    with patch.object(ChunkTokens, "save", side_effect=AssertionError):
+        chunk_tokens = load_chunk_tokens(None, chunks)
+    assert len(chunk_tokens) == 3
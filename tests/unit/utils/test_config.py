@@ -1476,3 +1476,30 @@ def test_additional_config_file_incorrect_type():
         config.reload_additional_config_file(
             "tests/config/valid_rhdh_config.yaml", "wrongtype"
         )
+
+
+@pytest.mark.parametrize(
+    ("validation_method", "built"),
+    (
+        (constants.QueryValidationMethod.EMBEDDING, True),
+        (constants.QueryValidationMethod.LLM, False),
+    ),
+)
+def test_embedding_question_validator_is_built_with_index(validation_method, built):
+    """Check that the embedding question validator is built when index is loaded."""
+    config.reload_from_yaml_file("tests/config/valid_config.yaml")
+    config.ols_config.query_validation_method = validation_method
+    with (
+        patch("ols.utils.config.IndexLoader") as index_loader,
+        patch("ols.utils.config.EmbeddingQuestionValidator") as validator,
+        patch("ols.utils.config.index_centroid"),
+    ):
+        assert config.rag_index is index_loader.return_value.vector_index
+        assert validator.call_count == int(built)
+
+        # the validator is not built again on the request path
+        expected = validator.return_value if built else None
+        assert config.embedding_question_validator is expected
+        assert config.embedding_question_validator is expected
+        assert validator.call_count == int(built)
+    config.reload_from_yaml_file("tests/config/valid_config.yaml")
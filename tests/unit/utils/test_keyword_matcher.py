@@ -0,0 +1,76 @@
+"""Unit tests for the keyword matcher."""
+
+import re
+
+import pytest
+
+from ols.constants import KeywordMatchMode
+from ols.customize import keywords
+from ols.utils.keyword_matcher import KeywordMatcher, trie_pattern
+
+KEYWORDS = {"auto", "automation", "autoscale", "cluster", "pod", "c++"}
+
+
+def test_trie_pattern():
+    """Test that words sharing prefix are merged."""
+    assert trie_pattern(["auto", "automation", "autoscale"]) == (
+        "auto(?:mation|scale)?"
+    )
+    assert trie_pattern(["pod", "c++"]) == r"(?:c\+\+|pod)"
+    # the expression never matches when there are no words
+    assert re.search(trie_pattern([]), "anything") is None
+    assert re.search(trie_pattern([""]), "anything") is None
+
+
+@pytest.mark.parametrize(
+    ("text", "found"),
+    [
+        ("How do I scale my cluster?", {"cluster"}),
+        ("Automation of autoscaled PODS", {"automation", "autoscale", "pod"}),
+        ("compile C++ in a podman container", {"c++", "pod"}),
+        ("What does 42 signify?", set()),
+        ("", set()),
+    ],
+)
+def test_substring_matches(text, found):
+    """Test that keywords are found anywhere in the text."""
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher.matches(text) == found
+    assert (matcher.search(text) is not None) == bool(found)
+
+
+@pytest.mark.parametrize(
+    ("text", "found"),
+    [
+        ("How do I scale my clusters?", {"cluster"}),
+        ("Automation of autoscaled PODS", {"automation", "pod"}),
+        ("run it in a podman container", set()),
+        ("the autos are parked", {"auto"}),
+        ("autocomplete", set()),
+    ],
+)
+def test_word_matches(text, found):
+    """Test that only whole words (with inflection suffix) are found."""
+    matcher = KeywordMatcher(KEYWORDS, KeywordMatchMode.WORD)
+    assert matcher.matches(text) == found
+
+
+def test_search_returns_first_keyword():
+    """Test that the first keyword found in the text is returned."""
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher.search("a pod in the cluster") == "pod"
+    assert matcher.search("nothing to see") is None
+
+
+def test_matches_substring_semantics_of_keyword_list():
+    """Test that the matcher finds the same as looking for every keyword."""
+    matcher = KeywordMatcher(keywords.KEYWORDS)
+    texts = [
+        "How do I configure the automation controller?",
+        "What does 42 signify?",
+        "Tell me about Kubernetes?",
+        "zzz " * 100 + "deployment",
+    ]
+    for text in texts:
+        expected = any(keyword in text.lower() for keyword in keywords.KEYWORDS)
+        assert (matcher.search(text) is not None) == expected
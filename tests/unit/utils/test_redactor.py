@@ -1,10 +1,64 @@
 """Unit test for the question filter."""
 
+import random
 import re
 from unittest import TestCase
 
-from ols.utils.config import AppConfig
-from ols.utils.redactor import Redactor, RegexFilter
+from prometheus_client import REGISTRY
+
+from ols import config
+
+# needs to be setup there before metrics (used by the redactor) are imported
+config.ols_config.authentication_config.module = "k8s"
+
+from ols.utils.config import AppConfig  # noqa: E402
+from ols.utils.redactor import (  # noqa: E402
+    Redactor,
+    RegexFilter,
+    StreamRedactor,
+    compile_passes,
+    leading_literal,
+    required_literal,
+    trailing_run,
+)
+
+PII_FILTERS = [
+    RegexFilter(re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+"), "email", "<EMAIL>"),
+    RegexFilter(re.compile(r"(?:https?://)?(?:www\.)?[\w\.-]+\.\w+"), "url", "<URL>"),
+    RegexFilter(re.compile(r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}"), "ip", "<IP>"),
+    RegexFilter(re.compile(r"\b\d{3}[-.]?\d{3}[-.]?\d{4}\b"), "phone", "<PHONE>"),
+    RegexFilter(re.compile(r"\bsecret\b"), "secret", "<SECRET>"),
+    RegexFilter(re.compile(r"password: \S+"), "password", "password: <PASSWORD>"),
+]
+
+
+def redact_sequentially(regex_filters, text):
+    """Apply the filters one by one, as the redactor used to."""
+    for regex_filter in regex_filters:
+        text = regex_filter.pattern.sub(regex_filter.replace_with, text)
+    return text
+
+
+def redact_stream(redactor, chunks):
+    """Redact the text streamed in the chunks."""
+    stream = redactor.stream()
+    return "".join(stream.redact(chunk) for chunk in chunks) + stream.flush()
+
+
+def random_chunks(rng, text):
+    """Split the text into random chunks."""
+    bounds = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, 8)))
+    return [text[start:end] for start, end in zip([0, *bounds], [*bounds, len(text)])]
+
+
+def duration_count(name):
+    """Return number of redaction passes made by the filter."""
+    return (
+        REGISTRY.get_sample_value(
+            "ols_redaction_duration_seconds_count", {"filter": name}
+        )
+        or 0
+    )
 
 
 class TestRedactor(TestCase):
@@ -64,3 +118,239 @@ class TestRedactor(TestCase):
         self.query_filter.regex_filters = []
         redacted_query = self.query_filter.redact("test_id", query)
         assert redacted_query == query
+
+    def test_merged_filters_match_sequential_redaction(self):
+        """Test that merged filters redact as filters applied one by one."""
+        self.query_filter.regex_filters = PII_FILTERS
+        words = [
+            "deploy",
+            "secret",
+            "secrets",
+            "1.123.0.99",
+            "123-456-7890",
+            "john@example.com",
+            "www.example.com",
+            "https://10.0.0.1",
+            "a.b",
+            "mongodb",
+            "password: hunter2",
+            "passport",
+            "\n",
+        ]
+        rng = random.Random(42)  # noqa: S311
+        for _ in range(500):
+            query = " ".join(rng.choices(words, k=rng.randint(1, 12)))
+            assert self.query_filter.redact("test_id", query) == (
+                redact_sequentially(PII_FILTERS, query)
+            ), query
+        query = "secret10.0.0.1"
+        assert self.query_filter.redact("test_id", query) == (
+            redact_sequentially(PII_FILTERS, query)
+        )
+
+    def test_random_merged_filters_match_sequential_redaction(self):
+        """Test that random filters redact as filters applied one by one."""
+        patterns = [
+            r"a+",
+            r"\d+",
+            r"\bkey\b",
+            r"b1",
+            r"(?<=a)b",
+            r"1(?!a)",
+            r"[ab]+1",
+            r"-",
+            r"1>",
+            r"M>",
+            r"a|b1",
+            r"\w+-",
+            r"k\w*",
+            r"<\w+>",
+            r"[^ ]b",
+            r"b{2,}",
+            r"^a",
+            r"a$",
+        ]
+        replacements = ["<A>", "<NUM>", "", "x", "-", "ab", "<KEY>", "1"]
+        rng = random.Random(42)  # noqa: S311
+        for _ in range(2000):
+            self.query_filter.regex_filters = [
+                RegexFilter(
+                    re.compile(pattern), f"filter_{i}", rng.choice(replacements)
+                )
+                for i, pattern in enumerate(rng.sample(patterns, rng.randint(2, 6)))
+            ]
+            query = "".join(rng.choices("ab1 <>-Mkey", k=rng.randint(0, 20)))
+            assert self.query_filter.redact("test_id", query) == (
+                redact_sequentially(self.query_filter.regex_filters, query)
+            ), (self.query_filter.regex_filters, query)
+
+    def test_overlapping_matches(self):
+        """Test that text with overlapping matches is redacted filter by filter."""
+        self.query_filter.regex_filters = PII_FILTERS
+        query = "mail me at http://john.doe@example.com from 10.0.0.1"
+        # first filter (email) matches inside of the url found by second one
+        merged_before = duration_count("merged")
+        email_before = duration_count("email")
+
+        redacted_query = self.query_filter.redact("test_id", query)
+
+        assert redacted_query == "mail me at http://<EMAIL> from <URL>"
+        assert duration_count("merged") == merged_before + 1
+        assert duration_count("email") == email_before + 1
+
+    def test_literal_prefilter(self):
+        """Test that the filters are not applied to texts without their literal."""
+        self.query_filter.regex_filters = [
+            RegexFilter(re.compile(r"\bsecret\b"), "secret", "<SECRET>"),
+        ]
+        before = duration_count("secret")
+
+        self.query_filter.redact("test_id", "write a deployment yaml")
+        assert duration_count("secret") == before
+        assert self.query_filter.redact("test_id", "my secret") == "my <SECRET>"
+        assert duration_count("secret") == before + 1
+
+    def test_compile_passes(self):
+        """Test that only independent filters are merged."""
+        passes = compile_passes(
+            [
+                *PII_FILTERS[:3],
+                # backreference
+                RegexFilter(re.compile(r"(\w)\1\1"), "repeated", "<REPEATED>"),
+                # word boundary
+                PII_FILTERS[3],
+                RegexFilter(re.compile(r"\d+"), "number", "<NUM>"),
+                # matches replacement of the previous filter
+                RegexFilter(re.compile(r"NUM"), "num_word", "<NUM_WORD>"),
+                # can match the end of replacement of the previous filter
+                RegexFilter(re.compile(r">\d"), "after_tag", "(AFTER)"),
+                RegexFilter(re.compile(r"x+"), "xs", "(X)"),
+                # group reference in replacement
+                RegexFilter(re.compile(r"(\d+)%"), "percent", r"\1 percent"),
+            ]
+        )
+        assert [len(getattr(p, "passes", [p])) for p in passes] == [
+            3,
+            1,
+            1,
+            1,
+            1,
+            2,
+            1,
+        ]
+
+    def test_required_literal(self):
+        """Test the literal required by patterns."""
+        assert required_literal(re.compile(r"\b(?:image)\b")) == "image"
+        assert required_literal(re.compile(r"user@(example)\.com")) == (
+            "user@example.com"
+        )
+        assert required_literal(re.compile(r"ab+cd")) == "cd"
+        assert required_literal(re.compile(r"(?i:ab)c")) == "c"
+        assert required_literal(re.compile(r"(?i)abc")) == ""
+        assert required_literal(re.compile(r"foo|bar")) == ""
+        assert required_literal(re.compile(r"\d+")) == ""
+
+    def test_stream_redactor_matches_redaction_of_whole_text(self):
+        """Test that streamed text is redacted as if it was redacted at once."""
+        self.query_filter.regex_filters = PII_FILTERS
+        words = [
+            "deploy",
+            "secret",
+            "topsecret",
+            "1.123.0.99",
+            "123-456-7890",
+            "john@example.com",
+            "www.example.com",
+            "password: hunter2",
+            "pass",
+            "\n",
+        ]
+        rng = random.Random(42)  # noqa: S311
+        for _ in range(500):
+            text = " ".join(rng.choices(words, k=rng.randint(1, 12)))
+            chunks = random_chunks(rng, text)
+            assert redact_stream(self.query_filter, chunks) == (
+                self.query_filter.redact("test_id", text)
+            ), chunks
+
+    def test_stream_redactor_applies_filters_to_redacted_text(self):
+        """Test that streamed filters see text redacted by preceding filters."""
+        self.query_filter.regex_filters = [
+            RegexFilter(re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+"), "email", "<EMAIL>"),
+            RegexFilter(re.compile(r"password: \S+"), "password", "password: <X>"),
+        ]
+        chunks = ["a.b", "@", "c.", "comp", "asswor", "d: hu", "nter2p"]
+        chunks += ["asswo", "r", "d", ": h", "unter2"]
+        assert redact_stream(self.query_filter, chunks) == (
+            "<EMAIL>: hunter2password: <X>"
+        )
+
+        patterns = [
+            r"a+",
+            r"\d+",
+            r"\bkey\b",
+            r"(?<=a)b",
+            r"1(?!a)",
+            r"[ab]+1",
+            r"\w+-",
+            r"k\w*",
+            r"<\w+>",
+            r"[\w.]+@\w+",
+            r"password: \S+",
+        ]
+        replacements = ["<A>", "<NUM>", "", "x", "-", "ab", "<KEY>", "1"]
+        pieces = ["a", "b", "1", " ", "<", ">", "-", "key", "@", ".", "password: "]
+        rng = random.Random(42)  # noqa: S311
+        for _ in range(2000):
+            self.query_filter.regex_filters = [
+                RegexFilter(
+                    re.compile(pattern), f"filter_{i}", rng.choice(replacements)
+                )
+                for i, pattern in enumerate(rng.sample(patterns, rng.randint(1, 5)))
+            ]
+            text = "".join(rng.choices(pieces, k=rng.randint(1, 20)))
+            chunks = random_chunks(rng, text)
+            assert redact_stream(self.query_filter, chunks) == (
+                self.query_filter.redact("test_id", text)
+            ), (self.query_filter.regex_filters, chunks)
+
+    def test_stream_redactor_holds_back_possible_matches(self):
+        """Test that only text that can be a part of a match is held back."""
+        self.query_filter.regex_filters = PII_FILTERS
+        stream = self.query_filter.stream()
+
+        assert stream.redact("The") == ""
+        assert stream.redact(" secret") == "The "
+        assert stream.redact(" is") == "<SECRET> "
+        assert stream.redact(" pass") == "is "
+        assert stream.redact("word: x") == ""
+        assert stream.redact("yz and") == "password: <PASSWORD> "
+        assert stream.flush() == "and"
+
+    def test_stream_redactor_lookback(self):
+        """Test that text held back is limited."""
+        stream = StreamRedactor(
+            [RegexFilter(re.compile(r"x+"), "xs", "<X>")], max_lookback=4
+        )
+        assert stream.redact("xxx") == ""
+        # matches longer than the limit are redacted in parts
+        assert stream.redact("xxxxx") == "<X>"
+        assert stream.redact("xx ") == "<X> "
+
+    def test_trailing_run(self):
+        """Test the run of characters that can be a part of a match."""
+        assert trailing_run(re.compile(r"\bsecret\b")).search("a set").group() == (
+            "set"
+        )
+        assert trailing_run(re.compile(r"\d{3}(?=-)")).search("12 1-").group() == ("1-")
+        # any character can be a part of the match
+        assert trailing_run(re.compile(r"a.b")).search("x y").group() == "x y"
+        assert trailing_run(re.compile(r"[^a]b")).search("x y").group() == "x y"
+
+    def test_leading_literal(self):
+        """Test the literal every match starts with."""
+        assert leading_literal(re.compile(r"password: \S+")) == "password: "
+        assert leading_literal(re.compile(r"\bsecret\b")) == "secret"
+        assert leading_literal(re.compile(r"(?i)secret")) == ""
+        assert leading_literal(re.compile(r"\d+secret")) == ""
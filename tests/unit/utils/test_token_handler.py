@@ -7,7 +7,11 @@ import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
 from ols.constants import TOKEN_BUFFER_WEIGHT, ModelFamily
-from ols.src.prompts.prompt_generator import restructure_history
+from ols.src.prompts.prompt_generator import (
+    restructure_history,
+    restructure_rag_context_pre,
+)
+from ols.src.rag_index.chunk_tokens import ChunkTokens
 from ols.utils.token_handler import PromptTooLongError, TokenHandler
 from tests.mock_classes.mock_retrieved_node import MockRetrievedNode
 
@@ -39,6 +43,7 @@ class TestTokenHandler(TestCase):
                 "metadata": {"docs_url": "data/doc4.pdf", "title": "Doc4"},
             },
         ]
+        self._node_data = node_data
         self._mock_retrieved_obj = [MockRetrievedNode(data) for data in node_data]
         self._token_handler_obj = TokenHandler()
 
@@ -292,3 +297,123 @@ class TestTokenHandler(TestCase):
         assert len(truncated_history) == 1
         assert truncated_history[-1] == restructure_history(history[-1], model)
         assert truncated
+
+    @mock.patch("ols.utils.token_handler.TOKEN_BUFFER_WEIGHT", 1.05)
+    @mock.patch("ols.utils.token_handler.MINIMUM_CONTEXT_TOKEN_LIMIT", 1)
+    @mock.patch("ols.utils.token_handler.RAG_SIMILARITY_CUTOFF", 0.4)
+    def test_token_handler_chunk_tokens(self):
+        """Test that precomputed tokens of chunks give the same context."""
+        retrieved_nodes = [
+            MockRetrievedNode({**data, "node_id": f"node-{i}"})
+            for i, data in enumerate(self._node_data)
+        ]
+        chunk_tokens = ChunkTokens.build(
+            {node.node_id: node.get_text() for node in retrieved_nodes},
+            self._token_handler_obj,
+        )
+
+        for model in (ModelFamily.GPT, ModelFamily.GRANITE):
+            for max_tokens in (500, 12, 7):
+                expected = self._token_handler_obj.truncate_rag_context(
+                    retrieved_nodes, model, max_tokens
+                )
+                with mock.patch.object(
+                    self._token_handler_obj,
+                    "text_to_tokens",
+                    wraps=self._token_handler_obj.text_to_tokens,
+                ) as text_to_tokens:
+                    assert (
+                        self._token_handler_obj.truncate_rag_context(
+                            retrieved_nodes, model, max_tokens, chunk_tokens
+                        )
+                        == expected
+                    )
+                # only the model specific tags are tokenized
+                for call in text_to_tokens.call_args_list:
+                    assert call.args[0] == restructure_rag_context_pre("", model)
+
+    def test_history_token_counts(self):
+        """Check that stored token counts are keyed by model family."""
+        messages = [HumanMessage("first message"), AIMessage("first answer")]
+
+        counts = self._token_handler_obj.history_token_counts(messages, ModelFamily.GPT)
+        assert counts == {
+            self._token_handler_obj.history_token_key(ModelFamily.GPT): [
+                self._token_handler_obj.message_to_token_count(message)
+                for message in messages
+            ]
+        }
+
+        counts = self._token_handler_obj.history_token_counts(
+            messages, ModelFamily.GRANITE
+        )
+        # granite tags are counted too
+        assert counts == {
+            self._token_handler_obj.history_token_key(ModelFamily.GRANITE): [
+                self._token_handler_obj.message_to_token_count(
+                    restructure_history(message, ModelFamily.GRANITE)
+                )
+                for message in messages
+            ]
+        }
+
+    def test_limit_conversation_history_with_token_counts(self):
+        """Check that stored token counts are used instead of tokenizing history."""
+        history = [
+            HumanMessage("first message from human"),
+            AIMessage("first answer from AI"),
+            HumanMessage("second message from human"),
+            AIMessage("second answer from AI"),
+        ]
+        key = self._token_handler_obj.history_token_key(ModelFamily.GPT)
+        token_counts = [{key: 10}, {key: 10}, {key: 5}, {key: 5}]
+
+        with mock.patch.object(
+            self._token_handler_obj, "text_to_tokens", side_effect=AssertionError
+        ):
+            truncated_history, truncated = (
+                self._token_handler_obj.limit_conversation_history(
+                    history, ModelFamily.GPT, 20, token_counts
+                )
+            )
+        assert truncated_history == history[1:]
+        assert truncated
+
+        # counts for other model family are not used
+        truncated_history, truncated = (
+            self._token_handler_obj.limit_conversation_history(
+                history, ModelFamily.GRANITE, 1000, token_counts
+            )
+        )
+        assert len(truncated_history) == 4
+        assert not truncated
+
+    def test_check_available_tokens(self):
+        """Check available tokens for prompt with already counted tokens."""
+        assert TokenHandler.check_available_tokens(100, 500, 20) == 380
+        assert TokenHandler.check_available_tokens(480, 500, 20) == 0
+        with pytest.raises(
+            PromptTooLongError,
+            match="Prompt length 481 exceeds LLM available context window limit 480",
+        ):
+            TokenHandler.check_available_tokens(481, 500, 20)
+
+    def test_history_to_token_count(self):
+        """Check that stored token counts are used to count limited history."""
+        history = [HumanMessage("first message"), AIMessage("first answer")]
+        key = self._token_handler_obj.history_token_key(ModelFamily.GPT)
+        message_count = self._token_handler_obj.message_to_token_count(history[0])
+
+        assert self._token_handler_obj.history_to_token_count(
+            history, ModelFamily.GPT
+        ) == sum(
+            self._token_handler_obj.message_to_token_count(message)
+            for message in history
+        )
+        assert (
+            self._token_handler_obj.history_to_token_count(
+                history, ModelFamily.GPT, [{}, {key: 100}]
+            )
+            == message_count + 100
+        )
+        assert self._token_handler_obj.history_to_token_count([], ModelFamily.GPT) == 0